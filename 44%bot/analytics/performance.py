@@ -1,83 +1,124 @@
 """
 Performance Analytics - Trading Metrics Calculation
-Calculates and logs performance metrics every 60 seconds.
+Keeps running stats updated on every trade close and logs them every 60 seconds.
 """
 
-import asyncio
+import json
+from datetime import datetime
 from decimal import Decimal
 from typing import Optional, Dict, Any
 
+from config import config
 from utils.logger import logger
 from database.queries import (
-    get_performance_metrics,
-    get_trade_history,
-    get_paper_config
+    get_closed_trades_since,
+    get_latest_stats_snapshot,
+    get_paper_config,
+    upsert_stats_snapshot
 )
+from analytics.stats import TradeStats
+from core.scheduler import Periodic
 
 
 class PerformanceAnalytics:
     """
     Calculates and displays trading performance metrics.
-    Updates every 60 seconds with win rate, P&L, and other stats.
+
+    Stats live in a TradeStats accumulator that record_trade() updates on
+    every close and saves to paper_stats_snapshots (one row per hour), so
+    the 60 second display never queries the database. load_stats()
+    restores the latest snapshot on startup and folds in trades closed
+    since it was written.
     """
 
     def __init__(self):
         self.running = False
-        self.update_interval = 60  # seconds
+        self.update_interval = config.PERFORMANCE_UPDATE_INTERVAL  # seconds
         self.target_win_rate = Decimal('90.0')  # 90% target
+        self.stats = TradeStats(window=config.STATS_ROLLING_WINDOW)
+
+    async def load_stats(self) -> None:
+        """Restore the accumulator from the latest snapshot and catch up on newer trades."""
+        snapshot = await get_latest_stats_snapshot()
+        if snapshot:
+            state = snapshot['state']
+            self.stats = TradeStats.from_state(json.loads(state) if isinstance(state, str) else state)
+            self.stats.window = config.STATS_ROLLING_WINDOW
+        else:
+            paper_config = await get_paper_config() or {}
+            starting_balance = paper_config.get('starting_balance', paper_config.get('account_balance', 0))
+            self.stats = TradeStats(Decimal(str(starting_balance or 0)), window=config.STATS_ROLLING_WINDOW)
+
+        missed = await get_closed_trades_since(self.stats.last_exit_time)
+        for trade in missed:
+            self._fold(trade['pnl_usd'], trade['outcome'], trade['exit_time'],
+                       trade['entry_time'], trade['risk_reward_ratio'])
+        if missed:
+            await self._save()
+
+        logger.info(
+            f"Performance stats loaded: {self.stats.trades} trades "
+            f"({len(missed)} folded in from paper_trades)"
+        )
+
+    async def record_trade(
+        self,
+        pnl_usd: Decimal,
+        outcome: str,
+        exit_time: datetime,
+        entry_time: Optional[datetime] = None,
+        risk_reward_ratio: Optional[Decimal] = None
+    ) -> None:
+        """
+        Add a just-closed trade to the stats and save the hour's snapshot.
+        Errors are logged, never raised: the trade itself is already closed.
+        """
+        try:
+            self._fold(pnl_usd, outcome, exit_time, entry_time, risk_reward_ratio)
+            await self._save()
+        except Exception as e:
+            logger.error(f"Failed to record trade stats: {e}", exc_info=True)
+
+    def _fold(self, pnl_usd, outcome, exit_time, entry_time, risk_reward_ratio) -> None:
+        self.stats.record(
+            Decimal(str(pnl_usd or 0)), outcome, exit_time, entry_time,
+            Decimal(str(risk_reward_ratio)) if risk_reward_ratio is not None else None
+        )
+
+    async def _save(self) -> None:
+        """Upsert the snapshot for the hour of the last close."""
+        bucket_start = self.stats.last_exit_time.replace(minute=0, second=0, microsecond=0)
+        await upsert_stats_snapshot(bucket_start, self.stats.snapshot(), self.stats.to_state())
 
     async def calculate_metrics(self) -> None:
         """
-        Main analytics loop - runs every 60 seconds.
-        Fetches and logs performance metrics.
+        Main analytics loop - runs every 60 seconds, on the minute.
+        Logs the in-memory performance metrics.
         """
+        ticker = Periodic(self.update_interval)
         while self.running:
             try:
-                # Get metrics from database view
-                metrics = await get_performance_metrics()
-
-                if metrics:
-                    await self._display_metrics(metrics)
+                if self.stats.trades:
+                    self._display_metrics(self.stats)
                 else:
                     logger.info("No trades yet - waiting for first signal")
 
                 # Wait before next update
-                await asyncio.sleep(self.update_interval)
+                await ticker.wait()
 
             except Exception as e:
                 logger.error(f"Error in analytics loop: {e}", exc_info=True)
-                await asyncio.sleep(self.update_interval)
+                await ticker.wait()
 
-    async def _display_metrics(self, metrics: Dict[str, Any]) -> None:
+    def _display_metrics(self, stats: TradeStats) -> None:
         """
         Display performance metrics in formatted output.
 
         Args:
-            metrics: Performance metrics from v_paper_performance view
+            stats: Running trade statistics
         """
-        # Extract metrics
-        total_trades = metrics.get('total_trades', 0)
-        wins = metrics.get('wins', 0)
-        losses = metrics.get('losses', 0)
-        breakevens = metrics.get('breakevens', 0)
-        win_rate = Decimal(str(metrics.get('win_rate', 0) or 0))
-        total_pnl = Decimal(str(metrics.get('total_pnl', 0) or 0))
-        avg_win = Decimal(str(metrics.get('avg_win', 0) or 0))
-        avg_loss = Decimal(str(metrics.get('avg_loss', 0) or 0))
-        largest_win = Decimal(str(metrics.get('largest_win', 0) or 0))
-        largest_loss = Decimal(str(metrics.get('largest_loss', 0) or 0))
-        avg_rr = Decimal(str(metrics.get('avg_rr', 0) or 0))
-
-        # Get current balance
-        config = await get_paper_config()
-        if config:
-            current_balance = Decimal(str(config['account_balance']))
-            starting_balance = Decimal(str(config['starting_balance']))
-            total_return_pct = ((current_balance - starting_balance) / starting_balance) * Decimal('100')
-        else:
-            current_balance = Decimal('0')
-            starting_balance = Decimal('0')
-            total_return_pct = Decimal('0')
+        total_trades = stats.trades
+        win_rate = stats.win_rate
 
         # Win rate progress
         win_rate_target = self.target_win_rate
@@ -90,17 +131,19 @@ class PerformanceAnalytics:
 
         # Account stats
         logger.info(f"\n[ACCOUNT]")
-        logger.info(f"  Starting Balance: ${starting_balance:,.2f}")
-        logger.info(f"  Current Balance:  ${current_balance:,.2f}")
-        logger.info(f"  Total P&L:        ${total_pnl:+,.2f}")
-        logger.info(f"  Total Return:     {total_return_pct:+.2f}%")
+        logger.info(f"  Starting Balance: ${stats.starting_balance:,.2f}")
+        logger.info(f"  Current Balance:  ${stats.equity:,.2f}")
+        logger.info(f"  Total P&L:        ${stats.total_pnl:+,.2f}")
+        logger.info(f"  Total Return:     {stats.return_percent:+.2f}%")
+        logger.info(f"  Max Drawdown:     ${stats.max_drawdown:,.2f} ({stats.max_drawdown_percent:.2f}%)")
 
         # Trade statistics
         logger.info(f"\n[TRADES]")
         logger.info(f"  Total Trades:     {total_trades}")
-        logger.info(f"  Wins:             {wins} ({wins / total_trades * 100:.1f}%)" if total_trades > 0 else "  Wins:             0")
-        logger.info(f"  Losses:           {losses} ({losses / total_trades * 100:.1f}%)" if total_trades > 0 else "  Losses:           0")
-        logger.info(f"  Breakevens:       {breakevens}")
+        logger.info(f"  Wins:             {stats.wins} ({stats.wins / total_trades * 100:.1f}%)")
+        logger.info(f"  Losses:           {stats.losses} ({stats.losses / total_trades * 100:.1f}%)")
+        logger.info(f"  Breakevens:       {stats.breakevens}")
+        logger.info(f"  Avg Duration:     {stats.avg_duration_hours:.1f}h")
 
         # Win rate with target comparison
         if win_rate >= win_rate_target:
@@ -114,41 +157,37 @@ class PerformanceAnalytics:
         logger.info(f"  Status:           {status}")
 
         # P&L statistics
+        profit_factor = f"{stats.profit_factor:.2f}" if stats.profit_factor is not None else "n/a"
         logger.info(f"\n[P&L STATS]")
-        logger.info(f"  Avg Win:          ${avg_win:,.2f}")
-        logger.info(f"  Avg Loss:         ${avg_loss:,.2f}")
-        logger.info(f"  Largest Win:      ${largest_win:,.2f}")
-        logger.info(f"  Largest Loss:     ${largest_loss:,.2f}")
-        logger.info(f"  Avg R/R Ratio:    {avg_rr:.2f}:1")
+        logger.info(f"  Avg Win:          ${stats.avg_win:,.2f}")
+        logger.info(f"  Avg Loss:         ${stats.avg_loss:,.2f}")
+        logger.info(f"  Largest Win:      ${stats.largest_win:,.2f}")
+        logger.info(f"  Largest Loss:     ${stats.largest_loss:,.2f}")
+        logger.info(f"  Avg R/R Ratio:    {stats.avg_rr:.2f}:1")
+        logger.info(f"  Profit Factor:    {profit_factor}")
 
         # Additional insights
         if total_trades >= 10:
-            await self._display_insights(metrics, total_trades, win_rate)
+            self._display_insights(stats)
 
         logger.info("\n" + "=" * 60 + "\n")
 
-    async def _display_insights(
-        self,
-        metrics: Dict[str, Any],
-        total_trades: int,
-        win_rate: Decimal
-    ) -> None:
+    def _display_insights(self, stats: TradeStats) -> None:
         """
         Display additional insights when enough trades exist.
 
         Args:
-            metrics: Performance metrics
-            total_trades: Total number of trades
-            win_rate: Current win rate
+            stats: Running trade statistics
         """
         logger.info(f"\n[INSIGHTS]")
 
         # Trades to 90% goal
-        if total_trades < 100:
-            trades_remaining = 100 - total_trades
+        if stats.trades < 100:
+            trades_remaining = 100 - stats.trades
             logger.info(f"  Trades to 100:    {trades_remaining} more needed")
 
         # Win rate trend
+        win_rate = stats.win_rate
         if win_rate >= Decimal('90.0'):
             logger.info(f"  TARGET ACHIEVED! Maintain consistency.")
         elif win_rate >= Decimal('70.0'):
@@ -158,13 +197,13 @@ class PerformanceAnalytics:
         else:
             logger.info(f"  Critical. System may need adjustment.")
 
-        # Get recent trades for streak analysis
-        recent_trades = await get_trade_history(limit=10)
-        if recent_trades and len(recent_trades) >= 5:
-            # Calculate recent win rate (last 10 trades)
-            recent_wins = sum(1 for t in recent_trades if t['outcome'] == 'WIN')
-            recent_win_rate = (recent_wins / len(recent_trades)) * 100
-            logger.info(f"  Recent Win Rate:  {recent_win_rate:.1f}% (last {len(recent_trades)} trades)")
+        # Streaks and the rolling window
+        if stats.streak:
+            kind = 'wins' if stats.streak > 0 else 'losses'
+            logger.info(f"  Current Streak:   {abs(stats.streak)} {kind}")
+        logger.info(f"  Recent Win Rate:  {stats.rolling_win_rate:.1f}% (last {stats.rolling_trades} trades)")
+        if stats.rolling_sharpe is not None:
+            logger.info(f"  Recent Sharpe:    {stats.rolling_sharpe:.2f} per trade")
 
     async def get_current_metrics(self) -> Optional[Dict[str, Any]]:
         """
@@ -174,7 +213,7 @@ class PerformanceAnalytics:
             Performance metrics dictionary or None
         """
         try:
-            return await get_performance_metrics()
+            return self.stats.snapshot()
         except Exception as e:
             logger.error(f"Failed to get current metrics: {e}")
             return None
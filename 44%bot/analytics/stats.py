@@ -0,0 +1,268 @@
+"""
+Trade Statistics - Incrementally Maintained Performance Metrics
+Each closed trade is folded in with O(1) work, so the analytics loop never
+re-aggregates paper_trades. State round-trips through JSON for snapshots.
+"""
+
+import math
+from collections import deque
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Deque, Dict, Optional, Tuple
+
+ZERO = Decimal('0')
+
+
+def _utc(ts: Optional[datetime]) -> Optional[datetime]:
+    """Naive timestamps (datetime.utcnow()) as aware UTC."""
+    if ts is not None and ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+class TradeStats:
+    """
+    Running performance statistics over closed trades.
+
+    record() updates counts, P&L sums and extremes, equity with its peak
+    and maximum drawdown, win/loss streaks (a breakeven resets both), and a
+    window of the last `window` trades with running sums for the recent
+    win rate and per-trade Sharpe ratio (mean / stdev of P&L as a fraction
+    of equity before the trade, not annualised).
+    """
+
+    def __init__(self, starting_balance: Decimal = ZERO, window: int = 20):
+        self.window = window
+        self.starting_balance = Decimal(starting_balance)
+
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.breakevens = 0
+
+        self.total_pnl = ZERO
+        self.gross_profit = ZERO   # sum of winning P&L
+        self.gross_loss = ZERO     # sum of losing P&L (negative)
+        self.largest_win = ZERO
+        self.largest_loss = ZERO
+        self.rr_sum = ZERO
+        self.rr_count = 0
+        self.duration_hours_sum = 0.0
+        self.duration_count = 0
+
+        self.equity = self.starting_balance
+        self.peak_equity = self.starting_balance
+        self.max_drawdown = ZERO          # USD
+        self.max_drawdown_percent = ZERO
+
+        self.streak = 0  # +n after n wins in a row, -n after n losses
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+        self.last_exit_time: Optional[datetime] = None
+
+        # Rolling window: (return, won) per trade plus running sums
+        self._recent: Deque[Tuple[float, bool]] = deque()
+        self._recent_sum = 0.0
+        self._recent_squares = 0.0
+        self._recent_wins = 0
+
+    # -------------------------------------------------------------------------
+    # UPDATES
+    # -------------------------------------------------------------------------
+
+    def record(
+        self,
+        pnl_usd: Decimal,
+        outcome: str,
+        exit_time: Optional[datetime] = None,
+        entry_time: Optional[datetime] = None,
+        risk_reward_ratio: Optional[Decimal] = None
+    ) -> None:
+        """
+        Fold one closed trade into the statistics.
+
+        Args:
+            pnl_usd: Net P&L after fees
+            outcome: 'WIN', 'LOSS' or 'BREAKEVEN'
+            exit_time: Close time (trades must arrive in exit order)
+            entry_time: Open time, for the average duration
+            risk_reward_ratio: Planned R/R of the trade
+        """
+        pnl = Decimal(pnl_usd)
+        exit_time, entry_time = _utc(exit_time), _utc(entry_time)
+        equity_before = self.equity
+
+        self.trades += 1
+        self.total_pnl += pnl
+        won = outcome == 'WIN'
+        if won:
+            self.wins += 1
+            self.gross_profit += pnl
+            self.largest_win = max(self.largest_win, pnl)
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+            self.max_win_streak = max(self.max_win_streak, self.streak)
+        elif outcome == 'LOSS':
+            self.losses += 1
+            self.gross_loss += pnl
+            self.largest_loss = min(self.largest_loss, pnl)
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+            self.max_loss_streak = max(self.max_loss_streak, -self.streak)
+        else:
+            self.breakevens += 1
+            self.streak = 0
+
+        if risk_reward_ratio is not None:
+            self.rr_sum += Decimal(str(risk_reward_ratio))
+            self.rr_count += 1
+        if exit_time is not None:
+            if entry_time is not None:
+                self.duration_hours_sum += (exit_time - entry_time).total_seconds() / 3600
+                self.duration_count += 1
+            self.last_exit_time = exit_time
+
+        # Equity curve
+        self.equity += pnl
+        if self.equity > self.peak_equity:
+            self.peak_equity = self.equity
+        drawdown = self.peak_equity - self.equity
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+        if self.peak_equity > 0:
+            self.max_drawdown_percent = max(
+                self.max_drawdown_percent, drawdown / self.peak_equity * Decimal('100')
+            )
+
+        # Rolling window
+        ret = float(pnl / equity_before) if equity_before > 0 else 0.0
+        self._push(ret, won)
+
+    def _push(self, ret: float, won: bool) -> None:
+        self._recent.append((ret, won))
+        self._recent_sum += ret
+        self._recent_squares += ret * ret
+        self._recent_wins += won
+        if len(self._recent) > self.window:
+            old, old_won = self._recent.popleft()
+            self._recent_sum -= old
+            self._recent_squares -= old * old
+            self._recent_wins -= old_won
+
+    # -------------------------------------------------------------------------
+    # DERIVED METRICS
+    # -------------------------------------------------------------------------
+
+    @property
+    def win_rate(self) -> Decimal:
+        """Win rate in percent."""
+        return Decimal(self.wins * 100) / self.trades if self.trades else ZERO
+
+    @property
+    def avg_win(self) -> Decimal:
+        return self.gross_profit / self.wins if self.wins else ZERO
+
+    @property
+    def avg_loss(self) -> Decimal:
+        return self.gross_loss / self.losses if self.losses else ZERO
+
+    @property
+    def avg_rr(self) -> Decimal:
+        return self.rr_sum / self.rr_count if self.rr_count else ZERO
+
+    @property
+    def avg_duration_hours(self) -> float:
+        return self.duration_hours_sum / self.duration_count if self.duration_count else 0.0
+
+    @property
+    def profit_factor(self) -> Optional[Decimal]:
+        """Gross profit over gross loss (None before the first loss)."""
+        return self.gross_profit / -self.gross_loss if self.gross_loss else None
+
+    @property
+    def drawdown_percent(self) -> Decimal:
+        """Current distance below the equity peak, in percent."""
+        if self.peak_equity <= 0:
+            return ZERO
+        return (self.peak_equity - self.equity) / self.peak_equity * Decimal('100')
+
+    @property
+    def return_percent(self) -> Decimal:
+        if self.starting_balance <= 0:
+            return ZERO
+        return self.total_pnl / self.starting_balance * Decimal('100')
+
+    @property
+    def rolling_trades(self) -> int:
+        return len(self._recent)
+
+    @property
+    def rolling_win_rate(self) -> float:
+        """Win rate over the rolling window, in percent."""
+        return self._recent_wins * 100 / len(self._recent) if self._recent else 0.0
+
+    @property
+    def rolling_sharpe(self) -> Optional[float]:
+        """Per-trade Sharpe ratio over the rolling window (None under 2 trades or zero spread)."""
+        n = len(self._recent)
+        if n < 2:
+            return None
+        mean = self._recent_sum / n
+        variance = max(self._recent_squares - n * mean * mean, 0.0) / (n - 1)
+        if variance <= 1e-18:
+            return None
+        return mean / math.sqrt(variance)
+
+    # -------------------------------------------------------------------------
+    # PERSISTENCE
+    # -------------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current metrics, keyed like the paper_stats_snapshots columns."""
+        return {
+            'total_trades': self.trades,
+            'wins': self.wins,
+            'losses': self.losses,
+            'breakevens': self.breakevens,
+            'win_rate': self.win_rate,
+            'total_pnl': self.total_pnl,
+            'avg_win': self.avg_win,
+            'avg_loss': self.avg_loss,
+            'largest_win': self.largest_win,
+            'largest_loss': self.largest_loss,
+            'avg_rr': self.avg_rr,
+            'profit_factor': self.profit_factor,
+            'equity': self.equity,
+            'peak_equity': self.peak_equity,
+            'max_drawdown': self.max_drawdown,
+            'max_drawdown_percent': self.max_drawdown_percent,
+            'current_streak': self.streak,
+            'max_win_streak': self.max_win_streak,
+            'max_loss_streak': self.max_loss_streak,
+            'rolling_win_rate': self.rolling_win_rate,
+            'rolling_sharpe': self.rolling_sharpe,
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serialisable state; from_state() rebuilds an identical accumulator."""
+        state = {name: value for name, value in vars(self).items() if not name.startswith('_')}
+        for name, value in state.items():
+            if isinstance(value, Decimal):
+                state[name] = str(value)
+        state['last_exit_time'] = self.last_exit_time.isoformat() if self.last_exit_time else None
+        state['recent'] = [[ret, won] for ret, won in self._recent]
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'TradeStats':
+        stats = cls(Decimal(state['starting_balance']), state['window'])
+        for name, value in state.items():
+            if name == 'recent':
+                continue
+            current = getattr(stats, name)
+            if isinstance(current, Decimal):
+                value = Decimal(value)
+            setattr(stats, name, value)
+        if state.get('last_exit_time'):
+            stats.last_exit_time = datetime.fromisoformat(state['last_exit_time'])
+        for ret, won in state.get('recent', []):
+            stats._push(ret, bool(won))
+        return stats
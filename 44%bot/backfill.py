@@ -5,48 +5,34 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import List, Dict, Any, Optional
 
-from coinbase.rest import RESTClient
-from config import config
 from database.connection import db
+from market.http_client import CoinbaseAPIError, coinbase_client
 from utils.logger import logger
 
 # Constants
 PRODUCT_ID = "BTC-USD"
 GRANULARITY = "FIVE_MINUTE"
+CANDLES_PATH = f"/api/v3/brokerage/products/{PRODUCT_ID}/candles"
+MAX_IN_FLIGHT = 16  # concurrent chunk requests; the client's rate limiter sets the pace
+
+class CoinbaseBackfiller:
+    def __init__(self, client=coinbase_client):
+        # Shared client: signing, pooling, rate limits and retries
+        self.client = client
+
+    async def fetch_candles(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        # API uses unix timestamps
+        params = {
+            'start': str(int(start.timestamp())),
+            'end': str(int(end.timestamp())),
+            'granularity': GRANULARITY
+        }
 
-class CoinbaseBackfillerSdk:
-    def __init__(self):
-        # The SDK handles auth automatically
-        # Remove newlines for SDK if present, similar to manual handling
-        api_secret = config.COINBASE_API_SECRET
-        if '\\n' in api_secret:
-            api_secret = api_secret.replace('\\n', '\n')
-            
-        self.client = RESTClient(
-            api_key=config.COINBASE_API_KEY,
-            api_secret=api_secret
-        )
-
-    def fetch_candles(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
-        # SDK uses unix timestamps
-        start_ts = int(start.timestamp())
-        end_ts = int(end.timestamp())
-        
         try:
-            # get_candles returns a dictionary with 'candles' key
-            response = self.client.get_candles(
-                product_id=PRODUCT_ID,
-                start=start_ts,
-                end=end_ts,
-                granularity=GRANULARITY
-            )
-            
-            # SDK returns an object, not a dict
-            if hasattr(response, 'candles'):
-                return response.candles
-            return []
-            
-        except Exception as e:
+            response = await self.client.get(CANDLES_PATH, params=params)
+            return response.get('candles', [])
+
+        except CoinbaseAPIError as e:
             logger.error(f"Failed to fetch candles: {e}")
             return []
 
@@ -56,22 +42,12 @@ class CoinbaseBackfillerSdk:
 
         values = []
         for c in candles:
-            # Candles from SDK might be objects
-            if hasattr(c, 'start'):
-                 start_val = c.start
-                 open_val = c.open
-                 high_val = c.high
-                 low_val = c.low
-                 close_val = c.close
-                 volume_val = c.volume
-            else:
-                 # Fallback to dict
-                 start_val = c['start']
-                 open_val = c['open']
-                 high_val = c['high']
-                 low_val = c['low']
-                 close_val = c['close']
-                 volume_val = c['volume']
+            start_val = c['start']
+            open_val = c['open']
+            high_val = c['high']
+            low_val = c['low']
+            close_val = c['close']
+            volume_val = c['volume']
 
             if isinstance(start_val, str) and not start_val.isdigit():
                  dt = datetime.fromisoformat(start_val.replace('Z', '+00:00'))
@@ -104,39 +80,44 @@ async def main():
     # 24 hour chunks
     chunk_size = timedelta(hours=24)
     
-    backfiller = CoinbaseBackfillerSdk()
+    backfiller = CoinbaseBackfiller()
     await db.connect()
-    
+    await backfiller.client.connect()
+
     try:
+        chunks = []
         current_start = start_date
-        total_fetched = 0
-        
-        logger.info(f"Starting backfill from {start_date} to {end_date}")
-        
         while current_start < end_date:
             current_end = min(current_start + chunk_size, end_date)
-            
-            logger.info(f"Fetching chunk: {current_start} -> {current_end}")
-            
-            # SDK is synchronous for this call usually, wrap in executor if needed
-            # But here we run it directly since it's a script
-            candles = backfiller.fetch_candles(current_start, current_end)
-            
+            chunks.append((current_start, current_end))
+            current_start = current_end
+
+        logger.info(f"Starting backfill from {start_date} to {end_date} ({len(chunks)} chunks)")
+
+        # Fetch chunks concurrently; the client's token bucket keeps the
+        # request rate at Coinbase's limit, and candles are saved as they arrive
+        semaphore = asyncio.Semaphore(MAX_IN_FLIGHT)
+
+        async def fetch(chunk_start: datetime, chunk_end: datetime):
+            async with semaphore:
+                return chunk_start, chunk_end, await backfiller.fetch_candles(chunk_start, chunk_end)
+
+        total_fetched = 0
+        started = time.monotonic()
+        for next_chunk in asyncio.as_completed([fetch(*c) for c in chunks]):
+            chunk_start, chunk_end, candles = await next_chunk
+
             if candles:
                 await backfiller.save_candles(candles)
                 total_fetched += len(candles)
                 logger.info(f"Progress: {total_fetched} candles total")
             else:
-                logger.warning(f"No candles found for chunk {current_start} -> {current_end}")
-            
-            # Rate limit politeness
-            await asyncio.sleep(0.5)
-            
-            current_start = current_end
-            
-        logger.info("Backfill complete!")
-        
+                logger.warning(f"No candles found for chunk {chunk_start} -> {chunk_end}")
+
+        logger.info(f"Backfill complete! {total_fetched} candles in {time.monotonic() - started:.1f}s")
+
     finally:
+        await backfiller.client.aclose()
         await db.disconnect()
 
 if __name__ == "__main__":
@@ -6,19 +6,38 @@ Usage:
     python backtest.py --start "2024-01-01" --end "2024-12-31"
     python backtest.py --days 90  # Last 90 days
     python backtest.py --all      # All available data
+    python backtest.py --all --shards 8  # Split the timeline across processes
+    python backtest.py --all --intrabar-1m btc_usd_1m.csv  # Settle stop/target ties on 1M
+    python backtest.py --all --profile   # Per-stage timings -> logs/profiles/*.json
+    python backtest.py --all --export-trades logs/backtest_trades.csv  # For the historyBot bootstrap
 """
 
 import asyncio
 import argparse
+import bisect
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from dataclasses import dataclass, asdict, fields as dataclass_fields
 
 from database.connection import db
 from config import config
-from utils.logger import logger
+from utils.logger import logger, configure as configure_logging
 from core.trade_simulator import TradeSimulator
+from core.risk_manager import RiskManager
+from utils.money import price_to_ticks, ticks_to_price
+from utils.result_cache import ResultCache
+from utils.profiling import profiler
+from market.intrabar_resolver import IntrabarResolver, IntrabarStore, TAKE_PROFIT
+from core.trailing_stop import TrailingRule, TrailingStop, AverageTrueRange, MODES, ATR, SWING
+from core.confluence_detector import (
+    SweepState, SwingTracker, CandleEvents, WAITING_FVG, WAITING_FVG_FILL, WAITING_BOS,
+    events_4h, events_5m, log_sweep
+)
 
 
 @dataclass
@@ -40,6 +59,42 @@ class BacktestTrade:
     risk_reward_ratio: Decimal
 
 
+@dataclass
+class TradePlan:
+    """Where a trade entered and the 5M cursor after it exited (sharded runs)"""
+    index_4h: int
+    entry_index: int
+    bias: str
+    resume_index: int
+
+
+# Candles and scanner shared by the shards of one worker (set by _init_shard_worker)
+_shard_candles: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None
+_shard_scanner: Optional['Backtester'] = None
+
+
+def _init_shard_worker(
+    candles_4h: List[Dict[str, Any]],
+    candles_5m: List[Dict[str, Any]],
+    trailing: TrailingRule
+) -> None:
+    """Receive the candle lists once per worker instead of once per shard."""
+    global _shard_candles, _shard_scanner
+    _shard_candles = (candles_4h, candles_5m)
+    # Reuses its 5M tick arrays across shards. No 1M resolver: a candle hitting
+    # both levels exits either way, so the cursor is the same; the replay settles it
+    _shard_scanner = Backtester(trailing=trailing)
+    # Forked workers inherit an enabled profiler; their timings would be lost
+    profiler.enabled = False
+
+
+def _scan_shard(start_4h: int, end_4h: int) -> List[TradePlan]:
+    """Scan one shard from a flat state (no trade open before start_4h)."""
+    candles_4h, candles_5m = _shard_candles
+    plans, _ = asyncio.run(_shard_scanner._scan(candles_4h, candles_5m, start_4h, end_4h, 0))
+    return plans
+
+
 class Backtester:
     """
     Backtesting engine that processes historical data to simulate trading.
@@ -52,16 +107,54 @@ class Backtester:
     5. R/R ratio: 1:1 minimum, 2:1 maximum
     """
 
-    def __init__(self, starting_balance: Decimal = Decimal('100.00')):
+    def __init__(
+        self,
+        starting_balance: Decimal = Decimal('100.00'),
+        cache: Optional[ResultCache] = None,
+        intrabar: Optional[IntrabarResolver] = None,
+        trailing: Optional[TrailingRule] = None,
+        risk: Optional[RiskManager] = None
+    ):
         self.starting_balance = starting_balance
         self.current_balance = starting_balance
         self.trades: List[BacktestTrade] = []
         self.simulator = TradeSimulator()
 
+        # Completed runs keyed by candle content, parameters and code version
+        self.cache = cache
+
+        # Optional 1M drill-down for candles that straddle both stop and target
+        self.intrabar = intrabar
+
+        # How stops trail once a trade is 80% to TP (TRAILING_STOP_MODE by default)
+        self.trailing = trailing or TrailingRule.from_config()
+
+        # Optional account-level limits (daily loss, losing streak, balance),
+        # fed the simulated opens and closes like the live RiskManager
+        self.risk = risk
+
         # State tracking
         self.open_position: Optional[Dict[str, Any]] = None
         self.max_positions = 1
 
+        # Integer high/low/close ticks for the 5M candle list being monitored
+        self._tick_source: Optional[List[Dict[str, Any]]] = None
+        self._tick_arrays: Optional[Tuple[List[int], List[int], List[int]]] = None
+        self._atr_source: Optional[List[Dict[str, Any]]] = None
+        self._atrs: List[Optional[int]] = []
+
+        # Streaming detector output for the 4H / 5M candle lists being scanned
+        self._events_4h_source: Optional[List[Dict[str, Any]]] = None
+        self._events_4h: List[Optional[Dict[str, Any]]] = []
+        self._events_5m_source: Optional[List[Dict[str, Any]]] = None
+        self._events_5m: List[CandleEvents] = []
+
+        # 4H -> 5M index map for the candle lists being scanned
+        self._alignment_source: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None
+        self._first_5m: List[int] = []
+        self._timestamps_5m: List[datetime] = []
+
+    @profiler.timed('sweep_4h')
     async def detect_liquidity_sweep_4h(
         self,
         candles_4h: List[Dict[str, Any]],
@@ -81,406 +174,12 @@ class Backtester:
         Returns:
             Pattern dict with bias or None
         """
-        # Need at least 2 candles to detect higher low/lower high
-        if current_index < 2:
-            return None
-
-        # Look back for previous swing levels
-        lookback = min(10, current_index)
-
-        current = candles_4h[current_index]
-        current_high = Decimal(str(current['high']))
-        current_low = Decimal(str(current['low']))
-
-        # Find most recent swing low (for higher low detection)
-        prev_swing_low = None
-        for i in range(current_index - 1, max(0, current_index - lookback), -1):
-            if i < 1:
-                break
-
-            c = candles_4h[i]
-            c_prev = candles_4h[i-1]
-            c_next = candles_4h[i+1] if i+1 < len(candles_4h) else None
-
-            if not c_next:
-                continue
-
-            # 3-candle swing low pattern
-            low = Decimal(str(c['low']))
-            if (low < Decimal(str(c_prev['low'])) and
-                low < Decimal(str(c_next['low']))):
-                prev_swing_low = low
-                break
-
-        # Check for HIGHER LOW (BULLISH bias)
-        if prev_swing_low and current_low > prev_swing_low:
-            logger.info(
-                f"4H HIGHER LOW detected: current_low=${current_low} > prev_swing_low=${prev_swing_low} "
-                f"at {current['timestamp']} -> BULLISH bias (triggering 5M scan)"
-            )
-            return {
-                'pattern_type': 'HIGHER_LOW',
-                'bias': 'BULLISH',
-                'current_low': current_low,
-                'prev_swing_low': prev_swing_low,
-                'timestamp': current['timestamp']
-            }
-
-        # Find most recent swing high (for lower high detection)
-        prev_swing_high = None
-        for i in range(current_index - 1, max(0, current_index - lookback), -1):
-            if i < 1:
-                break
-
-            c = candles_4h[i]
-            c_prev = candles_4h[i-1]
-            c_next = candles_4h[i+1] if i+1 < len(candles_4h) else None
-
-            if not c_next:
-                continue
-
-            # 3-candle swing high pattern
-            high = Decimal(str(c['high']))
-            if (high > Decimal(str(c_prev['high'])) and
-                high > Decimal(str(c_next['high']))):
-                prev_swing_high = high
-                break
-
-        # Check for LOWER HIGH (BEARISH bias)
-        if prev_swing_high and current_high < prev_swing_high:
-            logger.info(
-                f"4H LOWER HIGH detected: current_high=${current_high} < prev_swing_high=${prev_swing_high} "
-                f"at {current['timestamp']} -> BEARISH bias (triggering 5M scan)"
-            )
-            return {
-                'pattern_type': 'LOWER_HIGH',
-                'bias': 'BEARISH',
-                'current_high': current_high,
-                'prev_swing_high': prev_swing_high,
-                'timestamp': current['timestamp']
-            }
-
-        return None
-
-    def detect_choch(
-        self,
-        candles_5m: List[Dict[str, Any]],
-        current_index: int,
-        bias: str
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Detect CHoCH (Change of Character) - 5 minute break of recent structure high/low.
-
-        CHoCH Detection Logic:
-        - LOOKBACK_PERIOD: 20 candles (5M timeframe)
-        - BREAK_THRESHOLD: 0.1%
-        - BULLISH: Current 5M candle close breaks above recent swing high
-        - BEARISH: Current 5M candle close breaks below recent swing low
-
-        Args:
-            candles_5m: 5M candle data
-            current_index: Current candle index
-            bias: 'BULLISH' or 'BEARISH'
-
-        Returns:
-            CHoCH detection result or None
-        """
-        LOOKBACK_PERIOD = 20
-        BREAK_THRESHOLD = Decimal('0.001')  # 0.1%
-
-        # Need at least LOOKBACK_PERIOD + 1 candles
-        if current_index < LOOKBACK_PERIOD:
-            return None
-
-        current = candles_5m[current_index]
-        current_close = Decimal(str(current['close']))
-
-        # Get recent candles for structure
-        recent_start = current_index - LOOKBACK_PERIOD
-        recent_candles = candles_5m[recent_start:current_index]
-
-        if bias == 'BULLISH':
-            # Find highest high in recent candles
-            recent_highs = [Decimal(str(c['high'])) for c in recent_candles]
-            max_recent_high = max(recent_highs)
-            break_level = max_recent_high * (Decimal('1') + BREAK_THRESHOLD)
-
-            # Check if current close breaks above
-            if current_close > break_level:
-                logger.debug(
-                    f"CHoCH BULLISH detected: close=${current_close:.2f} > "
-                    f"break_level=${break_level:.2f} (structure=${max_recent_high:.2f})"
-                )
-                return {
-                    'detected': True,
-                    'type': 'BULLISH',
-                    'price': current_close,
-                    'structure_level': max_recent_high,
-                    'timestamp': current['timestamp']
-                }
-
-        elif bias == 'BEARISH':
-            # Find lowest low in recent candles
-            recent_lows = [Decimal(str(c['low'])) for c in recent_candles]
-            min_recent_low = min(recent_lows)
-            break_level = min_recent_low * (Decimal('1') - BREAK_THRESHOLD)
-
-            # Check if current close breaks below
-            if current_close < break_level:
-                logger.debug(
-                    f"CHoCH BEARISH detected: close=${current_close:.2f} < "
-                    f"break_level=${break_level:.2f} (structure=${min_recent_low:.2f})"
-                )
-                return {
-                    'detected': True,
-                    'type': 'BEARISH',
-                    'price': current_close,
-                    'structure_level': min_recent_low,
-                    'timestamp': current['timestamp']
-                }
-
-        return None
-
-    def detect_fvg(
-        self,
-        candles_5m: List[Dict[str, Any]],
-        current_index: int,
-        bias: str
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Detect FVG (Fair Value Gap) - 3-candle gap pattern.
-
-        FVG Detection Logic (matches Node.js implementation):
-        - MIN_GAP_PERCENT: 0.1%
-        - BULLISH FVG: Gap between c1.high and c3.low (c3.low > c1.high)
-        - BEARISH FVG: Gap between c1.low and c3.high (c3.high < c1.low)
-
-        Args:
-            candles_5m: 5M candle data
-            current_index: Current candle index (must be at least index 2)
-            bias: 'BULLISH' or 'BEARISH'
-
-        Returns:
-            FVG zone dict or None
-        """
-        MIN_GAP_PERCENT = Decimal('0.001')  # 0.1%
-
-        # Need at least 3 candles
-        if current_index < 2:
-            return None
-
-        # Get last 3 candles
-        c1 = candles_5m[current_index - 2]
-        c2 = candles_5m[current_index - 1]
-        c3 = candles_5m[current_index]
-
-        if bias == 'BULLISH':
-            c1_high = Decimal(str(c1['high']))
-            c3_low = Decimal(str(c3['low']))
-            current_price = Decimal(str(c3['close']))
-
-            # Check for gap: c3.low > c1.high
-            if c3_low > c1_high:
-                gap_size = c3_low - c1_high
-                gap_percent = gap_size / current_price
-
-                # Validate minimum gap size
-                if gap_percent >= MIN_GAP_PERCENT:
-                    logger.debug(
-                        f"FVG BULLISH detected: gap ${c1_high:.2f} to ${c3_low:.2f}, "
-                        f"size=${gap_size:.2f} ({gap_percent*100:.3f}%)"
-                    )
-                    return {
-                        'type': 'BULLISH',
-                        'top': c3_low,
-                        'bottom': c1_high,
-                        'size': gap_size,
-                        'percent': gap_percent,
-                        'timestamp': c3['timestamp'],
-                        'filled': False
-                    }
-
-        elif bias == 'BEARISH':
-            c1_low = Decimal(str(c1['low']))
-            c3_high = Decimal(str(c3['high']))
-            current_price = Decimal(str(c3['close']))
-
-            # Check for gap: c3.high < c1.low
-            if c3_high < c1_low:
-                gap_size = c1_low - c3_high
-                gap_percent = gap_size / current_price
-
-                # Validate minimum gap size
-                if gap_percent >= MIN_GAP_PERCENT:
-                    logger.debug(
-                        f"FVG BEARISH detected: gap ${c3_high:.2f} to ${c1_low:.2f}, "
-                        f"size=${gap_size:.2f} ({gap_percent*100:.3f}%)"
-                    )
-                    return {
-                        'type': 'BEARISH',
-                        'top': c1_low,
-                        'bottom': c3_high,
-                        'size': gap_size,
-                        'percent': gap_percent,
-                        'timestamp': c3['timestamp'],
-                        'filled': False
-                    }
-
-        return None
-
-    def detect_fvg_fill(
-        self,
-        candle: Dict[str, Any],
-        fvg_zone: Dict[str, Any],
-        bias: str
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Detect if FVG zone has been filled (price retraced into gap).
-
-        Args:
-            candle: Current candle to check
-            fvg_zone: The FVG zone dict from detect_fvg
-            bias: 'BULLISH' or 'BEARISH'
-
-        Returns:
-            Fill detection result or None
-        """
-        if not fvg_zone:
-            return None
-
-        candle_low = Decimal(str(candle['low']))
-        candle_high = Decimal(str(candle['high']))
-
-        if bias == 'BULLISH':
-            # For bullish FVG, price needs to dip into the gap (retrace down)
-            if candle_low <= fvg_zone['top'] and candle_low >= fvg_zone['bottom']:
-                logger.debug(
-                    f"FVG BULLISH FILLED: price=${candle_low:.2f} entered gap "
-                    f"[${fvg_zone['bottom']:.2f}, ${fvg_zone['top']:.2f}]"
-                )
-                return {
-                    'filled': True,
-                    'fill_price': candle_low,
-                    'timestamp': candle['timestamp']
-                }
-
-        elif bias == 'BEARISH':
-            # For bearish FVG, price needs to rise into the gap (retrace up)
-            if candle_high >= fvg_zone['bottom'] and candle_high <= fvg_zone['top']:
-                logger.debug(
-                    f"FVG BEARISH FILLED: price=${candle_high:.2f} entered gap "
-                    f"[${fvg_zone['bottom']:.2f}, ${fvg_zone['top']:.2f}]"
-                )
-                return {
-                    'filled': True,
-                    'fill_price': candle_high,
-                    'timestamp': candle['timestamp']
-                }
-
-        return None
-
-    def detect_bos(
-        self,
-        candles_5m: List[Dict[str, Any]],
-        current_index: int,
-        bias: str
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Detect BOS (Break of Structure) - candle closure above most recent 5M swing high/low.
-
-        BOS Detection Logic:
-        - Finds most recent 5M swing high (BULLISH) or swing low (BEARISH)
-        - BULLISH: Current candle close above most recent 5M swing high
-        - BEARISH: Current candle close below most recent 5M swing low
-        - Strong continuation confluence signal
-
-        Args:
-            candles_5m: 5M candle data
-            current_index: Current candle index
-            bias: 'BULLISH' or 'BEARISH'
-
-        Returns:
-            BOS detection result or None
-        """
-        # Need enough history to find swing
-        if current_index < 3:
-            return None
-
-        current_candle = candles_5m[current_index]
-        current_close = Decimal(str(current_candle['close']))
-
-        # Find most recent swing high/low (lookback 20 candles)
-        lookback = min(20, current_index - 2)
-        swing_level = None
-
-        if bias == 'BULLISH':
-            # Look for most recent swing high (2-candle pattern)
-            for i in range(current_index - 1, current_index - lookback, -1):
-                if i < 1:
-                    break
-
-                c = candles_5m[i]
-                c_prev = candles_5m[i-1]
-                c_next = candles_5m[i+1] if i+1 < len(candles_5m) else None
-
-                if not c_next:
-                    continue
-
-                # 2-candle swing high
-                high = Decimal(str(c['high']))
-                if (high > Decimal(str(c_prev['high'])) and
-                    high > Decimal(str(c_next['high']))):
-                    swing_level = high
-                    break
-
-            if swing_level and current_close > swing_level:
-                logger.debug(
-                    f"BOS BULLISH detected: close=${current_close:.2f} > "
-                    f"swing_high=${swing_level:.2f}"
-                )
-                return {
-                    'detected': True,
-                    'type': 'BULLISH',
-                    'price': current_close,
-                    'structure_level': swing_level,
-                    'timestamp': current_candle['timestamp']
-                }
-
-        elif bias == 'BEARISH':
-            # Look for most recent swing low (2-candle pattern)
-            for i in range(current_index - 1, current_index - lookback, -1):
-                if i < 1:
-                    break
-
-                c = candles_5m[i]
-                c_prev = candles_5m[i-1]
-                c_next = candles_5m[i+1] if i+1 < len(candles_5m) else None
-
-                if not c_next:
-                    continue
-
-                # 2-candle swing low
-                low = Decimal(str(c['low']))
-                if (low < Decimal(str(c_prev['low'])) and
-                    low < Decimal(str(c_next['low']))):
-                    swing_level = low
-                    break
-
-            if swing_level and current_close < swing_level:
-                logger.debug(
-                    f"BOS BEARISH detected: close=${current_close:.2f} < "
-                    f"swing_low=${swing_level:.2f}"
-                )
-                return {
-                    'detected': True,
-                    'type': 'BEARISH',
-                    'price': current_close,
-                    'structure_level': swing_level,
-                    'timestamp': current_candle['timestamp']
-                }
-
-        return None
+        sweep = self._get_structure_events(candles_4h, None)[0][current_index]
+        if sweep:
+            log_sweep(sweep)
+        return sweep
 
+    @profiler.timed('confluence_5m')
     async def detect_5m_confluence(
         self,
         candles_5m: List[Dict[str, Any]],
@@ -491,8 +190,9 @@ class Backtester:
         """
         Full 5M confluence detection: CHoCH → FVG → FVG Fill → BOS (EXACT ORDER REQUIRED).
 
-        This is the COMPLETE implementation matching your Node.js scanners.
         All four patterns must occur in sequence within the search window.
+        Per-candle structure events come from the streaming detector in
+        core/confluence_detector.py, computed once per candle list.
 
         State Machine:
         1. WAITING_CHOCH: Looking for CHoCH break
@@ -510,81 +210,55 @@ class Backtester:
         Returns:
             Complete confluence signal or None
         """
-        # State tracking
-        choch_result = None
-        fvg_result = None
-        fvg_fill_result = None
-        bos_result = None
+        events = self._get_structure_events(None, candles_5m)[1]
+        state = SweepState(bias)
 
         # Process each candle in the window
         for i in range(start_index, min(end_index + 1, len(candles_5m))):
-            candle = candles_5m[i]
-
-            # STATE 1: Looking for CHoCH
-            if not choch_result:
-                choch_result = self.detect_choch(candles_5m, i, bias)
-                if choch_result:
-                    logger.info(
-                        f"✓ CHoCH DETECTED at {candle['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} "
-                        f"(index {i}) - {bias} bias confirmed"
-                    )
+            if not state.advance(events[i]):
                 continue
 
-            # STATE 2: CHoCH found, looking for FVG
-            if choch_result and not fvg_result:
-                fvg_result = self.detect_fvg(candles_5m, i, bias)
-                if fvg_result:
-                    logger.info(
-                        f"✓ FVG DETECTED at {candle['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} "
-                        f"(index {i}) - Gap zone: ${fvg_result['bottom']:.2f} to ${fvg_result['top']:.2f}"
-                    )
-                continue
+            # Arguments, not f-strings: nothing is formatted when INFO is filtered out
+            candle_time = candles_5m[i]['timestamp']
 
-            # STATE 3: FVG found, looking for FVG fill
-            if fvg_result and not fvg_fill_result:
-                fvg_fill_result = self.detect_fvg_fill(candle, fvg_result, bias)
-                if fvg_fill_result:
-                    logger.info(
-                        f"✓ FVG FILL DETECTED at {candle['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} "
-                        f"(index {i}) - Price entered gap at ${fvg_fill_result['fill_price']:.2f}"
-                    )
-                continue
-
-            # STATE 4: FVG filled, looking for BOS
-            if fvg_fill_result and not bos_result:
-                bos_result = self.detect_bos(
-                    candles_5m,
-                    i,
-                    bias
+            if state.stage == WAITING_FVG:
+                logger.info(
+                    "✓ CHoCH DETECTED at {:%Y-%m-%d %H:%M:%S} (index {}) - {} bias confirmed",
+                    candle_time, i, bias
                 )
-                if bos_result:
-                    logger.info(
-                        f"✓ BOS DETECTED at {candle['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} "
-                        f"(index {i}) - Structure broken at ${bos_result['price']:.2f}"
-                    )
-                    logger.info(
-                        f"\n{'='*80}\n"
-                        f"🎯 FULL CONFLUENCE COMPLETE ({bias})\n"
-                        f"{'='*80}\n"
-                        f"CHoCH:    {choch_result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
-                        f"FVG:      {fvg_result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
-                        f"FVG Fill: {fvg_fill_result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
-                        f"BOS:      {candle['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
-                        f"{'='*80}"
-                    )
-                    return {
-                        'bias': bias,
-                        'bos_price': Decimal(str(candle['close'])),
-                        'timestamp': candle['timestamp'],
-                        'choch': choch_result,
-                        'fvg': fvg_result,
-                        'fvg_fill': fvg_fill_result,
-                        'bos': bos_result
-                    }
+            elif state.stage == WAITING_FVG_FILL:
+                logger.info(
+                    "✓ FVG DETECTED at {:%Y-%m-%d %H:%M:%S} "
+                    "(index {}) - Gap zone: ${:.2f} to ${:.2f}",
+                    candle_time, i, state.fvg['bottom'], state.fvg['top']
+                )
+            elif state.stage == WAITING_BOS:
+                logger.info(
+                    "✓ FVG FILL DETECTED at {:%Y-%m-%d %H:%M:%S} "
+                    "(index {}) - Price entered gap at ${:.2f}",
+                    candle_time, i, state.fvg_fill['fill_price']
+                )
+            else:
+                logger.info(
+                    "✓ BOS DETECTED at {:%Y-%m-%d %H:%M:%S} "
+                    "(index {}) - Structure broken at ${:.2f}",
+                    candle_time, i, state.bos['price']
+                )
+                logger.opt(lazy=True).info("{}", lambda: (
+                    f"\n{'='*80}\n"
+                    f"🎯 FULL CONFLUENCE COMPLETE ({bias})\n"
+                    f"{'='*80}\n"
+                    f"CHoCH:    {state.choch['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"FVG:      {state.fvg['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"FVG Fill: {state.fvg_fill['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"BOS:      {candle_time:%Y-%m-%d %H:%M:%S}\n"
+                    f"{'='*80}"
+                ))
+                return state.signal()
 
         # Confluence not completed in window
-        if choch_result:
-            logger.debug(f"Partial confluence: CHoCH found but sequence incomplete")
+        if state.choch:
+            logger.debug("Partial confluence: CHoCH found but sequence incomplete")
         return None
 
     async def find_swing_level(
@@ -636,6 +310,7 @@ class Backtester:
 
         return None
 
+    @profiler.timed('execute_trade')
     async def execute_backtest_trade(
         self,
         entry_time: datetime,
@@ -708,9 +383,7 @@ class Backtester:
 
         # Reject trade if no valid stop
         if not stop_result:
-            logger.warning(
-                f"Trade REJECTED: No valid swing-based stop at {entry_time}"
-            )
+            logger.warning("Trade REJECTED: No valid swing-based stop at {}", entry_time)
             return None
 
         # Calculate position size (1% risk)
@@ -779,7 +452,7 @@ class Backtester:
             )
             return None
 
-        logger.info(
+        logger.opt(lazy=True).info("{}", lambda: (
             f"\n{'='*80}\n"
             f"📊 TRADE EXECUTED\n"
             f"{'='*80}\n"
@@ -791,10 +464,11 @@ class Backtester:
             f"Risk Amount:   ${position.risk_amount:,.2f} (1% of balance)\n"
             f"R/R Ratio:     {trade['rr_ratio']:.2f}:1\n"
             f"{'='*80}"
-        )
+        ))
 
         return trade
 
+    @profiler.timed('monitor_trade')
     async def monitor_backtest_trade(
         self,
         trade: Dict[str, Any],
@@ -813,59 +487,63 @@ class Backtester:
             Completed BacktestTrade
         """
         direction = trade['direction']
-        entry_price = trade['entry_price']
-        stop_loss = trade['stop_loss']
-        take_profit = trade['take_profit']
+        highs, lows, closes = self._get_tick_arrays(candles_5m)
+        take_profit = price_to_ticks(trade['take_profit'])
+        trail = TrailingStop(
+            self.trailing, direction == 'LONG', price_to_ticks(trade['entry_price']),
+            price_to_ticks(trade['stop_loss']), take_profit
+        )
+
+        # Inputs of the ATR / SWING trails, as of each candle's close
+        mode = self.trailing.mode
+        atrs = self._get_atr(candles_5m) if mode == ATR else None
+        swings = extremes = None
+        if mode == SWING:
+            swings = SwingTracker(len(candles_5m), 0, highest=direction == 'SHORT')
+            extremes = lows if direction == 'LONG' else highs
+            for j in range(max(start_index - 2, 0), start_index + 1):
+                swings.push(extremes[j])
 
         max_duration_candles = (72 * 60) // 5  # 72 hours in 5M candles
-        trailing_activated = False
-        trailing_stop = None
 
         # Process each subsequent candle
         for i in range(start_index + 1, min(start_index + max_duration_candles, len(candles_5m))):
-            candle = candles_5m[i]
-            high = Decimal(str(candle['high']))
-            low = Decimal(str(candle['low']))
-            close = Decimal(str(candle['close']))
-
-            # Check trailing stop activation (80% to TP)
-            if not trailing_activated:
-                progress = abs(close - entry_price) / abs(take_profit - entry_price)
-                if progress >= Decimal('0.80'):
-                    trailing_stop = entry_price
-                    trailing_activated = True
-                    logger.debug(f"Trailing stop activated @ ${entry_price:.2f}")
-
-            # Check stop loss (or trailing stop)
-            effective_stop = trailing_stop if trailing_activated else stop_loss
+            high = highs[i]
+            low = lows[i]
+            effective_stop = trail.stop
 
             if direction == 'LONG':
-                # Stop hit
-                if low <= effective_stop:
-                    exit_reason = 'TRAILING_STOP' if trailing_activated else 'STOP_LOSS'
-                    return await self._close_backtest_trade(
-                        trade, candle['timestamp'], effective_stop, exit_reason
+                stop_hit = low <= effective_stop
+                target_hit = high >= take_profit
+            else:  # SHORT
+                stop_hit = high >= effective_stop
+                target_hit = low <= take_profit
+
+            # Both levels inside one candle: OHLC cannot order them, so the
+            # stop is assumed unless the 1M bars show the target came first
+            if stop_hit and target_hit and self.intrabar:
+                with profiler.stage('intrabar_1m'):
+                    first = self.intrabar.first_hit(
+                        candles_5m[i]['timestamp'], direction, effective_stop, take_profit
                     )
+                stop_hit = first != TAKE_PROFIT
 
-                # Take profit hit
-                if high >= take_profit:
-                    return await self._close_backtest_trade(
-                        trade, candle['timestamp'], take_profit, 'TAKE_PROFIT'
-                    )
+            # Stop hit (or trailing stop)
+            if stop_hit:
+                return await self._close_stopped_trade(
+                    trade, candles_5m[i]['timestamp'], trail
+                )
 
-            else:  # SHORT
-                # Stop hit
-                if high >= effective_stop:
-                    exit_reason = 'TRAILING_STOP' if trailing_activated else 'STOP_LOSS'
-                    return await self._close_backtest_trade(
-                        trade, candle['timestamp'], effective_stop, exit_reason
-                    )
+            # Take profit hit
+            if target_hit:
+                return await self._close_backtest_trade(
+                    trade, candles_5m[i]['timestamp'], trade['take_profit'], 'TAKE_PROFIT'
+                )
 
-                # Take profit hit
-                if low <= take_profit:
-                    return await self._close_backtest_trade(
-                        trade, candle['timestamp'], take_profit, 'TAKE_PROFIT'
-                    )
+            # Trail on the close, for the next candle (same engine as live ticks)
+            swing = swings.push(extremes[i]) if swings else None
+            if trail.update(closes[i], atr=atrs[i] if atrs else None, swing=swing):
+                logger.debug("Trailing stop moved to ${:.2f}", ticks_to_price(trail.stop))
 
         # Time limit reached
         final_candle = candles_5m[min(start_index + max_duration_candles - 1, len(candles_5m) - 1)]
@@ -874,6 +552,87 @@ class Backtester:
             trade, final_candle['timestamp'], final_price, 'TIME_LIMIT'
         )
 
+    @profiler.timed('tick_arrays')
+    def _get_tick_arrays(
+        self,
+        candles_5m: List[Dict[str, Any]]
+    ) -> Tuple[List[int], List[int], List[int]]:
+        """
+        Get high/low/close as integer price ticks, converting the candle list
+        once and reusing it for every trade monitored against it.
+        """
+        if self._tick_source is not candles_5m:
+            self._tick_arrays = (
+                [price_to_ticks(c['high']) for c in candles_5m],
+                [price_to_ticks(c['low']) for c in candles_5m],
+                [price_to_ticks(c['close']) for c in candles_5m],
+            )
+            self._tick_source = candles_5m
+        return self._tick_arrays
+
+    @profiler.timed('atr')
+    def _get_atr(self, candles_5m: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """Get the 5M ATR (ticks) as of each candle's close, built once per candle list."""
+        if self._atr_source is not candles_5m:
+            highs, lows, closes = self._get_tick_arrays(candles_5m)
+            atr = AverageTrueRange(config.TRAILING_ATR_PERIOD)
+            self._atrs = [atr.update(h, l, c) for h, l, c in zip(highs, lows, closes)]
+            self._atr_source = candles_5m
+        return self._atrs
+
+    @profiler.timed('structure_events')
+    def _get_structure_events(
+        self,
+        candles_4h: Optional[List[Dict[str, Any]]],
+        candles_5m: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[List[Optional[Dict[str, Any]]], List[CandleEvents]]:
+        """
+        Get per-candle 4H sweeps and 5M structure events, feeding each candle
+        list through the streaming detector once and reusing the result.
+        """
+        if candles_4h is not None and self._events_4h_source is not candles_4h:
+            self._events_4h = events_4h(candles_4h)
+            self._events_4h_source = candles_4h
+        if candles_5m is not None and self._events_5m_source is not candles_5m:
+            self._events_5m = events_5m(candles_5m)
+            self._events_5m_source = candles_5m
+        return self._events_4h, self._events_5m
+
+    @profiler.timed('alignment_5m')
+    def _get_5m_alignment(
+        self,
+        candles_4h: List[Dict[str, Any]],
+        candles_5m: List[Dict[str, Any]]
+    ) -> Tuple[List[int], List[datetime]]:
+        """
+        Get the first 5M index at or after each 4H candle open (4H candle k
+        covers 5M rows [first_5m[k], first_5m[k + 1])) and the 5M timestamps,
+        built once per pair of candle lists.
+        """
+        source = self._alignment_source
+        if source is None or source[0] is not candles_4h or source[1] is not candles_5m:
+            self._timestamps_5m = [c['timestamp'] for c in candles_5m]
+            self._first_5m = [
+                bisect.bisect_left(self._timestamps_5m, c['timestamp']) for c in candles_4h
+            ]
+            self._alignment_source = (candles_4h, candles_5m)
+        return self._first_5m, self._timestamps_5m
+
+    async def _close_stopped_trade(
+        self,
+        trade: Dict[str, Any],
+        exit_time: datetime,
+        trail: TrailingStop
+    ) -> BacktestTrade:
+        """Close a trade at its stop (the trailed stop once trailing is active)."""
+        if trail.active:
+            return await self._close_backtest_trade(
+                trade, exit_time, ticks_to_price(trail.stop), 'TRAILING_STOP'
+            )
+        return await self._close_backtest_trade(
+            trade, exit_time, trade['stop_loss'], 'STOP_LOSS'
+        )
+
     async def _close_backtest_trade(
         self,
         trade: Dict[str, Any],
@@ -911,6 +670,8 @@ class Backtester:
 
         # Update balance
         self.current_balance += net_pnl
+        if self.risk:
+            self.risk.on_close(len(self.trades), net_pnl, outcome, exit_time)
 
         # Create completed trade
         completed = BacktestTrade(
@@ -931,8 +692,8 @@ class Backtester:
         )
 
         logger.info(
-            f"Trade CLOSED ({exit_reason}): {outcome} | "
-            f"P&L: ${net_pnl:.2f} | Balance: ${self.current_balance:.2f}"
+            "Trade CLOSED ({}): {} | P&L: ${:.2f} | Balance: ${:.2f}",
+            exit_reason, outcome, net_pnl, self.current_balance
         )
 
         return completed
@@ -940,7 +701,9 @@ class Backtester:
     async def run_backtest(
         self,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        shards: int = 1,
+        workers: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Main backtest execution loop.
@@ -948,6 +711,8 @@ class Backtester:
         Args:
             start_date: Start date for backtest (default: earliest data)
             end_date: End date for backtest (default: latest data)
+            shards: Number of time shards to scan in parallel (1 = serial)
+            workers: Worker processes for sharded runs (default: one per core)
 
         Returns:
             Backtest results dictionary
@@ -960,8 +725,9 @@ class Backtester:
         query_4h = "SELECT * FROM candles_4h ORDER BY timestamp ASC"
         query_5m = "SELECT * FROM candles_5m ORDER BY timestamp ASC"
 
-        candles_4h = await db.fetch_all(query_4h)
-        candles_5m = await db.fetch_all(query_5m)
+        with profiler.stage('load_candles'):
+            candles_4h = await db.fetch_all(query_4h)
+            candles_5m = await db.fetch_all(query_5m)
 
         logger.info(f"Loaded {len(candles_4h)} 4H candles, {len(candles_5m)} 5M candles")
 
@@ -979,12 +745,79 @@ class Backtester:
         )
         logger.info(f"Starting balance: ${self.starting_balance:.2f}\n")
 
-        # Process 4H candles for liquidity sweeps
-        current_5m_index = 0
+        cache_key = None
+        if self.cache:
+            with profiler.stage('result_cache'):
+                cache_key = self.cache.key(
+                    candles_4h, candles_5m, self.starting_balance,
+                    intrabar=self.intrabar.store.fingerprint if self.intrabar else None,
+                    trailing=f"{self.trailing!r}/{config.TRAILING_ATR_PERIOD}",
+                    risk=self._risk_fingerprint()
+                )
+                cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    f"Loaded {len(cached['trades'])} trades from result cache ({cache_key[:12]})"
+                )
+                self.trades = [BacktestTrade(**t) for t in cached['trades']]
+                self.current_balance = cached['final_balance']
+                return self._complete_backtest()
+
+        if shards > 1 and self.risk:
+            # Risk limits carry P&L between trades, which shards cannot see
+            logger.warning("Risk limits need the serial scan, ignoring --shards")
+            shards = 1
+
+        if shards > 1:
+            await self._run_sharded(candles_4h, candles_5m, shards, workers)
+        else:
+            await self._scan(candles_4h, candles_5m, 0, len(candles_4h), 0)
+
+        if cache_key:
+            self.cache.put(cache_key, {
+                'trades': [asdict(t) for t in self.trades],
+                'final_balance': self.current_balance
+            })
+
+        return self._complete_backtest()
+
+    def _risk_fingerprint(self) -> Optional[str]:
+        """Risk limits for the result cache key (None when disabled)."""
+        if not self.risk:
+            return None
+        return repr((self.risk.max_positions, self.risk.daily_loss_limit,
+                     self.risk.consecutive_loss_limit, self.risk.min_account_balance))
+
+    async def _scan(
+        self,
+        candles_4h: List[Dict[str, Any]],
+        candles_5m: List[Dict[str, Any]],
+        start_4h: int,
+        end_4h: int,
+        current_5m_index: int,
+        synced: Optional[Callable[[int, int], bool]] = None
+    ) -> Tuple[List[TradePlan], int]:
+        """
+        Run the strategy over 4H candles [start_4h, end_4h).
+
+        Args:
+            candles_4h: 4H candle data
+            candles_5m: 5M candle data
+            start_4h: First 4H index to process
+            end_4h: 4H index to stop before
+            current_5m_index: 5M cursor (first candle after the last trade exit)
+            synced: Optional check called before each 4H index with the 5M
+                cursor; scanning stops at the first index where it returns True
+
+        Returns:
+            (plans for the trades taken, 4H index where scanning stopped)
+        """
+        plans: List[TradePlan] = []
+        first_5m, timestamps_5m = self._get_5m_alignment(candles_4h, candles_5m)
 
-        for i4h in range(len(candles_4h)):
-            candle_4h = candles_4h[i4h]
-            candle_4h_time = candle_4h['timestamp']
+        for i4h in range(start_4h, end_4h):
+            if synced and synced(i4h, current_5m_index):
+                return plans, i4h
 
             # Check for liquidity sweep
             sweep = await self.detect_liquidity_sweep_4h(candles_4h, i4h)
@@ -997,9 +830,7 @@ class Backtester:
                 continue
 
             # Find corresponding 5M candles (next 4 hours)
-            while (current_5m_index < len(candles_5m) and
-                   candles_5m[current_5m_index]['timestamp'] < candle_4h_time):
-                current_5m_index += 1
+            current_5m_index = max(current_5m_index, first_5m[i4h])
 
             # Look for 5M confluence in next 48 candles (4 hours)
             confluence_window_end = min(current_5m_index + 48, len(candles_5m) - 1)
@@ -1025,7 +856,7 @@ class Backtester:
             entry_price = Decimal(str(entry_candle['close']))
 
             # Log why this trade is being executed
-            logger.info(
+            logger.opt(lazy=True).info("{}", lambda: (
                 f"\n{'='*80}\n"
                 f"🎯 TRADE SETUP COMPLETE - Executing {sweep['bias']} Trade\n"
                 f"{'='*80}\n"
@@ -1039,7 +870,10 @@ class Backtester:
                 f"\nEntry Price:   ${entry_price:,.2f}\n"
                 f"Entry Time:    {entry_candle['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}\n"
                 f"{'='*80}"
-            )
+            ))
+
+            if self.risk and not self.risk.check(entry_candle['timestamp']).approved:
+                continue  # Paused by risk limits
 
             # Execute trade
             trade = await self.execute_backtest_trade(
@@ -1054,6 +888,8 @@ class Backtester:
 
             if not trade:
                 continue  # Trade rejected (no valid stop)
+            if self.risk:
+                self.risk.on_open(len(self.trades), trade['position_size_usd'], trade['risk_amount'])
 
             # Monitor trade to completion
             completed_trade = await self.monitor_backtest_trade(
@@ -1063,17 +899,141 @@ class Backtester:
             self.trades.append(completed_trade)
 
             # Update 5M index to after trade exit
-            while (current_5m_index < len(candles_5m) and
-                   candles_5m[current_5m_index]['timestamp'] <= completed_trade.exit_time):
-                current_5m_index += 1
+            current_5m_index = max(
+                current_5m_index,
+                bisect.bisect_right(timestamps_5m, completed_trade.exit_time)
+            )
 
-        # Calculate results
+            plans.append(TradePlan(i4h, entry_index, sweep['bias'], current_5m_index))
+
+        return plans, end_4h
+
+    @profiler.timed('shard_scan')
+    async def _run_sharded(
+        self,
+        candles_4h: List[Dict[str, Any]],
+        candles_5m: List[Dict[str, Any]],
+        shards: int,
+        workers: Optional[int] = None
+    ) -> None:
+        """
+        Run the backtest as parallel time shards, with trades identical to a serial run.
+
+        The only state carried between 4H candles is the 5M cursor after the
+        last trade exit; the balance changes position size but never which
+        trades are taken or where they exit. So each shard is scanned in its
+        own process as if flat at its start. Lookbacks (10-candle 4H swings,
+        20-candle CHoCH/stop swings) read the candles before the shard, and
+        trades run past the shard end for their full 72h hold.
+
+        Shards are then stitched in order. When the previous shard's last
+        trade is still holding the cursor past a shard's start, the boundary
+        is re-scanned serially until it reaches a 4H candle where the cursor
+        matches the shard's own scan, and the shard's remaining trades are
+        kept from there. The accepted trades are finally replayed in order
+        against the real balance.
+
+        Args:
+            candles_4h: 4H candle data
+            candles_5m: 5M candle data
+            shards: Number of contiguous 4H index ranges
+            workers: Worker processes (default: one per core)
+        """
+        # Records from asyncpg are not picklable; workers get plain dicts
+        candles_4h = [dict(c) for c in candles_4h]
+        candles_5m = [dict(c) for c in candles_5m]
+
+        step = -(-len(candles_4h) // shards)
+        bounds = [(start, min(start + step, len(candles_4h)))
+                  for start in range(0, len(candles_4h), step)]
+        workers = min(workers or os.cpu_count() or 1, len(bounds))
+
+        logger.info(f"Scanning {len(bounds)} shards of {step} 4H candles on {workers} workers")
+
+        # Fork shares the candle lists with workers without pickling them.
+        # Workers are not profiled: their scan time shows up as shard_scan
+        # self time, the boundary re-scans and the replay as nested stages
+        context = (multiprocessing.get_context('fork')
+                   if 'fork' in multiprocessing.get_all_start_methods() else None)
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_shard_worker,
+                                 initargs=(candles_4h, candles_5m, self.trailing)) as pool:
+            shard_plans = await asyncio.gather(*[
+                loop.run_in_executor(pool, _scan_shard, start, end) for start, end in bounds
+            ])
+
+        # Stitch shards in order
+        scanner = Backtester(self.starting_balance, trailing=self.trailing)
+        first_5m, _ = scanner._get_5m_alignment(candles_4h, candles_5m)
+        plans: List[TradePlan] = []
+        resume_index = 0
+
+        for (start, end), speculative in zip(bounds, shard_plans):
+            def synced(i4h: int, cursor: int) -> bool:
+                # Cursor the 5M confluence search would start from at i4h
+                expected = 0
+                for plan in speculative:
+                    if plan.index_4h >= i4h:
+                        break
+                    expected = plan.resume_index
+                return max(cursor, first_5m[i4h]) == max(expected, first_5m[i4h])
+
+            rescanned, stitched_at = await scanner._scan(
+                candles_4h, candles_5m, start, end, resume_index, synced=synced
+            )
+            if stitched_at > start:
+                logger.info(f"Re-scanned 4H candles {start}-{stitched_at} at shard boundary")
+
+            plans.extend(rescanned)
+            plans.extend(plan for plan in speculative if plan.index_4h >= stitched_at)
+            if plans:
+                resume_index = plans[-1].resume_index
+
+        # Replay accepted trades in order so sizing follows the real balance
+        for plan in plans:
+            entry_candle = candles_5m[plan.entry_index]
+            trade = await self.execute_backtest_trade(
+                entry_time=entry_candle['timestamp'],
+                bias=plan.bias,
+                entry_price=Decimal(str(entry_candle['close'])),
+                candles_5m=candles_5m,
+                candles_4h=candles_4h,
+                current_5m_index=plan.entry_index,
+                current_4h_index=plan.index_4h
+            )
+            self.trades.append(
+                await self.monitor_backtest_trade(trade, candles_5m, plan.entry_index)
+            )
+
+    def export_trades(self, path: str) -> None:
+        """
+        Write the completed trades to CSV, one row per trade in order, with
+        each trade's net P&L as an R-multiple of its initial stop risk. This
+        is the trade log historyBot/scripts/equity_curve_simulation.py
+        --trades bootstraps.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        columns = [f.name for f in dataclass_fields(BacktestTrade)] + ['r_multiple']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for trade in self.trades:
+                risk = trade.position_size_btc * abs(trade.entry_price - trade.stop_loss)
+                r_multiple = (trade.pnl_usd / risk).quantize(Decimal('0.0001')) if risk else ''
+                writer.writerow({**asdict(trade), 'r_multiple': r_multiple})
+        logger.info(f"Exported {len(self.trades)} trades to {path}")
+
+    @profiler.timed('results')
+    def _complete_backtest(self) -> Dict[str, Any]:
+        """Calculate, print and return results for the completed trades."""
         results = self._calculate_results()
 
         logger.info("\n" + "=" * 60)
         logger.info("BACKTEST COMPLETE")
         logger.info("=" * 60)
         self._print_results(results)
+        if self.intrabar and self.intrabar.lookups:
+            logger.info(self.intrabar.summary())
 
         return results
 
@@ -1180,8 +1140,20 @@ async def main():
     parser.add_argument('--days', type=int, help='Last N days to backtest')
     parser.add_argument('--all', action='store_true', help='Use all available data')
     parser.add_argument('--balance', type=float, default=100.0, help='Starting balance (default: $100)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore cached results and rerun every candle')
+    parser.add_argument('--shards', type=int, default=1, help='Split the timeline into N shards run in parallel (default: 1, serial)')
+    parser.add_argument('--workers', type=int, help='Worker processes for --shards (default: one per core)')
+    parser.add_argument('--intrabar-1m', type=str, metavar='CSV', help='1M candle CSV used to settle 5M candles that hit both stop and target')
+    parser.add_argument('--profile', nargs='?', const='', metavar='PATH', help='Time each backtest stage and write a JSON report (default: logs/profiles/backtest_<UTC time>.json)')
+    parser.add_argument('--profile-trace', action='store_true', help='With --profile, also write a cProfile trace next to the report')
+    parser.add_argument('--trailing', type=str.upper, choices=MODES, help='Trailing stop mode once 80%% to TP (default: TRAILING_STOP_MODE)')
+    parser.add_argument('--risk-limits', action='store_true', help='Apply the daily loss, losing streak and minimum balance limits (serial scan only)')
+    parser.add_argument('--export-trades', type=str, metavar='PATH', help='Write the trades, with R-multiples, to a CSV for the historyBot bootstrap')
+    parser.add_argument('--log-level', type=str.upper, help='Log level for this run, e.g. WARNING to skip per-setup and per-trade logs (default: LOG_LEVEL)')
 
     args = parser.parse_args()
+    if args.log_level:
+        configure_logging(args.log_level)
 
     # Parse date arguments
     start_date = None
@@ -1201,11 +1173,43 @@ async def main():
 
     try:
         # Run backtest
-        backtester = Backtester(starting_balance=Decimal(str(args.balance)))
-        results = await backtester.run_backtest(start_date, end_date)
+        cache = None if args.no_cache else ResultCache()
+        intrabar = None
+        if args.intrabar_1m:
+            intrabar = IntrabarResolver(IntrabarStore.for_csv(args.intrabar_1m))
+        balance = Decimal(str(args.balance))
+        risk = None
+        if args.risk_limits:
+            # MIN_ACCOUNT_BALANCE is sized for the live account: keep the same
+            # fraction of the backtest balance ($1 of the default $100)
+            risk = RiskManager(
+                balance, max_positions=1,
+                min_account_balance=config.MIN_ACCOUNT_BALANCE / config.STARTING_BALANCE * balance
+            )
+        backtester = Backtester(
+            starting_balance=balance, cache=cache, intrabar=intrabar,
+            trailing=TrailingRule.from_config(args.trailing), risk=risk
+        )
+
+        if args.profile is not None:
+            profiler.start(trace=args.profile_trace)
+        try:
+            results = await backtester.run_backtest(
+                start_date, end_date, shards=args.shards, workers=args.workers
+            )
+        finally:
+            if args.profile is not None:
+                profiler.stop()
+                path = args.profile or os.path.join(
+                    'logs', 'profiles',
+                    f"backtest_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.json"
+                )
+                report = profiler.write(path, 'backtest')
+                logger.info("\n" + profiler.summary(report))
+                logger.info(f"Profile report: {path}")
 
-        # Optionally export results
-        # await export_results_to_csv(results)
+        if args.export_trades:
+            backtester.export_trades(args.export_trades)
 
     finally:
         await db.disconnect()
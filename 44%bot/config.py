@@ -23,6 +23,13 @@ class Config:
     # Coinbase API
     COINBASE_API_KEY = os.getenv('COINBASE_API_KEY', '')
     COINBASE_API_SECRET = os.getenv('COINBASE_API_SECRET', '')
+    COINBASE_API_URL = os.getenv('COINBASE_API_URL', 'https://api.coinbase.com')  # mock server for tests
+    COINBASE_PRIVATE_RATE_LIMIT = float(os.getenv('COINBASE_PRIVATE_RATE_LIMIT', '30'))  # requests/s per key
+    COINBASE_PUBLIC_RATE_LIMIT = float(os.getenv('COINBASE_PUBLIC_RATE_LIMIT', '10'))  # requests/s per IP
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))  # seconds
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))  # attempts per request
+    PRICE_HEDGE_AFTER = float(os.getenv('PRICE_HEDGE_AFTER', '0.3'))  # seconds, 0 disables hedging
+    PRICE_MAX_STALE_SECONDS = 30  # oldest cached price served when the API fails
 
     # Trading Parameters
     STARTING_BALANCE = Decimal(os.getenv('ACCOUNT_BALANCE', '10000'))
@@ -46,7 +53,7 @@ class Config:
     FEE_PERCENT = Decimal('0.006')  # 0.60% taker fee (for calculate_fee)
 
     # Risk Management
-    MAX_POSITIONS = 1
+    MAX_POSITIONS = int(os.getenv('MAX_POSITIONS', '1'))  # concurrent open paper positions
     DAILY_LOSS_LIMIT_PERCENT = Decimal(os.getenv('DAILY_LOSS_LIMIT', '0.03'))  # 3%
     CONSECUTIVE_LOSS_LIMIT = int(os.getenv('CONSECUTIVE_LOSS_LIMIT', '3'))
     MAX_TRADE_DURATION_HOURS = int(os.getenv('MAX_TRADE_DURATION_HOURS', '72'))
@@ -54,14 +61,25 @@ class Config:
 
     # Position Monitoring
     SIGNAL_POLL_INTERVAL = 5  # seconds
-    POSITION_CHECK_INTERVAL = 1  # seconds
+    POSITION_CHECK_INTERVAL = 1  # seconds (retry delay after a failed check)
+    POSITION_CHECK_MIN_INTERVAL = 0.25  # seconds, position next to a trigger
+    POSITION_CHECK_MAX_INTERVAL = 30  # seconds, position far from every trigger
+    POSITION_CHECK_SIGMAS = 4  # volatility margin when spacing checks
+    POSITION_REFRESH_INTERVAL = 5  # seconds between open-position reloads
     PERFORMANCE_UPDATE_INTERVAL = 60  # seconds
+    STATS_ROLLING_WINDOW = 20  # trades in the rolling win rate / Sharpe window
 
     # Trailing Stop
     TRAILING_STOP_ACTIVATION_PERCENT = Decimal('80')  # Activate at 80% to TP
+    TRAILING_STOP_MODE = os.getenv('TRAILING_STOP_MODE', 'BREAKEVEN').upper()  # BREAKEVEN, FIXED, ATR or SWING
+    TRAILING_DISTANCE_PERCENT = Decimal('0.005')  # FIXED: 0.5% of entry behind the best price
+    TRAILING_ATR_MULTIPLIER = Decimal('2')  # ATR: stop this many 5M ATRs behind the best price
+    TRAILING_ATR_PERIOD = 14  # 5M candles
+    TRAILING_MIN_STEP_PERCENT = Decimal('0.0005')  # smallest stop move saved (0.05% of entry)
 
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_BINARY = os.getenv('LOG_BINARY', '0') == '1'  # structured logs/paper_trading_<date>.bin
 
     @classmethod
     def get_database_url(cls):
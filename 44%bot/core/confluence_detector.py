@@ -0,0 +1,421 @@
+"""
+Confluence Detector - Incremental 4H Sweep and 5M Confluence Detection
+Streaming version of the backtest detectors: each closed candle is pushed
+once and updates rolling state in constant time, instead of every candle
+rescanning its lookback window.
+
+4H: higher low / lower high against the most recent 3-candle swing within
+    the last 10 candles (BULLISH / BEARISH bias).
+5M: CHoCH -> FVG -> FVG Fill -> BOS, in that exact order, within the 48
+    candles after a sweep.
+
+Rolling highs/lows come from monotonic deques. backtest.py computes the
+events once per candle list (events_4h/events_5m) and walks each sweep's
+window with a SweepState. Live signals still come from the Node.js
+confluence_state scanners.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import logger
+
+# 4H sweep detection
+SWEEP_SWING_LOOKBACK = 10  # Candles searched for the previous swing
+
+# 5M confluence detection
+CHOCH_LOOKBACK = 20
+CHOCH_BREAK_THRESHOLD = Decimal('0.001')  # 0.1%
+FVG_MIN_GAP_PERCENT = Decimal('0.001')  # 0.1%
+BOS_SWING_LOOKBACK = 20
+
+# Sweep state machine
+WAITING_CHOCH = 'WAITING_CHOCH'
+WAITING_FVG = 'WAITING_FVG'
+WAITING_FVG_FILL = 'WAITING_FVG_FILL'
+WAITING_BOS = 'WAITING_BOS'
+COMPLETE = 'COMPLETE'
+
+
+def _price(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class RollingExtreme:
+    """
+    Max or min of the last `size` values, maintained with a monotonic deque.
+    Each value is appended and removed at most once, so push is O(1) amortized.
+    """
+
+    def __init__(self, size: int, highest: bool = True):
+        self.size = size
+        self.highest = highest
+        self._deque: Deque[Tuple[int, Decimal]] = deque()
+        self._count = 0
+
+    def push(self, value: Decimal) -> None:
+        """Add the newest value, dropping values it dominates or that left the window."""
+        index = self._count
+        self._count += 1
+
+        window = self._deque
+        if self.highest:
+            while window and window[-1][1] <= value:
+                window.pop()
+        else:
+            while window and window[-1][1] >= value:
+                window.pop()
+        window.append((index, value))
+
+        if window[0][0] <= index - self.size:
+            window.popleft()
+
+    @property
+    def value(self) -> Optional[Decimal]:
+        """Extreme of the values in the window (None before the first push)."""
+        return self._deque[0][1] if self._deque else None
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.size
+
+
+class SwingTracker:
+    """
+    Most recent swing high (or low): a candle whose value beats the candle
+    before and the candle after it. A swing at index i is confirmed when
+    candle i + 1 closes, so it is visible from candle i + 1 onward.
+    """
+
+    def __init__(self, lookback: int, min_index: int, highest: bool = True):
+        """
+        Args:
+            lookback: Swings older than current_index - lookback + 1 are ignored
+            min_index: Swings before this index are ignored
+            highest: Track swing highs (True) or swing lows (False)
+        """
+        self.lookback = lookback
+        self.min_index = min_index
+        self.highest = highest
+        self._prev: Optional[Decimal] = None
+        self._prev2: Optional[Decimal] = None
+        self._count = 0
+        self._swing: Optional[Tuple[int, Decimal]] = None
+
+    def push(self, value: Decimal) -> Optional[Decimal]:
+        """
+        Add the newest candle value.
+
+        Returns:
+            Most recent swing level in range of the new candle, or None
+        """
+        index = self._count
+        self._count += 1
+
+        # The previous candle is a swing if it beats both neighbours
+        if self._prev2 is not None:
+            if self.highest:
+                is_swing = self._prev > self._prev2 and self._prev > value
+            else:
+                is_swing = self._prev < self._prev2 and self._prev < value
+            if is_swing:
+                self._swing = (index - 1, self._prev)
+
+        self._prev2 = self._prev
+        self._prev = value
+
+        if self._swing and self._swing[0] >= max(index - self.lookback + 1, self.min_index):
+            return self._swing[1]
+        return None
+
+
+@dataclass
+class CandleEvents:
+    """Structure events of one 5M candle, keyed by bias (only biases that fired)"""
+    index: int
+    candle: Dict[str, Any]
+    choch: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    fvg: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    bos: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+class SweepTracker4H:
+    """Incremental higher low / lower high detection on closed 4H candles."""
+
+    def __init__(self):
+        # Swings in the previous SWEEP_SWING_LOOKBACK - 1 candles, from index 1
+        self._lows = SwingTracker(SWEEP_SWING_LOOKBACK, 1, highest=False)
+        self._highs = SwingTracker(SWEEP_SWING_LOOKBACK, 1, highest=True)
+
+    def update(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Push a closed 4H candle.
+
+        Args:
+            candle: 4H candle with timestamp, high and low
+
+        Returns:
+            Sweep dict (pattern_type, bias, levels, timestamp) or None
+        """
+        current_high = _price(candle['high'])
+        current_low = _price(candle['low'])
+        prev_swing_low = self._lows.push(current_low)
+        prev_swing_high = self._highs.push(current_high)
+
+        # Check for HIGHER LOW (BULLISH bias)
+        if prev_swing_low and current_low > prev_swing_low:
+            return {
+                'pattern_type': 'HIGHER_LOW',
+                'bias': 'BULLISH',
+                'current_low': current_low,
+                'prev_swing_low': prev_swing_low,
+                'timestamp': candle['timestamp']
+            }
+
+        # Check for LOWER HIGH (BEARISH bias)
+        if prev_swing_high and current_high < prev_swing_high:
+            return {
+                'pattern_type': 'LOWER_HIGH',
+                'bias': 'BEARISH',
+                'current_high': current_high,
+                'prev_swing_high': prev_swing_high,
+                'timestamp': candle['timestamp']
+            }
+
+        return None
+
+
+def log_sweep(sweep: Dict[str, Any]) -> None:
+    """Log a detected 4H sweep."""
+    if sweep['bias'] == 'BULLISH':
+        logger.info(
+            "4H HIGHER LOW detected: current_low=${} > prev_swing_low=${} "
+            "at {} -> BULLISH bias (triggering 5M scan)",
+            sweep['current_low'], sweep['prev_swing_low'], sweep['timestamp']
+        )
+    else:
+        logger.info(
+            "4H LOWER HIGH detected: current_high=${} < prev_swing_high=${} "
+            "at {} -> BEARISH bias (triggering 5M scan)",
+            sweep['current_high'], sweep['prev_swing_high'], sweep['timestamp']
+        )
+
+
+class StructureTracker5M:
+    """Incremental CHoCH, FVG and BOS detection on closed 5M candles."""
+
+    def __init__(self):
+        # CHoCH: highest high / lowest low of the previous CHOCH_LOOKBACK candles
+        self._recent_high = RollingExtreme(CHOCH_LOOKBACK, highest=True)
+        self._recent_low = RollingExtreme(CHOCH_LOOKBACK, highest=False)
+        # BOS: most recent 2-sided swing in the previous BOS_SWING_LOOKBACK - 1 candles
+        self._swing_high = SwingTracker(BOS_SWING_LOOKBACK, 3, highest=True)
+        self._swing_low = SwingTracker(BOS_SWING_LOOKBACK, 3, highest=False)
+        # FVG: the two candles before the current one
+        self._previous: Deque[Dict[str, Any]] = deque(maxlen=2)
+        self._count = 0
+
+    def update(self, candle: Dict[str, Any]) -> CandleEvents:
+        """
+        Push a closed 5M candle.
+
+        Args:
+            candle: 5M candle with timestamp, high, low and close
+
+        Returns:
+            CandleEvents for this candle
+        """
+        index = self._count
+        self._count += 1
+        events = CandleEvents(index, candle)
+
+        timestamp = candle['timestamp']
+        high = _price(candle['high'])
+        low = _price(candle['low'])
+        close = _price(candle['close'])
+
+        # CHoCH - close breaks the previous 20 candles' structure by 0.1%
+        if self._recent_high.full:
+            max_recent_high = self._recent_high.value
+            if close > max_recent_high * (Decimal('1') + CHOCH_BREAK_THRESHOLD):
+                events.choch['BULLISH'] = {
+                    'detected': True,
+                    'type': 'BULLISH',
+                    'price': close,
+                    'structure_level': max_recent_high,
+                    'timestamp': timestamp
+                }
+            min_recent_low = self._recent_low.value
+            if close < min_recent_low * (Decimal('1') - CHOCH_BREAK_THRESHOLD):
+                events.choch['BEARISH'] = {
+                    'detected': True,
+                    'type': 'BEARISH',
+                    'price': close,
+                    'structure_level': min_recent_low,
+                    'timestamp': timestamp
+                }
+        self._recent_high.push(high)
+        self._recent_low.push(low)
+
+        # FVG - gap between candle 1 and candle 3 of at least 0.1% of close
+        if len(self._previous) == 2:
+            c1 = self._previous[0]
+            c1_high = _price(c1['high'])
+            c1_low = _price(c1['low'])
+
+            if low > c1_high:
+                gap_size = low - c1_high
+                gap_percent = gap_size / close
+                if gap_percent >= FVG_MIN_GAP_PERCENT:
+                    events.fvg['BULLISH'] = {
+                        'type': 'BULLISH',
+                        'top': low,
+                        'bottom': c1_high,
+                        'size': gap_size,
+                        'percent': gap_percent,
+                        'timestamp': timestamp,
+                        'filled': False
+                    }
+
+            if high < c1_low:
+                gap_size = c1_low - high
+                gap_percent = gap_size / close
+                if gap_percent >= FVG_MIN_GAP_PERCENT:
+                    events.fvg['BEARISH'] = {
+                        'type': 'BEARISH',
+                        'top': c1_low,
+                        'bottom': high,
+                        'size': gap_size,
+                        'percent': gap_percent,
+                        'timestamp': timestamp,
+                        'filled': False
+                    }
+        self._previous.append(candle)
+
+        # BOS - close beyond the most recent swing high / low
+        swing_high = self._swing_high.push(high)
+        swing_low = self._swing_low.push(low)
+        if swing_high and close > swing_high:
+            events.bos['BULLISH'] = {
+                'detected': True,
+                'type': 'BULLISH',
+                'price': close,
+                'structure_level': swing_high,
+                'timestamp': timestamp
+            }
+        if swing_low and close < swing_low:
+            events.bos['BEARISH'] = {
+                'detected': True,
+                'type': 'BEARISH',
+                'price': close,
+                'structure_level': swing_low,
+                'timestamp': timestamp
+            }
+
+        return events
+
+
+def detect_fvg_fill(candle: Dict[str, Any], fvg_zone: Dict[str, Any], bias: str) -> Optional[Dict[str, Any]]:
+    """
+    Check whether a candle retraced into an FVG zone.
+
+    Args:
+        candle: Candle to check
+        fvg_zone: FVG zone dict (top, bottom)
+        bias: 'BULLISH' or 'BEARISH'
+
+    Returns:
+        Fill dict (filled, fill_price, timestamp) or None
+    """
+    if bias == 'BULLISH':
+        # Price dips into the gap
+        fill_price = _price(candle['low'])
+    else:
+        # Price rises into the gap
+        fill_price = _price(candle['high'])
+
+    if fvg_zone['bottom'] <= fill_price <= fvg_zone['top']:
+        return {
+            'filled': True,
+            'fill_price': fill_price,
+            'timestamp': candle['timestamp']
+        }
+    return None
+
+
+@dataclass
+class SweepState:
+    """
+    Confluence progress of one sweep through its 5M window.
+
+    Advances at most one stage per candle, in the order
+    CHoCH -> FVG -> FVG Fill -> BOS.
+    """
+    bias: str
+    stage: str = WAITING_CHOCH
+    choch: Optional[Dict[str, Any]] = None
+    fvg: Optional[Dict[str, Any]] = None
+    fvg_fill: Optional[Dict[str, Any]] = None
+    bos: Optional[Dict[str, Any]] = None
+
+    def advance(self, events: CandleEvents) -> bool:
+        """
+        Apply one candle.
+
+        Args:
+            events: Events of the candle
+
+        Returns:
+            True if the stage changed
+        """
+        if self.stage == WAITING_CHOCH:
+            self.choch = events.choch.get(self.bias)
+            if self.choch:
+                self.stage = WAITING_FVG
+                return True
+
+        elif self.stage == WAITING_FVG:
+            self.fvg = events.fvg.get(self.bias)
+            if self.fvg:
+                self.stage = WAITING_FVG_FILL
+                return True
+
+        elif self.stage == WAITING_FVG_FILL:
+            self.fvg_fill = detect_fvg_fill(events.candle, self.fvg, self.bias)
+            if self.fvg_fill:
+                self.stage = WAITING_BOS
+                return True
+
+        elif self.stage == WAITING_BOS:
+            self.bos = events.bos.get(self.bias)
+            if self.bos:
+                self.stage = COMPLETE
+                return True
+
+        return False
+
+    def signal(self) -> Dict[str, Any]:
+        """Completed confluence signal (same shape as Backtester.detect_5m_confluence)."""
+        return {
+            'bias': self.bias,
+            'bos_price': self.bos['price'],
+            'timestamp': self.bos['timestamp'],
+            'choch': self.choch,
+            'fvg': self.fvg,
+            'fvg_fill': self.fvg_fill,
+            'bos': self.bos
+        }
+
+
+def events_4h(candles: Iterable[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Sweep (or None) for every candle of a historical 4H series."""
+    tracker = SweepTracker4H()
+    return [tracker.update(candle) for candle in candles]
+
+
+def events_5m(candles: Iterable[Dict[str, Any]]) -> List[CandleEvents]:
+    """CandleEvents for every candle of a historical 5M series."""
+    tracker = StructureTracker5M()
+    return [tracker.update(candle) for candle in candles]
@@ -5,76 +5,194 @@ Monitors open positions for stop loss, take profit, trailing stops, and time lim
 
 import asyncio
 from decimal import Decimal
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 from config import config
-from utils.logger import logger
+from utils.logger import logger, debug_every
 from database.queries import (
     get_open_positions,
     close_paper_trade,
     activate_trailing_stop,
-    update_paper_trade
+    update_paper_trade,
+    get_swing_levels
 )
 from market.price_feed import price_feed
 from core.trade_simulator import TradeSimulator
+from core.scheduler import ExitScheduler
+from core.trigger_book import TriggerBook
+from core.trailing_stop import TrailingRule, TrailingStop, ATR, SWING, expected_range
+from core.risk_manager import risk_manager
+from analytics.performance import performance_analytics
+from utils.money import PositionLevels, price_to_ticks, ticks_to_price
 
 
 class PositionManager:
     """
     Monitors open positions in real-time.
-    Checks every 1 second for:
+    Checks each position for:
     - Stop loss hits
     - Take profit hits
-    - Trailing stop activation (80% to TP)
+    - Trailing stop activation (80% to TP) and moves (TrailingStop)
     - 72-hour time limit
+
+    Every position's triggers sit in a TriggerBook, so a new price costs
+    O(log n + hits) and only positions whose levels it crossed get the
+    full check. Prices are fetched after an interval set by ExitScheduler
+    from the distance to the book's nearest trigger and recent volatility
+    (0.25s next to a level, up to 30s far from all of them). Open
+    positions are reloaded every 5 seconds, after any close or update,
+    and on wake().
     """
 
     def __init__(self):
         self.running = False
-        self.check_interval = 1  # seconds
+        self.check_interval = config.POSITION_CHECK_INTERVAL  # retry delay after errors
+        self.refresh_interval = config.POSITION_REFRESH_INTERVAL
         self.trade_simulator = TradeSimulator()
 
-        # Trailing stop config
-        self.trailing_activation_percent = Decimal('0.80')  # 80% to TP
+        # Trailing stop config (activates at 80% to TP, then trails per TRAILING_STOP_MODE)
+        self.trailing_rule = TrailingRule.from_config()
         self.max_trade_duration_hours = 72  # 72 hours
 
+        self.scheduler = ExitScheduler(
+            min_interval=config.POSITION_CHECK_MIN_INTERVAL,
+            max_interval=config.POSITION_CHECK_MAX_INTERVAL,
+            sigmas=config.POSITION_CHECK_SIGMAS
+        )
+        self.book = TriggerBook()
+        self._wake = asyncio.Event()
+
+        # Integer price levels per open position (rebuilt only when the row changes)
+        self._levels_cache: Dict[int, Tuple[Tuple[Any, Any], PositionLevels]] = {}
+        self._trails: Dict[int, TrailingStop] = {}
+        self._swings: Dict[str, Optional[int]] = {'LONG': None, 'SHORT': None}  # SWING mode, ticks
+
     async def monitor_positions(self) -> None:
         """
-        Main monitoring loop - runs every 1 second.
-        Checks all open positions for exit conditions.
+        Main monitoring loop.
+        On each price, runs the full exit check only for positions whose
+        triggers the price crossed, then sleeps until the nearest trigger
+        could plausibly be reached or the positions change.
         """
+        loop = asyncio.get_running_loop()
+        positions: Dict[int, Dict[str, Any]] = {}
+        refresh_at = 0.0
+        swings_moved = False
+
         while self.running:
             try:
-                # Get current price (use cache to avoid API spam)
-                current_price = await price_feed.get_current_price(use_cache=True)
-
-                # Get all open positions
-                open_positions = await get_open_positions()
-
-                if not open_positions:
-                    logger.debug("No open positions to monitor")
-                else:
-                    logger.debug(
-                        f"Monitoring {len(open_positions)} open position(s) "
-                        f"at price ${current_price:,.2f}"
+                now = loop.time()
+                if self._wake.is_set() or now >= refresh_at:
+                    self._wake.clear()
+                    open_positions = await get_open_positions()
+                    positions = {p['id']: p for p in open_positions}
+                    self._prune_levels_cache(open_positions)
+                    risk_manager.sync_open(open_positions)
+                    swings_moved = await self._refresh_swings()
+                    self._sync_book(positions)
+                    refresh_at = now + self.refresh_interval
+                    if not open_positions:
+                        debug_every(60, "No open positions to monitor")
+
+                next_check = refresh_at
+                if positions:
+                    # Cache no older than the tightest check interval
+                    current_price = await price_feed.get_current_price(
+                        use_cache=True, max_age=self.scheduler.min_interval
+                    )
+                    price_ticks = price_to_ticks(current_price)
+                    now = loop.time()
+                    self.scheduler.observe(now, price_ticks)
+
+                    hits = self.book.crossed(price_ticks, datetime.utcnow())
+                    if swings_moved:
+                        # A new swing can move any SWING trail: check them all once
+                        hits = list(dict.fromkeys(hits + list(positions)))
+                        swings_moved = False
+                    debug_every(
+                        20, "Price ${:,.2f}: {} of {} open position(s) triggered",
+                        current_price, len(hits), len(positions)
                     )
+                    for trade_id in hits:
+                        position = positions.get(trade_id)
+                        if position is not None and await self._check_position(position, current_price):
+                            # Closed or updated: pick it up again from a reloaded row
+                            del positions[trade_id]
+                            self.book.remove(trade_id)
+                            refresh_at = min(refresh_at, now + self.scheduler.min_interval)
+                        elif position is not None:
+                            # The trail may wait for a new level (e.g. a changed ATR)
+                            self._book_position(position)
 
-                    for position in open_positions:
-                        await self._check_position(position, current_price)
+                    next_check = now + self._check_delay(price_ticks)
 
-                # Wait 1 second before next check
-                await asyncio.sleep(self.check_interval)
+                await self._sleep_until(min(next_check, refresh_at))
 
             except Exception as e:
                 logger.error(f"Error in position monitoring loop: {e}", exc_info=True)
                 await asyncio.sleep(self.check_interval)
 
+    def _sync_book(self, positions: Dict[int, Dict[str, Any]]) -> None:
+        """Bring the trigger book in line with freshly loaded open positions."""
+        self.book.retain(positions)
+        for position in positions.values():
+            self._book_position(position)
+
+    def _book_position(self, position: Dict[str, Any]) -> None:
+        """Index a position's stop, take profit, next trail move and time limit."""
+        levels = self._get_levels(position)
+        self.book.add(
+            levels, self._deadline(position['entry_time']),
+            self._get_trail(levels).next_trigger()
+        )
+
+    async def _refresh_swings(self) -> bool:
+        """
+        Reload the latest 5M swings SWING trails follow.
+
+        Returns:
+            True if either swing changed
+        """
+        if self.trailing_rule.mode != SWING:
+            return False
+        swings = {}
+        for direction, swing_type in (('LONG', 'LOW'), ('SHORT', 'HIGH')):
+            rows = await get_swing_levels('5M', swing_type, 1)
+            swings[direction] = price_to_ticks(rows[0]['price']) if rows else None
+        moved = swings != self._swings
+        self._swings = swings
+        return moved
+
+    def _check_delay(self, price_ticks: int) -> float:
+        """Seconds until the next price check, from the book's nearest trigger."""
+        deadline = self.book.next_deadline()
+        time_left = (deadline - datetime.utcnow()).total_seconds() if deadline else None
+        return self.scheduler.delay(self.book.distance(price_ticks), price_ticks, time_left)
+
+    async def _sleep_until(self, deadline: float) -> None:
+        """Sleep until a loop-time deadline, or until wake() is called."""
+        timeout = deadline - asyncio.get_running_loop().time()
+        if timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def wake(self) -> None:
+        """Reload open positions now (e.g. right after a trade is opened)."""
+        self._wake.set()
+
+    def _deadline(self, entry_time: datetime) -> datetime:
+        """Time limit of a position opened at entry_time."""
+        return entry_time + timedelta(hours=self.max_trade_duration_hours)
+
     async def _check_position(
         self,
         position: Dict[str, Any],
         current_price: Decimal
-    ) -> None:
+    ) -> bool:
         """
         Check a single position for all exit conditions.
 
@@ -82,18 +200,15 @@ class PositionManager:
         1. Time limit (72 hours)
         2. Stop loss hit
         3. Take profit hit
-        4. Trailing stop activation (80% to TP)
+        4. Trailing stop activation (80% to TP) or move
+
+        Returns:
+            True if the position was closed or its row was updated
         """
         trade_id = position['id']
         direction = position['direction']
-        entry_price = Decimal(str(position['entry_price']))
-        stop_loss = Decimal(str(position['stop_loss']))
-        take_profit = Decimal(str(position['take_profit']))
-        trailing_activated = position['trailing_stop_activated']
-        trailing_price = (
-            Decimal(str(position['trailing_stop_price']))
-            if position['trailing_stop_price'] else None
-        )
+        levels = self._get_levels(position)
+        price_ticks = price_to_ticks(current_price)
         entry_time = position['entry_time']
 
         # 1. Check time limit (72 hours)
@@ -101,56 +216,105 @@ class PositionManager:
             trade_id, entry_time, current_price, direction
         )
         if time_limit_hit:
-            return  # Position closed
+            return True  # Position closed
 
         # 2. Check stop loss (or trailing stop if activated)
-        effective_stop = trailing_price if trailing_activated else stop_loss
+        effective_stop = levels.effective_stop
 
         stop_hit = self._is_stop_loss_hit(
-            current_price, effective_stop, direction
+            price_ticks, effective_stop, direction
         )
 
         if stop_hit:
+            trailing_activated = levels.trailing_activated
             reason = 'TRAILING_STOP' if trailing_activated else 'STOP_LOSS'
             await self._close_position(
-                trade_id, current_price, direction, entry_price,
-                effective_stop, reason
+                trade_id, current_price, direction, position['entry_price'],
+                position['trailing_stop_price'] if trailing_activated else position['stop_loss'],
+                reason
             )
-            return  # Position closed
+            return True  # Position closed
 
         # 3. Check take profit
         tp_hit = self._is_take_profit_hit(
-            current_price, take_profit, direction
+            price_ticks, levels.take_profit, direction
         )
 
         if tp_hit:
             await self._close_position(
-                trade_id, current_price, direction, entry_price,
-                take_profit, 'TAKE_PROFIT'
+                trade_id, current_price, direction, position['entry_price'],
+                position['take_profit'], 'TAKE_PROFIT'
             )
-            return  # Position closed
-
-        # 4. Check trailing stop activation (80% to TP)
-        if not trailing_activated:
-            should_activate = self._should_activate_trailing_stop(
-                entry_price, current_price, take_profit, direction
-            )
-
-            if should_activate:
-                # Move stop to breakeven (entry price)
-                await activate_trailing_stop(trade_id, entry_price)
+            return True  # Position closed
+
+        # 4. Check trailing stop activation (80% to TP), then trail it
+        trail = self._get_trail(levels)
+        atr = swing = None
+        if self.trailing_rule.mode == ATR:
+            atr = expected_range(self.scheduler.volatility.sigma(price_ticks))
+        elif self.trailing_rule.mode == SWING:
+            swing = self._swings[direction]
+
+        if trail.update(price_ticks, atr=atr, swing=swing):
+            # Only saved when the stop actually moved
+            new_stop = ticks_to_price(trail.stop)
+            if not levels.trailing_activated:
+                await activate_trailing_stop(trade_id, new_stop)
                 logger.info(
                     f"Trailing stop ACTIVATED for trade #{trade_id}: "
-                    f"moved to breakeven @ ${entry_price:.2f}"
+                    f"moved to {'breakeven ' if trail.stop == levels.entry else ''}@ ${new_stop:.2f}"
                 )
+            else:
+                await update_paper_trade(trade_id, {'trailing_stop_price': new_stop})
+                logger.info(f"Trailing stop for trade #{trade_id} moved to ${new_stop:.2f}")
+            return True
+
+        return False
+
+    def _get_levels(self, position: Dict[str, Any]) -> PositionLevels:
+        """
+        Get integer price levels for a position, converting from the DB row
+        only when the row is new or its trailing stop changed.
+        """
+        key = (position['trailing_stop_activated'], position['trailing_stop_price'])
+        cached = self._levels_cache.get(position['id'])
+        if cached and cached[0] == key:
+            return cached[1]
+
+        levels = PositionLevels.from_row(position)
+        self._levels_cache[position['id']] = (key, levels)
+        return levels
+
+    def _get_trail(self, levels: PositionLevels) -> TrailingStop:
+        """
+        Get the trailing stop of a position, rebuilt from its levels when the
+        saved stop no longer matches (e.g. after a restart), keeping the best
+        price seen so far.
+        """
+        trail = self._trails.get(levels.trade_id)
+        if trail is None or trail.stop != levels.effective_stop or trail.active != levels.trailing_activated:
+            rebuilt = TrailingStop.from_levels(self.trailing_rule, levels)
+            if trail is not None:
+                rebuilt.best = trail.best
+            self._trails[levels.trade_id] = trail = rebuilt
+        return trail
+
+    def _prune_levels_cache(self, open_positions: List[Dict[str, Any]]) -> None:
+        """Drop cached levels and trails for positions that are no longer open."""
+        if len(self._levels_cache) > len(open_positions) or len(self._trails) > len(open_positions):
+            open_ids = {p['id'] for p in open_positions}
+            for cache in (self._levels_cache, self._trails):
+                for trade_id in list(cache):
+                    if trade_id not in open_ids:
+                        del cache[trade_id]
 
     def _is_stop_loss_hit(
         self,
-        current_price: Decimal,
-        stop_price: Decimal,
+        current_price: int,
+        stop_price: int,
         direction: str
     ) -> bool:
-        """Check if stop loss has been hit."""
+        """Check if stop loss has been hit (prices in ticks)."""
         if direction == 'LONG':
             # LONG: Stop hit when price <= stop
             return current_price <= stop_price
@@ -160,11 +324,11 @@ class PositionManager:
 
     def _is_take_profit_hit(
         self,
-        current_price: Decimal,
-        tp_price: Decimal,
+        current_price: int,
+        tp_price: int,
         direction: str
     ) -> bool:
-        """Check if take profit has been hit."""
+        """Check if take profit has been hit (prices in ticks)."""
         if direction == 'LONG':
             # LONG: TP hit when price >= target
             return current_price >= tp_price
@@ -172,44 +336,6 @@ class PositionManager:
             # SHORT: TP hit when price <= target
             return current_price <= tp_price
 
-    def _should_activate_trailing_stop(
-        self,
-        entry_price: Decimal,
-        current_price: Decimal,
-        take_profit: Decimal,
-        direction: str
-    ) -> bool:
-        """
-        Check if trailing stop should be activated (80% to TP).
-
-        Args:
-            entry_price: Original entry price
-            current_price: Current market price
-            take_profit: Take profit target
-            direction: 'LONG' or 'SHORT'
-
-        Returns:
-            True if should activate trailing stop
-        """
-        # Calculate target distance
-        target_distance = abs(take_profit - entry_price)
-
-        # Calculate current progress
-        current_progress = abs(current_price - entry_price)
-
-        # Calculate progress percentage
-        progress_percent = current_progress / target_distance
-
-        # Check if we've reached 80% of target
-        if progress_percent >= self.trailing_activation_percent:
-            # Ensure price is moving in correct direction
-            if direction == 'LONG' and current_price > entry_price:
-                return True
-            elif direction == 'SHORT' and current_price < entry_price:
-                return True
-
-        return False
-
     async def _check_time_limit(
         self,
         trade_id: int,
@@ -312,7 +438,7 @@ class PositionManager:
                 outcome = 'BREAKEVEN'
 
             # Close the trade in database
-            await close_paper_trade(
+            exit_time = await close_paper_trade(
                 trade_id=trade_id,
                 exit_price=exit_price_with_slippage,
                 pnl_usd=net_pnl,
@@ -321,6 +447,12 @@ class PositionManager:
                 exit_slippage_percent=config.FIXED_SLIPPAGE_PERCENT * Decimal('100'),
                 exit_fee_usd=exit_fee
             )
+            risk_manager.on_close(trade_id, net_pnl, outcome, exit_time)
+            await performance_analytics.record_trade(
+                net_pnl, outcome, exit_time,
+                entry_time=position.get('entry_time'),
+                risk_reward_ratio=position.get('risk_reward_ratio')
+            )
 
             logger.info(
                 f"Position #{trade_id} CLOSED ({reason}):\n"
@@ -0,0 +1,213 @@
+"""
+Risk Manager - Pre-trade Risk Limits
+In-memory port of lib/trading/risk_manager.js: daily P&L, losing streak,
+open exposure and balance are seeded from the DB once and then updated on
+every open and close, so a pre-trade check is a few comparisons with no
+queries. The backtester drives the same object from its simulated trades.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+from utils.logger import logger
+from database.queries import get_open_positions, get_paper_config, get_risk_seed
+
+ZERO = Decimal('0')
+
+
+@dataclass(frozen=True)
+class RiskCheck:
+    """Outcome of a pre-trade check"""
+    approved: bool
+    reasons: Tuple[str, ...] = ()
+
+
+class RiskManager:
+    """
+    Enforces the account-level limits before a trade is opened:
+    - Open positions below MAX_POSITIONS
+    - Today's P&L above -DAILY_LOSS_LIMIT_PERCENT of the balance
+    - Fewer than CONSECUTIVE_LOSS_LIMIT losses in a row (a win or
+      breakeven resets the count)
+    - Balance at least MIN_ACCOUNT_BALANCE
+
+    Days are UTC calendar days; the daily P&L resets on the first check or
+    close of a new day. A losing streak at the limit pauses trading for the
+    rest of its day too (the Node.js version pauses until a win, which a
+    flat account never gets), or until reset_streak() is called.
+
+    Usage:
+        await risk_manager.load()
+        if risk_manager.check().approved:
+            ...open the trade, then risk_manager.on_open(...)
+    """
+
+    def __init__(
+        self,
+        balance: Decimal = ZERO,
+        max_positions: Optional[int] = None,
+        daily_loss_limit: Optional[Decimal] = None,
+        consecutive_loss_limit: Optional[int] = None,
+        min_account_balance: Optional[Decimal] = None
+    ):
+        self.max_positions = max_positions if max_positions is not None else config.MAX_POSITIONS
+        self.daily_loss_limit = (daily_loss_limit if daily_loss_limit is not None
+                                 else config.DAILY_LOSS_LIMIT_PERCENT)
+        self.consecutive_loss_limit = (consecutive_loss_limit if consecutive_loss_limit is not None
+                                       else config.CONSECUTIVE_LOSS_LIMIT)
+        self.min_account_balance = (min_account_balance if min_account_balance is not None
+                                    else config.MIN_ACCOUNT_BALANCE)
+
+        self.balance = Decimal(balance)
+        self.day: Optional[date] = None
+        self.daily_pnl = ZERO
+        self.consecutive_losses = 0
+
+        # trade_id -> (position_size_usd, risk_amount_usd)
+        self._open: Dict[int, Tuple[Decimal, Decimal]] = {}
+        self.exposure_usd = ZERO
+        self.open_risk_usd = ZERO
+
+        self._last_reasons: Tuple[str, ...] = ()
+
+    # -------------------------------------------------------------------------
+    # SEEDING
+    # -------------------------------------------------------------------------
+
+    async def load(self) -> None:
+        """Seed balance, today's P&L, the losing streak and open positions from the DB."""
+        now = datetime.now(timezone.utc)
+        day_start = datetime.combine(now.date(), time(), tzinfo=timezone.utc)
+
+        paper_config = await get_paper_config() or {}
+        starting_balance = paper_config.get('starting_balance', paper_config.get('account_balance', 0))
+        seed = await get_risk_seed(day_start, self.consecutive_loss_limit)
+        open_positions = await get_open_positions()
+
+        self.balance = Decimal(str(starting_balance or 0)) + Decimal(str(seed['total_pnl']))
+        self.day = now.date()
+        self.daily_pnl = Decimal(str(seed['daily_pnl']))
+        self.consecutive_losses = 0
+        for outcome in seed['recent_outcomes']:
+            if outcome != 'LOSS':
+                break
+            self.consecutive_losses += 1
+        last_exit = seed['last_exit_time']
+        if last_exit is not None and last_exit.astimezone(timezone.utc).date() < self.day:
+            self._end_streak_pause()
+        self.sync_open(open_positions)
+
+        logger.info(
+            f"Risk state loaded: balance ${self.balance:,.2f}, today ${self.daily_pnl:+,.2f}, "
+            f"{self.consecutive_losses} loss(es) in a row, {len(self._open)} open position(s)"
+        )
+
+    def sync_open(self, open_positions: List[Dict[str, Any]]) -> None:
+        """Replace the open-position book with freshly loaded rows."""
+        self._open = {
+            p['id']: (Decimal(str(p['position_size_usd'] or 0)), Decimal(str(p['risk_amount_usd'] or 0)))
+            for p in open_positions
+        }
+        self.exposure_usd = sum((usd for usd, _ in self._open.values()), ZERO)
+        self.open_risk_usd = sum((risk for _, risk in self._open.values()), ZERO)
+
+    # -------------------------------------------------------------------------
+    # UPDATES
+    # -------------------------------------------------------------------------
+
+    def on_open(self, trade_id: int, position_usd: Decimal, risk_usd: Decimal) -> None:
+        """Record a newly opened position."""
+        if trade_id in self._open:
+            return
+        self._open[trade_id] = (position_usd, risk_usd)
+        self.exposure_usd += position_usd
+        self.open_risk_usd += risk_usd
+
+    def on_close(self, trade_id: int, pnl_usd: Decimal, outcome: str, exit_time: datetime) -> None:
+        """
+        Record a closed position.
+
+        Args:
+            trade_id: ID of the closed trade
+            pnl_usd: Net P&L after fees
+            outcome: 'WIN', 'LOSS' or 'BREAKEVEN'
+            exit_time: Close time (UTC)
+        """
+        opened = self._open.pop(trade_id, None)
+        if opened is not None:
+            self.exposure_usd -= opened[0]
+            self.open_risk_usd -= opened[1]
+
+        self._roll_day(exit_time.date())
+        if exit_time.date() == self.day:
+            self.daily_pnl += pnl_usd
+        self.balance += pnl_usd
+        self.consecutive_losses = self.consecutive_losses + 1 if outcome == 'LOSS' else 0
+
+    def reset_streak(self) -> None:
+        """Resume trading after a losing streak pause."""
+        self.consecutive_losses = 0
+
+    def _roll_day(self, today: date) -> None:
+        if self.day is None or today > self.day:
+            self.day = today
+            self.daily_pnl = ZERO
+            self._end_streak_pause()
+
+    def _end_streak_pause(self) -> None:
+        if self.consecutive_losses >= self.consecutive_loss_limit:
+            self.consecutive_losses = 0
+
+    # -------------------------------------------------------------------------
+    # CHECKS
+    # -------------------------------------------------------------------------
+
+    def check(self, now: Optional[datetime] = None) -> RiskCheck:
+        """
+        Check the account-level limits for a new trade (no I/O).
+
+        Args:
+            now: Time of the prospective entry (default: now, UTC)
+
+        Returns:
+            RiskCheck with the reasons for any rejection
+        """
+        self._roll_day((now or datetime.now(timezone.utc)).date())
+
+        reasons = []
+        if self.daily_pnl <= -self.balance * self.daily_loss_limit:
+            reasons.append(
+                f"daily loss limit exceeded (${self.daily_pnl:,.2f} / "
+                f"-${self.balance * self.daily_loss_limit:,.2f})"
+            )
+        if self.consecutive_losses >= self.consecutive_loss_limit:
+            reasons.append(f"{self.consecutive_losses} consecutive losses")
+        if self.balance < self.min_account_balance:
+            reasons.append(
+                f"account balance too low (${self.balance:,.2f} < ${self.min_account_balance:,.2f})"
+            )
+
+        # Log pauses when they change only; callers check on every signal poll
+        paused = tuple(reasons)
+        if paused != self._last_reasons:
+            if paused:
+                logger.warning(f"Trading paused: {'; '.join(paused)}")
+            else:
+                logger.info("Risk limits clear, trading resumed")
+            self._last_reasons = paused
+
+        if len(self._open) >= self.max_positions:
+            reasons.insert(0, f"position limit reached ({len(self._open)}/{self.max_positions})")
+        reasons = tuple(reasons)
+        return RiskCheck(not reasons, reasons)
+
+    @property
+    def open_positions(self) -> int:
+        return len(self._open)
+
+
+# Global risk manager instance
+risk_manager = RiskManager()
@@ -0,0 +1,132 @@
+"""
+Scheduler - Drift-free Periodic Ticks and Adaptive Exit Checks
+Periodic loops wake on a fixed wall-clock grid; open positions are checked
+sooner the closer price is to a trigger relative to recent volatility.
+"""
+
+import asyncio
+import math
+import time
+from typing import Optional, Tuple
+
+
+class Periodic:
+    """
+    Sleeps until the next slot of a fixed grid instead of sleeping a fixed
+    time after the work, so loop bodies do not accumulate drift.
+
+    With align=True the grid sits on wall-clock multiples of the interval
+    (a 60s interval fires on the minute). Slots missed while the work ran
+    long are skipped rather than fired back to back.
+    """
+
+    def __init__(self, interval: float, align: bool = True):
+        self.interval = interval
+        self.align = align
+        self._deadline: Optional[float] = None
+
+    def _first_deadline(self, now: float) -> float:
+        if not self.align:
+            return now + self.interval
+        wall = time.time()
+        return now + (math.floor(wall / self.interval) + 1) * self.interval - wall
+
+    async def wait(self) -> None:
+        """Sleep until the next slot."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._deadline is None:
+            self._deadline = self._first_deadline(now)
+        elif now >= self._deadline:
+            missed = math.floor((now - self._deadline) / self.interval) + 1
+            self._deadline += missed * self.interval
+        await asyncio.sleep(self._deadline - now)
+        self._deadline += self.interval
+
+
+class VolatilityEstimator:
+    """
+    Exponentially weighted price volatility in ticks per sqrt(second).
+
+    Samples may arrive at any spacing: each squared move is normalised by
+    the time it took, and older samples fade with the given half-life.
+    """
+
+    def __init__(self, half_life: float = 300.0, floor_fraction: float = 0.00002,
+                 initial_fraction: float = 0.0002):
+        self.half_life = half_life
+        self.floor_fraction = floor_fraction      # minimum sigma as a fraction of price
+        self.initial_fraction = initial_fraction  # sigma assumed before any samples
+        self._variance: Optional[float] = None
+        self._last: Optional[Tuple[float, int]] = None
+
+    def update(self, now: float, price: int) -> None:
+        """Add a price sample (ticks) taken at monotonic time `now`."""
+        if self._last is not None:
+            elapsed = now - self._last[0]
+            if elapsed <= 0:
+                return
+            rate = (price - self._last[1]) ** 2 / elapsed
+            weight = 1.0 - 0.5 ** (elapsed / self.half_life)
+            if self._variance is None:
+                self._variance = rate
+            else:
+                self._variance += weight * (rate - self._variance)
+        self._last = (now, price)
+
+    def sigma(self, price: int) -> float:
+        """Current volatility in ticks per sqrt(second), never below the floor."""
+        floor = price * self.floor_fraction
+        if self._variance is None:
+            return max(price * self.initial_fraction, floor)
+        return max(math.sqrt(self._variance), floor)
+
+
+class ExitScheduler:
+    """
+    Spacing of exit checks.
+
+    When the nearest trigger of any open position (stop, take profit,
+    trailing activation) is `d` ticks from price, the next check comes
+    after (d / (sigmas * sigma))**2 seconds: the time a random walk with
+    the current volatility needs to move that far with `sigmas` standard
+    deviations of margin, clamped to [min_interval, max_interval].
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.25,
+        max_interval: float = 30.0,
+        sigmas: float = 4.0,
+        volatility: Optional[VolatilityEstimator] = None
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.sigmas = sigmas
+        self.volatility = volatility or VolatilityEstimator()
+
+    def observe(self, now: float, price: int) -> None:
+        """Feed a fresh price sample (ticks) into the volatility estimate."""
+        self.volatility.update(now, price)
+
+    def delay(self, distance: Optional[int], price: int,
+              time_left: Optional[float] = None) -> float:
+        """
+        Seconds until the next check.
+
+        Args:
+            distance: Ticks from price to the nearest trigger (None if none)
+            price: Current price in ticks
+            time_left: Seconds until the nearest time limit, if any
+
+        Returns:
+            Delay in seconds
+        """
+        if distance is None:
+            seconds = self.max_interval
+        else:
+            reach = self.sigmas * self.volatility.sigma(price)
+            seconds = min(max((distance / reach) ** 2, self.min_interval), self.max_interval)
+        if time_left is not None:
+            seconds = min(seconds, max(time_left, self.min_interval))
+        return seconds
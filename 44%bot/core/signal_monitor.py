@@ -3,43 +3,42 @@ Signal Monitor - Confluence Signal Polling
 Polls database every 5 seconds for COMPLETE confluence signals and triggers trade execution.
 """
 
-import asyncio
 from typing import List, Dict, Any
 
 from utils.logger import logger
-from database.queries import get_complete_confluence_signals, get_open_positions
+from database.queries import get_complete_confluence_signals
 from core.trade_simulator import trade_simulator
+from core.position_manager import position_manager
+from core.risk_manager import risk_manager
+from core.scheduler import Periodic
 
 
 class SignalMonitor:
     """
     Monitors for new confluence signals and triggers paper trades.
     Polls database every 5 seconds for signals with current_state='COMPLETE'.
+    Position, daily loss, losing streak and balance limits are checked
+    against the in-memory RiskManager before each trade.
     """
 
     def __init__(self):
         self.running = False
         self.poll_interval = 5  # seconds
-        self.max_concurrent_positions = 1  # Only 1 position at a time
         self._processed_signals = set()  # Track processed signal IDs
 
     async def poll_for_signals(self) -> None:
         """
-        Main polling loop - runs every 5 seconds.
+        Main polling loop - runs every 5 seconds on a clock-aligned grid.
         Checks for COMPLETE confluence signals and executes trades.
         """
+        ticker = Periodic(self.poll_interval)
         while self.running:
             try:
                 # Check if we can take new positions
-                open_positions = await get_open_positions()
-                open_count = len(open_positions)
-
-                if open_count >= self.max_concurrent_positions:
-                    logger.debug(
-                        f"Max positions reached ({open_count}/{self.max_concurrent_positions}), "
-                        "skipping signal check"
-                    )
-                    await asyncio.sleep(self.poll_interval)
+                risk = risk_manager.check()
+                if not risk.approved:
+                    logger.debug("Risk limits: {}, skipping signal check", '; '.join(risk.reasons))
+                    await ticker.wait()
                     continue
 
                 # Get complete confluence signals
@@ -52,14 +51,15 @@ class SignalMonitor:
                         # Skip if already processed in this session
                         signal_id = signal['id']
                         if signal_id in self._processed_signals:
-                            logger.debug(f"Signal #{signal_id} already processed, skipping")
+                            logger.debug("Signal #{} already processed, skipping", signal_id)
                             continue
 
-                        # Check position limit again (in case multiple signals)
-                        open_positions = await get_open_positions()
-                        if len(open_positions) >= self.max_concurrent_positions:
+                        # Check risk limits again (in case multiple signals)
+                        risk = risk_manager.check()
+                        if not risk.approved:
                             logger.info(
-                                "Position limit reached, stopping signal processing"
+                                f"Risk limits reached ({'; '.join(risk.reasons)}), "
+                                "stopping signal processing"
                             )
                             break
 
@@ -73,11 +73,11 @@ class SignalMonitor:
                     logger.debug("No complete confluence signals found")
 
                 # Wait before next poll
-                await asyncio.sleep(self.poll_interval)
+                await ticker.wait()
 
             except Exception as e:
                 logger.error(f"Error in signal polling loop: {e}", exc_info=True)
-                await asyncio.sleep(self.poll_interval)
+                await ticker.wait()
 
     async def _process_signal(self, signal: Dict[str, Any]) -> None:
         """
@@ -104,6 +104,7 @@ class SignalMonitor:
                 logger.info(
                     f"Signal #{signal_id} -> Trade #{trade_id} executed successfully"
                 )
+                position_manager.wake()
             else:
                 logger.warning(
                     f"Signal #{signal_id} rejected (no valid swing-based stop loss)"
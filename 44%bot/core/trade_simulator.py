@@ -21,6 +21,7 @@ from database.queries import (
 )
 from database.models import StopLossResult, PositionSize, ConfluenceSignal
 from market.price_feed import price_feed
+from core.risk_manager import risk_manager
 
 
 # Stop loss configuration (MUST match Node.js exactly)
@@ -60,15 +61,15 @@ class TradeSimulator:
             # Stop below swing low - 0.2% buffer
             stop_loss = swing_price * (Decimal('1') - self.config.BUFFER_BELOW_LOW)
             logger.debug(
-                f"LONG stop with buffer: swing=${swing_price}, "
-                f"buffer={self.config.BUFFER_BELOW_LOW}, stop=${stop_loss}"
+                "LONG stop with buffer: swing=${}, buffer={}, stop=${}",
+                swing_price, self.config.BUFFER_BELOW_LOW, stop_loss
             )
         elif direction == 'SHORT':
             # Stop above swing high + 0.3% buffer
             stop_loss = swing_price * (Decimal('1') + self.config.BUFFER_ABOVE_HIGH)
             logger.debug(
-                f"SHORT stop with buffer: swing=${swing_price}, "
-                f"buffer={self.config.BUFFER_ABOVE_HIGH}, stop=${stop_loss}"
+                "SHORT stop with buffer: swing=${}, buffer={}, stop=${}",
+                swing_price, self.config.BUFFER_ABOVE_HIGH, stop_loss
             )
         else:
             raise ValueError(f"Invalid direction: {direction}")
@@ -333,8 +334,8 @@ class TradeSimulator:
         stop_distance_percent = (stop_distance / entry_price) * Decimal('100')
 
         logger.debug(
-            f"Position size calculated: {position_btc:.8f} BTC (${position_usd:.2f}), "
-            f"risk=${risk_amount:.2f}, stop_distance={stop_distance_percent:.2f}%"
+            "Position size calculated: {:.8f} BTC (${:.2f}), risk=${:.2f}, stop_distance={:.2f}%",
+            position_btc, position_usd, risk_amount, stop_distance_percent
         )
 
         return PositionSize(
@@ -382,8 +383,8 @@ class TradeSimulator:
                 filled_price = price * (Decimal('1') + slippage_percent)
 
         logger.debug(
-            f"Slippage applied: ${price:.2f} � ${filled_price:.2f} "
-            f"({direction}, {'entry' if is_entry else 'exit'})"
+            "Slippage applied: ${:.2f} -> ${:.2f} ({}, {})",
+            price, filled_price, direction, 'entry' if is_entry else 'exit'
         )
 
         return filled_price
@@ -497,6 +498,7 @@ class TradeSimulator:
             }
 
             trade_id = await insert_paper_trade(trade_data)
+            risk_manager.on_open(trade_id, position.usd, position.risk_amount)
 
             logger.info(
                 f"Paper trade #{trade_id} EXECUTED: {direction} "
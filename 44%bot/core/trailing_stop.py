@@ -0,0 +1,202 @@
+"""
+Trailing Stop - Ratcheting Stops for Live Ticks and Backtest Candles
+One O(1) update per price per position, shared by PositionManager and the
+backtester. The stop only ever moves in the position's favour and only
+reports a move worth saving.
+"""
+
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from config import config
+from utils.money import PRICE_DECIMALS, USD_DECIMALS, PositionLevels, as_fraction, scale_ticks
+
+# Trailing modes
+BREAKEVEN = 'BREAKEVEN'  # move to entry once, at activation
+FIXED = 'FIXED'          # trail a fixed fraction of entry behind the best price
+ATR = 'ATR'              # trail a multiple of the 5M ATR behind the best price
+SWING = 'SWING'          # trail behind the latest 5M swing (with the stop buffer)
+MODES = (BREAKEVEN, FIXED, ATR, SWING)
+
+FIVE_MINUTES = 300  # seconds
+CENT = 10 ** (PRICE_DECIMALS - USD_DECIMALS)  # ticks; paper_trades stores stops in cents
+
+
+@dataclass(frozen=True)
+class TrailingRule:
+    """How stops trail; every mode starts at the activation point."""
+    mode: str = BREAKEVEN
+    activation: Decimal = Decimal('0.80')       # fraction of the TP distance
+    distance: Decimal = Decimal('0.005')        # FIXED: fraction of entry
+    atr_multiplier: Decimal = Decimal('2')      # ATR
+    min_step: Decimal = Decimal('0.0005')       # fraction of entry
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown trailing stop mode {self.mode!r} (expected one of {', '.join(MODES)})")
+
+    @classmethod
+    def from_config(cls, mode: Optional[str] = None) -> 'TrailingRule':
+        return cls(
+            mode=(mode or config.TRAILING_STOP_MODE).upper(),
+            activation=config.TRAILING_STOP_ACTIVATION_PERCENT / Decimal('100'),
+            distance=config.TRAILING_DISTANCE_PERCENT,
+            atr_multiplier=config.TRAILING_ATR_MULTIPLIER,
+            min_step=config.TRAILING_MIN_STEP_PERCENT
+        )
+
+
+class TrailingStop:
+    """
+    Ratcheting stop of one position, all prices in ticks.
+
+    Inactive until price reaches the activation level (the activation
+    fraction of the way from entry to take profit, and at least one tick
+    in profit). Activation moves the stop to breakeven; after that FIXED
+    and ATR trail a distance behind the best price seen, and SWING trails
+    behind the latest swing beyond the stop. Trailed levels are rounded
+    to the cent away from price, so they survive the DB round trip.
+    update() returns True only when the stop moved: on activation, or by
+    at least min_step.
+
+    Usage:
+        trail = TrailingStop(rule, levels.is_long, levels.entry, levels.stop_loss, levels.take_profit)
+        if trail.update(price):
+            save(trail.stop)
+    """
+
+    __slots__ = (
+        'mode', 'is_long', 'entry', 'stop', 'take_profit', 'active', 'best',
+        'activation_level', '_distance', '_min_step', '_atr_num', '_atr_den',
+        '_buffer_num', '_buffer_den', '_last_distance'
+    )
+
+    def __init__(
+        self,
+        rule: TrailingRule,
+        is_long: bool,
+        entry: int,
+        stop: int,
+        take_profit: int,
+        active: bool = False
+    ):
+        self.mode = rule.mode
+        self.is_long = is_long
+        self.entry = entry
+        self.stop = stop
+        self.take_profit = take_profit
+        self.active = active
+        self.best = entry
+
+        num, den = as_fraction(rule.activation)
+        ticks = max(-(-abs(take_profit - entry) * num // den), 1)
+        self.activation_level = entry + ticks if is_long else entry - ticks
+
+        self._distance = scale_ticks(entry, *as_fraction(rule.distance))
+        self._min_step = scale_ticks(entry, *as_fraction(rule.min_step))
+        self._atr_num, self._atr_den = as_fraction(rule.atr_multiplier)
+        buffer = config.BUFFER_BELOW_LOW if is_long else config.BUFFER_ABOVE_HIGH
+        self._buffer_num, self._buffer_den = as_fraction(buffer)
+        self._last_distance: Optional[int] = self._distance if rule.mode == FIXED else None
+
+    @classmethod
+    def from_levels(cls, rule: TrailingRule, levels: PositionLevels) -> 'TrailingStop':
+        """Trail for an open position (resumes at its saved trailing stop)."""
+        return cls(rule, levels.is_long, levels.entry, levels.effective_stop,
+                   levels.take_profit, active=levels.trailing_activated)
+
+    def update(self, price: int, atr: Optional[int] = None, swing: Optional[int] = None) -> bool:
+        """
+        Feed one price.
+
+        Args:
+            price: Latest price (a tick, or a candle close)
+            atr: Current ATR in ticks (ATR mode)
+            swing: Latest swing low (longs) / high (shorts) in ticks (SWING mode)
+
+        Returns:
+            True if the stop moved
+        """
+        sign = 1 if self.is_long else -1
+        if (price - self.best) * sign > 0:
+            self.best = price
+
+        if not self.active:
+            if (price - self.activation_level) * sign < 0:
+                return False
+            self.active = True
+            if (self.entry - self.stop) * sign > 0:
+                self.stop = self.entry
+            self._ratchet(price, atr, swing, sign, 0)
+            return True
+
+        return self._ratchet(price, atr, swing, sign, self._min_step)
+
+    def _ratchet(self, price: int, atr: Optional[int], swing: Optional[int], sign: int, step: int) -> bool:
+        if self.mode == FIXED:
+            candidate = self.best - sign * self._distance
+        elif self.mode == ATR and atr:
+            self._last_distance = atr * self._atr_num // self._atr_den
+            candidate = self.best - sign * self._last_distance
+        elif self.mode == SWING and swing is not None:
+            candidate = swing - sign * scale_ticks(swing, self._buffer_num, self._buffer_den)
+        else:
+            return False
+        candidate -= candidate % CENT if sign > 0 else -(-candidate % CENT)
+
+        # Only tighten, by at least `step`, and never through the current price
+        if (candidate - self.stop) * sign >= max(step, 1) and (price - candidate) * sign > 0:
+            self.stop = candidate
+            return True
+        return False
+
+    def next_trigger(self) -> Optional[int]:
+        """
+        Price at which update() would next move the stop (for TriggerBook),
+        or None when only new swings or ATR readings can move it.
+        """
+        if not self.active:
+            return self.activation_level
+        if self._last_distance is None or self.mode in (BREAKEVEN, SWING):
+            return None
+        sign = 1 if self.is_long else -1
+        return self.stop + sign * (max(self._min_step, 1) + self._last_distance)
+
+
+class AverageTrueRange:
+    """Wilder's ATR over candles in ticks, O(1) per candle."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._previous_close: Optional[int] = None
+        self._count = 0
+        self._sum = 0
+        self.value: Optional[int] = None
+
+    def update(self, high: int, low: int, close: int) -> Optional[int]:
+        """Add a closed candle; returns the ATR once `period` candles are in."""
+        if self._previous_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high, self._previous_close) - min(low, self._previous_close)
+        self._previous_close = close
+
+        if self.value is None:
+            self._count += 1
+            self._sum += true_range
+            if self._count == self.period:
+                self.value = self._sum // self.period
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) // self.period
+        return self.value
+
+
+def expected_range(sigma: float, seconds: float = FIVE_MINUTES) -> int:
+    """
+    Expected high-low range (ticks) of a random walk with volatility sigma
+    (ticks per sqrt(second)) over `seconds`: sqrt(8 / pi) * sigma * sqrt(t).
+    Stands in for the 5M ATR when only ticks are available.
+    """
+    return int(math.sqrt(8 / math.pi) * sigma * math.sqrt(seconds))
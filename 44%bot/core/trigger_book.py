@@ -0,0 +1,162 @@
+"""
+Trigger Book - Price-sorted Exit Triggers for Open Positions
+Every position's stop, take profit and next trailing stop move live in two
+sorted arrays and its time limit in a heap, so each new price only
+touches the triggers it actually crossed.
+"""
+
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from utils.money import PositionLevels
+
+# Trigger kinds
+STOP = 'STOP'
+TAKE_PROFIT = 'TAKE_PROFIT'
+TRAILING = 'TRAILING'
+
+Trigger = Tuple[int, int, str]  # (level in ticks, trade_id, kind)
+
+
+def _level(trigger: Trigger) -> int:
+    return trigger[0]
+
+
+class TriggerBook:
+    """
+    Exit triggers of all open positions, indexed by price and deadline.
+
+    Rising triggers fire once price reaches them from below (long take
+    profit and trailing move, short stop); falling triggers fire once
+    price drops to them (long stop, short take profit and trailing move).
+    Each side is a sorted list, so crossed() is one bisect per side plus
+    a slice of the hits: O(log n + hits) per price. Time limits sit in a
+    heap with lazy deletion.
+
+    Stop and take profit levels are inclusive, like PositionManager's
+    checks, and the trailing level is TrailingStop.next_trigger(). The
+    book only says which positions need a look: the manager still runs
+    its full check on each of them.
+    """
+
+    def __init__(self):
+        self._rising: List[Trigger] = []
+        self._falling: List[Trigger] = []
+        self._positions: Dict[int, Tuple[PositionLevels, Optional[datetime], Optional[int]]] = {}
+        self._triggers: Dict[int, List[Tuple[List[Trigger], Trigger]]] = {}
+        self._deadlines: List[Tuple[datetime, int, int]] = []  # (deadline, version, trade_id)
+        self._armed: Dict[int, Tuple[datetime, int]] = {}
+        self._versions = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, trade_id: int) -> bool:
+        return trade_id in self._positions
+
+    # -------------------------------------------------------------------------
+    # POSITIONS
+    # -------------------------------------------------------------------------
+
+    def add(self, levels: PositionLevels, deadline: Optional[datetime] = None,
+            trail_at: Optional[int] = None) -> None:
+        """
+        Insert or update a position's triggers (a no-op when unchanged).
+
+        Args:
+            levels: Position levels in ticks
+            deadline: Time limit (naive UTC, like datetime.utcnow()), if any
+            trail_at: Price (ticks) at which the trailing stop would move, if any
+        """
+        trade_id = levels.trade_id
+        if self._positions.get(trade_id) == (levels, deadline, trail_at):
+            return
+        self.remove(trade_id)
+
+        stop_side, target_side = (
+            (self._falling, self._rising) if levels.is_long else (self._rising, self._falling)
+        )
+        placed = [
+            (stop_side, (levels.effective_stop, trade_id, STOP)),
+            (target_side, (levels.take_profit, trade_id, TAKE_PROFIT)),
+        ]
+        if trail_at is not None:
+            placed.append((target_side, (trail_at, trade_id, TRAILING)))
+        for side, trigger in placed:
+            insort(side, trigger)
+
+        self._positions[trade_id] = (levels, deadline, trail_at)
+        self._triggers[trade_id] = placed
+        if deadline is not None:
+            self._arm(trade_id, deadline)
+
+    def _arm(self, trade_id: int, deadline: datetime) -> None:
+        version = next(self._versions)
+        self._armed[trade_id] = (deadline, version)
+        heapq.heappush(self._deadlines, (deadline, version, trade_id))
+
+    def remove(self, trade_id: int) -> None:
+        """Drop a position's triggers (unknown ids are ignored)."""
+        placed = self._triggers.pop(trade_id, None)
+        if placed is None:
+            return
+        del self._positions[trade_id]
+        self._armed.pop(trade_id, None)
+        for side, trigger in placed:
+            del side[bisect_left(side, trigger)]
+
+    def retain(self, open_ids) -> None:
+        """Drop every position not in open_ids."""
+        for trade_id in [t for t in self._positions if t not in open_ids]:
+            self.remove(trade_id)
+
+    # -------------------------------------------------------------------------
+    # QUERIES
+    # -------------------------------------------------------------------------
+
+    def crossed(self, price: int, now: datetime) -> List[int]:
+        """
+        Positions with a trigger at or beyond price, or past their time limit.
+
+        Args:
+            price: Current price in ticks
+            now: Current time (naive UTC)
+
+        Returns:
+            Trade ids, each once: time limits first, then price triggers
+        """
+        hits: Dict[int, None] = {}
+        heap = self._deadlines
+        while heap and heap[0][0] < now:
+            deadline, version, trade_id = heapq.heappop(heap)
+            if self._armed.get(trade_id) == (deadline, version):
+                hits[trade_id] = None
+                # Keeps firing on later calls until the position is removed
+                self._arm(trade_id, now)
+        for _, trade_id, _ in self._rising[:bisect_right(self._rising, price, key=_level)]:
+            hits[trade_id] = None
+        for _, trade_id, _ in self._falling[bisect_left(self._falling, price, key=_level):]:
+            hits[trade_id] = None
+        return list(hits)
+
+    def distance(self, price: int) -> Optional[int]:
+        """Ticks from price to the nearest untriggered level, or None for an empty book."""
+        nearest = None
+        above = bisect_right(self._rising, price, key=_level)
+        if above < len(self._rising):
+            nearest = self._rising[above][0] - price
+        below = bisect_left(self._falling, price, key=_level)
+        if below > 0:
+            gap = price - self._falling[below - 1][0]
+            nearest = gap if nearest is None else min(nearest, gap)
+        return nearest
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Earliest time limit in the book."""
+        heap = self._deadlines
+        while heap and self._armed.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
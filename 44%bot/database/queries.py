@@ -3,6 +3,7 @@ SQL queries for paper trading system.
 Handles all database operations for signals, trades, swings, and configuration.
 """
 
+import json
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
 from datetime import datetime
@@ -262,7 +263,7 @@ async def close_paper_trade(
     close_reason: str,
     exit_slippage_percent: Decimal,
     exit_fee_usd: Decimal
-) -> None:
+) -> datetime:
     """
     Close a paper trade with all exit details.
 
@@ -274,11 +275,15 @@ async def close_paper_trade(
         close_reason: 'STOP_LOSS', 'TAKE_PROFIT', 'TRAILING_STOP', 'TIME_LIMIT', 'MANUAL'
         exit_slippage_percent: Exit slippage percentage
         exit_fee_usd: Exit fee in USD
+
+    Returns:
+        Exit time recorded for the trade (UTC)
     """
+    exit_time = datetime.utcnow()
     updates = {
         'status': 'CLOSED',
         'exit_price': exit_price,
-        'exit_time': datetime.utcnow(),
+        'exit_time': exit_time,
         'pnl_usd': pnl_usd,
         'outcome': outcome,
         'close_reason': close_reason,
@@ -292,6 +297,7 @@ async def close_paper_trade(
         f"Closed paper trade #{trade_id}: {outcome} @ ${exit_price} "
         f"(P&L: ${pnl_usd:.2f}, Reason: {close_reason})"
     )
+    return exit_time
 
 
 async def activate_trailing_stop(trade_id: int, trailing_price: Decimal) -> None:
@@ -443,3 +449,131 @@ async def get_trade_history(limit: int = 50) -> List[Dict[str, Any]]:
     except Exception as e:
         logger.error(f"Failed to fetch trade history: {e}")
         raise
+
+
+async def get_closed_trades_since(after: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Get closed trades in exit order, for folding into the stats accumulator.
+
+    Args:
+        after: Only trades that exited after this time (None for all)
+
+    Returns:
+        List of trade dictionaries ordered by exit_time ascending
+    """
+    query = """
+        SELECT
+            id,
+            pnl_usd,
+            outcome,
+            entry_time,
+            exit_time,
+            risk_reward_ratio
+        FROM paper_trades
+        WHERE status = 'CLOSED'
+          AND ($1::TIMESTAMPTZ IS NULL OR exit_time > $1)
+        ORDER BY exit_time ASC
+    """
+
+    try:
+        rows = await db.fetch_all(query, after)
+        logger.debug(f"Retrieved {len(rows)} closed trades since {after}")
+        return rows
+    except Exception as e:
+        logger.error(f"Failed to fetch closed trades: {e}")
+        raise
+
+
+async def get_latest_stats_snapshot() -> Optional[Dict[str, Any]]:
+    """
+    Get the most recent performance stats snapshot.
+
+    Returns:
+        Snapshot row (with the accumulator state as JSON text) or None
+    """
+    query = """
+        SELECT * FROM paper_stats_snapshots
+        ORDER BY bucket_start DESC
+        LIMIT 1
+    """
+
+    try:
+        return await db.fetch_one(query)
+    except Exception as e:
+        logger.error(f"Failed to fetch stats snapshot: {e}")
+        raise
+
+
+async def upsert_stats_snapshot(
+    bucket_start: datetime,
+    metrics: Dict[str, Any],
+    state: Dict[str, Any]
+) -> None:
+    """
+    Write the stats for a time bucket, replacing the bucket's earlier row.
+
+    Args:
+        bucket_start: Start of the bucket (exit time truncated to the hour)
+        metrics: TradeStats.snapshot() values
+        state: TradeStats.to_state() for restoring the accumulator
+    """
+    columns = list(metrics)
+    placeholders = ', '.join(f"${i}" for i in range(2, len(columns) + 2))
+    updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns)
+    state_param = len(columns) + 2
+
+    query = f"""
+        INSERT INTO paper_stats_snapshots (bucket_start, {', '.join(columns)}, state)
+        VALUES ($1, {placeholders}, ${state_param}::JSONB)
+        ON CONFLICT (bucket_start) DO UPDATE
+        SET {updates}, state = EXCLUDED.state, updated_at = NOW()
+    """
+
+    try:
+        await db.execute(query, bucket_start, *metrics.values(), json.dumps(state))
+        logger.debug(f"Saved stats snapshot for {bucket_start:%Y-%m-%d %H:00}")
+    except Exception as e:
+        logger.error(f"Failed to save stats snapshot: {e}")
+        raise
+
+
+async def get_risk_seed(day_start: datetime, streak_limit: int) -> Dict[str, Any]:
+    """
+    Get the closed-trade totals the risk manager starts from.
+
+    Args:
+        day_start: Start of the current trading day (UTC midnight)
+        streak_limit: Most recent outcomes to return (enough to count a losing streak)
+
+    Returns:
+        Dictionary with total_pnl, daily_pnl, last_exit_time and
+        recent_outcomes (newest first)
+    """
+    totals_query = """
+        SELECT
+            COALESCE(SUM(pnl_usd), 0) AS total_pnl,
+            COALESCE(SUM(pnl_usd) FILTER (WHERE exit_time >= $1), 0) AS daily_pnl,
+            MAX(exit_time) AS last_exit_time
+        FROM paper_trades
+        WHERE status = 'CLOSED'
+    """
+    outcomes_query = """
+        SELECT outcome
+        FROM paper_trades
+        WHERE status = 'CLOSED'
+        ORDER BY exit_time DESC
+        LIMIT $1
+    """
+
+    try:
+        totals = await db.fetch_one(totals_query, day_start)
+        outcomes = await db.fetch_all(outcomes_query, streak_limit)
+        return {
+            'total_pnl': totals['total_pnl'],
+            'daily_pnl': totals['daily_pnl'],
+            'last_exit_time': totals['last_exit_time'],
+            'recent_outcomes': [row['outcome'] for row in outcomes]
+        }
+    except Exception as e:
+        logger.error(f"Failed to fetch risk seed: {e}")
+        raise
@@ -15,6 +15,7 @@ from market.price_feed import price_feed
 from core.signal_monitor import signal_monitor
 from core.position_manager import position_manager
 from analytics.performance import performance_analytics
+from core.risk_manager import risk_manager
 
 
 class PaperTradingSystem:
@@ -47,6 +48,12 @@ class PaperTradingSystem:
             await price_feed.connect()
             logger.info(" Price feed connected")
 
+            # Restore running performance stats
+            await performance_analytics.load_stats()
+
+            # Seed in-memory risk limits (daily P&L, streak, exposure)
+            await risk_manager.load()
+
             # Display configuration
             logger.info("\n=  CONFIGURATION:")
             logger.info(f"  Risk per trade:       {config.RISK_PERCENT * 100:.0f}%")
@@ -55,6 +62,10 @@ class PaperTradingSystem:
             logger.info(f"  Trading fee:          {config.FEE_PERCENT * 100:.2f}%")
             logger.info(f"  Stop loss buffer:     {config.BUFFER_BELOW_LOW * 100:.1f}% (LONG), {config.BUFFER_ABOVE_HIGH * 100:.1f}% (SHORT)")
             logger.info(f"  Stop distance range:  {config.MIN_STOP_DISTANCE_PERCENT:.1f}% - {config.MAX_STOP_DISTANCE_PERCENT:.1f}%")
+            logger.info(f"  Max positions:        {config.MAX_POSITIONS}")
+            logger.info(f"  Daily loss limit:     {config.DAILY_LOSS_LIMIT_PERCENT * 100:.1f}%")
+            logger.info(f"  Loss streak limit:    {config.CONSECUTIVE_LOSS_LIMIT}")
+            logger.info(f"  Min account balance:  ${config.MIN_ACCOUNT_BALANCE:,.2f}")
 
             logger.info("\n System initialization complete")
             logger.info("=" * 60 + "\n")
@@ -103,7 +114,7 @@ class PaperTradingSystem:
         Main run loop - starts all concurrent tasks.
         Runs 3 concurrent tasks:
         1. Signal monitor (polls every 5s)
-        2. Position manager (checks every 1s)
+        2. Position manager (every 0.25-30s, by distance to the nearest trigger)
         3. Performance analytics (updates every 60s)
         """
         self.running = True
@@ -0,0 +1,324 @@
+"""
+Coinbase HTTP Client - Shared Connection Pool, Rate Limits and Retries
+One pooled (HTTP/2 when h2 is installed) client for every Coinbase caller,
+with per-endpoint token buckets, jittered retries and optional hedging.
+"""
+
+import asyncio
+import importlib.util
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import jwt as pyjwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.backends import default_backend
+
+from config import config
+from utils.logger import logger
+
+# httpx only negotiates HTTP/2 when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Statuses worth retrying: rate limited or a transient server error
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+PUBLIC_PREFIX = '/api/v3/brokerage/market/'
+
+
+class CoinbaseAPIError(RuntimeError):
+    """A Coinbase request that failed after all retries (or could not be retried)."""
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRY_STATUSES
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` requests per second with bursts up to `burst`.
+
+    Waiters are served in arrival order. pause() empties the bucket so
+    every caller backs off together after a 429.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now."""
+        if self._lock.locked():
+            return False
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        """Wait for a token."""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds`."""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+    attempts: int = 3
+    base_delay: float = 0.1    # seconds
+    max_delay: float = 2.0     # seconds
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def endpoint_class(path: str) -> str:
+    """Rate-limit class of a REST path: 'public' market data or 'private'."""
+    return 'public' if path.startswith(PUBLIC_PREFIX) else 'private'
+
+
+class CoinbaseClient:
+    """
+    Shared client for the Coinbase Advanced Trade REST API.
+
+    Usage:
+        await coinbase_client.connect()
+        data = await coinbase_client.get('/api/v3/brokerage/best_bid_ask',
+                                         params={'product_ids': 'BTC-USD'})
+
+    connect()/aclose() are reference counted, so the price feed and a
+    backfill can share the pool. Pass base_url (or set COINBASE_API_URL)
+    to run against a local mock server, or transport= for an in-process
+    httpx.MockTransport.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limits: Optional[Dict[str, float]] = None
+    ):
+        self.base_url = (base_url or config.COINBASE_API_URL).rstrip('/')
+        self.host = urlsplit(self.base_url).netloc
+        self.api_key = config.COINBASE_API_KEY if api_key is None else api_key
+        self.api_secret = config.COINBASE_API_SECRET if api_secret is None else api_secret
+        self.retry = retry or RetryPolicy(attempts=config.HTTP_MAX_RETRIES)
+        rate_limits = rate_limits or {
+            'private': config.COINBASE_PRIVATE_RATE_LIMIT,
+            'public': config.COINBASE_PUBLIC_RATE_LIMIT,
+        }
+        self.buckets = {name: TokenBucket(rate) for name, rate in rate_limits.items()}
+
+        self.http: Optional[httpx.AsyncClient] = None
+        self._transport = transport
+        self._private_key = None
+        self._users = 0
+        self.stats = {'requests': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0}
+
+    # -------------------------------------------------------------------------
+    # LIFECYCLE
+    # -------------------------------------------------------------------------
+
+    async def connect(self) -> None:
+        """Open the connection pool and load the signing key (first caller only)."""
+        if self.http is not None:
+            self._users += 1
+            return
+
+        if self._private_key is None:
+            self.load_key()
+        self._users += 1
+        self.http = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=min(config.HTTP_TIMEOUT, 5.0)),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+            transport=self._transport,
+        )
+        logger.debug(
+            f"Coinbase client connected to {self.base_url} "
+            f"({'HTTP/2' if HTTP2_AVAILABLE else 'HTTP/1.1'})"
+        )
+
+    async def aclose(self) -> None:
+        """Close the pool once the last user disconnects."""
+        self._users = max(0, self._users - 1)
+        if self._users == 0 and self.http is not None:
+            await self.http.aclose()
+            self.http = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self.http is not None
+
+    def load_key(self) -> None:
+        """Load the EC private key from the API secret (escaped newlines allowed)."""
+        api_secret = self.api_secret
+        if '\\n' in api_secret:
+            api_secret = api_secret.replace('\\n', '\n')
+        self._private_key = serialization.load_pem_private_key(
+            api_secret.encode(),
+            password=None,
+            backend=default_backend()
+        )
+        logger.debug("Private key loaded successfully")
+
+    def sign(self, request_method: str, request_path: str) -> str:
+        """
+        Generate a JWT for one request (path without the query string).
+
+        Args:
+            request_method: HTTP method (GET, POST, etc.)
+            request_path: API endpoint path
+
+        Returns:
+            JWT token string
+        """
+        now = int(time.time())
+        payload = {
+            'sub': self.api_key,
+            'iss': 'coinbase-cloud',
+            'nbf': now,
+            'exp': now + 120,  # 2 minutes
+            'aud': ['cdp_service'],
+            'uri': f"{request_method} {self.host}{request_path}"
+        }
+        return pyjwt.encode(
+            payload,
+            self._private_key,
+            algorithm='ES256',  # ECDSA with SHA-256
+            headers={'kid': self.api_key, 'nonce': str(uuid.uuid4())}
+        )
+
+    # -------------------------------------------------------------------------
+    # REQUESTS
+    # -------------------------------------------------------------------------
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None,
+                  hedge_after: Optional[float] = None) -> Dict[str, Any]:
+        """GET a JSON endpoint (see request)."""
+        return await self.request('GET', path, params=params, hedge_after=hedge_after)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        hedge_after: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a signed request and return the decoded JSON body.
+
+        Every attempt waits for the endpoint's rate-limit token. Transport
+        errors, 429 and 5xx are retried with jittered backoff (at least the
+        server's Retry-After). With hedge_after, an attempt still running
+        after that many seconds is raced against a duplicate request, if
+        the rate limit has a token to spare (idempotent GETs only).
+
+        Raises:
+            CoinbaseAPIError: On a non-retryable status or when retries run out
+        """
+        if self.http is None:
+            raise RuntimeError("Coinbase client not connected. Call connect() first.")
+
+        bucket = self.buckets[endpoint_class(path)]
+        send = lambda: self._send(method, path, params, json)  # noqa: E731
+
+        for attempt in range(self.retry.attempts):
+            try:
+                await bucket.acquire()
+                if hedge_after and method == 'GET':
+                    response = await self._hedged(send, hedge_after, bucket)
+                else:
+                    response = await send()
+                return response.json()
+
+            except (httpx.TransportError, CoinbaseAPIError) as e:
+                error = e if isinstance(e, CoinbaseAPIError) else CoinbaseAPIError(
+                    f"{method} {path}: {type(e).__name__}: {e}"
+                )
+                if error.status == 429 and error.retry_after:
+                    bucket.pause(error.retry_after)
+                if not error.retryable or attempt == self.retry.attempts - 1:
+                    raise error from e
+
+                delay = max(self.retry.delay(attempt), error.retry_after or 0.0)
+                self.stats['retries'] += 1
+                logger.warning(f"{error} - retry {attempt + 1}/{self.retry.attempts - 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _send(self, method: str, path: str, params: Optional[Dict[str, Any]],
+                    json: Optional[Dict[str, Any]]) -> httpx.Response:
+        headers = {
+            'Authorization': f'Bearer {self.sign(method, path)}',
+            'Content-Type': 'application/json'
+        }
+        self.stats['requests'] += 1
+        response = await self.http.request(method, path, params=params, json=json, headers=headers)
+        if response.status_code >= 400:
+            retry_after = response.headers.get('Retry-After')
+            raise CoinbaseAPIError(
+                f"{method} {path} failed with status {response.status_code}",
+                status=response.status_code,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        return response
+
+    async def _hedged(self, send: Callable, hedge_after: float, bucket: TokenBucket) -> httpx.Response:
+        """First successful response of the request and, if it is slow, one duplicate."""
+        first = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done or not bucket.try_acquire():
+            return await first
+
+        self.stats['hedges'] += 1
+        second = asyncio.ensure_future(send())
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    if succeeded[0] is second:
+                        self.stats['hedge_wins'] += 1
+                    return succeeded[0].result()
+            return first.result()  # both failed: raise the original error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+# Global client shared by the price feed and backfills
+coinbase_client = CoinbaseClient()
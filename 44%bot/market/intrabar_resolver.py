@@ -0,0 +1,227 @@
+"""
+Intrabar resolver for backtests
+Settles 5M candles whose range contains both the stop and the take profit.
+
+From OHLC alone the backtester cannot tell which level a candle touched
+first, so it assumes the stop. With a resolver attached it replays that
+candle's 1M bars instead. The 1M history lives in a memory-mapped column
+store (epoch seconds, high ticks, low ticks as int64 files) built once from
+the 1M CSV, so a backtest only pages in the few minutes around ambiguous
+candles rather than loading the whole 1M history.
+"""
+
+import csv
+import hashlib
+import json
+import mmap
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Tuple
+
+from utils.logger import logger
+from utils.money import price_to_ticks
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+
+# Column files of a store directory (native-endian int64)
+COLUMNS = ('timestamp', 'high', 'low')
+
+STOP = 'STOP'
+TAKE_PROFIT = 'TAKE_PROFIT'
+
+
+def _epoch_seconds(value: datetime) -> int:
+    """Epoch seconds of a candle timestamp (naive values are UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _file_stat(path: Path) -> list:
+    """Resolved path, size and mtime: changes whenever the file is rewritten."""
+    st = path.stat()
+    return [str(path.resolve()), st.st_size, st.st_mtime_ns]
+
+
+class IntrabarStore:
+    """
+    Read-only memory-mapped 1M high/low columns.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Args:
+            directory: Store built by IntrabarStore.build()
+        """
+        self.directory = Path(directory)
+        meta = json.loads((self.directory / 'meta.json').read_text())
+        self.fingerprint: str = meta['fingerprint']
+        self.rows: int = meta['rows']
+
+        self._files = []
+        self._maps = []
+        columns = {}
+        for name in COLUMNS:
+            f = open(self.directory / f"{name}.i64", 'rb')
+            self._files.append(f)
+            if self.rows:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps.append(mapped)
+                columns[name] = memoryview(mapped).cast('q')
+            else:
+                columns[name] = memoryview(array('q'))
+        self.timestamps = columns['timestamp']
+        self.highs = columns['high']
+        self.lows = columns['low']
+
+    @classmethod
+    def build(cls, csv_path: Path, directory: Optional[Path] = None) -> 'IntrabarStore':
+        """
+        Convert a 1M candle CSV (timestamp,open,high,low,close,volume) to a store.
+
+        The CSV is streamed, so building never holds the full history in memory.
+
+        Args:
+            csv_path: 1M candle CSV, sorted ascending
+            directory: Output directory (default: 44%bot/.cache/intrabar_1m)
+
+        Returns:
+            Opened store
+        """
+        csv_path = Path(csv_path)
+        directory = Path(directory) if directory else APP_ROOT / '.cache' / 'intrabar_1m'
+        directory.mkdir(parents=True, exist_ok=True)
+
+        digest = hashlib.sha256()
+        outputs = {name: open(directory / f"{name}.i64", 'wb') for name in COLUMNS}
+        buffers = {name: array('q') for name in COLUMNS}
+        rows = 0
+        last = None
+
+        try:
+            with open(csv_path, newline='') as f:
+                for row in csv.DictReader(f):
+                    timestamp = _epoch_seconds(datetime.fromisoformat(row['timestamp']))
+                    if last is not None and timestamp <= last:
+                        raise ValueError(f"{csv_path} is not sorted ascending at {row['timestamp']}")
+                    last = timestamp
+
+                    buffers['timestamp'].append(timestamp)
+                    buffers['high'].append(price_to_ticks(row['high']))
+                    buffers['low'].append(price_to_ticks(row['low']))
+                    digest.update(f"{timestamp},{row['high']},{row['low']};".encode())
+                    rows += 1
+
+                    if len(buffers['timestamp']) >= 65536:
+                        for name in COLUMNS:
+                            buffers[name].tofile(outputs[name])
+                            buffers[name] = array('q')
+
+            for name in COLUMNS:
+                buffers[name].tofile(outputs[name])
+        finally:
+            for out in outputs.values():
+                out.close()
+
+        (directory / 'meta.json').write_text(json.dumps({
+            'source': str(csv_path),
+            'source_stat': _file_stat(csv_path),
+            'rows': rows,
+            'fingerprint': digest.hexdigest(),
+        }))
+        logger.info(f"Built 1M intrabar store: {rows:,} bars in {directory}")
+        return cls(directory)
+
+    @classmethod
+    def for_csv(cls, csv_path: Path, directory: Optional[Path] = None) -> 'IntrabarStore':
+        """Open the store built from csv_path, rebuilding it if the CSV changed."""
+        csv_path = Path(csv_path)
+        directory = Path(directory) if directory else APP_ROOT / '.cache' / 'intrabar_1m'
+        try:
+            meta = json.loads((directory / 'meta.json').read_text())
+        except (FileNotFoundError, ValueError):
+            meta = {}
+        if meta.get('source_stat') == _file_stat(csv_path):
+            return cls(directory)
+        return cls.build(csv_path, directory)
+
+    def span(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        """Row range [lo, hi) of 1M bars opening in [start, end)."""
+        lo = bisect_left(self.timestamps, _epoch_seconds(start))
+        hi = bisect_left(self.timestamps, _epoch_seconds(end), lo)
+        return lo, hi
+
+    def close(self) -> None:
+        """Release the mappings and files."""
+        for name in ('timestamps', 'highs', 'lows'):
+            getattr(self, name).release()
+        for mapped in self._maps:
+            mapped.close()
+        for f in self._files:
+            f.close()
+
+
+class IntrabarResolver:
+    """
+    Decides stop vs take profit inside a 5M candle from its 1M bars.
+    """
+
+    def __init__(self, store: IntrabarStore, bar_seconds: int = 300):
+        """
+        Args:
+            store: 1M intrabar store
+            bar_seconds: Length of the candles being resolved (5M)
+        """
+        self.store = store
+        self.bar_seconds = bar_seconds
+
+        # Ambiguous candles seen, and how many the 1M bars settled
+        self.lookups = 0
+        self.resolved = 0
+
+    def first_hit(
+        self,
+        candle_time: datetime,
+        direction: str,
+        stop_ticks: int,
+        take_profit_ticks: int
+    ) -> Optional[str]:
+        """
+        Which level a candle reached first.
+
+        Args:
+            candle_time: Open time of the ambiguous 5M candle
+            direction: 'LONG' or 'SHORT'
+            stop_ticks: Effective stop in price ticks
+            take_profit_ticks: Take profit in price ticks
+
+        Returns:
+            STOP or TAKE_PROFIT, or None if the 1M bars cannot tell
+            (no 1M coverage, or both levels inside the same 1M bar)
+        """
+        self.lookups += 1
+        lo, hi = self.store.span(candle_time, candle_time + timedelta(seconds=self.bar_seconds))
+
+        highs, lows = self.store.highs, self.store.lows
+        for i in range(lo, hi):
+            if direction == 'LONG':
+                stopped = lows[i] <= stop_ticks
+                target = highs[i] >= take_profit_ticks
+            else:
+                stopped = highs[i] >= stop_ticks
+                target = lows[i] <= take_profit_ticks
+
+            if stopped and target:
+                return None
+            if stopped or target:
+                self.resolved += 1
+                return STOP if stopped else TAKE_PROFIT
+        return None
+
+    def summary(self) -> str:
+        return (
+            f"1M intrabar: {self.resolved}/{self.lookups} ambiguous candles resolved "
+            f"({self.lookups - self.resolved} kept pessimistic)"
+        )
@@ -1,41 +1,33 @@
 """
 Coinbase price feed for fetching live BTC-USD market data.
-Uses direct HTTP requests with JWT authentication.
+Requests go through the shared Coinbase client (pooling, rate limits, retries).
 """
 
-import asyncio
-import time
-import uuid
-import httpx
 from decimal import Decimal
-from typing import Optional, Dict
+from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
-import jwt as pyjwt
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 
 from config import config
 from utils.logger import logger
+from market.http_client import CoinbaseClient, coinbase_client
 
 
 class PriceFeed:
     """Fetches live BTC-USD prices from Coinbase Advanced Trade API."""
 
-    BASE_URL = "https://api.coinbase.com"
     PRODUCT_ID = "BTC-USD"
+    BEST_BID_ASK_PATH = "/api/v3/brokerage/best_bid_ask"
 
-    def __init__(self):
-        self.api_key = config.COINBASE_API_KEY
-        self.api_secret = config.COINBASE_API_SECRET
-        self.client: Optional[httpx.AsyncClient] = None
+    def __init__(self, client: Optional[CoinbaseClient] = None):
+        self.client = client or coinbase_client
 
         # Price caching to reduce API calls (cache for 1 second)
         self._last_price: Optional[Decimal] = None
         self._last_fetch_time: Optional[datetime] = None
         self._cache_duration = timedelta(seconds=1)
+        self._max_stale = timedelta(seconds=config.PRICE_MAX_STALE_SECONDS)
 
         self._connected = False
-        self._private_key = None
 
     async def connect(self) -> None:
         """Initialize the price feed (validate credentials)."""
@@ -44,21 +36,7 @@ class PriceFeed:
             return
 
         try:
-            # Initialize HTTP client
-            self.client = httpx.AsyncClient(timeout=10.0)
-
-            # Process API secret (handle escaped newlines)
-            api_secret = self.api_secret
-            if '\\n' in api_secret:
-                api_secret = api_secret.replace('\\n', '\n')
-
-            # Load the private key
-            self._private_key = serialization.load_pem_private_key(
-                api_secret.encode(),
-                password=None,
-                backend=default_backend()
-            )
-            logger.debug("Private key loaded successfully")
+            await self.client.connect()
 
             # Test credentials by fetching current price
             price = await self._fetch_price_from_api()
@@ -72,52 +50,19 @@ class PriceFeed:
             raise
 
     async def disconnect(self) -> None:
-        """Close the HTTP client."""
-        if self.client:
+        """Release the shared HTTP client."""
+        if self.client.is_connected:
             await self.client.aclose()
         self._connected = False
-        self._private_key = None
         logger.info("Price feed disconnected")
 
-    def _generate_jwt(self, request_method: str, request_path: str) -> str:
-        """
-        Generate JWT token for Coinbase API authentication.
-
-        Args:
-            request_method: HTTP method (GET, POST, etc.)
-            request_path: API endpoint path
-
-        Returns:
-            JWT token string
-        """
-        try:
-            # Create JWT payload
-            uri = f"{request_method} api.coinbase.com{request_path}"
-            now = int(time.time())
-
-            payload = {
-                'sub': self.api_key,
-                'iss': 'coinbase-cloud',
-                'nbf': now,
-                'exp': now + 120,  # 2 minutes
-                'aud': ['cdp_service'],
-                'uri': uri
-            }
-
-            # Sign JWT
-            token = pyjwt.encode(
-                payload,
-                self._private_key,
-                algorithm='ES256',  # ECDSA with SHA-256
-                headers={'kid': self.api_key, 'nonce': str(uuid.uuid4())}
-            )
-
-            logger.debug(f"Generated JWT for {request_method} {request_path}")
-            return token
-
-        except Exception as e:
-            logger.error(f"JWT generation failed: {e}")
-            raise RuntimeError(f"Failed to generate authentication token: {e}")
+    async def _fetch_best_bid_ask(self) -> Dict[str, Any]:
+        """Best bid/ask pricebook for the product (hedged when slow)."""
+        return await self.client.get(
+            self.BEST_BID_ASK_PATH,
+            params={'product_ids': self.PRODUCT_ID},
+            hedge_after=config.PRICE_HEDGE_AFTER or None
+        )
 
     async def _fetch_price_from_api(self) -> Optional[Decimal]:
         """
@@ -127,27 +72,11 @@ class PriceFeed:
         Returns:
             Current mid-price (average of best bid and ask) or None on failure
         """
-        if not self.client or not self._private_key:
+        if not self.client.is_connected:
             raise RuntimeError("Client not initialized")
 
-        endpoint = f"/api/v3/brokerage/best_bid_ask?product_ids={self.PRODUCT_ID}"
-        url = f"{self.BASE_URL}{endpoint}"
-
         try:
-            # Generate JWT token
-            jwt_token = self._generate_jwt('GET', endpoint)
-
-            # Build headers
-            headers = {
-                'Authorization': f'Bearer {jwt_token}',
-                'Content-Type': 'application/json'
-            }
-
-            # Make API request
-            response = await self.client.get(url, headers=headers)
-            response.raise_for_status()
-
-            data = response.json()
+            data = await self._fetch_best_bid_ask()
 
             # Parse response
             if 'pricebooks' in data and len(data['pricebooks']) > 0:
@@ -160,8 +89,8 @@ class PriceFeed:
                     # Calculate mid-price
                     mid_price = (best_bid + best_ask) / Decimal('2')
                     logger.debug(
-                        f"Fetched BTC-USD: ${mid_price:,.2f} "
-                        f"(bid: ${best_bid:,.2f}, ask: ${best_ask:,.2f})"
+                        "Fetched BTC-USD: ${:,.2f} (bid: ${:,.2f}, ask: ${:,.2f})",
+                        mid_price, best_bid, best_ask
                     )
                     return mid_price
                 else:
@@ -171,25 +100,25 @@ class PriceFeed:
                 logger.warning("No pricebooks in API response")
                 return None
 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"API request failed with status {e.response.status_code}: {e}")
-            return None
         except Exception as e:
             logger.error(f"Failed to fetch price from API: {e}")
             return None
 
-    async def get_current_price(self, use_cache: bool = True) -> Decimal:
+    async def get_current_price(self, use_cache: bool = True,
+                                max_age: Optional[float] = None) -> Decimal:
         """
         Get the current BTC-USD price.
 
         Args:
             use_cache: If True, return cached price if < 1 second old
+            max_age: Override the cache lifetime in seconds (sub-second exit checks)
 
         Returns:
             Current BTC-USD price
 
         Raises:
-            RuntimeError: If price fetch fails
+            RuntimeError: If price fetch fails and there is no cached price
+                younger than PRICE_MAX_STALE_SECONDS
         """
         if not self._connected:
             raise RuntimeError("Price feed not connected. Call connect() first.")
@@ -198,19 +127,20 @@ class PriceFeed:
         now = datetime.utcnow()
         if use_cache and self._last_price and self._last_fetch_time:
             cache_age = now - self._last_fetch_time
-            if cache_age < self._cache_duration:
-                logger.debug(f"Using cached price: ${self._last_price:,.2f}")
+            limit = self._cache_duration if max_age is None else timedelta(seconds=max_age)
+            if cache_age < limit:
+                logger.debug("Using cached price: ${:,.2f}", self._last_price)
                 return self._last_price
 
         # Fetch fresh price
         price = await self._fetch_price_from_api()
 
         if price is None:
-            if self._last_price:
+            if self._last_price and now - self._last_fetch_time <= self._max_stale:
                 logger.warning("API fetch failed, using last cached price")
                 return self._last_price
             else:
-                raise RuntimeError("Failed to fetch price and no cached price available")
+                raise RuntimeError("Failed to fetch price and no recent cached price available")
 
         # Update cache
         self._last_price = price
@@ -225,27 +155,11 @@ class PriceFeed:
         Returns:
             Dictionary with 'bid', 'ask', 'mid', 'spread', 'spread_percent'
         """
-        if not self.client or not self._private_key:
+        if not self.client.is_connected:
             raise RuntimeError("Client not initialized")
 
-        endpoint = f"/api/v3/brokerage/best_bid_ask?product_ids={self.PRODUCT_ID}"
-        url = f"{self.BASE_URL}{endpoint}"
-
         try:
-            # Generate JWT token
-            jwt_token = self._generate_jwt('GET', endpoint)
-
-            # Build headers
-            headers = {
-                'Authorization': f'Bearer {jwt_token}',
-                'Content-Type': 'application/json'
-            }
-
-            # Make API request
-            response = await self.client.get(url, headers=headers)
-            response.raise_for_status()
-
-            data = response.json()
+            data = await self._fetch_best_bid_ask()
 
             if 'pricebooks' in data and len(data['pricebooks']) > 0:
                 pricebook = data['pricebooks'][0]
@@ -273,7 +187,7 @@ class PriceFeed:
     @property
     def is_connected(self) -> bool:
         """Check if the price feed is connected."""
-        return self._connected and self.client is not None
+        return self._connected and self.client.is_connected
 
 
 # Global price feed instance
@@ -1,36 +1,266 @@
 """
 Logging utility for Paper Trading System
-Uses loguru for modern, formatted logging
+Uses loguru with background-thread sinks, so a log call costs the caller
+a queue put instead of a terminal or disk write
+
+Hot paths should pass arguments instead of f-strings, so nothing is
+formatted when the level is filtered out:
+
+    logger.debug("Slippage applied: ${:.2f} -> ${:.2f}", price, filled)
+    logger.opt(lazy=True).info("{}", lambda: build_banner(setup))
+    debug_every(100, "Checked {} positions", count)   # 1 in 100 calls
 """
 
+import json
+import os
+import queue
+import struct
 import sys
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
 from loguru import logger
 from config import config
 
-# Remove default logger
-logger.remove()
-
-# Add custom logger with formatting
-logger.add(
-    sys.stdout,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    level=config.LOG_LEVEL,
-    colorize=True
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
 )
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+LOG_DIR = Path("logs")
+RETENTION_DAYS = 30
+
+# Binary record: length, timestamp, level number, line, then length-prefixed
+# UTF-8 name, function, message and JSON extra
+_LENGTH = struct.Struct('<I')
+_HEADER = struct.Struct('<dBI')
+_FIELD = struct.Struct('<I')
+
+
+class BackgroundSink:
+    """
+    Stream-like loguru sink that hands messages to a writer thread.
+
+    The thread writes everything queued since its last pass and flushes
+    once per batch. loguru calls stop() on logger.remove() (and at exit),
+    which drains the queue. A forked child gets no writer thread, so the
+    module's fork hook switches the installed sinks to direct writes
+    instead of queueing into a thread that does not exist.
+    """
+
+    def __init__(self, stream, encode: Optional[Callable[[Any], Any]] = None, name: str = 'log-writer'):
+        self._stream = stream
+        self._encode = encode
+        self._name = name
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._direct = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, message) -> None:
+        if self._direct:
+            self._stream.write(self._encode(message) if self._encode else message)
+            self._stream.flush()
+        else:
+            self._queue.put(message)
+
+    def _run(self) -> None:
+        encode, stream, pending = self._encode, self._stream, self._queue
+        while True:
+            message = pending.get()
+            try:
+                while message is not None:
+                    stream.write(encode(message) if encode else message)
+                    try:
+                        message = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                stream.flush()
+            except Exception as e:
+                # Keep draining: a failed write must not back the queue up
+                sys.stderr.write(f"--- Logging error in {self._name}: {e!r} ---\n")
+            if message is None:
+                return
+
+    def write_directly(self) -> None:
+        self._direct = True
+
+    def stop(self) -> None:
+        if not self._direct and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if hasattr(self._stream, 'close'):
+            self._stream.close()
+
+
+class _Console:
+    """stdout without close() (BackgroundSink closes what it writes to)."""
+
+    def write(self, message: str) -> None:
+        sys.stdout.write(message)
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+
+class DailyFile:
+    """
+    Log file per local day (logs/<prefix>_YYYY-MM-DD<suffix>), switched at
+    midnight. Finished days are zipped and files older than retention_days
+    are deleted, all on the writer thread.
+    """
+
+    def __init__(self, prefix: str, suffix: str = '.log', binary: bool = False,
+                 directory: Path = LOG_DIR, retention_days: int = RETENTION_DAYS):
+        self.prefix = prefix
+        self.suffix = suffix
+        self.binary = binary
+        self.directory = Path(directory)
+        self.retention_days = retention_days
+        self._file = None
+        self._path: Optional[Path] = None
+        self._rotate_at = 0.0
+
+    def _open(self) -> None:
+        now = datetime.now()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path = self.directory / f"{self.prefix}_{now:%Y-%m-%d}{self.suffix}"
+        self._file = open(self._path, 'ab' if self.binary else 'a', encoding=None if self.binary else 'utf-8')
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self._rotate_at = midnight.timestamp()
+
+    def _rotate(self) -> None:
+        finished = self._path
+        self._file.close()
+        self._open()
+        with zipfile.ZipFile(finished.with_name(finished.name + '.zip'), 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.write(finished, finished.name)
+        finished.unlink()
+
+        cutoff = time.time() - self.retention_days * 86400
+        for old in self.directory.glob(f"{self.prefix}_*"):
+            if old != self._path and old.stat().st_mtime < cutoff:
+                old.unlink()
+
+    def write(self, data) -> None:
+        if self._file is None:
+            self._open()
+        elif time.time() >= self._rotate_at:
+            self._rotate()
+        self._file.write(data)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def encode_record(message) -> bytes:
+    """Pack a loguru message's record for the binary sink."""
+    record = message.record
+    fields = [
+        (record['name'] or '').encode(),
+        record['function'].encode(),
+        record['message'].encode(),
+        json.dumps(record['extra'], default=str).encode() if record['extra'] else b'',
+    ]
+    body = _HEADER.pack(record['time'].timestamp(), record['level'].no, record['line'])
+    body += b''.join(_FIELD.pack(len(f)) + f for f in fields)
+    return _LENGTH.pack(len(body)) + body
+
+
+def read_binary_log(path) -> Iterator[Dict[str, Any]]:
+    """Records written by the binary sink, as dicts."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        (length,), offset = _LENGTH.unpack_from(data, offset), offset + _LENGTH.size
+        end = offset + length
+        timestamp, level, line = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        values = []
+        for _ in range(4):
+            (size,) = _FIELD.unpack_from(data, offset)
+            offset += _FIELD.size
+            values.append(data[offset:offset + size].decode())
+            offset += size
+        name, function, text, extra = values
+        yield {
+            'time': datetime.fromtimestamp(timestamp), 'level': level, 'name': name,
+            'function': function, 'line': line, 'message': text,
+            'extra': json.loads(extra) if extra else {},
+        }
+        offset = end
+
+
+_DEBUG = logger.level('DEBUG').no
+_min_level = logger.level(config.LOG_LEVEL).no
+_sample_counts: Dict[str, int] = {}
+_sinks: List[BackgroundSink] = []  # installed by the last configure()
+
+
+def _after_fork_in_child() -> None:
+    for sink in _sinks:
+        sink.write_directly()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def configure(level: str = config.LOG_LEVEL, binary: bool = config.LOG_BINARY) -> None:
+    """
+    (Re)install the console and daily file sinks at `level`, plus the
+    structured binary sink (logs/paper_trading_<date>.bin) when binary is set.
+    """
+    global _min_level
+    logger.remove()
+    _sinks.clear()
+    _sinks.append(BackgroundSink(_Console(), name='log-console'))
+    logger.add(_sinks[-1], format=CONSOLE_FORMAT, level=level, colorize=True)
+    _sinks.append(BackgroundSink(DailyFile('paper_trading'), name='log-file'))
+    logger.add(_sinks[-1], format=FILE_FORMAT, level=level, colorize=False)
+    if binary:
+        _sinks.append(BackgroundSink(DailyFile('paper_trading', '.bin', binary=True),
+                                     encode=encode_record, name='log-binary'))
+        logger.add(_sinks[-1], format="{message}", level=level, colorize=False)
+    _min_level = logger.level(level).no
+
+
+def enabled(level: str) -> bool:
+    """True when messages at `level` reach a sink (guard for costly log-only work)."""
+    return logger.level(level).no >= _min_level
+
+
+def debug_every(every: int, message: str, *args, **kwargs) -> None:
+    """
+    Debug message logged on the 1st, (every+1)th, ... call with this
+    template, for sampling inside loops. Costs a counter bump when debug
+    logging is off.
+    """
+    if _min_level > _DEBUG:
+        return
+    count = _sample_counts.get(message, 0)
+    _sample_counts[message] = count + 1
+    if count % every == 0:
+        logger.opt(depth=1).debug(message + f" [sampled 1/{every}]", *args, **kwargs)
+
+
+configure()
 
-# Add file logger for paper trading
-logger.add(
-    "logs/paper_trading_{time:YYYY-MM-DD}.log",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-    level=config.LOG_LEVEL,
-    rotation="00:00",  # New file at midnight
-    retention="30 days",  # Keep logs for 30 days
-    compression="zip"
-)
 
 def get_logger(name: str):
     """Get a logger with a specific name"""
     return logger.bind(name=name)
 
 # Export the logger
-__all__ = ['logger', 'get_logger']
+__all__ = ['logger', 'get_logger', 'configure', 'enabled', 'debug_every', 'read_binary_log']
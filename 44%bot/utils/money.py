@@ -0,0 +1,148 @@
+"""
+Fixed-point money type for Paper Trading System
+Scaled-integer prices for exact, fast hot-path arithmetic.
+
+Prices are held as integer ticks of 1e-8 USD. Every level the simulator
+produces (swing +/- 0.2%/0.3% buffer, 2:1 take profit) fits inside 8
+decimals, so comparisons on ticks give exactly the same answers as the
+Decimal math they replace. Convert with the helpers below at the DB and
+log boundary only. Fills, sizes and P&L stay in Decimal.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Scale factors
+PRICE_DECIMALS = 8  # 1e-8 USD per price tick
+USD_DECIMALS = 2  # 1e-2 USD (1 cent), as paper_trades stores prices
+
+PRICE_SCALE = 10 ** PRICE_DECIMALS
+
+Number = Union[int, Decimal, float, str]
+
+
+def to_fixed(value: Number, decimals: int, rounding: str = ROUND_HALF_EVEN) -> int:
+    """
+    Convert a numeric value to a scaled integer.
+
+    Args:
+        value: int, Decimal, float or numeric string
+        decimals: Number of decimal places in one unit
+        rounding: Decimal rounding mode for values finer than one unit
+
+    Returns:
+        Scaled integer
+    """
+    if isinstance(value, int):
+        return value * 10 ** decimals
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int(value.scaleb(decimals).to_integral_value(rounding=rounding))
+
+
+def from_fixed(units: int, decimals: int) -> Decimal:
+    """Convert a scaled integer back to a Decimal."""
+    return Decimal(units).scaleb(-decimals)
+
+
+def price_to_ticks(value: Number) -> int:
+    """Convert a USD price to 1e-8 USD ticks."""
+    return to_fixed(value, PRICE_DECIMALS)
+
+
+def ticks_to_price(ticks: int) -> Decimal:
+    """Convert 1e-8 USD ticks to a Decimal price."""
+    return from_fixed(ticks, PRICE_DECIMALS)
+
+
+def as_fraction(value: Number) -> Tuple[int, int]:
+    """
+    Express a ratio (e.g. Decimal('0.80')) as an exact integer fraction.
+
+    Lets callers compare `a / b >= ratio` as `a * den >= b * num`
+    without any division.
+    """
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.as_integer_ratio()
+
+
+def scale_ticks(ticks: int, numerator: int, denominator: int) -> int:
+    """
+    Multiply ticks by numerator/denominator with half-even rounding.
+
+    Args:
+        ticks: Scaled integer value
+        numerator: Fraction numerator
+        denominator: Fraction denominator (positive)
+
+    Returns:
+        Scaled integer result
+    """
+    quotient, remainder = divmod(ticks * numerator, denominator)
+    twice = remainder * 2
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+@dataclass(frozen=True)
+class PositionLevels:
+    """
+    Integer price levels for one open position.
+
+    Built once per position from the DB row so per-tick exit checks never
+    touch Decimal.
+    """
+    trade_id: int
+    direction: str
+    entry: int
+    stop_loss: int
+    take_profit: int
+    trailing_activated: bool = False
+    trailing_stop: Optional[int] = None
+
+    @property
+    def is_long(self) -> bool:
+        return self.direction == 'LONG'
+
+    @property
+    def effective_stop(self) -> int:
+        """Trailing stop when active, otherwise the original stop loss."""
+        if self.trailing_activated and self.trailing_stop is not None:
+            return self.trailing_stop
+        return self.stop_loss
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'PositionLevels':
+        """
+        Build levels from a paper_trades row (asyncpg returns Decimal).
+
+        Args:
+            row: paper_trades row as a dict
+
+        Returns:
+            PositionLevels with all prices in ticks
+        """
+        trailing_price = row.get('trailing_stop_price')
+        return cls(
+            trade_id=row['id'],
+            direction=row['direction'],
+            entry=price_to_ticks(row['entry_price']),
+            stop_loss=price_to_ticks(row['stop_loss']),
+            take_profit=price_to_ticks(row['take_profit']),
+            trailing_activated=bool(row.get('trailing_stop_activated')),
+            trailing_stop=(
+                price_to_ticks(trailing_price) if trailing_price is not None else None
+            )
+        )
+
+
+__all__ = [
+    'PRICE_DECIMALS', 'USD_DECIMALS', 'PRICE_SCALE',
+    'to_fixed', 'from_fixed',
+    'price_to_ticks', 'ticks_to_price',
+    'as_fraction', 'scale_ticks',
+    'PositionLevels'
+]
@@ -0,0 +1,173 @@
+"""
+Stage profiler
+Wall time and call counts per named stage of a backtest run.
+
+Disabled by default, in which case stages cost one attribute check.
+backtest.py --profile enables it, optionally with a cProfile trace, and
+writes a JSON report so runs can be compared before and after a change.
+
+Stages nest: a stage's total time includes the stages it calls, its self
+time does not. Timing follows a single call stack, which matches the
+backtest (every await is sequential); stages running in concurrent tasks
+would be attributed to whichever stage is open.
+"""
+
+import contextlib
+import cProfile
+import functools
+import inspect
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Profiler:
+    """
+    Collects per-stage timings between start() and stop().
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._stack: List[List[float]] = []  # [start, nested time] per open stage
+        self._tracer: Optional[cProfile.Profile] = None
+        self._started = 0.0
+        self._wall = 0.0
+
+    def start(self, trace: bool = False) -> None:
+        """
+        Reset and start collecting.
+
+        Args:
+            trace: Also record a cProfile trace of every function call
+        """
+        self.enabled = True
+        self.stats = {}
+        self._stack = []
+        self._tracer = cProfile.Profile() if trace else None
+        self._started = time.perf_counter()
+        if self._tracer:
+            self._tracer.enable()
+
+    def stop(self) -> None:
+        """Stop collecting; stats and trace are kept for report()/write()."""
+        if self._tracer:
+            self._tracer.disable()
+        self._wall = time.perf_counter() - self._started
+        self.enabled = False
+
+    def stage(self, name: str):
+        """Context manager timing one call of a named stage."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed(name)
+
+    def timed(self, name: str) -> Callable:
+        """
+        Decorator timing every call of a function or coroutine function as a stage.
+
+        Usage:
+            @profiler.timed('monitor_trade')
+            async def monitor_backtest_trade(self, ...): ...
+        """
+        def decorate(fn: Callable) -> Callable:
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    with self._timed(name):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self._timed(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+
+        return decorate
+
+    @contextlib.contextmanager
+    def _timed(self, name: str):
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+            entry = self.stats.setdefault(
+                name, {'calls': 0, 'total_s': 0.0, 'self_s': 0.0, 'max_s': 0.0}
+            )
+            entry['calls'] += 1
+            entry['total_s'] += elapsed
+            entry['self_s'] += elapsed - frame[1]
+            entry['max_s'] = max(entry['max_s'], elapsed)
+
+    def report(self, entry: str) -> Dict[str, Any]:
+        """
+        Machine-readable report of the last run, stages sorted by self time.
+
+        Args:
+            entry: Name of the profiled program
+
+        Returns:
+            Dict with wall time and one record per stage
+        """
+        wall = self._wall
+        stages = [
+            {
+                'stage': name,
+                **{k: round(v, 6) if isinstance(v, float) else v for k, v in s.items()},
+                'share': round(s['self_s'] / wall, 4) if wall else 0.0
+            }
+            for name, s in sorted(self.stats.items(), key=lambda item: -item[1]['self_s'])
+        ]
+        return {
+            'entry': entry,
+            'finished': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'wall_s': round(wall, 6),
+            'stages': stages,
+        }
+
+    def write(self, path: Path, entry: str) -> Dict[str, Any]:
+        """
+        Write report(entry) as JSON, and the cProfile trace next to it as .prof.
+
+        Returns:
+            The report written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = self.report(entry)
+        if self._tracer:
+            trace = path.with_suffix('.prof')
+            self._tracer.dump_stats(str(trace))
+            report['trace'] = str(trace)
+        path.write_text(json.dumps(report, indent=2))
+        return report
+
+    def summary(self, report: Dict[str, Any], top: int = 12) -> str:
+        """Text table of the top stages of a report."""
+        lines = [
+            f"PROFILE ({report['entry']}, {report['wall_s']:.2f}s wall)",
+            f"  {'Stage':<28} {'Calls':>8} {'Self s':>9} {'Total s':>9} {'Share':>7}",
+        ]
+        for s in report['stages'][:top]:
+            lines.append(
+                f"  {s['stage']:<28} {s['calls']:>8} {s['self_s']:>9.3f} "
+                f"{s['total_s']:>9.3f} {s['share'] * 100:>6.1f}%"
+            )
+        return "\n".join(lines)
+
+
+# Global profiler instance
+profiler = Profiler()
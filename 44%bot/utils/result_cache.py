@@ -0,0 +1,191 @@
+"""
+Result cache for backtest runs
+Content-addressed, size-bounded on-disk store of completed backtests.
+
+A run is keyed by the candles it saw (hashed by value, not by date range),
+the starting balance, the Decimal trading parameters in config, and the
+source of every module that decides trades. Re-running an unchanged
+backtest loads its trades instead of replaying every candle; changing the
+data, a parameter or the strategy code produces a new key. Least recently
+used entries are evicted once the cache directory exceeds max_bytes.
+"""
+
+import hashlib
+import os
+import pickle
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from config import Config
+from utils.logger import logger
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+
+# Modules whose code determines backtest trades
+STRATEGY_SOURCES = (
+    'backtest.py',
+    'core/confluence_detector.py',
+    'core/risk_manager.py',
+    'core/trade_simulator.py',
+    'core/trailing_stop.py',
+    'market/intrabar_resolver.py',
+    'utils/money.py',
+    'config.py',
+)
+
+
+def fingerprint_rows(rows: Iterable[Any]) -> str:
+    """
+    Hash candle rows by value.
+
+    Args:
+        rows: asyncpg Records or dicts (Decimal/datetime values repr stably)
+
+    Returns:
+        Hex digest
+    """
+    h = hashlib.sha256()
+    count = 0
+    for row in rows:
+        h.update(repr(tuple(row.items())).encode())
+        count += 1
+    h.update(f"rows:{count}".encode())
+    return h.hexdigest()
+
+
+def trading_parameters() -> Dict[str, Decimal]:
+    """Decimal settings on Config (risk, buffers, slippage, fees)."""
+    return {
+        name: value for name, value in sorted(vars(Config).items())
+        if name.isupper() and isinstance(value, Decimal)
+    }
+
+
+class ResultCache:
+    """
+    Pickle store for backtest results under a cache directory.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        sources: Sequence[str] = STRATEGY_SOURCES
+    ):
+        """
+        Args:
+            root: Cache directory (default: 44%bot/.cache)
+            max_bytes: Size bound before least recently used entries go
+            sources: Files, relative to the app root, hashed into every key
+        """
+        self.root = Path(root) if root else APP_ROOT / '.cache'
+        self.max_bytes = max_bytes
+        self._code_version = self._hash_sources(sources)
+
+    @staticmethod
+    def _hash_sources(sources: Sequence[str]) -> str:
+        h = hashlib.sha256()
+        for source in sources:
+            h.update(source.encode())
+            h.update((APP_ROOT / source).read_bytes())
+        return h.hexdigest()
+
+    def key(
+        self,
+        candles_4h: Sequence[Any],
+        candles_5m: Sequence[Any],
+        starting_balance: Decimal,
+        intrabar: Optional[str] = None,
+        trailing: Optional[str] = None,
+        risk: Optional[str] = None
+    ) -> str:
+        """
+        Build the cache key for a backtest run.
+
+        Args:
+            candles_4h: 4H candles after date filtering
+            candles_5m: 5M candles after date filtering
+            starting_balance: Account balance at the start of the run
+            intrabar: Fingerprint of the 1M store settling ambiguous candles, if any
+            trailing: Trailing stop settings not covered by trading_parameters()
+            risk: Risk limits applied to the run, if any
+
+        Returns:
+            Hex digest identifying the run
+        """
+        h = hashlib.sha256()
+        h.update(self._code_version.encode())
+        h.update(fingerprint_rows(candles_4h).encode())
+        h.update(fingerprint_rows(candles_5m).encode())
+        h.update(repr(starting_balance).encode())
+        h.update(repr(trading_parameters()).encode())
+        if intrabar:
+            h.update(f"intrabar:{intrabar}".encode())
+        if trailing:
+            h.update(f"trailing:{trailing}".encode())
+        if risk:
+            h.update(f"risk:{risk}".encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Load a stored result.
+
+        Args:
+            key: Key from key()
+
+        Returns:
+            Stored value, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)  # Mark as recently used
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a result and evict old entries if over the size bound.
+
+        Args:
+            key: Key from key()
+            value: Picklable result
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until under max_bytes."""
+        entries = []
+        total = 0
+        for path in self.root.glob('*/*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted cache entry {path.name}")
@@ -0,0 +1,259 @@
+"""
+44%bot Benchmarks
+=================
+Backtester detectors, trade monitoring, a full run_backtest, one
+PositionManager pass, trigger book ticks, trailing stop updates, risk
+checks, PriceFeed signing/fetching and the running trade stats, on seeded
+synthetic candles and an in-memory database. Logging is silenced so the
+timings measure the trading code rather than log sinks.
+"""
+
+import contextlib
+import io
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from fixtures import BEST_BID_ASK, MemoryDatabase, aggregate_candles, open_positions, synthetic_candles
+from harness import REPO_ROOT, benchmark
+
+BOT_ROOT = REPO_ROOT / '44%bot'
+sys.path.insert(0, str(BOT_ROOT))
+
+# utils.logger opens logs/ relative to the working directory
+with contextlib.chdir(BOT_ROOT):
+    import backtest
+    import database.queries
+    from analytics.stats import TradeStats
+    from backtest import Backtester
+    from core.confluence_detector import events_4h, events_5m
+    from core.position_manager import PositionManager
+    from core.risk_manager import RiskManager
+    from core.trailing_stop import FIXED, TrailingRule, TrailingStop
+    from market.http_client import CoinbaseClient
+    from market.price_feed import PriceFeed
+    from utils.logger import logger
+    from utils.money import price_to_ticks
+
+logger.remove()
+
+N_5M = 20_000                 # ~69 days of 5M candles
+N_4H = 3_000                  # ~16 months of 4H candles (detector benchmark)
+N_TRADES = 200
+N_POSITIONS = 50
+PM_ITERATIONS = 100
+N_REQUESTS = 200
+N_BOOK = 500
+N_TICKS = 10_000
+
+CANDLES_5M = synthetic_candles(N_5M)
+CANDLES_4H_OF_5M = aggregate_candles(CANDLES_5M, 48)
+CANDLES_4H = synthetic_candles(N_4H, minutes=240, volatility=0.012)
+ENTRY_INDICES = range(100, N_5M - 100, (N_5M - 200) // N_TRADES)[:N_TRADES]
+
+# =============================================================================
+# DETECTORS
+# =============================================================================
+
+@benchmark('bot.detector.events_4h', items=N_4H, unit='candles')
+def bench_events_4h():
+    events_4h(CANDLES_4H)
+
+
+@benchmark('bot.detector.events_5m', items=N_5M, unit='candles')
+def bench_events_5m():
+    events_5m(CANDLES_5M)
+
+
+def _warm_backtester() -> Backtester:
+    """Backtester with detector events and tick arrays already built."""
+    bt = Backtester(Decimal('100'))
+    bt._get_structure_events(CANDLES_4H_OF_5M, CANDLES_5M)
+    bt._get_tick_arrays(CANDLES_5M)
+    return bt
+
+
+def _warm_sweeps() -> Backtester:
+    bt = Backtester(Decimal('100'))
+    bt._get_structure_events(CANDLES_4H, None)
+    return bt
+
+
+@benchmark('bot.detector.sweep_4h', setup=_warm_sweeps, items=N_4H, unit='candles')
+async def bench_sweep_4h(bt: Backtester):
+    for i in range(N_4H):
+        await bt.detect_liquidity_sweep_4h(CANDLES_4H, i)
+
+
+@benchmark('bot.detector.confluence_5m', setup=_warm_backtester,
+           items=2 * len(CANDLES_4H_OF_5M), unit='windows')
+async def bench_confluence_5m(bt: Backtester):
+    # The 48-candle window the backtest searches after every 4H candle
+    for start in range(0, N_5M - 48, 48):
+        for bias in ('BULLISH', 'BEARISH'):
+            await bt.detect_5m_confluence(CANDLES_5M, start, start + 48, bias)
+
+
+@benchmark('bot.detector.swing_level', setup=_warm_backtester, items=2 * (N_5M // 10), unit='lookups')
+async def bench_swing_level(bt: Backtester):
+    for i in range(0, N_5M, 10):
+        await bt.find_swing_level(CANDLES_5M, i, 'HIGH')
+        await bt.find_swing_level(CANDLES_5M, i, 'LOW')
+
+# =============================================================================
+# TRADES
+# =============================================================================
+
+async def _open_trades():
+    bt = _warm_backtester()
+    trades = []
+    for index in ENTRY_INDICES:
+        candle = CANDLES_5M[index]
+        for bias in ('BULLISH', 'BEARISH'):
+            trade = await bt.execute_backtest_trade(
+                entry_time=candle['timestamp'], bias=bias, entry_price=candle['close'],
+                candles_5m=CANDLES_5M, candles_4h=CANDLES_4H_OF_5M,
+                current_5m_index=index, current_4h_index=index // 48
+            )
+            if trade:
+                trades.append((trade, index))
+                break
+    return bt, trades
+
+
+@benchmark('bot.monitor_trade', setup=_open_trades, items=N_TRADES, unit='trades')
+async def bench_monitor_trade(bt: Backtester, trades):
+    for trade, index in trades:
+        await bt.monitor_backtest_trade(trade, CANDLES_5M, index)
+
+
+def _backtest_db() -> Backtester:
+    backtest.db = MemoryDatabase({'candles_4h': CANDLES_4H_OF_5M, 'candles_5m': CANDLES_5M})
+    return Backtester(Decimal('100'))
+
+
+@benchmark('bot.run_backtest', setup=_backtest_db, items=N_5M, unit='candles', repeat=3)
+async def bench_run_backtest(bt: Backtester):
+    with contextlib.redirect_stdout(io.StringIO()):
+        await bt.run_backtest()
+
+# =============================================================================
+# LIVE LOOP
+# =============================================================================
+
+PRICE = Decimal('60000.00')
+
+
+def _position_manager() -> PositionManager:
+    database.queries.db = MemoryDatabase({'paper_trades': open_positions(N_POSITIONS, PRICE)})
+    return PositionManager()
+
+
+@benchmark('bot.position_manager.iteration', setup=_position_manager,
+           items=PM_ITERATIONS, unit='iterations')
+async def bench_position_manager(pm: PositionManager):
+    # Body of monitor_positions() without the price fetch and the sleep
+    now = datetime.utcnow()
+    for i in range(PM_ITERATIONS):
+        price = PRICE + Decimal(i % 20 - 10)
+        positions = {p['id']: p for p in await database.queries.get_open_positions()}
+        pm._sync_book(positions)
+        ticks = price_to_ticks(price)
+        for trade_id in pm.book.crossed(ticks, now):
+            await pm._check_position(positions[trade_id], price)
+        pm._check_delay(ticks)
+        pm._prune_levels_cache(list(positions.values()))
+
+
+def _trigger_book() -> PositionManager:
+    pm = PositionManager()
+    pm._sync_book({p['id']: p for p in open_positions(N_BOOK, PRICE)})
+    return pm
+
+
+@benchmark('bot.trigger_book.tick', setup=_trigger_book, items=N_TICKS, unit='ticks')
+def bench_trigger_book(pm: PositionManager):
+    # Per-price work with N_BOOK positions open, none near an exit
+    now = datetime.utcnow()
+    base = price_to_ticks(PRICE)
+    for i in range(N_TICKS):
+        ticks = base + (i % 200 - 100) * 100
+        pm.book.crossed(ticks, now)
+        pm._check_delay(ticks)
+
+
+def _trailing_stops() -> list:
+    rule = TrailingRule(mode=FIXED)
+    entry = price_to_ticks(PRICE)
+    return [TrailingStop(rule, True, entry, entry - 1_000 * 10**8, entry + 1_000 * 10**8)
+            for _ in range(N_POSITIONS)]
+
+
+@benchmark('bot.trailing_stop.update', setup=_trailing_stops,
+           items=N_TICKS * N_POSITIONS // 10, unit='updates')
+def bench_trailing_stop(trails: list):
+    # A rally through activation, ratcheting FIXED trails on every tick
+    base = price_to_ticks(PRICE)
+    for i in range(N_TICKS // 10):
+        ticks = base + i * 2 * 10**8  # $2 per tick, activating at +$800
+        for trail in trails:
+            trail.update(ticks)
+
+
+async def _price_feed() -> PriceFeed:
+    client = CoinbaseClient(
+        api_key='organizations/benchmark/apiKeys/benchmark',
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=BEST_BID_ASK)),
+        rate_limits={'private': 1e9, 'public': 1e9}  # time the client, not the limiter
+    )
+    client._private_key = ec.generate_private_key(ec.SECP256R1())
+    await client.connect()
+    return PriceFeed(client)
+
+
+@benchmark('bot.price_feed.sign', setup=_price_feed, items=N_REQUESTS, unit='tokens')
+def bench_price_feed_sign(feed: PriceFeed):
+    for _ in range(N_REQUESTS):
+        feed.client.sign('GET', PriceFeed.BEST_BID_ASK_PATH)
+
+
+@benchmark('bot.price_feed.fetch', setup=_price_feed, items=N_REQUESTS, unit='requests')
+async def bench_price_feed_fetch(feed: PriceFeed):
+    for _ in range(N_REQUESTS):
+        await feed._fetch_price_from_api()
+
+
+# =============================================================================
+# RISK
+# =============================================================================
+
+N_CHECKS = 10_000
+
+
+@benchmark('bot.risk.check', items=N_CHECKS, unit='checks')
+def bench_risk_check():
+    # Pre-trade check after each close, as SignalMonitor runs it
+    risk = RiskManager(Decimal('10000'), max_positions=N_POSITIONS)
+    now = datetime.utcnow()
+    for i in range(N_CHECKS):
+        risk.on_open(i, Decimal('5000'), Decimal('100'))
+        risk.on_close(i, Decimal(i % 7 * 10 - 25), 'WIN' if i % 7 > 2 else 'LOSS', now)
+        risk.check(now)
+
+
+# =============================================================================
+# ANALYTICS
+# =============================================================================
+
+N_CLOSES = 10_000
+
+
+@benchmark('bot.analytics.record', items=N_CLOSES, unit='trades')
+def bench_stats_record():
+    stats = TradeStats(Decimal('10000'))
+    for i in range(N_CLOSES):
+        pnl = Decimal(i % 7 * 10 - 25)
+        stats.record(pnl, 'WIN' if pnl > 0 else 'LOSS', risk_reward_ratio=Decimal('2.5'))
@@ -0,0 +1,67 @@
+"""
+historyBot Benchmarks
+=====================
+Swing, regime and RSI computation from backtest_4h_bias_v3 on the bundled
+4H/5M data, Monte Carlo throughput of equity_curve_simulation, the block
+bootstrap over the v3 trade log (one process) and the synthetic candle
+generator. The result cache is turned off so every call
+does the work.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pandas as pd
+
+from harness import REPO_ROOT, benchmark
+
+HISTORY_ROOT = REPO_ROOT / 'historyBot'
+os.environ['HISTORYBOT_CACHE'] = '0'
+sys.path.insert(0, str(HISTORY_ROOT / 'scripts'))
+
+from strategy_adapters import bias_v3, load_script  # noqa: E402
+from engine.bootstrap import block_bootstrap, r_multiples  # noqa: E402
+from engine.synthetic import SyntheticMarket  # noqa: E402
+
+equity_sim = load_script('scripts/equity_curve_simulation.py', 'equity_curve_simulation')
+
+DF_4H = bias_v3.load_data(HISTORY_ROOT / 'data' / 'btc_usd_4h.csv')
+DF_5M = bias_v3.load_data(HISTORY_ROOT / 'data' / 'btc_usd_5m.csv')
+N_SIMULATIONS = 100
+SIM_MONTHS = 12
+N_SYNTHETIC = 500_000
+N_BOOTSTRAP = 20_000
+V3_R = r_multiples(pd.read_csv(HISTORY_ROOT / 'candleBias' / '4H' / '4h_bias_v3_best_results.csv'), stop_pct=1.5)
+
+
+@benchmark('history.rsi', items=len(DF_5M), unit='candles')
+def bench_rsi():
+    bias_v3.calculate_rsi(DF_5M['close'], bias_v3.RSI_PERIOD)
+
+
+@benchmark('history.swings', setup=DF_4H.copy, items=len(DF_4H), unit='candles', repeat=3)
+def bench_swings(df):
+    bias_v3.detect_swings(df)
+
+
+@benchmark('history.regimes', setup=DF_4H.copy, items=len(DF_4H), unit='candles', repeat=3)
+def bench_regimes(df):
+    bias_v3.detect_regimes(df)
+
+
+@benchmark('history.monte_carlo', items=N_SIMULATIONS, unit='simulations', repeat=3)
+def bench_monte_carlo():
+    with contextlib.redirect_stdout(io.StringIO()):
+        equity_sim.run_monte_carlo(N_SIMULATIONS, 1000, SIM_MONTHS, equity_sim.SYSTEM_PARAMS)
+
+
+@benchmark('history.bootstrap', items=N_BOOTSTRAP, unit='paths', repeat=3)
+def bench_bootstrap():
+    block_bootstrap(V3_R, paths=N_BOOTSTRAP, workers=1)
+
+
+@benchmark('history.synthetic', items=N_SYNTHETIC, unit='candles', repeat=3)
+def bench_synthetic():
+    SyntheticMarket(seed=1).generate(N_SYNTHETIC, ['1min', '5min', '1h', '4h'])
@@ -0,0 +1,155 @@
+"""
+Benchmark Fixtures
+==================
+Deterministic inputs for the benchmarks: seeded synthetic candles in the
+shape asyncpg returns them (dicts of Decimal prices and UTC timestamps),
+an in-memory stand-in for the 44%bot database pool, and a canned Coinbase
+best_bid_ask response.
+"""
+
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+SEED = 7
+CENT = Decimal('0.01')
+
+
+def synthetic_candles(n: int, minutes: int = 5, volatility: float = 0.0015, seed: int = SEED,
+                      start_price: float = 60000.0,
+                      start: datetime = datetime(2025, 1, 1, tzinfo=timezone.utc)
+                      ) -> List[Dict[str, Any]]:
+    """
+    Random-walk candles; the default volatility is BTC-like for 5M bars.
+
+    The same seed always gives the same candles, so timings from
+    different runs measure the same work.
+    """
+    rng = random.Random(seed)
+    candles = []
+    price = start_price
+    wick = volatility * 0.4
+    for i in range(n):
+        open_ = price
+        close = open_ * (1 + rng.gauss(0, volatility))
+        high = max(open_, close) * (1 + abs(rng.gauss(0, wick)))
+        low = min(open_, close) * (1 - abs(rng.gauss(0, wick)))
+        candles.append({
+            'timestamp': start + timedelta(minutes=minutes * i),
+            'open': Decimal(repr(open_)).quantize(CENT),
+            'high': Decimal(repr(high)).quantize(CENT),
+            'low': Decimal(repr(low)).quantize(CENT),
+            'close': Decimal(repr(close)).quantize(CENT),
+            'volume': Decimal(repr(rng.uniform(1, 50))).quantize(Decimal('0.0001')),
+        })
+        price = close
+    return candles
+
+
+def aggregate_candles(candles: List[Dict[str, Any]], per_bar: int) -> List[Dict[str, Any]]:
+    """Coarser candles from consecutive groups of per_bar candles (48 x 5M = 4H)."""
+    bars = []
+    for i in range(0, len(candles) - per_bar + 1, per_bar):
+        group = candles[i:i + per_bar]
+        bars.append({
+            'timestamp': group[0]['timestamp'],
+            'open': group[0]['open'],
+            'high': max(c['high'] for c in group),
+            'low': min(c['low'] for c in group),
+            'close': group[-1]['close'],
+            'volume': sum(c['volume'] for c in group),
+        })
+    return bars
+
+# =============================================================================
+# IN-MEMORY DATABASE
+# =============================================================================
+
+_SELECT = re.compile(
+    r"SELECT \* FROM (\w+)(?:\s+WHERE (\w+) = '(\w+)')?(?:\s+ORDER BY (\w+)(?: (ASC|DESC))?)?",
+    re.IGNORECASE
+)
+_UPDATE = re.compile(r"UPDATE (\w+)\s+SET (.+?)\s+WHERE id = \$(\d+)", re.IGNORECASE | re.DOTALL)
+
+
+class MemoryDatabase:
+    """
+    Dict-backed stand-in for database.connection.DatabasePool.
+
+    Understands the statement shapes the benchmarked code issues:
+    SELECT * FROM t [WHERE col = 'value'] [ORDER BY col [ASC|DESC]] and the
+    dynamic UPDATE t SET a = $1, ... WHERE id = $n built by database.queries.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.tables = tables or {}
+
+    async def fetch_all(self, query: str, *args) -> List[Dict[str, Any]]:
+        match = _SELECT.search(query)
+        if not match:
+            raise NotImplementedError(f"MemoryDatabase cannot run: {query.strip()[:80]}")
+        table, column, value, order, direction = match.groups()
+        rows = self.tables.get(table, [])
+        if column:
+            rows = [r for r in rows if str(r.get(column)) == value]
+        if order:
+            rows = sorted(rows, key=lambda r: r[order], reverse=(direction or '').upper() == 'DESC')
+        return [dict(r) for r in rows]
+
+    async def fetch_one(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch_all(query, *args)
+        return rows[0] if rows else None
+
+    async def execute(self, query: str, *args) -> str:
+        match = _UPDATE.search(query)
+        if not match:
+            raise NotImplementedError(f"MemoryDatabase cannot run: {query.strip()[:80]}")
+        table, assignments, id_param = match.groups()
+        values = {}
+        for assignment in assignments.split(','):
+            column, param = (part.strip() for part in assignment.split('='))
+            values[column] = args[int(param.lstrip('$')) - 1]
+        row_id = args[int(id_param) - 1]
+        updated = 0
+        for row in self.tables.get(table, []):
+            if row['id'] == row_id:
+                row.update(values)
+                updated += 1
+        return f"UPDATE {updated}"
+
+
+def open_positions(n: int, price: Decimal = Decimal('60000.00')) -> List[Dict[str, Any]]:
+    """paper_trades rows for n open positions around price, none near an exit."""
+    now = datetime.utcnow()
+    rows = []
+    for i in range(n):
+        long = i % 2 == 0
+        rows.append({
+            'id': i + 1,
+            'status': 'OPEN',
+            'direction': 'LONG' if long else 'SHORT',
+            'entry_price': price,
+            'stop_loss': price - 1000 if long else price + 1000,
+            'take_profit': price + 2000 if long else price - 2000,
+            'trailing_stop_activated': False,
+            'trailing_stop_price': None,
+            'entry_time': now - timedelta(minutes=i),
+            'position_size_btc': Decimal('0.01'),
+            'position_size_usd': price * Decimal('0.01'),
+        })
+    return rows
+
+# =============================================================================
+# COINBASE RESPONSES
+# =============================================================================
+
+BEST_BID_ASK = {
+    'pricebooks': [{
+        'product_id': 'BTC-USD',
+        'bids': [{'price': '60000.01', 'size': '0.41'}],
+        'asks': [{'price': '60000.99', 'size': '0.12'}],
+        'time': '2025-01-01T00:00:00.000000Z',
+    }]
+}
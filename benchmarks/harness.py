@@ -0,0 +1,218 @@
+"""
+Benchmark Harness
+=================
+Registry, timing and history for the benchmark suite.
+
+A benchmark is a function registered with @benchmark. Its optional setup
+runs before every repeat outside the timed region and returns the
+function's arguments, so each repeat starts from the same state (fresh
+Backtester, fresh in-memory tables). Coroutine functions are run on one
+shared event loop. The first call is a warmup and is not recorded, and
+the garbage collector is paused while a call is timed, as timeit does.
+
+Each run is appended as one JSON line to the history file together with
+the commit it ran on; compare() reports per-benchmark ratios of the best
+time against an earlier run and flags the ones slower than the threshold.
+The best of the repeats is used because scheduler and cache noise only
+ever adds time.
+"""
+
+import asyncio
+import gc
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_HISTORY = Path(__file__).resolve().parent / 'history.jsonl'
+
+
+@dataclass
+class Benchmark:
+    name: str
+    fn: Callable
+    setup: Optional[Callable] = None
+    items: int = 1          # work items per call (candles, trades, simulations...)
+    unit: str = 'calls'
+    repeat: Optional[int] = None  # overrides the run's repeat count (slow benchmarks)
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, *, setup: Optional[Callable] = None, items: int = 1,
+              unit: str = 'calls', repeat: Optional[int] = None):
+    """
+    Register a benchmark.
+
+    Usage:
+        @benchmark('bot.detector.events_5m', items=N_5M, unit='candles')
+        def bench_events_5m():
+            events_5m(CANDLES_5M)
+    """
+    def decorate(fn: Callable) -> Callable:
+        if name in REGISTRY:
+            raise KeyError(f"Duplicate benchmark {name!r}")
+        REGISTRY[name] = Benchmark(name, fn, setup, items, unit, repeat)
+        return fn
+    return decorate
+
+
+def _call(fn: Callable, args: Any, loop: asyncio.AbstractEventLoop) -> float:
+    if not isinstance(args, tuple):
+        args = (args,)
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = fn(*args)
+        if inspect.isawaitable(result):
+            loop.run_until_complete(result)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def measure(bench: Benchmark, repeat: int, loop: asyncio.AbstractEventLoop) -> Dict[str, Any]:
+    """Time one benchmark: a warmup call, then `repeat` recorded calls."""
+    repeat = bench.repeat or repeat
+    times = []
+    for i in range(repeat + 1):
+        args = bench.setup() if bench.setup else ()
+        if inspect.isawaitable(args):
+            args = loop.run_until_complete(args)
+        elapsed = _call(bench.fn, args, loop)
+        if i:
+            times.append(elapsed)
+
+    median = statistics.median(times)
+    return {
+        'median_s': round(median, 6),
+        'min_s': round(min(times), 6),
+        'stdev_s': round(statistics.stdev(times), 6) if len(times) > 1 else 0.0,
+        'repeat': repeat,
+        'items': bench.items,
+        'unit': bench.unit,
+        'per_s': round(bench.items / min(times), 2) if min(times) else None,
+    }
+
+
+def run(names: List[str], repeat: int, progress: Callable[[str, Dict[str, Any]], None] = None
+        ) -> Dict[str, Dict[str, Any]]:
+    """Measure the named benchmarks in order."""
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for name in names:
+            results[name] = measure(REGISTRY[name], repeat, loop)
+            if progress:
+                progress(name, results[name])
+    finally:
+        loop.close()
+    return results
+
+# =============================================================================
+# HISTORY
+# =============================================================================
+
+def _git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_record(results: Dict[str, Dict[str, Any]], label: Optional[str],
+                history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'id': (history[-1]['id'] + 1) if history else 1,
+        'label': label,
+        'finished': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'machine': f"{platform.node()} {platform.machine()} x{os.cpu_count()}",
+        'results': results,
+    }
+
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path: Path, record: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def find_run(history: List[Dict[str, Any]], ref: Optional[str]) -> Optional[Dict[str, Any]]:
+    """A stored run by id or label (latest with that label); None = latest run."""
+    if not history:
+        return None
+    if ref is None:
+        return history[-1]
+    for record in reversed(history):
+        if str(record['id']) == ref or record.get('label') == ref:
+            return record
+    return None
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+
+def compare(base: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Best-time ratio current/base for every benchmark present in both runs.
+
+    Returns:
+        One row per benchmark with status 'regression' (ratio > 1 + threshold),
+        'improvement' (ratio < 1 - threshold) or 'ok'
+    """
+    rows = []
+    for name, cur in current['results'].items():
+        old = base['results'].get(name)
+        if old is None or not old['min_s']:
+            continue
+        ratio = cur['min_s'] / old['min_s']
+        if old.get('items') != cur.get('items'):
+            status = 'resized'  # workload changed, timings not comparable
+        elif ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'base_s': old['min_s'], 'current_s': cur['min_s'],
+                     'ratio': ratio, 'status': status})
+    return rows
+
+
+def format_comparison(base: Dict[str, Any], current: Dict[str, Any],
+                      rows: List[Dict[str, Any]], threshold: float) -> str:
+    lines = [
+        f"Compared with run {base['id']}"
+        + (f" ({base['label']})" if base.get('label') else '')
+        + f" at {base.get('commit') or 'unknown commit'}, threshold {threshold:.0%}",
+    ]
+    if base.get('machine') != current.get('machine') or base.get('python') != current.get('python'):
+        lines.append(f"  note: baseline ran on {base.get('machine')} / Python {base.get('python')}")
+    lines.append(f"  {'Benchmark':<36} {'Base s':>10} {'Now s':>10} {'Ratio':>7}  Status")
+    for r in rows:
+        lines.append(f"  {r['name']:<36} {r['base_s']:>10.4f} {r['current_s']:>10.4f} "
+                     f"{r['ratio']:>6.2f}x  {r['status'].upper() if r['status'] == 'regression' else r['status']}")
+    return "\n".join(lines)
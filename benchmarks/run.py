@@ -0,0 +1,101 @@
+"""
+Benchmark Runner
+================
+Times the 44%bot and historyBot hot paths and keeps a JSON history of the
+results, so an optimization can be checked against the run before it and
+regressions are caught when a later change slows a path down.
+
+Usage (from the repository root):
+    python benchmarks/run.py                     # run everything, append to history
+    python benchmarks/run.py -k detector         # only benchmarks matching a substring
+    python benchmarks/run.py --label baseline    # name the run for later comparisons
+    python benchmarks/run.py --compare           # run, compare with the previous run
+    python benchmarks/run.py --compare baseline  # ... or with a run id / label
+    python benchmarks/run.py --diff 3 7          # compare two stored runs, no timing
+    python benchmarks/run.py --list
+
+--compare and --diff exit with status 1 when any benchmark's best time is
+slower than the baseline by more than --threshold (default 10%). Compare
+runs from the same machine, and raise the threshold on shared or
+throttled hosts where repeated runs already differ by more than that.
+"""
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+import harness
+from harness import DEFAULT_HISTORY, REGISTRY
+
+SUITES = ('bench_bot', 'bench_historybot')
+
+
+def _print_result(name: str, result: dict) -> None:
+    print(f"  {name:<36} {result['min_s']:>9.4f}s  (median {result['median_s']:.4f}s, "
+          f"{result['per_s']:,.0f} {result['unit']}/s)")
+
+
+def _report(base, current, threshold: float) -> int:
+    rows = harness.compare(base, current, threshold)
+    print("\n" + harness.format_comparison(base, current, rows, threshold))
+    regressions = [r['name'] for r in rows if r['status'] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark 44%bot and historyBot hot paths')
+    parser.add_argument('-k', dest='pattern', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed calls per benchmark after one warmup (default: 5)')
+    parser.add_argument('--label', help='Name stored with this run')
+    parser.add_argument('--compare', nargs='?', const='', metavar='RUN', help='Compare with a stored run id or label (default: the previous run)')
+    parser.add_argument('--diff', nargs=2, metavar=('BASE', 'RUN'), help='Compare two stored runs without timing anything')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Slowdown ratio flagged as a regression (default: 0.10)')
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY, help=f'History file (default: {DEFAULT_HISTORY.name})')
+    parser.add_argument('--no-save', action='store_true', help='Do not append this run to the history')
+    parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+    args = parser.parse_args()
+
+    history = harness.load_history(args.history)
+
+    if args.diff:
+        base, current = (harness.find_run(history, ref) for ref in args.diff)
+        missing = [ref for ref, run in zip(args.diff, (base, current)) if run is None]
+        if missing:
+            parser.error(f"No stored run {', '.join(missing)} in {args.history}")
+        return _report(base, current, args.threshold)
+
+    base = None
+    if args.compare is not None:
+        base = harness.find_run(history, args.compare or None)
+        if base is None:
+            parser.error(f"No stored run {args.compare or '(history is empty)'} in {args.history}")
+
+    for suite in SUITES:
+        importlib.import_module(suite)
+    names = [n for n in REGISTRY if not args.pattern or args.pattern in n]
+
+    if args.list:
+        for name in names:
+            bench = REGISTRY[name]
+            print(f"  {name:<36} {bench.items:>8} {bench.unit}")
+        return 0
+
+    print(f"Running {len(names)} benchmarks ({args.repeat} repeats after a warmup)")
+    results = harness.run(names, args.repeat, progress=_print_result)
+    record = harness.make_record(results, args.label, history)
+    if not args.no_save:
+        harness.append_history(args.history, record)
+        print(f"\nSaved run {record['id']} to {args.history}")
+
+    if base is not None:
+        return _report(base, record, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,31 @@ interface HistoricalDataPoint {
   tradesCount: number;
 }
 
+/**
+ * Paper trading history from the bot's hourly stats snapshots: the last
+ * snapshot of each day already holds the cumulative figures, so nothing
+ * is aggregated over paper_trades.
+ */
+async function paperHistory(days: number): Promise<HistoricalDataPoint[]> {
+  const result = await pool.query(`
+    SELECT DISTINCT ON (DATE(bucket_start))
+      DATE(bucket_start)::TEXT as date,
+      win_rate,
+      total_pnl,
+      total_trades as trades_count
+    FROM paper_stats_snapshots
+    WHERE bucket_start >= NOW() - make_interval(days => $1)
+    ORDER BY DATE(bucket_start) ASC, bucket_start DESC
+  `, [days]);
+
+  return result.rows.map(row => ({
+    date: row.date,
+    winRate: parseFloat(row.win_rate),
+    totalPnL: parseFloat(row.total_pnl),
+    tradesCount: parseInt(row.trades_count),
+  }));
+}
+
 export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse
@@ -25,7 +50,11 @@ export default async function handler(
   }
 
   try {
-    const { days = '30' } = req.query;
+    const { days = '30', source = 'live' } = req.query;
+
+    if (source === 'paper') {
+      return res.status(200).json(await paperHistory(parseInt(days as string)));
+    }
 
     // Get trades grouped by day
     const result = await pool.query(`
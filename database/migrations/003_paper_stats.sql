@@ -0,0 +1,71 @@
+-- ============================================================================
+-- Paper Trading Stats Snapshots Migration
+-- Description: Hourly snapshots of the incrementally maintained performance
+--              stats, so analytics and the dashboard never re-aggregate
+--              paper_trades
+-- ============================================================================
+
+DROP TABLE IF EXISTS paper_stats_snapshots CASCADE;
+
+-- ============================================================================
+-- Table: paper_stats_snapshots
+-- Description: One row per hour with trades closed in it, holding the
+--              cumulative stats after the hour's last close
+-- ============================================================================
+
+CREATE TABLE paper_stats_snapshots (
+    bucket_start TIMESTAMPTZ PRIMARY KEY,
+
+    -- Counts
+    total_trades INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    breakevens INTEGER NOT NULL DEFAULT 0,
+    win_rate DECIMAL(6,2) NOT NULL DEFAULT 0,
+
+    -- P&L
+    total_pnl DECIMAL(14,2) NOT NULL DEFAULT 0,
+    avg_win DECIMAL(12,2),
+    avg_loss DECIMAL(12,2),
+    largest_win DECIMAL(12,2),
+    largest_loss DECIMAL(12,2),
+    avg_rr DECIMAL(6,2),
+    profit_factor DECIMAL(10,2),
+
+    -- Equity curve
+    equity DECIMAL(14,2) NOT NULL,
+    peak_equity DECIMAL(14,2) NOT NULL,
+    max_drawdown DECIMAL(14,2) NOT NULL DEFAULT 0,
+    max_drawdown_percent DECIMAL(6,2) NOT NULL DEFAULT 0,
+
+    -- Streaks (current_streak: +n wins / -n losses in a row)
+    current_streak INTEGER NOT NULL DEFAULT 0,
+    max_win_streak INTEGER NOT NULL DEFAULT 0,
+    max_loss_streak INTEGER NOT NULL DEFAULT 0,
+
+    -- Rolling window (last STATS_ROLLING_WINDOW trades)
+    rolling_win_rate DOUBLE PRECISION,
+    rolling_sharpe DOUBLE PRECISION,
+
+    -- Accumulator state for restoring on restart
+    state JSONB NOT NULL,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+COMMENT ON TABLE paper_stats_snapshots IS 'Hourly cumulative paper trading stats (latest row restores the accumulator)';
+COMMENT ON COLUMN paper_stats_snapshots.rolling_sharpe IS 'Per-trade Sharpe ratio over the rolling window, not annualised';
+COMMENT ON COLUMN paper_stats_snapshots.state IS 'TradeStats.to_state() of the Python analytics';
+
+-- ============================================================================
+-- Migration Complete
+-- ============================================================================
+
+\echo '======================================================================='
+\echo 'Paper Stats Migration Applied Successfully'
+\echo '======================================================================='
+\echo 'New Tables Created: 1'
+\echo '  1. paper_stats_snapshots - Hourly performance stats snapshots'
+\echo ''
+\echo 'The Python analytics backfills it from paper_trades on first start.'
+\echo '======================================================================='
@@ -17,12 +17,19 @@ Tests:
 3. Failure containment (loss clustering)
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+from engine.time_index import TimeIndex
+from engine.profiling import profiled
+
 # Constants
 SWING_LOOKBACK = 5  # 1H swing detection window
 STRUCTURE_LOOKBACK = 12  # 12 hours to assess structure
@@ -34,11 +41,11 @@ def load_1h_data(filepath):
     df = df.sort_values('timestamp').reset_index(drop=True)
     return df
 
-def load_4h_signals(filepath):
-    """Load 4H bias signals from backtest results"""
-    df = pd.read_csv(filepath)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    return df
+def load_4h_signals():
+    """4H bias signals from the contract pipeline's cached bias_4h stage"""
+    # Imported here: contract_pipeline loads this module for get_session
+    from contract_pipeline import build_pipeline
+    return build_pipeline().run('bias_4h')['bias_4h']
 
 def detect_1h_swings(df):
     """Detect swing highs and lows on 1H"""
@@ -66,7 +73,7 @@ def detect_1h_swings(df):
 
     return df
 
-def assess_1h_structure(df_1h, signal_time, lookback_hours=12):
+def assess_1h_structure(df_1h, signal_time, lookback_hours=12, time_index=None):
     """
     Assess 1H structure at the time of a 4H signal
 
@@ -76,13 +83,16 @@ def assess_1h_structure(df_1h, signal_time, lookback_hours=12):
     BEARISH structure: Lower highs AND lower lows
     NEUTRAL: Mixed or unclear
     """
+    if time_index is None:
+        time_index = TimeIndex.from_frame(df_1h)
+
     # Find the 1H candle closest to signal time
-    mask = df_1h['timestamp'] <= signal_time
-    if mask.sum() < lookback_hours:
+    candles_before = time_index.count_before(signal_time, inclusive=True)
+    if candles_before < lookback_hours:
         return 'NEUTRAL', {}
 
     # Get the lookback window
-    end_idx = df_1h[mask].index[-1]
+    end_idx = candles_before - 1
     start_idx = max(0, end_idx - lookback_hours)
     window = df_1h.iloc[start_idx:end_idx+1]
 
@@ -199,6 +209,7 @@ def calculate_loss_streaks(results, condition_col=None, condition_val=None):
         'total_signals': len(filtered)
     }
 
+@profiled
 def run_backtest():
     print("=" * 90)
     print("1H STRUCTURE ALIGNMENT CHECKPOINT")
@@ -210,11 +221,12 @@ def run_backtest():
     # Load data
     print("Loading data...")
     df_1h = load_1h_data('data/btc_usd_1h.csv')
-    df_4h_signals = load_4h_signals('4H/4h_bias_v3_best_results.csv')
+    df_4h_signals = load_4h_signals()
 
     # Detect swings on 1H
     print("Detecting 1H swings...")
     df_1h = detect_1h_swings(df_1h)
+    index_1h = TimeIndex.from_frame(df_1h)
 
     # Get date range overlap
     min_1h = df_1h['timestamp'].min()
@@ -238,7 +250,7 @@ def run_backtest():
     results = []
 
     for _, signal in signals.iterrows():
-        structure, details = assess_1h_structure(df_1h, signal['timestamp'])
+        structure, details = assess_1h_structure(df_1h, signal['timestamp'], time_index=index_1h)
         alignment = check_alignment(signal['bias'], structure)
         session = get_session(signal['timestamp'])
 
@@ -9,22 +9,27 @@ REFINEMENTS:
 Goal: Does 1H structure filter out bad days?
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+from contract_pipeline import build_pipeline
+from engine.profiling import profiled
+
 def load_1h_data(filepath):
     df = pd.read_csv(filepath)
     df['timestamp'] = pd.to_datetime(df['timestamp'])
     df = df.sort_values('timestamp').reset_index(drop=True)
     return df
 
-def load_4h_signals(filepath):
-    df = pd.read_csv(filepath)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    return df
+def load_4h_signals():
+    """4H bias signals from the contract pipeline's cached bias_4h stage"""
+    return build_pipeline().run('bias_4h')['bias_4h']
 
 def calculate_emas(df):
     """Calculate EMAs for trend detection"""
@@ -187,6 +192,7 @@ def calculate_loss_streaks(results, condition_col=None, condition_val=None):
         'total_signals': len(filtered)
     }
 
+@profiled
 def run_backtest():
     print("=" * 90)
     print("1H STRUCTURE ALIGNMENT CHECKPOINT V2")
@@ -195,7 +201,7 @@ def run_backtest():
 
     # Load data
     df_1h = load_1h_data('data/btc_usd_1h.csv')
-    df_4h_signals = load_4h_signals('4H/4h_bias_v3_best_results.csv')
+    df_4h_signals = load_4h_signals()
 
     # Calculate EMAs
     df_1h = calculate_emas(df_1h)
@@ -4,35 +4,23 @@
 Deep dive into stop efficiency and MFE/MAE timing
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.timeframes import load_timeframes
+from engine.profiling import profiled
+
 class Direction(Enum):
     BULLISH = "BULLISH"
     BEARISH = "BEARISH"
 
-def load_1m_data(filepath: str) -> pd.DataFrame:
-    df = pd.read_csv(filepath)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp').reset_index(drop=True)
-    return df
-
-def aggregate_candles(df_1m: pd.DataFrame, period: str) -> pd.DataFrame:
-    df = df_1m.set_index('timestamp')
-    agg_dict = {
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-        'volume': 'sum'
-    }
-    df_agg = df.resample(period).agg(agg_dict).dropna()
-    return df_agg.reset_index()
-
 def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
     delta = df['close'].diff()
     gain = delta.where(delta > 0, 0)
@@ -173,6 +161,7 @@ def analyze_trade_sequence(df_1m: pd.DataFrame, entry_time: datetime, entry_pric
         'first_events': first_events
     }
 
+@profiled
 def run_detailed_analysis(filepath: str):
     """Run detailed trade-by-trade analysis"""
     print("=" * 80)
@@ -181,9 +170,10 @@ def run_detailed_analysis(filepath: str):
 
     # Load data
     print("\nLoading data...")
-    df_1m = load_1m_data(filepath)
-    df_5m = aggregate_candles(df_1m, '5min')
-    df_4h = aggregate_candles(df_1m, '4h')
+    frames = load_timeframes(filepath, ['5min', '4h'])
+    df_1m = frames.base
+    df_5m = frames['5min']
+    df_4h = frames['4h'].copy()
     df_4h['rsi'] = calculate_rsi(df_4h)
 
     print(f"1M candles: {len(df_1m):,}")
@@ -18,13 +18,24 @@ PASS criteria:
 - Win rate stable (within 5%)
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.time_index import TimeIndex
+from engine.excursions import ExcursionEngine
+from engine.cache import default_cache
+from engine.timeframes import load_timeframes
+from engine.profiling import profiled, PROFILER
+
+CACHE = default_cache()
+
 # ============================================================================
 # DATA STRUCTURES
 # ============================================================================
@@ -74,32 +85,9 @@ class Trade:
     session: Session
 
 # ============================================================================
-# CANDLE AGGREGATION
+# INDICATORS
 # ============================================================================
 
-def load_1m_data(filepath: str) -> pd.DataFrame:
-    """Load 1M candle data"""
-    df = pd.read_csv(filepath)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp').reset_index(drop=True)
-    return df
-
-def aggregate_candles(df_1m: pd.DataFrame, period: str) -> pd.DataFrame:
-    """Aggregate 1M candles to higher timeframe"""
-    df = df_1m.set_index('timestamp')
-
-    agg_dict = {
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-        'volume': 'sum'
-    }
-
-    df_agg = df.resample(period).agg(agg_dict).dropna()
-    df_agg = df_agg.reset_index()
-    return df_agg
-
 def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """Calculate RSI"""
     delta = df['close'].diff()
@@ -158,6 +146,7 @@ def detect_swings(df: pd.DataFrame, lookback: int = 3) -> Tuple[pd.DataFrame, pd
 # 4H SIGNAL DETECTION (Per Locked Contract)
 # ============================================================================
 
+@CACHE.stage
 def detect_4h_signals(df_4h: pd.DataFrame) -> List[Signal4H]:
     """
     Detect 4H signals per locked contract:
@@ -255,21 +244,25 @@ def is_blocked_session(ts: datetime) -> bool:
 # 5M EXECUTION (Per Locked Contract)
 # ============================================================================
 
-def find_5m_reclaim(df_5m: pd.DataFrame, signal: Signal4H, max_hours: int = 4) -> Optional[Entry5M]:
+@PROFILER.timed
+def find_5m_reclaim(df_5m: pd.DataFrame, signal: Signal4H, max_hours: int = 4,
+                    time_index: Optional[TimeIndex] = None) -> Optional[Entry5M]:
     """
     Find 5M reclaim per locked contract:
     - BULLISH: 5M close > swept level + 0.2%
     - BEARISH: 5M close < swept level - 0.2%
     - Must occur within max_hours (prefer 1-2 hours)
     """
+    if time_index is None:
+        time_index = TimeIndex.from_frame(df_5m)
+
     buffer_pct = 0.002  # 0.2%
 
     # Get 5M candles after 4H signal (after confirmation candle completes)
     signal_end = signal.timestamp + timedelta(hours=4)  # 4H candle + confirmation
     window_end = signal_end + timedelta(hours=max_hours)
 
-    mask = (df_5m['timestamp'] > signal_end) & (df_5m['timestamp'] <= window_end)
-    window = df_5m[mask]
+    window = time_index.window(df_5m, signal_end, window_end, closed='right')
 
     for _, candle in window.iterrows():
         if signal.direction == Direction.BULLISH:
@@ -300,11 +293,15 @@ def find_5m_reclaim(df_5m: pd.DataFrame, signal: Signal4H, max_hours: int = 4) -
 # ============================================================================
 
 def find_5m_stop(df_5m: pd.DataFrame, entry: Entry5M, direction: Direction,
-                 lookback_candles: int = 20) -> Optional[Stop]:
+                 lookback_candles: int = 20,
+                 time_index: Optional[TimeIndex] = None) -> Optional[Stop]:
     """Find stop based on 5M swing levels"""
+    if time_index is None:
+        time_index = TimeIndex.from_frame(df_5m)
+
     # Get candles before entry
-    mask = df_5m['timestamp'] < entry.timestamp
-    recent = df_5m[mask].tail(lookback_candles)
+    end_idx = time_index.count_before(entry.timestamp)
+    recent = df_5m.iloc[max(0, end_idx - lookback_candles):end_idx]
 
     if recent.empty:
         return None
@@ -344,15 +341,21 @@ def find_5m_stop(df_5m: pd.DataFrame, entry: Entry5M, direction: Direction,
         )
 
 def find_1m_refined_stop(df_1m: pd.DataFrame, entry: Entry5M, direction: Direction,
-                          lookback_candles: int = 60) -> Optional[Stop]:
+                          lookback_candles: int = 60,
+                          time_index: Optional[TimeIndex] = None) -> Optional[Stop]:
     """
     Find tighter stop using 1M swing levels
 
     This is the core efficiency test:
     - Can we find a closer swing on 1M that still protects the trade?
     """
+    if time_index is None:
+        time_index = TimeIndex.from_frame(df_1m)
+
     # Get 1M candles in a window around entry
-    entry_idx = df_1m[df_1m['timestamp'] <= entry.timestamp].index[-1]
+    entry_idx = time_index.last_at_or_before(entry.timestamp)
+    if entry_idx < 0:
+        return None
     start_idx = max(0, entry_idx - lookback_candles)
     recent = df_1m.iloc[start_idx:entry_idx]
 
@@ -411,31 +414,21 @@ def find_1m_refined_stop(df_1m: pd.DataFrame, entry: Entry5M, direction: Directi
 # MFE/MAE CALCULATION
 # ============================================================================
 
-def calculate_mfe_mae(df_1m: pd.DataFrame, entry: Entry5M, direction: Direction,
-                      max_hours: int = 24) -> Tuple[float, float]:
+@CACHE.stage
+def calculate_mfe_mae(engine: ExcursionEngine, entries: List[Entry5M],
+                      directions: List[Direction],
+                      max_hours: int = 24) -> List[Tuple[float, float]]:
     """
     Calculate Maximum Favorable Excursion and Maximum Adverse Excursion
-    over a fixed time window
+    over a fixed time window, for all entries in one pass
     """
-    window_end = entry.timestamp + timedelta(hours=max_hours)
-    mask = (df_1m['timestamp'] > entry.timestamp) & (df_1m['timestamp'] <= window_end)
-    window = df_1m[mask]
-
-    if window.empty:
-        return 0.0, 0.0
-
-    if direction == Direction.BULLISH:
-        max_price = window['high'].max()
-        min_price = window['low'].min()
-        mfe = (max_price - entry.entry_price) / entry.entry_price * 100
-        mae = (entry.entry_price - min_price) / entry.entry_price * 100
-    else:  # BEARISH
-        max_price = window['high'].max()
-        min_price = window['low'].min()
-        mfe = (entry.entry_price - min_price) / entry.entry_price * 100
-        mae = (max_price - entry.entry_price) / entry.entry_price * 100
-
-    return mfe, mae
+    stats = engine.evaluate(
+        [e.timestamp for e in entries],
+        [e.entry_price for e in entries],
+        directions,
+        horizon=pd.Timedelta(hours=max_hours)
+    )
+    return list(zip(stats['mfe'].tolist(), stats['mae'].tolist()))
 
 def determine_outcome(mfe: float, mae: float, stop_distance: float,
                       target_rr: float = 2.0) -> str:
@@ -459,15 +452,18 @@ def determine_outcome(mfe: float, mae: float, stop_distance: float,
 # ============================================================================
 
 def test_limit_entry(df_1m: pd.DataFrame, entry: Entry5M, direction: Direction,
-                     improvement_target: float = 0.1) -> Dict:
+                     improvement_target: float = 0.1,
+                     time_index: Optional[TimeIndex] = None) -> Dict:
     """
     Test if a limit order could have gotten better entry
 
     Looks for retracement after entry signal within 15 minutes
     """
+    if time_index is None:
+        time_index = TimeIndex.from_frame(df_1m)
+
     window_end = entry.timestamp + timedelta(minutes=15)
-    mask = (df_1m['timestamp'] > entry.timestamp) & (df_1m['timestamp'] <= window_end)
-    window = df_1m[mask]
+    window = time_index.window(df_1m, entry.timestamp, window_end, closed='right')
 
     if window.empty:
         return {'could_improve': False, 'improvement_pct': 0}
@@ -491,6 +487,7 @@ def test_limit_entry(df_1m: pd.DataFrame, entry: Entry5M, direction: Direction,
 # MAIN ANALYSIS
 # ============================================================================
 
+@profiled
 def run_analysis(filepath: str) -> Dict:
     """Run complete 1M efficiency analysis"""
     print("=" * 70)
@@ -500,17 +497,21 @@ def run_analysis(filepath: str) -> Dict:
 
     # Load data
     print("\n[1] Loading 1M data...")
-    df_1m = load_1m_data(filepath)
+    frames = load_timeframes(filepath, ['5min', '4h'])
+    df_1m = frames.base
     print(f"    Loaded {len(df_1m):,} candles")
     print(f"    Range: {df_1m['timestamp'].min()} to {df_1m['timestamp'].max()}")
 
     # Aggregate to 5M and 4H
     print("\n[2] Aggregating candles...")
-    df_5m = aggregate_candles(df_1m, '5T')
-    df_4h = aggregate_candles(df_1m, '4H')
+    df_5m = frames['5min']
+    df_4h = frames['4h']
     print(f"    5M candles: {len(df_5m):,}")
     print(f"    4H candles: {len(df_4h):,}")
 
+    index_1m = TimeIndex.from_frame(df_1m)
+    index_5m = TimeIndex.from_frame(df_5m)
+
     # Detect 4H signals
     print("\n[3] Detecting 4H signals (per locked contract)...")
     signals = detect_4h_signals(df_4h)
@@ -519,6 +520,7 @@ def run_analysis(filepath: str) -> Dict:
     # Process each signal
     print("\n[4] Processing signals through execution layers...")
     trades = []
+    candidates = []
     blocked_by_session = 0
     no_reclaim = 0
 
@@ -529,7 +531,7 @@ def run_analysis(filepath: str) -> Dict:
             continue
 
         # Find 5M reclaim
-        entry = find_5m_reclaim(df_5m, signal)
+        entry = find_5m_reclaim(df_5m, signal, time_index=index_5m)
         if entry is None:
             no_reclaim += 1
             continue
@@ -540,15 +542,22 @@ def run_analysis(filepath: str) -> Dict:
             continue
 
         # Calculate stops
-        stop_5m = find_5m_stop(df_5m, entry, signal.direction)
-        stop_1m = find_1m_refined_stop(df_1m, entry, signal.direction)
+        stop_5m = find_5m_stop(df_5m, entry, signal.direction, time_index=index_5m)
+        stop_1m = find_1m_refined_stop(df_1m, entry, signal.direction, time_index=index_1m)
 
         if stop_5m is None:
             continue
 
-        # Calculate MFE/MAE
-        mfe, mae = calculate_mfe_mae(df_1m, entry, signal.direction)
+        candidates.append((signal, entry, stop_5m, stop_1m))
 
+    # Calculate MFE/MAE for every candidate at once
+    excursions = calculate_mfe_mae(
+        ExcursionEngine.from_frame(df_1m),
+        [c[1] for c in candidates],
+        [c[0].direction for c in candidates]
+    )
+
+    for (signal, entry, stop_5m, stop_1m), (mfe, mae) in zip(candidates, excursions):
         # Determine outcomes
         outcome_5m = determine_outcome(mfe, mae, stop_5m.distance_pct)
         outcome_1m = determine_outcome(mfe, mae, stop_1m.distance_pct) if stop_1m else "N/A"
@@ -631,7 +640,7 @@ def run_analysis(filepath: str) -> Dict:
 
     entry_tests = []
     for t in trades:
-        result = test_limit_entry(df_1m, t.entry, t.signal.direction)
+        result = test_limit_entry(df_1m, t.entry, t.signal.direction, time_index=index_1m)
         entry_tests.append(result)
 
     could_improve = len([r for r in entry_tests if r['could_improve']])
@@ -776,6 +785,8 @@ def run_analysis(filepath: str) -> Dict:
         print("OVERALL: INSUFFICIENT DATA")
         print("\nNot enough trades with valid 1M stops to evaluate.")
 
+    print(f"\n({CACHE.summary()})")
+
     # Return results dict
     return {
         'trades': len(trades),
@@ -12,27 +12,24 @@ This is a different use case than stop tightening:
 If this works, 1M's role is ENTRY OPTIMIZATION, not stop optimization.
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.excursions import ExcursionEngine
+from engine.timeframes import load_timeframes
+from engine.profiling import profiled
+
 class Direction(Enum):
     BULLISH = "BULLISH"
     BEARISH = "BEARISH"
 
-def load_1m_data(filepath: str) -> pd.DataFrame:
-    df = pd.read_csv(filepath)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    return df.sort_values('timestamp').reset_index(drop=True)
-
-def aggregate_candles(df_1m: pd.DataFrame, period: str) -> pd.DataFrame:
-    df = df_1m.set_index('timestamp')
-    agg_dict = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
-    return df.resample(period).agg(agg_dict).dropna().reset_index()
-
 def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
     delta = df['close'].diff()
     gain = delta.where(delta > 0, 0)
@@ -89,19 +86,16 @@ def find_1m_optimal_entry(df_1m: pd.DataFrame, signal_time: datetime, direction:
 
 def analyze_entry_improvement(df_1m: pd.DataFrame, entry_time: datetime, entry_price: float,
                               optimal_entry_price: float, direction: Direction,
-                              stop_price: float, max_hours: int = 48) -> Dict:
+                              stop_price: float, max_hours: int = 48,
+                              engine: Optional[ExcursionEngine] = None) -> Dict:
     """
     Compare outcomes between market entry vs optimal 1M entry.
 
     Both use the same stop (5M stop).
     Measure R:R improvement from better entry.
     """
-    window_end = entry_time + timedelta(hours=max_hours)
-    mask = (df_1m['timestamp'] > entry_time) & (df_1m['timestamp'] <= window_end)
-    window = df_1m[mask]
-
-    if window.empty:
-        return {}
+    if engine is None:
+        engine = ExcursionEngine.from_frame(df_1m)
 
     # Calculate stop distances for both entries
     if direction == Direction.BULLISH:
@@ -115,35 +109,24 @@ def analyze_entry_improvement(df_1m: pd.DataFrame, entry_time: datetime, entry_p
         target_market = entry_price - (stop_dist_market * 2)
         target_optimal = optimal_entry_price - (stop_dist_optimal * 2)
 
-    # Determine outcomes
-    def get_outcome(ep, tp, sp, dir):
-        for _, candle in window.iterrows():
-            if dir == Direction.BULLISH:
-                if candle['low'] <= sp:
-                    return 'LOSS'
-                if candle['high'] >= tp:
-                    return 'WIN'
-            else:
-                if candle['high'] >= sp:
-                    return 'LOSS'
-                if candle['low'] <= tp:
-                    return 'WIN'
-        return 'NEUTRAL'
+    # Determine outcomes (stop checked before target within a candle)
+    stats = engine.evaluate(
+        [entry_time, entry_time],
+        [entry_price, optimal_entry_price],
+        [direction, direction],
+        horizon=pd.Timedelta(hours=max_hours),
+        stop_prices=[stop_price, stop_price],
+        target_prices=[target_market, target_optimal]
+    )
+
+    if stats['bars'].iloc[0] == 0:
+        return {}
 
-    outcome_market = get_outcome(entry_price, target_market, stop_price, direction)
-    outcome_optimal = get_outcome(optimal_entry_price, target_optimal, stop_price, direction)
+    outcome_market, outcome_optimal = stats['outcome']
 
     # Calculate actual R:R achieved
-    if direction == Direction.BULLISH:
-        mfe = (window['high'].max() - entry_price) / entry_price * 100
-        mae = (entry_price - window['low'].min()) / entry_price * 100
-        mfe_optimal = (window['high'].max() - optimal_entry_price) / optimal_entry_price * 100
-        mae_optimal = (optimal_entry_price - window['low'].min()) / optimal_entry_price * 100
-    else:
-        mfe = (entry_price - window['low'].min()) / entry_price * 100
-        mae = (window['high'].max() - entry_price) / entry_price * 100
-        mfe_optimal = (optimal_entry_price - window['low'].min()) / optimal_entry_price * 100
-        mae_optimal = (window['high'].max() - optimal_entry_price) / optimal_entry_price * 100
+    mfe, mfe_optimal = stats['mfe']
+    mae, mae_optimal = stats['mae']
 
     rr_market = mfe / (stop_dist_market / entry_price * 100) if stop_dist_market > 0 else 0
     rr_optimal = mfe_optimal / (stop_dist_optimal / optimal_entry_price * 100) if stop_dist_optimal > 0 else 0
@@ -165,6 +148,7 @@ def analyze_entry_improvement(df_1m: pd.DataFrame, entry_time: datetime, entry_p
         'rr_optimal': rr_optimal,
     }
 
+@profiled
 def run_entry_precision_test(filepath: str):
     """Test if 1M can improve entry timing while keeping 5M stops"""
     print("=" * 80)
@@ -174,9 +158,11 @@ def run_entry_precision_test(filepath: str):
 
     # Load and prepare data
     print("\nLoading data...")
-    df_1m = load_1m_data(filepath)
-    df_5m = aggregate_candles(df_1m, '5min')
-    df_4h = aggregate_candles(df_1m, '4h')
+    frames = load_timeframes(filepath, ['5min', '4h'])
+    df_1m = frames.base
+    engine_1m = ExcursionEngine.from_frame(df_1m)
+    df_5m = frames['5min']
+    df_4h = frames['4h'].copy()
     df_4h['rsi'] = calculate_rsi(df_4h)
 
     # Detect signals
@@ -269,7 +255,7 @@ def run_entry_precision_test(filepath: str):
         # Analyze outcomes
         analysis = analyze_entry_improvement(df_1m, entry['timestamp'], entry['price'],
                                              optimal['optimal_entry'], sig['direction'],
-                                             stop_5m, max_hours=48)
+                                             stop_5m, max_hours=48, engine=engine_1m)
 
         if analysis:
             results.append({
@@ -9,12 +9,21 @@ CONFIRMATION_ONLY had 762 signals at 64.6% accuracy but 1 death spiral.
 Let's find the sweet spot.
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from collections import defaultdict
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.cache import default_cache
+from engine.profiling import profiled
+
+# Swings, regimes, sweeps and evaluations are memoized by data + config + code
+CACHE = default_cache()
+
 EVALUATION_WINDOW = 8
 SWING_LOOKBACK = 20
 SWEEP_THRESHOLD = 0.001
@@ -37,6 +46,7 @@ def calculate_rsi(prices, period=14):
     rs = avg_gain / avg_loss
     return 100 - (100 / (1 + rs))
 
+@CACHE.stage
 def detect_swings(df):
     df['swing_high'] = False
     df['swing_low'] = False
@@ -47,6 +57,7 @@ def detect_swings(df):
             df.loc[df.index[i], 'swing_low'] = True
     return df
 
+@CACHE.stage
 def detect_regimes(df, window=50):
     df['tr'] = np.maximum(df['high'] - df['low'],
         np.maximum(abs(df['high'] - df['close'].shift(1)), abs(df['low'] - df['close'].shift(1))))
@@ -68,6 +79,7 @@ def detect_regimes(df, window=50):
                 df.loc[df.index[i], 'regime'] = 'TRENDING_DOWN'
     return df
 
+@CACHE.stage
 def detect_sweeps_filtered(df, config):
     sweeps = []
     lookback = config.get('lookback', 20)
@@ -144,6 +156,7 @@ def detect_sweeps_filtered(df, config):
 
     return sweeps
 
+@CACHE.stage
 def evaluate_sweeps(df, sweeps):
     results = []
     for sweep in sweeps:
@@ -241,6 +254,7 @@ CONFIGS = {
     'bullish_rsi35_confirm': {'rsi_filter': True, 'rsi_bull_threshold': 35, 'rsi_bear_threshold': 100, 'confirmation': True},
 }
 
+@profiled
 def run_tests(filepath):
     print("=" * 90)
     print("4H BIAS V3 - FINE-TUNING FOR MAXIMUM SIGNAL COUNT")
@@ -266,6 +280,8 @@ def run_tests(filepath):
                 'raw_results': eval_results
             })
 
+    print(f"  ({CACHE.summary()})\n")
+
     # Sort by: passed first, then by signal count
     results.sort(key=lambda x: (0 if x['passed'] else 1, -x['metrics']['signals']))
 
@@ -18,13 +18,21 @@ Pass Criteria (same as training):
 This is validation, NOT optimization.
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.cache import default_cache
+from engine.profiling import profiled
+
+CACHE = default_cache()
+
 # =============================================================================
 # FROZEN CONFIGURATION (DO NOT CHANGE)
 # =============================================================================
@@ -150,6 +158,7 @@ def detect_market_regimes(df):
 # SWING DETECTION (FROZEN)
 # =============================================================================
 
+@CACHE.stage
 def detect_swings(df):
     """3-candle swing detection - FROZEN LOGIC."""
     df['swing_high'] = False
@@ -254,6 +263,7 @@ def detect_sweeps_frozen(df):
 # EVALUATION (FROZEN)
 # =============================================================================
 
+@CACHE.stage
 def evaluate_sweeps(df, sweeps):
     """Evaluate outcomes - FROZEN LOGIC."""
     results = []
@@ -324,6 +334,7 @@ def detect_death_spirals(results, threshold=5):
 # STRESS TEST REPORT
 # =============================================================================
 
+@profiled
 def run_stress_test(filepath):
     """Run stress test with FROZEN logic on bear market data."""
 
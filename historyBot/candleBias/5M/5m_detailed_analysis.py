@@ -4,13 +4,24 @@
 Deep dive into entry quality, false confirmation patterns, and MAE distribution
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional, Tuple
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.time_index import TimeIndex
+from engine.excursions import ExcursionEngine, mfe_mae_outcome
+from engine.cache import default_cache
+from engine.timeframes import aggregate
+from engine.profiling import profiled, PROFILER
+
+CACHE = default_cache()
+
 class Bias(Enum):
     NONE = 0
     BULLISH = 1
@@ -56,19 +67,11 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
+@CACHE.stage
 def aggregate_to_4h(df_5m: pd.DataFrame) -> pd.DataFrame:
-    df = df_5m.copy()
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df.set_index('timestamp', inplace=True)
-    df_4h = df.resample('4h').agg({
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-        'volume': 'sum'
-    }).dropna()
+    df_4h = aggregate(df_5m, '4h')
     df_4h['rsi'] = calculate_rsi(df_4h['close'], 14)
-    return df_4h.reset_index()
+    return df_4h
 
 def detect_swing_levels(df: pd.DataFrame, lookback: int = 5) -> pd.DataFrame:
     df = df.copy()
@@ -95,6 +98,7 @@ def get_recent_swing(df: pd.DataFrame, idx: int, swing_type: str, lookback: int
         return swings.iloc[-1]
     return None
 
+@CACHE.stage
 def detect_4h_bias_signals(df_4h: pd.DataFrame) -> List[BiasSignal]:
     df = detect_swing_levels(df_4h)
     signals = []
@@ -130,78 +134,50 @@ def detect_4h_bias_signals(df_4h: pd.DataFrame) -> List[BiasSignal]:
                         ))
     return signals
 
-def calculate_detailed_mfe_mae(df_5m: pd.DataFrame, entry_time: datetime, entry_price: float,
-                                bias: Bias, hold_hours: int = 24) -> dict:
-    """Calculate detailed MFE/MAE with timing information"""
-    end_time = entry_time + timedelta(hours=hold_hours)
-    mask = (df_5m['timestamp'] > entry_time) & (df_5m['timestamp'] <= end_time)
-    future = df_5m[mask].reset_index(drop=True)
-
-    if len(future) < 5:
-        return None
-
-    # Track running MFE and MAE
-    running_mfe = 0
-    running_mae = 0
-    time_to_mfe = 0
-    time_to_mae = 0
-    mfe_first = None
-    drawdown_before_profit = 0
-    first_profit_time = None
-
-    for i, row in future.iterrows():
-        if bias == Bias.BULLISH:
-            excursion_favorable = ((row['high'] - entry_price) / entry_price) * 100
-            excursion_adverse = ((entry_price - row['low']) / entry_price) * 100
-        else:
-            excursion_favorable = ((entry_price - row['low']) / entry_price) * 100
-            excursion_adverse = ((row['high'] - entry_price) / entry_price) * 100
-
-        if excursion_favorable > running_mfe:
-            running_mfe = excursion_favorable
-            time_to_mfe = (i + 1) * 5  # Minutes
-            if mfe_first is None and excursion_favorable > 0.1:
-                mfe_first = True
-
-        if excursion_adverse > running_mae:
-            running_mae = excursion_adverse
-            time_to_mae = (i + 1) * 5
-            if mfe_first is None and excursion_adverse > 0.1:
-                mfe_first = False
-
-        # Track drawdown before first meaningful profit
-        if first_profit_time is None:
-            if excursion_favorable > 0.3:  # 0.3% profit threshold
-                first_profit_time = (i + 1) * 5
-            else:
-                drawdown_before_profit = max(drawdown_before_profit, excursion_adverse)
-
-    # Determine outcome
-    if running_mfe > running_mae * 1.5:
-        outcome = 'WIN'
-    elif running_mae > running_mfe * 1.5:
-        outcome = 'LOSS'
-    else:
-        outcome = 'BREAKEVEN'
-
-    return {
-        'mfe': max(0, running_mfe),
-        'mae': max(0, running_mae),
-        'time_to_mfe': time_to_mfe,
-        'time_to_mae': time_to_mae,
-        'mfe_first': mfe_first if mfe_first is not None else True,
-        'drawdown_before_profit': drawdown_before_profit,
-        'outcome': outcome,
-        'hold_time': len(future) * 5
-    }
+@CACHE.stage
+def calculate_detailed_mfe_mae(engine: ExcursionEngine, entry_times: List[datetime],
+                                entry_prices: List[float], biases: List[Bias],
+                                hold_hours: int = 24) -> List[Optional[dict]]:
+    """Calculate detailed MFE/MAE with timing information for a batch of entries"""
+    stats = engine.evaluate(entry_times, entry_prices, biases,
+                            horizon=pd.Timedelta(hours=hold_hours),
+                            favorable_threshold=0.1, profit_threshold=0.3)
+
+    # Running MFE/MAE start at 0, so negative excursions never count
+    mfe = np.maximum(0, stats['mfe'].to_numpy())
+    mae = np.maximum(0, stats['mae'].to_numpy())
+    outcomes = mfe_mae_outcome(mfe, mae, ratio=1.5)
+
+    results = []
+    for i, row in enumerate(stats.itertuples(index=False)):
+        if row.bars < 5:
+            results.append(None)
+            continue
+
+        results.append({
+            'mfe': mfe[i],
+            'mae': mae[i],
+            'time_to_mfe': row.bars_to_mfe * 5,  # Minutes
+            'time_to_mae': row.bars_to_mae * 5,
+            'mfe_first': bool(row.mfe_first),
+            'drawdown_before_profit': row.drawdown_before_profit,
+            'outcome': outcomes[i],
+            'hold_time': row.bars * 5
+        })
 
+    return results
+
+@PROFILER.timed
 def find_5m_confirmations_detailed(df_5m: pd.DataFrame, bias_signal: BiasSignal,
-                                    max_wait_hours: int = 12) -> List[dict]:
+                                    max_wait_hours: int = 12,
+                                    time_index: Optional[TimeIndex] = None) -> List[dict]:
+    if time_index is None:
+        time_index = TimeIndex.from_frame(df_5m)
+
     confirmations = []
     start_time = bias_signal.timestamp
     end_time = start_time + timedelta(hours=max_wait_hours)
-    mask = (df_5m['timestamp'] >= start_time) & (df_5m['timestamp'] <= end_time)
-    window = df_5m[mask].copy()
+    window = time_index.window(df_5m, start_time, end_time).copy()
 
     if len(window) < 20:
         return confirmations
@@ -321,6 +297,7 @@ def find_5m_confirmations_detailed(df_5m: pd.DataFrame, bias_signal: BiasSignal,
 
     return confirmations
 
+@profiled
 def run_detailed_analysis(csv_path: str):
     print("="*70)
     print("5M EXECUTION - DETAILED ANALYSIS")
@@ -329,6 +306,7 @@ def run_detailed_analysis(csv_path: str):
     # Load data
     df_5m = pd.read_csv(csv_path)
     df_5m['timestamp'] = pd.to_datetime(df_5m['timestamp'])
+    time_index = TimeIndex.from_frame(df_5m)
 
     df_4h = aggregate_to_4h(df_5m)
     bias_signals = detect_4h_bias_signals(df_4h)
@@ -341,34 +319,42 @@ def run_detailed_analysis(csv_path: str):
     all_entries = []
     entries_by_type = {ct: [] for ct in ConfirmationType}
 
+    candidates = []
     for signal in bias_signals:
-        confirmations = find_5m_confirmations_detailed(df_5m, signal, max_wait_hours=12)
+        confirmations = find_5m_confirmations_detailed(df_5m, signal, max_wait_hours=12,
+                                                       time_index=time_index)
 
         for conf in confirmations:
             entry_time = conf['timestamp']
             if isinstance(entry_time, str):
                 entry_time = pd.to_datetime(entry_time)
+            candidates.append((signal, conf, entry_time))
+
+    all_metrics = calculate_detailed_mfe_mae(
+        ExcursionEngine.from_frame(df_5m),
+        [c[2] for c in candidates],
+        [c[1]['price'] for c in candidates],
+        [c[0].bias for c in candidates],
+        hold_hours=24
+    )
+
+    for (signal, conf, entry_time), metrics in zip(candidates, all_metrics):
+        if metrics is None:
+            continue
 
-            latency_minutes = int((entry_time - signal.timestamp).total_seconds() / 60)
-
-            metrics = calculate_detailed_mfe_mae(
-                df_5m, entry_time, conf['price'], signal.bias, hold_hours=24
-            )
-
-            if metrics is None:
-                continue
+        latency_minutes = int((entry_time - signal.timestamp).total_seconds() / 60)
 
-            entry = {
-                'timestamp': entry_time,
-                'bias': signal.bias,
-                'type': conf['type'],
-                'entry_price': conf['price'],
-                'latency_min': latency_minutes,
-                **metrics
-            }
+        entry = {
+            'timestamp': entry_time,
+            'bias': signal.bias,
+            'type': conf['type'],
+            'entry_price': conf['price'],
+            'latency_min': latency_minutes,
+            **metrics
+        }
 
-            all_entries.append(entry)
-            entries_by_type[conf['type']].append(entry)
+        all_entries.append(entry)
+        entries_by_type[conf['type']].append(entry)
 
     # Analysis 1: MAE Distribution (Critical for execution quality)
     print("\n" + "="*70)
@@ -555,6 +541,8 @@ def run_detailed_analysis(csv_path: str):
         print(f"    - Avg Latency: {np.mean([e['latency_min'] for e in entries]):.0f} min")
         print(f"    - MFE First: {sum(1 for e in entries if e['mfe_first'])/len(entries)*100:.1f}%")
 
+    print(f"\n  ({CACHE.summary()})")
+
 
 if __name__ == "__main__":
     run_detailed_analysis("/Users/ble/TradingBot/historyBot/data/btc_usd_5m.csv")
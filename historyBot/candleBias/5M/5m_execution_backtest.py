@@ -17,13 +17,25 @@ Testing: Timing confirmation, reducing premature entries.
 4. RSI Recovery - RSI recovers from extreme in bias direction
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Optional, Tuple
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.range_extrema import RangeExtrema
+from engine.time_index import TimeIndex
+from engine.excursions import ExcursionEngine, mfe_mae_outcome
+from engine.cache import default_cache
+from engine.timeframes import aggregate
+from engine.profiling import profiled, PROFILER
+
+CACHE = default_cache()
+
 class Bias(Enum):
     NONE = 0
     BULLISH = 1
@@ -65,25 +77,15 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
+@CACHE.stage
 def aggregate_to_4h(df_5m: pd.DataFrame) -> pd.DataFrame:
     """Aggregate 5M candles to 4H candles"""
-    df = df_5m.copy()
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df.set_index('timestamp', inplace=True)
-
-    # Resample to 4H
-    df_4h = df.resample('4h').agg({
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-        'volume': 'sum'
-    }).dropna()
+    df_4h = aggregate(df_5m, '4h')
 
     # Calculate RSI on 4H
     df_4h['rsi'] = calculate_rsi(df_4h['close'], 14)
 
-    return df_4h.reset_index()
+    return df_4h
 
 def detect_swing_levels(df: pd.DataFrame, lookback: int = 5) -> pd.DataFrame:
     """Detect swing highs and lows using 3-candle pattern"""
@@ -117,6 +119,7 @@ def get_recent_swing(df: pd.DataFrame, idx: int, swing_type: str, lookback: int
         return swings.iloc[-1]
     return None
 
+@CACHE.stage
 def detect_4h_bias_signals(df_4h: pd.DataFrame) -> List[BiasSignal]:
     """
     Detect 4H bias signals per LOCKED contract:
@@ -170,20 +173,24 @@ def detect_4h_bias_signals(df_4h: pd.DataFrame) -> List[BiasSignal]:
 
     return signals
 
+@PROFILER.timed
 def find_5m_confirmations(df_5m: pd.DataFrame, bias_signal: BiasSignal,
-                          max_wait_hours: int = 12) -> List[Tuple[ConfirmationType, int, float]]:
+                          max_wait_hours: int = 12,
+                          time_index: Optional[TimeIndex] = None) -> List[Tuple[ConfirmationType, int, float]]:
     """
     Find 5M confirmations after 4H bias signal.
     Returns list of (confirmation_type, candle_index, entry_price)
     """
+    if time_index is None:
+        time_index = TimeIndex.from_frame(df_5m)
+
     confirmations = []
 
     # Get 5M data window after bias signal
     start_time = bias_signal.timestamp
     end_time = start_time + timedelta(hours=max_wait_hours)
 
-    mask = (df_5m['timestamp'] >= start_time) & (df_5m['timestamp'] <= end_time)
-    window = df_5m[mask].copy()
+    window = time_index.window(df_5m, start_time, end_time).copy()
 
     if len(window) < 20:
         return confirmations
@@ -191,6 +198,11 @@ def find_5m_confirmations(df_5m: pd.DataFrame, bias_signal: BiasSignal,
     window['rsi'] = calculate_rsi(window['close'], 14)
     window = window.reset_index(drop=True)
 
+    # Prior 10-candle high/low for every row in one pass
+    extrema = RangeExtrema.from_frame(window)
+    recent_highs = extrema.high.lookback(10)
+    recent_lows = extrema.low.lookback(10)
+
     # Track which confirmations we've found
     found = set()
 
@@ -204,8 +216,8 @@ def find_5m_confirmations(df_5m: pd.DataFrame, bias_signal: BiasSignal,
             continue
 
         # Get recent 5M swing levels
-        recent_high = window.iloc[max(0, i-10):i]['high'].max()
-        recent_low = window.iloc[max(0, i-10):i]['low'].min()
+        recent_high = recent_highs[i]
+        recent_low = recent_lows[i]
 
         if bias_signal.bias == Bias.BULLISH:
             # 1. Break & Retest: Price breaks above recent high, pulls back, holds
@@ -278,44 +290,32 @@ def find_5m_confirmations(df_5m: pd.DataFrame, bias_signal: BiasSignal,
 
     return confirmations
 
-def calculate_mfe_mae(df_5m: pd.DataFrame, entry_time: datetime, entry_price: float,
-                      bias: Bias, hold_hours: int = 24) -> Tuple[float, float, str, int]:
+@CACHE.stage
+def calculate_mfe_mae(engine: ExcursionEngine, entry_times: List[datetime],
+                      entry_prices: List[float], biases: List[Bias],
+                      hold_hours: int = 24) -> pd.DataFrame:
     """
-    Calculate MFE and MAE for an entry.
-    Returns (mfe%, mae%, outcome, hold_time_minutes)
+    Calculate MFE and MAE for a batch of entries in one pass.
+    Returns DataFrame with mfe%, mae%, outcome, hold_time_minutes per entry
     """
-    end_time = entry_time + timedelta(hours=hold_hours)
-    mask = (df_5m['timestamp'] > entry_time) & (df_5m['timestamp'] <= end_time)
-    future = df_5m[mask]
-
-    if len(future) < 5:
-        return 0, 0, 'INVALID', 0
-
-    if bias == Bias.BULLISH:
-        # For longs: MFE = max high, MAE = min low
-        max_price = future['high'].max()
-        min_price = future['low'].min()
-        mfe = ((max_price - entry_price) / entry_price) * 100
-        mae = ((entry_price - min_price) / entry_price) * 100
-    else:
-        # For shorts: MFE = min low (price drop), MAE = max high (price rise)
-        max_price = future['high'].max()
-        min_price = future['low'].min()
-        mfe = ((entry_price - min_price) / entry_price) * 100
-        mae = ((max_price - entry_price) / entry_price) * 100
+    stats = engine.evaluate(entry_times, entry_prices, biases,
+                            horizon=pd.Timedelta(hours=hold_hours))
 
-    # Determine outcome (simple: if MFE > MAE = WIN)
-    if mfe > mae * 1.5:
-        outcome = 'WIN'
-    elif mae > mfe * 1.5:
-        outcome = 'LOSS'
-    else:
-        outcome = 'BREAKEVEN'
+    mfe = stats['mfe'].to_numpy()
+    mae = stats['mae'].to_numpy()
 
-    hold_time = len(future) * 5  # 5 minutes per candle
+    # Determine outcome (simple: if MFE > MAE = WIN)
+    outcome = mfe_mae_outcome(mfe, mae, ratio=1.5)
+    outcome = np.where(stats['bars'].to_numpy() < 5, 'INVALID', outcome)
 
-    return max(0, mfe), max(0, mae), outcome, hold_time
+    return pd.DataFrame({
+        'mfe': np.maximum(0, mfe),
+        'mae': np.maximum(0, mae),
+        'outcome': outcome,
+        'hold_time': stats['bars'].to_numpy() * 5  # 5 minutes per candle
+    })
 
+@profiled
 def run_backtest(csv_path: str) -> dict:
     """Run full 5M execution reliability backtest"""
 
@@ -331,6 +331,7 @@ def run_backtest(csv_path: str) -> dict:
     df_5m['timestamp'] = pd.to_datetime(df_5m['timestamp'])
     print(f"  Loaded {len(df_5m):,} 5M candles")
     print(f"  Range: {df_5m['timestamp'].min()} to {df_5m['timestamp'].max()}")
+    time_index = TimeIndex.from_frame(df_5m)
 
     # Aggregate to 4H
     print("\nAggregating to 4H...")
@@ -353,47 +354,55 @@ def run_backtest(csv_path: str) -> dict:
 
     print("\nFinding 5M confirmations for each bias signal...")
 
+    candidates = []
     for signal in bias_signals:
-        confirmations = find_5m_confirmations(df_5m, signal, max_wait_hours=12)
+        confirmations = find_5m_confirmations(df_5m, signal, max_wait_hours=12,
+                                              time_index=time_index)
 
         for conf_type, candle_idx, entry_price in confirmations:
             # Get entry timestamp
             start_time = signal.timestamp
             end_time = start_time + timedelta(hours=12)
-            mask = (df_5m['timestamp'] >= start_time) & (df_5m['timestamp'] <= end_time)
-            window = df_5m[mask].reset_index(drop=True)
+            window = time_index.slice(start_time, end_time)
 
-            if candle_idx >= len(window):
+            if candle_idx >= window.stop - window.start:
                 continue
 
-            entry_time = window.iloc[candle_idx]['timestamp']
-
-            # Calculate latency
-            latency_minutes = int((entry_time - signal.timestamp).total_seconds() / 60)
-
-            # Calculate MFE/MAE
-            mfe, mae, outcome, hold_time = calculate_mfe_mae(
-                df_5m, entry_time, entry_price, signal.bias, hold_hours=24
-            )
-
-            if outcome == 'INVALID':
-                continue
+            entry_time = df_5m['timestamp'].iloc[window.start + candle_idx]
+            candidates.append((signal, conf_type, entry_time, entry_price))
+
+    # Calculate MFE/MAE for every candidate at once
+    excursions = calculate_mfe_mae(
+        ExcursionEngine.from_frame(df_5m),
+        [c[2] for c in candidates],
+        [c[3] for c in candidates],
+        [c[0].bias for c in candidates],
+        hold_hours=24
+    )
+
+    for (signal, conf_type, entry_time, entry_price), stats in zip(
+            candidates, excursions.itertuples(index=False)):
+        if stats.outcome == 'INVALID':
+            continue
 
-            entry = Entry(
-                timestamp=entry_time,
-                bias=signal.bias,
-                confirmation_type=conf_type,
-                entry_price=entry_price,
-                bias_signal_time=signal.timestamp,
-                latency_minutes=latency_minutes,
-                mfe=mfe,
-                mae=mae,
-                outcome=outcome,
-                hold_time_minutes=hold_time
-            )
-
-            entries_by_type[conf_type].append(entry)
-            all_entries.append(entry)
+        # Calculate latency
+        latency_minutes = int((entry_time - signal.timestamp).total_seconds() / 60)
+
+        entry = Entry(
+            timestamp=entry_time,
+            bias=signal.bias,
+            confirmation_type=conf_type,
+            entry_price=entry_price,
+            bias_signal_time=signal.timestamp,
+            latency_minutes=latency_minutes,
+            mfe=stats.mfe,
+            mae=stats.mae,
+            outcome=stats.outcome,
+            hold_time_minutes=int(stats.hold_time)
+        )
+
+        entries_by_type[conf_type].append(entry)
+        all_entries.append(entry)
 
     # Analyze results
     print("\n" + "="*70)
@@ -591,6 +600,7 @@ def run_backtest(csv_path: str) -> dict:
     print("   5M answers 'now or not yet'")
     print("   - Wait for confirmation type to trigger")
     print("   - If no confirmation in optimal window, skip the trade")
+    print(f"\n  ({CACHE.summary()})")
 
     return {
         'bias_signals': len(bias_signals),
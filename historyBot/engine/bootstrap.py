@@ -0,0 +1,249 @@
+"""
+Block Bootstrap
+===============
+Monte Carlo over real trade sequences: resample a strategy's R-multiples in
+blocks, so losing streaks and other serial dependence survive resampling,
+and return the distribution of drawdown, ruin and losing streaks.
+
+Two schemes, both circular (a block running past the last trade wraps to
+the first):
+- stationary: Politis-Romano, geometric block lengths with mean `block`
+- moving: fixed-length blocks of `block` trades
+
+Paths are generated as (paths x trades) index matrices and scored with
+cumulative array ops, in chunks to bound memory. Chunks run in a process
+pool, each with its own child seed, so results depend on the seed but not
+on the worker count.
+
+Conventions:
+- Equity is a multiple of the starting balance, compounding a fixed
+  fraction `risk` of equity per trade; a trade losing more than the
+  whole equity leaves it at 0
+- A path is ruined once equity touches `ruin_level` or below
+- Spirals count losing runs of at least `spiral_threshold` trades, like
+  detect_death_spirals in the 4H bias backtests
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Iterable, Optional, Sequence
+
+from engine.excursions import direction_signs
+from engine.parallel import pool_context, worker_count
+
+STATIONARY = 'stationary'
+MOVING = 'moving'
+METHODS = (STATIONARY, MOVING)
+
+CHUNK_PATHS = 2048
+
+
+def default_block(n: int) -> int:
+    """Mean block length for n trades: n ** (1/3), the usual rate-optimal order."""
+    return max(1, int(round(n ** (1 / 3))))
+
+
+# =============================================================================
+# R-MULTIPLES
+# =============================================================================
+
+def r_multiples(trades: pd.DataFrame, stop_pct: Optional[float] = None) -> np.ndarray:
+    """
+    R-multiples of a trade log, in trade order.
+
+    Uses the first of:
+    - an `r_multiple` column
+    - entry_price / exit_price / stop_loss with a direction (or bias) column,
+      as in backtest.py trades: R = signed move / stop distance
+    - entry_price / exit_price with a direction (or bias) column and a
+      fixed stop_pct (percent of entry), as in 4h_bias_v3_best_results.csv
+
+    Args:
+        trades: One row per closed trade
+        stop_pct: Stop distance in percent of entry, for logs without stops
+
+    Returns:
+        Float array of R-multiples
+    """
+    if 'r_multiple' in trades:
+        return trades['r_multiple'].to_numpy(dtype=float)
+
+    side = 'direction' if 'direction' in trades else 'bias'
+    if side not in trades or not {'entry_price', 'exit_price'} <= set(trades.columns):
+        raise ValueError("Trade log needs r_multiple, or entry_price/exit_price with direction or bias")
+
+    signs = direction_signs(trades[side].to_numpy())
+    entry = trades['entry_price'].to_numpy(dtype=float)
+    move = (trades['exit_price'].to_numpy(dtype=float) - entry) * signs
+    if 'stop_loss' in trades:
+        risk = np.abs(entry - trades['stop_loss'].to_numpy(dtype=float))
+    elif stop_pct is not None:
+        risk = entry * stop_pct / 100
+    else:
+        raise ValueError("Trade log has no stop_loss column; pass stop_pct")
+    return move / risk
+
+
+def r_multiples_from_trades(trades: Iterable) -> np.ndarray:
+    """R-multiples of Backtester trades (BacktestTrade objects or dicts)."""
+    rows = [t if isinstance(t, dict) else vars(t) for t in trades]
+    return r_multiples(pd.DataFrame(rows))
+
+
+# =============================================================================
+# RESAMPLING
+# =============================================================================
+
+def resample_indices(rng: np.random.Generator, n: int, paths: int, length: int,
+                     block: int, method: str = STATIONARY) -> np.ndarray:
+    """
+    Trade indices of bootstrap paths.
+
+    Args:
+        rng: Random generator
+        n: Number of trades in the source sequence
+        paths: Number of paths
+        length: Trades per path
+        block: Mean (stationary) or fixed (moving) block length
+        method: STATIONARY or MOVING
+
+    Returns:
+        (paths x length) int array of indices into the source sequence
+    """
+    if method == STATIONARY:
+        # A new block starts with probability 1/block; otherwise the path
+        # takes the trade after the previous one
+        position = np.arange(length)
+        new_block = rng.random((paths, length)) < 1.0 / block
+        new_block[:, 0] = True
+        starts = rng.integers(0, n, size=(paths, length))
+        block_start = np.maximum.accumulate(np.where(new_block, position, 0), axis=1)
+        first = np.take_along_axis(starts, block_start, axis=1)
+        return (first + position - block_start) % n
+    if method == MOVING:
+        blocks = -(-length // block)
+        starts = rng.integers(0, n, size=(paths, blocks))
+        return ((starts[:, :, None] + np.arange(block)) % n).reshape(paths, -1)[:, :length]
+    raise ValueError(f"Unknown bootstrap method {method!r} (expected one of {', '.join(METHODS)})")
+
+
+def losing_streaks(losses: np.ndarray) -> np.ndarray:
+    """Running count of consecutive losses along each row of a bool matrix."""
+    count = np.cumsum(losses, axis=1)
+    reset = np.maximum.accumulate(np.where(losses, 0, count), axis=1)
+    return count - reset
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
+@dataclass
+class BootstrapResult:
+    """Per-path outcomes (one array element per bootstrap path)."""
+    final_equity: np.ndarray        # multiple of starting balance
+    max_drawdown: np.ndarray        # fraction of the running peak
+    min_equity: np.ndarray          # multiple of starting balance
+    max_losing_streak: np.ndarray   # trades
+    spirals: np.ndarray             # losing runs of spiral_threshold+ trades
+    ruin_level: float
+
+    def __len__(self) -> int:
+        return len(self.final_equity)
+
+    @property
+    def ruin_probability(self) -> float:
+        """Share of paths whose equity touched ruin_level."""
+        return float(np.mean(self.min_equity <= self.ruin_level))
+
+    def summary(self, percentiles: Sequence[float] = (5, 25, 50, 75, 95)) -> pd.DataFrame:
+        """Mean and percentiles of every per-path outcome."""
+        rows = {}
+        for f in fields(self):
+            values = getattr(self, f.name)
+            if isinstance(values, np.ndarray):
+                rows[f.name] = {'mean': values.mean(),
+                                **{f'p{p:g}': np.percentile(values, p) for p in percentiles}}
+        return pd.DataFrame(rows).T
+
+    @classmethod
+    def concat(cls, parts: Sequence['BootstrapResult']) -> 'BootstrapResult':
+        arrays = {f.name: np.concatenate([getattr(p, f.name) for p in parts])
+                  for f in fields(cls) if f.name != 'ruin_level'}
+        return cls(ruin_level=parts[0].ruin_level, **arrays)
+
+
+def _simulate_chunk(r: np.ndarray, paths: int, length: int, block: int, method: str,
+                    risk: float, ruin_level: float, spiral_threshold: int,
+                    seed: np.random.SeedSequence) -> BootstrapResult:
+    rng = np.random.default_rng(seed)
+    sampled = r[resample_indices(rng, len(r), paths, length, block, method)]
+
+    equity = np.cumprod(np.maximum(1.0 + risk * sampled, 0.0), axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    drawdown = 1.0 - equity / peak
+
+    losses = sampled < 0
+    streaks = losing_streaks(losses)
+    # A run ends where the next trade is not a loss, or at the path end
+    run_ends = np.zeros_like(losses)
+    run_ends[:, :-1] = losses[:, :-1] & ~losses[:, 1:]
+    run_ends[:, -1] = losses[:, -1]
+
+    return BootstrapResult(
+        final_equity=equity[:, -1],
+        max_drawdown=drawdown.max(axis=1),
+        min_equity=np.minimum(equity.min(axis=1), 1.0),
+        max_losing_streak=streaks.max(axis=1),
+        spirals=(run_ends & (streaks >= spiral_threshold)).sum(axis=1),
+        ruin_level=ruin_level,
+    )
+
+
+def block_bootstrap(r: Sequence[float], paths: int = 10_000, length: Optional[int] = None,
+                    block: Optional[int] = None, method: str = STATIONARY,
+                    risk: float = 0.01, ruin_level: float = 0.5, spiral_threshold: int = 5,
+                    seed: int = 0, workers: Optional[int] = None,
+                    chunk: int = CHUNK_PATHS) -> BootstrapResult:
+    """
+    Block-bootstrap equity paths from a sequence of R-multiples.
+
+    Args:
+        r: R-multiples in trade order
+        paths: Number of bootstrap paths
+        length: Trades per path (default: len(r))
+        block: Mean/fixed block length (default: default_block(len(r)))
+        method: STATIONARY or MOVING
+        risk: Fraction of equity risked per trade (1R)
+        ruin_level: Equity multiple counted as ruin
+        spiral_threshold: Losing run length counted as a spiral
+        seed: Base seed; each chunk gets its own child seed
+        workers: Worker processes (default: every core; 1 runs in-process)
+        chunk: Paths per task
+
+    Returns:
+        BootstrapResult over all paths
+    """
+    r = np.asarray(r, dtype=float)
+    if r.size == 0:
+        raise ValueError("No trades to resample")
+    if method not in METHODS:
+        raise ValueError(f"Unknown bootstrap method {method!r} (expected one of {', '.join(METHODS)})")
+    length = length or len(r)
+    block = block or default_block(len(r))
+
+    sizes = [min(chunk, paths - start) for start in range(0, paths, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(r, size, length, block, method, risk, ruin_level, spiral_threshold, s)
+            for size, s in zip(sizes, seeds)]
+
+    workers = worker_count(workers)
+    context = pool_context()
+    if workers <= 1 or len(args) <= 1 or context is None:
+        parts = [_simulate_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args)), mp_context=context) as pool:
+            parts = list(pool.map(_simulate_chunk, *zip(*args)))
+    return BootstrapResult.concat(parts)
@@ -0,0 +1,314 @@
+"""
+Content-Addressed Result Cache
+==============================
+Memoize analysis stages (swings, sweeps, bias signals, MFE/MAE, metrics)
+on disk, keyed by what actually determines their output:
+
+- the content of every argument (DataFrames/arrays hashed by value, not
+  by file name or object identity)
+- the code version: the stage function's source, the same-module helpers
+  and UPPER_CASE constants it references, and any engine modules it uses
+
+Rerunning a script with unchanged data and code loads each stage from
+disk. Editing one detector or one threshold only invalidates the stages
+that depend on it. Entries are pickles under root/<key[:2]>/; the least
+recently used are evicted once the directory exceeds max_bytes.
+"""
+
+import dataclasses
+import enum
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import types
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from engine.profiling import PROFILER
+
+_MISS = object()
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+def fingerprint(value: Any) -> str:
+    """Stable content hash of a stage argument."""
+    h = hashlib.sha256()
+    _update(h, value)
+    return h.hexdigest()
+
+
+def _update(h, value: Any) -> None:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, bytes):
+        h.update(b'bytes:' + value)
+    elif isinstance(value, pd.DataFrame):
+        h.update(b'df:')
+        h.update(json.dumps([str(c) for c in value.columns]).encode())
+        h.update(json.dumps([str(d) for d in value.dtypes]).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(f"series:{value.name}:{value.dtype};".encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"nd:{value.dtype}:{value.shape};".encode())
+        if value.dtype == object:
+            for item in value.ravel():
+                _update(h, item)
+        else:
+            h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, np.generic):
+        _update(h, value.item())
+    elif isinstance(value, (pd.Timestamp, datetime, date, pd.Timedelta, timedelta)):
+        h.update(f"{type(value).__name__}:{value.isoformat() if hasattr(value, 'isoformat') else value};".encode())
+    elif isinstance(value, enum.Enum):
+        h.update(f"enum:{type(value).__name__}.{value.name};".encode())
+    elif isinstance(value, dict):
+        h.update(b'dict{')
+        for k in sorted(value, key=repr):
+            _update(h, k)
+            _update(h, value[k])
+        h.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}[{len(value)}]".encode())
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, (set, frozenset)):
+        h.update(b'set{')
+        for item in sorted(value, key=repr):
+            _update(h, item)
+        h.update(b'}')
+    elif dataclasses.is_dataclass(value):
+        h.update(f"dc:{type(value).__name__}".encode())
+        _update(h, {f.name: getattr(value, f.name) for f in dataclasses.fields(value)})
+    elif hasattr(value, '__dict__'):
+        # Engine objects (TimeIndex, ExcursionEngine, ...) hash by their state
+        h.update(f"obj:{type(value).__qualname__}".encode())
+        _update(h, vars(value))
+    else:
+        raise TypeError(f"Cannot fingerprint {type(value).__name__}")
+
+
+def code_version(fn: Callable, depends: Sequence[Any] = ()) -> str:
+    """
+    Hash of everything in the code that determines fn's output.
+
+    Follows names fn references: same-module functions (recursively),
+    UPPER_CASE constants, and engine.* modules/classes (whole file). Extra
+    functions, modules or values can be added through depends.
+    """
+    h = hashlib.sha256()
+    seen = set()
+    _code_update(h, fn, seen)
+    for dep in depends:
+        if isinstance(dep, (types.FunctionType, types.ModuleType, type)):
+            _code_update(h, dep, seen)
+        else:
+            _update(h, dep)
+    return h.hexdigest()
+
+
+def _code_names(code: types.CodeType):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _code_update(h, obj, seen) -> None:
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+
+    if isinstance(obj, types.ModuleType) or (isinstance(obj, type) and obj.__module__.startswith('engine')):
+        module = obj if isinstance(obj, types.ModuleType) else sys.modules.get(obj.__module__)
+        path = getattr(module, '__file__', None)
+        if path and path not in seen:
+            seen.add(path)
+            h.update(Path(path).read_bytes())
+        return
+
+    fn = inspect.unwrap(obj)
+    try:
+        h.update(inspect.getsource(fn).encode())
+    except (OSError, TypeError):
+        h.update(repr(fn).encode())
+
+    module_globals = getattr(fn, '__globals__', {})
+    for name in sorted(_code_names(fn.__code__)):
+        if name not in module_globals:
+            continue
+        ref = module_globals[name]
+        if name.isupper() and not callable(ref):
+            h.update(name.encode())
+            _update(h, ref)
+        elif isinstance(ref, types.FunctionType) and ref.__module__ == fn.__module__:
+            _code_update(h, ref, seen)
+        elif isinstance(ref, (type, types.FunctionType)) and getattr(ref, '__module__', '').startswith('engine'):
+            _code_update(h, sys.modules[ref.__module__], seen)
+        elif isinstance(ref, types.ModuleType) and ref.__name__.startswith('engine'):
+            _code_update(h, ref, seen)
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class ResultCache:
+    """
+    Size-bounded on-disk cache of stage results.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int = 2 * 1024 ** 3,
+                 enabled: Optional[bool] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # HISTORYBOT_CACHE=0 turns caching off without editing scripts
+        if enabled is None:
+            enabled = os.environ.get('HISTORYBOT_CACHE', '1') != '0'
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> Any:
+        """Stored value, or the module-level _MISS sentinel."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISS
+        except Exception:
+            # Truncated file or a class that no longer unpickles: recompute
+            path.unlink(missing_ok=True)
+            return _MISS
+        os.utime(path)  # Mark as recently used
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # e.g. a class defined in a module pickle cannot re-import
+            tmp.unlink(missing_ok=True)
+            return
+        os.replace(tmp, path)
+        # Scanning the directory costs more than a small stage; check periodically
+        self._puts += 1
+        if self._puts % 32 == 1:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used entries until under max_bytes."""
+        entries = []
+        total = 0
+        for path in self.root.glob('*/*.pkl'):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        for path in self.root.glob('*/*.pkl'):
+            path.unlink(missing_ok=True)
+
+    def key(self, name: str, code: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+        h = hashlib.sha256()
+        h.update(name.encode())
+        h.update(code.encode())
+        h.update(fingerprint(args).encode())
+        h.update(fingerprint(kwargs).encode())
+        return h.hexdigest()
+
+    def stage(self, fn: Optional[Callable] = None, *, name: Optional[str] = None,
+              depends: Sequence[Any] = ()):
+        """
+        Decorator memoizing fn by argument content and code version.
+
+        The key is computed before fn runs, so stages that add columns to
+        their input DataFrame (detect_swings, detect_regimes) are safe; on
+        a hit the stored return value is used and the input is untouched.
+        Each call is also timed as a profiler stage (engine.profiling).
+
+        Usage:
+            @CACHE.stage
+            def detect_swings(df): ...
+
+            @CACHE.stage(depends=[calculate_rsi])
+            def detect_4h_signals(df_4h): ...
+        """
+        if fn is None:
+            return lambda f: self.stage(f, name=name, depends=depends)
+
+        stage_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        version = None
+
+        def call(args, kwargs):
+            nonlocal version
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            if version is None:
+                # Resolved on first call, once every helper is defined
+                version = code_version(fn, depends)
+            try:
+                key = self.key(stage_name, version, args, kwargs)
+            except TypeError:
+                return fn(*args, **kwargs)  # Argument we cannot hash: just run
+
+            value = self.get(key)
+            if value is not _MISS:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            value = fn(*args, **kwargs)
+            self.put(key, value)
+            return value
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with PROFILER.stage(stage_name):
+                return call(args, kwargs)
+
+        wrapper.cache = self
+        return wrapper
+
+    def summary(self) -> str:
+        return f"cache: {self.hits} hits, {self.misses} misses ({self.root})"
+
+
+def default_cache() -> ResultCache:
+    """Shared cache under historyBot/data/.cache (HISTORYBOT_CACHE_DIR overrides)."""
+    root = os.environ.get('HISTORYBOT_CACHE_DIR',
+                          str(Path(__file__).resolve().parents[1] / 'data' / '.cache'))
+    max_mb = int(os.environ.get('HISTORYBOT_CACHE_MAX_MB', '2048'))
+    return ResultCache(root, max_bytes=max_mb * 1024 ** 2)
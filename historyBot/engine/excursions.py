@@ -0,0 +1,263 @@
+"""
+Batch Excursion Engine
+======================
+MFE/MAE, time-to-MFE/MAE and first-touch outcomes for many entries in one
+vectorized call.
+
+Each entry's forward window is (entry_time, entry_time + horizon], matching
+the `(ts > entry) & (ts <= end)` masks used throughout the execution
+studies. Windows are gathered into a padded (entries x bars) matrix, in
+chunks to bound memory, so several horizons cost one pass over the longest.
+
+Conventions (same as the per-entry loops they replace):
+- Excursions are percentages of entry price
+- bars_to_mfe / bars_to_mae are 1-based; 0 when the excursion never goes positive
+- A bar that touches both stop and target counts as the stop unless
+  stop_first=False
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Union
+
+from engine.time_index import TimeIndex, to_int64_ns
+
+HorizonLike = Union[pd.Timedelta, str]
+
+LONG = 1
+SHORT = -1
+
+
+def direction_signs(directions) -> np.ndarray:
+    """
+    Normalize directions to +1 (long) / -1 (short).
+
+    Accepts numbers, 'LONG'/'SHORT', 'BULLISH'/'BEARISH' or Enums whose
+    name or value is one of those.
+    """
+    signs = []
+    for d in np.atleast_1d(np.asarray(directions, dtype=object)):
+        if hasattr(d, 'name'):
+            d = d.name
+        if isinstance(d, str):
+            d = d.upper()
+            if d in ('LONG', 'BULLISH', 'BUY'):
+                signs.append(LONG)
+            elif d in ('SHORT', 'BEARISH', 'SELL'):
+                signs.append(SHORT)
+            else:
+                raise ValueError(f"Unknown direction: {d!r}")
+        else:
+            signs.append(LONG if d > 0 else SHORT)
+    return np.asarray(signs, dtype=np.int64)
+
+
+class ExcursionEngine:
+    """
+    Forward-window excursion stats over one candle series.
+    """
+
+    def __init__(self, timestamps, highs, lows, chunk_size: int = 1024):
+        self.time_index = TimeIndex(timestamps)
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, chunk_size: int = 1024) -> 'ExcursionEngine':
+        """Build from a DataFrame with timestamp/high/low columns."""
+        return cls(df['timestamp'], df['high'].to_numpy(), df['low'].to_numpy(), chunk_size)
+
+    def evaluate(self, entry_times, entry_prices, directions,
+                 horizon: HorizonLike = '24h',
+                 stop_prices=None, target_prices=None,
+                 stop_first: bool = True,
+                 favorable_threshold: float = 0.1,
+                 profit_threshold: float = 0.3) -> pd.DataFrame:
+        """
+        Excursion stats for every entry over one horizon.
+
+        Args:
+            entry_times: Entry timestamps
+            entry_prices: Entry prices
+            directions: Per-entry direction (see direction_signs)
+            horizon: Forward window length
+            stop_prices: Optional absolute stop per entry (enables first-touch)
+            target_prices: Optional absolute target per entry (enables first-touch)
+            stop_first: Resolve a bar touching both levels as the stop
+            favorable_threshold: % move that decides mfe_first
+            profit_threshold: % profit that ends drawdown_before_profit tracking
+
+        Returns:
+            DataFrame, one row per entry, with columns bars, mfe, mae,
+            bars_to_mfe, bars_to_mae, mfe_first, drawdown_before_profit and,
+            when stops/targets are given, outcome and bars_to_exit
+        """
+        return self.evaluate_horizons(
+            entry_times, entry_prices, directions, {'result': horizon},
+            stop_prices=stop_prices, target_prices=target_prices,
+            stop_first=stop_first,
+            favorable_threshold=favorable_threshold,
+            profit_threshold=profit_threshold
+        )['result']
+
+    def evaluate_horizons(self, entry_times, entry_prices, directions,
+                          horizons: Dict[str, HorizonLike],
+                          stop_prices=None, target_prices=None,
+                          stop_first: bool = True,
+                          favorable_threshold: float = 0.1,
+                          profit_threshold: float = 0.3) -> Dict[str, pd.DataFrame]:
+        """
+        Excursion stats for every entry over several horizons at once.
+
+        Args:
+            horizons: Name -> window length, e.g. {'4h': '4h', '24h': '24h'}
+            (other args as evaluate)
+
+        Returns:
+            Name -> DataFrame (see evaluate)
+        """
+        entry_ns = to_int64_ns(entry_times)
+        prices = np.asarray(entry_prices, dtype=np.float64)
+        signs = direction_signs(directions)
+        n = len(entry_ns)
+
+        starts = np.searchsorted(self.time_index.ns, entry_ns, side='right')
+        ends = {
+            name: np.maximum(starts, np.searchsorted(
+                self.time_index.ns, entry_ns + pd.Timedelta(h).value, side='right'
+            ))
+            for name, h in horizons.items()
+        }
+
+        has_exits = stop_prices is not None and target_prices is not None
+        stops = np.asarray(stop_prices, dtype=np.float64) if has_exits else None
+        targets = np.asarray(target_prices, dtype=np.float64) if has_exits else None
+
+        columns = ['bars', 'mfe', 'mae', 'bars_to_mfe', 'bars_to_mae',
+                   'mfe_first', 'drawdown_before_profit']
+        if has_exits:
+            columns += ['outcome', 'bars_to_exit']
+        out = {name: {c: np.empty(n, dtype=object if c == 'outcome' else np.float64)
+                      for c in columns}
+               for name in horizons}
+
+        for lo in range(0, n, self.chunk_size):
+            hi = min(n, lo + self.chunk_size)
+            chunk_ends = {name: e[lo:hi] for name, e in ends.items()}
+            self._evaluate_chunk(
+                starts[lo:hi], chunk_ends, prices[lo:hi], signs[lo:hi],
+                stops[lo:hi] if has_exits else None,
+                targets[lo:hi] if has_exits else None,
+                stop_first, favorable_threshold, profit_threshold,
+                {name: (cols, lo, hi) for name, cols in out.items()}
+            )
+
+        results = {}
+        for name, cols in out.items():
+            df = pd.DataFrame(cols)
+            for c in ('bars', 'bars_to_mfe', 'bars_to_mae') + (('bars_to_exit',) if has_exits else ()):
+                df[c] = df[c].astype(np.int64)
+            df['mfe_first'] = df['mfe_first'].astype(bool)
+            results[name] = df
+        return results
+
+    def _evaluate_chunk(self, starts, ends, prices, signs, stops, targets,
+                        stop_first, favorable_threshold, profit_threshold, sinks) -> None:
+        """Fill one chunk of entries for every horizon."""
+        lengths = {name: e - starts for name, e in ends.items()}
+        width = max(int(l.max()) if len(l) else 0 for l in lengths.values())
+        m = len(starts)
+
+        if width == 0:
+            for name, (cols, lo, hi) in sinks.items():
+                self._write_empty(cols, lo, hi, stops is not None)
+            return
+
+        offsets = np.arange(width)
+        idx = starts[:, None] + offsets[None, :]
+        in_range = idx < len(self.highs)
+        idx = np.where(in_range, idx, 0)
+        highs = self.highs[idx]
+        lows = self.lows[idx]
+
+        # Favorable / adverse excursion per bar, in % of entry
+        long_side = (signs == LONG)[:, None]
+        entry = prices[:, None]
+        fav = np.where(long_side, highs - entry, entry - lows) / entry * 100
+        adv = np.where(long_side, entry - lows, highs - entry) / entry * 100
+
+        if stops is not None:
+            stop_hit = np.where(long_side, lows <= stops[:, None], highs >= stops[:, None])
+            target_hit = np.where(long_side, highs >= targets[:, None], lows <= targets[:, None])
+
+        rows = np.arange(m)
+        for name, (cols, lo, hi) in sinks.items():
+            length = lengths[name]
+            valid = offsets[None, :] < length[:, None]
+
+            fav_h = np.where(valid, fav, -np.inf)
+            adv_h = np.where(valid, adv, -np.inf)
+            mfe_idx = fav_h.argmax(axis=1)
+            mae_idx = adv_h.argmax(axis=1)
+            mfe = fav_h[rows, mfe_idx]
+            mae = adv_h[rows, mae_idx]
+            empty = length == 0
+
+            cols['bars'][lo:hi] = length
+            cols['mfe'][lo:hi] = np.where(empty, 0.0, mfe)
+            cols['mae'][lo:hi] = np.where(empty, 0.0, mae)
+            cols['bars_to_mfe'][lo:hi] = np.where(mfe > 0, mfe_idx + 1, 0)
+            cols['bars_to_mae'][lo:hi] = np.where(mae > 0, mae_idx + 1, 0)
+
+            # Which side crossed its threshold first (favorable wins ties)
+            first_fav = _first_true(valid & (fav > favorable_threshold), width)
+            first_adv = _first_true(valid & (adv > favorable_threshold), width)
+            cols['mfe_first'][lo:hi] = first_fav <= first_adv
+
+            # Worst adverse move before the first bar reaching profit_threshold
+            first_profit = _first_true(valid & (fav > profit_threshold), width)
+            before_profit = offsets[None, :] < first_profit[:, None]
+            dd = np.where(valid & before_profit, adv, 0.0).max(axis=1)
+            cols['drawdown_before_profit'][lo:hi] = np.maximum(dd, 0.0)
+
+            if stops is not None:
+                first_stop = _first_true(valid & stop_hit, width)
+                first_target = _first_true(valid & target_hit, width)
+                if stop_first:
+                    loss = (first_stop <= first_target) & (first_stop < width)
+                    win = first_target < first_stop
+                else:
+                    loss = first_stop < first_target
+                    win = (first_target <= first_stop) & (first_target < width)
+                cols['outcome'][lo:hi] = np.where(loss, 'LOSS', np.where(win, 'WIN', 'NEUTRAL'))
+                cols['bars_to_exit'][lo:hi] = np.where(
+                    loss, first_stop + 1, np.where(win, first_target + 1, 0)
+                )
+
+    @staticmethod
+    def _write_empty(cols, lo, hi, has_exits) -> None:
+        """Fill a chunk whose windows are all empty."""
+        for c in ('bars', 'mfe', 'mae', 'bars_to_mfe', 'bars_to_mae', 'drawdown_before_profit'):
+            cols[c][lo:hi] = 0
+        cols['mfe_first'][lo:hi] = True
+        if has_exits:
+            cols['outcome'][lo:hi] = 'NEUTRAL'
+            cols['bars_to_exit'][lo:hi] = 0
+
+
+def _first_true(mask: np.ndarray, width: int) -> np.ndarray:
+    """Column of the first True per row, or `width` when there is none."""
+    any_true = mask.any(axis=1)
+    return np.where(any_true, mask.argmax(axis=1), width)
+
+
+def mfe_mae_outcome(mfe: np.ndarray, mae: np.ndarray, ratio: float = 1.5) -> np.ndarray:
+    """
+    Simple excursion outcome used by the 5M studies:
+    WIN if MFE > MAE * ratio, LOSS if MAE > MFE * ratio, else BREAKEVEN.
+    """
+    mfe = np.asarray(mfe, dtype=np.float64)
+    mae = np.asarray(mae, dtype=np.float64)
+    return np.where(mfe > mae * ratio, 'WIN',
+                    np.where(mae > mfe * ratio, 'LOSS', 'BREAKEVEN'))
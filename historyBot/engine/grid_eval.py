@@ -0,0 +1,243 @@
+"""
+Stop/Target Grid Evaluator
+==========================
+Score a signal set against a whole grid of stop/target percentages in one
+call.
+
+For each signal the forward high/low window (up to max_bars) is gathered
+once. Running max/min along that window are monotone, so the first bar a
+level is crossed is just the count of bars that have not yet crossed it.
+Every (stop, target) cell then reduces to comparing two bar indices.
+
+Matches the per-candle simulate_trade loops in patterns/:
+- Entry at the signal candle's close, window starts on the next candle
+- Stop is checked before target inside a candle (conservative)
+- Untouched trades are skipped, or closed at the last window close
+  when timeout='close'
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence, Tuple
+
+WIN = 1
+LOSS = -1
+OPEN = 0
+
+
+class GridEvaluator:
+    """
+    First-passage stop/target evaluation over one candle series.
+    """
+
+    def __init__(self, highs, lows, closes, max_bars: int = 288,
+                 chunk_size: int = 256):
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.closes = np.asarray(closes, dtype=np.float64)
+        self.max_bars = max_bars
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, max_bars: int = 288,
+                   chunk_size: int = 256) -> 'GridEvaluator':
+        """Build from a DataFrame with high/low/close columns."""
+        return cls(df['high'].to_numpy(), df['low'].to_numpy(),
+                   df['close'].to_numpy(), max_bars, chunk_size)
+
+    def forward_window(self, signals: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Forward high/low matrices for the given entry indices.
+
+        Returns:
+            (highs, lows, lengths): (signals x max_bars) matrices padded with
+            -inf/+inf past each window, and the real window length per signal
+        """
+        n = len(self.highs)
+        offsets = np.arange(1, self.max_bars + 1)
+        idx = signals[:, None] + offsets[None, :]
+        valid = idx < n
+        idx = np.where(valid, idx, 0)
+        highs = np.where(valid, self.highs[idx], -np.inf)
+        lows = np.where(valid, self.lows[idx], np.inf)
+        lengths = np.clip(n - 1 - signals, 0, self.max_bars)
+        return highs, lows, lengths
+
+    def outcomes(self, signals: Sequence[int], direction: str,
+                 stop_pcts: Sequence[float], target_pcts: Sequence[float],
+                 timeout: str = 'skip') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Outcome of every signal for every (stop, target) pair.
+
+        Args:
+            signals: Entry candle indices
+            direction: 'LONG' or 'SHORT'
+            stop_pcts: Stop distances as fractions (0.003 = 0.3%)
+            target_pcts: Target distances as fractions
+            timeout: 'skip' leaves untouched trades OPEN; 'close' scores them
+                     by the last window close vs entry
+
+        Returns:
+            (outcome, exit_idx): int arrays shaped (signals, stops, targets).
+            outcome is WIN/LOSS/OPEN; exit_idx is the absolute exit candle
+            (last window candle for OPEN/timeout)
+        """
+        signals = np.asarray(signals, dtype=np.int64)
+        stop_pcts = np.asarray(stop_pcts, dtype=np.float64)
+        target_pcts = np.asarray(target_pcts, dtype=np.float64)
+        shape = (len(signals), len(stop_pcts), len(target_pcts))
+        outcome = np.zeros(shape, dtype=np.int8)
+        exit_idx = np.zeros(shape, dtype=np.int64)
+
+        for lo in range(0, len(signals), self.chunk_size):
+            chunk = signals[lo:lo + self.chunk_size]
+            o, e = self._outcomes_chunk(chunk, direction, stop_pcts, target_pcts, timeout)
+            outcome[lo:lo + len(chunk)] = o
+            exit_idx[lo:lo + len(chunk)] = e
+
+        return outcome, exit_idx
+
+    def _outcomes_chunk(self, signals, direction, stop_pcts, target_pcts, timeout):
+        highs, lows, lengths = self.forward_window(signals)
+        entry = self.closes[signals][:, None]
+        width = self.max_bars
+
+        if direction == 'LONG':
+            stop_prices = entry * (1 - stop_pcts[None, :])
+            target_prices = entry * (1 + target_pcts[None, :])
+            # Bars strictly before the first touch: running extreme not yet through the level
+            run_low = np.minimum.accumulate(lows, axis=1)
+            run_high = np.maximum.accumulate(highs, axis=1)
+            stop_bar = (run_low[:, :, None] > stop_prices[:, None, :]).sum(axis=1)
+            target_bar = (run_high[:, :, None] < target_prices[:, None, :]).sum(axis=1)
+        else:
+            stop_prices = entry * (1 + stop_pcts[None, :])
+            target_prices = entry * (1 - target_pcts[None, :])
+            run_high = np.maximum.accumulate(highs, axis=1)
+            run_low = np.minimum.accumulate(lows, axis=1)
+            stop_bar = (run_high[:, :, None] < stop_prices[:, None, :]).sum(axis=1)
+            target_bar = (run_low[:, :, None] > target_prices[:, None, :]).sum(axis=1)
+
+        # (signals, stops, 1) vs (signals, 1, targets)
+        s = stop_bar[:, :, None]
+        t = target_bar[:, None, :]
+        loss = (s <= t) & (s < width)
+        win = (t < s) & (t < width)
+
+        outcome = np.where(loss, LOSS, np.where(win, WIN, OPEN)).astype(np.int8)
+        first_exit = np.where(loss, s, t)
+        last_bar = signals + np.maximum(lengths, 1)
+        exit_idx = np.where(outcome != OPEN, signals[:, None, None] + first_exit + 1,
+                            last_bar[:, None, None])
+
+        # Trades without a full candle after entry are never taken
+        no_trade = lengths == 0
+        outcome[no_trade] = OPEN
+
+        if timeout == 'close':
+            final_close = self.closes[np.minimum(signals + self.max_bars, len(self.closes) - 1)]
+            if direction == 'LONG':
+                timed = np.where(final_close > entry[:, 0], WIN, LOSS)
+            else:
+                timed = np.where(final_close < entry[:, 0], WIN, LOSS)
+            fill = (outcome == OPEN) & ~no_trade[:, None, None]
+            outcome = np.where(fill, timed[:, None, None], outcome).astype(np.int8)
+
+        return outcome, exit_idx
+
+    def surface(self, signals: Sequence[int], direction: str,
+                stop_pcts: Sequence[float],
+                rr_ratios: Optional[Sequence[float]] = None,
+                target_pcts: Optional[Sequence[float]] = None,
+                min_gap: int = 0, cooldown: str = 'entry',
+                timeout: str = 'skip', min_trades: int = 0) -> pd.DataFrame:
+        """
+        Win-rate / expectancy surface over a stop x target grid.
+
+        Targets are either stop * rr for each rr (rr_ratios) or a fixed list
+        (target_pcts). Signals are filtered per cell exactly like the
+        sequential test_pattern loops:
+        - cooldown='entry': skip signals within min_gap candles of the last
+          counted entry
+        - cooldown='exit': skip signals at or before the last exit candle
+          (plus min_gap)
+
+        Returns:
+            DataFrame with stop, target, rr, wins, losses, total, win_rate,
+            expectancy (in R) per cell with total >= min_trades
+        """
+        if (rr_ratios is None) == (target_pcts is None):
+            raise ValueError("Pass exactly one of rr_ratios or target_pcts")
+
+        stop_pcts = np.asarray(stop_pcts, dtype=np.float64)
+        if rr_ratios is not None:
+            rr = np.asarray(rr_ratios, dtype=np.float64)
+            # Evaluate the union of all stop*rr targets, then pick the diagonal cells
+            targets = stop_pcts[:, None] * rr[None, :]
+            unique_targets, inverse = np.unique(targets, return_inverse=True)
+            inverse = inverse.reshape(targets.shape)
+        else:
+            unique_targets = np.asarray(target_pcts, dtype=np.float64)
+            inverse = np.broadcast_to(np.arange(len(unique_targets)),
+                                      (len(stop_pcts), len(unique_targets)))
+            targets = unique_targets[inverse]
+
+        signals = np.asarray(signals, dtype=np.int64)
+        outcome, exit_idx = self.outcomes(signals, direction, stop_pcts, unique_targets, timeout)
+
+        # Gather to (signals, stops, grid columns)
+        stop_axis = np.arange(len(stop_pcts))[:, None]
+        outcome = outcome[:, stop_axis, inverse]
+        exit_idx = exit_idx[:, stop_axis, inverse]
+
+        wins, losses = _count_with_cooldown(signals, outcome, exit_idx, min_gap, cooldown)
+        total = wins + losses
+
+        rr_grid = targets / stop_pcts[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            win_rate = np.where(total > 0, wins / total * 100, 0.0)
+            expectancy = np.where(total > 0, (wins * rr_grid - losses) / total, 0.0)
+
+        frame = pd.DataFrame({
+            'stop': np.repeat(stop_pcts, targets.shape[1]),
+            'target': targets.ravel(),
+            'rr': rr_grid.ravel(),
+            'wins': wins.ravel(),
+            'losses': losses.ravel(),
+            'total': total.ravel(),
+            'win_rate': win_rate.ravel(),
+            'expectancy': expectancy.ravel(),
+        })
+        return frame[frame['total'] >= max(min_trades, 1)].reset_index(drop=True)
+
+
+def _count_with_cooldown(signals: np.ndarray, outcome: np.ndarray, exit_idx: np.ndarray,
+                         min_gap: int, cooldown: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Replay the sequential signal filter for every grid cell at once.
+
+    The loop runs over signals (in order) but each step is vectorized over
+    the whole grid.
+    """
+    grid_shape = outcome.shape[1:]
+    last = np.zeros(grid_shape, dtype=np.int64)
+    wins = np.zeros(grid_shape, dtype=np.int64)
+    losses = np.zeros(grid_shape, dtype=np.int64)
+
+    for k, idx in enumerate(signals):
+        allowed = idx > last + min_gap
+        result = outcome[k]
+        counted = allowed & (result != OPEN)
+        wins += counted & (result == WIN)
+        losses += counted & (result == LOSS)
+        if cooldown == 'entry':
+            last = np.where(counted, idx, last)
+        else:
+            last = np.where(counted, exit_idx[k], last)
+
+    return wins, losses
+
+
+def surface_table(surface: pd.DataFrame, value: str = 'win_rate') -> pd.DataFrame:
+    """Pivot a surface into a stop x rr table of one metric."""
+    return surface.pivot_table(index='stop', columns='rr', values=value)
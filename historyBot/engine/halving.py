@@ -0,0 +1,191 @@
+"""
+Successive Halving Search
+=========================
+Find good configs without running every one over the full history.
+
+All candidates are scored on a short prefix of the history; only the best
+1/eta move on to a prefix eta times longer, and so on until the survivors
+see the full history. With eta=3 and three rungs, a grid costs about one
+full pass per rung instead of one full pass per config.
+
+Each rung runs in a process pool. Every finished evaluation is written to
+a JSON state file, so an interrupted search picks up where it stopped.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from engine.parallel import pool_context, worker_count
+
+# evaluate(features, config, fraction) -> metrics dict, or None when nothing to score
+Evaluate = Callable[[Any, dict, float], Optional[dict]]
+# score(metrics) -> number or tuple, higher is better
+Score = Callable[[dict], Any]
+
+
+def rung_fractions(n_rungs: int, eta: int) -> List[float]:
+    """History fraction per rung, e.g. [1/9, 1/3, 1] for 3 rungs at eta=3."""
+    return [float(eta) ** -(n_rungs - 1 - r) for r in range(n_rungs)]
+
+
+def _jsonable(value):
+    """Convert numpy scalars / tuples so metrics round-trip through JSON."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+# Worker-process state, set once per process by _init_worker
+_worker_features = None
+_worker_evaluate: Optional[Evaluate] = None
+
+
+def _init_worker(evaluate, features):
+    global _worker_features, _worker_evaluate
+    _worker_features = features
+    _worker_evaluate = evaluate
+
+
+def _evaluate_one(name, config, fraction):
+    return name, _worker_evaluate(_worker_features, config, fraction)
+
+
+class SuccessiveHalving:
+    """
+    Successive halving over a fixed set of named configs.
+    """
+
+    def __init__(self, evaluate: Evaluate, score: Score, eta: int = 3,
+                 n_rungs: int = 3, state_path: Optional[str] = None,
+                 workers: Optional[int] = None):
+        if eta < 2:
+            raise ValueError("eta must be >= 2")
+        self.evaluate = evaluate
+        self.score = score
+        self.eta = eta
+        self.fractions = rung_fractions(n_rungs, eta)
+        self.state_path = Path(state_path) if state_path else None
+        self.workers = worker_count(workers)
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _search_key(self, configs: Dict[str, dict]) -> dict:
+        return {'eta': self.eta, 'fractions': self.fractions,
+                'configs': _jsonable(configs)}
+
+    def _load_state(self, configs: Dict[str, dict]) -> Dict[str, Dict[str, Any]]:
+        """Finished evaluations per rung, if the state file matches this search."""
+        if self.state_path is None or not self.state_path.exists():
+            return {}
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get('search') != self._search_key(configs):
+            print(f"  {self.state_path} is from a different search, starting over")
+            return {}
+        return state.get('rungs', {})
+
+    def _save_state(self, configs: Dict[str, dict], rungs: Dict[str, Dict[str, Any]]) -> None:
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(self.state_path.suffix + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'search': self._search_key(configs), 'rungs': rungs}, f)
+        os.replace(tmp, self.state_path)
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def _rank(self, results: Dict[str, Any], names: List[str]) -> List[str]:
+        """Names sorted best first; configs without metrics go last."""
+        scored = [n for n in names if results[n] is not None]
+        unscored = [n for n in names if results[n] is None]
+        scored.sort(key=lambda n: _jsonable(self.score(results[n])), reverse=True)
+        return scored + unscored
+
+    def run(self, features, configs: Dict[str, dict], verbose: bool = True) -> pd.DataFrame:
+        """
+        Run the search.
+
+        Args:
+            features: Precomputed inputs passed to evaluate
+            configs: Name -> config dict
+            verbose: Print one line per rung
+
+        Returns:
+            Leaderboard DataFrame (best first): name, rung reached, history
+            fraction, plus the scalar metrics from the last rung evaluated
+        """
+        rungs = self._load_state(configs)
+        survivors = list(configs)
+        context = pool_context()
+
+        for r, fraction in enumerate(self.fractions):
+            done = rungs.setdefault(str(r), {})
+            pending = [n for n in survivors if n not in done]
+
+            if pending:
+                if self.workers <= 1 or len(pending) <= 1 or context is None:
+                    _init_worker(self.evaluate, features)
+                    for name in pending:
+                        done[name] = _jsonable(_evaluate_one(name, configs[name], fraction)[1])
+                        self._save_state(configs, rungs)
+                else:
+                    with ProcessPoolExecutor(
+                        max_workers=min(self.workers, len(pending)), mp_context=context,
+                        initializer=_init_worker, initargs=(self.evaluate, features)
+                    ) as pool:
+                        futures = [pool.submit(_evaluate_one, n, configs[n], fraction)
+                                   for n in pending]
+                        for future in as_completed(futures):
+                            name, metrics = future.result()
+                            done[name] = _jsonable(metrics)
+                            self._save_state(configs, rungs)
+
+            ranked = self._rank(done, survivors)
+            if verbose:
+                best = ranked[0] if ranked and done[ranked[0]] is not None else None
+                print(f"  Rung {r + 1}/{len(self.fractions)}: {len(survivors)} configs on "
+                      f"{fraction:.0%} of history ({len(survivors) - len(pending)} resumed)"
+                      + (f", best: {best}" if best else ""))
+
+            if r < len(self.fractions) - 1:
+                survivors = ranked[:max(1, len(survivors) // self.eta)]
+
+        return self._leaderboard(rungs)
+
+    def _leaderboard(self, rungs: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+        rows = {}
+        for r in sorted(rungs, key=int):
+            for name, metrics in rungs[r].items():
+                row = {'name': name, 'rung': int(r) + 1, 'fraction': self.fractions[int(r)]}
+                if metrics is not None:
+                    row.update({k: v for k, v in metrics.items() if np.isscalar(v)})
+                    row['_score'] = _jsonable(self.score(metrics))
+                rows[name] = row
+
+        # Deepest rung first, then best score within each rung
+        final = []
+        for rung in sorted({row['rung'] for row in rows.values()}, reverse=True):
+            group = [row for row in rows.values() if row['rung'] == rung]
+            scored = sorted((g for g in group if '_score' in g), key=lambda g: g['_score'], reverse=True)
+            final.extend(scored + [g for g in group if '_score' not in g])
+
+        return pd.DataFrame(final).drop(columns=['_score'], errors='ignore')
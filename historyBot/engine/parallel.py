@@ -0,0 +1,25 @@
+"""
+Process Pool Helpers
+====================
+Shared process-pool setup for the engine's batch jobs.
+
+The historyBot scripts run at module level without a __main__ guard, so
+pools prefer the fork start method: workers inherit the parent's arrays
+instead of re-importing (and re-running) the calling script.
+"""
+
+import multiprocessing
+import os
+from typing import Optional
+
+
+def pool_context():
+    """fork context where the platform has it, otherwise None (run in-process)."""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def worker_count(workers: Optional[int] = None) -> int:
+    """Requested worker count, defaulting to every core."""
+    return max(1, workers or os.cpu_count() or 1)
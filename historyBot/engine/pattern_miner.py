@@ -0,0 +1,290 @@
+"""
+Bitset Pattern Miner
+====================
+Enumerate conjunctions of atomic candle conditions and score the ones with
+enough support against a stop/target grid.
+
+Each atomic condition (RSI band, volume-ratio band, candle color, session,
+consecutive-candle count, ...) is stored once as a packed bitset over the
+candle index. A conjunction is a bitwise AND, its support a popcount, and
+support can only shrink as conditions are added, so any prefix below
+min_support prunes its whole subtree. Survivors are unpacked to signal
+indices and scored with GridEvaluator.surface in a process pool.
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from engine.grid_eval import GridEvaluator
+from engine.parallel import pool_context, worker_count
+
+# Bits set in every byte value
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+
+def popcount(bits: np.ndarray) -> int:
+    """Number of set bits in a packed bitset."""
+    return int(_POPCOUNT[bits].sum())
+
+
+@dataclass(frozen=True)
+class Condition:
+    """
+    One atomic condition as a packed bitset.
+
+    family groups mutually redundant conditions (e.g. every 'rsi <' band) so a
+    conjunction never uses two members of the same family.
+    """
+    name: str
+    family: str
+    bits: np.ndarray
+
+
+class ConditionSet:
+    """
+    Atomic conditions over one candle series.
+    """
+
+    def __init__(self, n_candles: int):
+        self.n = n_candles
+        self.conditions: List[Condition] = []
+
+    def add(self, name: str, family: str, mask) -> None:
+        """Add a boolean mask (NaN counts as False)."""
+        mask = np.asarray(pd.Series(mask).fillna(False), dtype=bool)
+        if len(mask) != self.n:
+            raise ValueError(f"Condition {name!r} has {len(mask)} rows, expected {self.n}")
+        self.conditions.append(Condition(name, family, np.packbits(mask)))
+
+    def get(self, name: str) -> Condition:
+        """Look up a condition by name."""
+        for cond in self.conditions:
+            if cond.name == name:
+                return cond
+        raise KeyError(name)
+
+    def indices(self, bits: np.ndarray) -> np.ndarray:
+        """Candle indices set in a packed bitset."""
+        return np.flatnonzero(np.unpackbits(bits, count=self.n))
+
+    def conjunctions(self, max_depth: int, min_support: int,
+                     required: Sequence[str] = (),
+                     exclude_families: Sequence[str] = ()) -> Iterator[Tuple[Tuple[str, ...], np.ndarray]]:
+        """
+        Enumerate conjunctions up to max_depth with support >= min_support.
+
+        Args:
+            max_depth: Maximum number of optional conditions per pattern
+            min_support: Minimum number of matching candles
+            required: Condition names ANDed into every pattern (e.g. candle color)
+            exclude_families: Families never used as optional conditions
+
+        Yields:
+            (condition names, packed bitset)
+        """
+        base = np.full((self.n + 7) // 8, 0xFF, dtype=np.uint8)
+        # Clear padding bits past the last candle
+        if self.n % 8:
+            base[-1] = (0xFF << (8 - self.n % 8)) & 0xFF
+        used_families = set()
+        for name in required:
+            cond = self.get(name)
+            base &= cond.bits
+            used_families.add(cond.family)
+
+        if popcount(base) < min_support:
+            return
+
+        candidates = [
+            c for c in self.conditions
+            if c.family not in used_families and c.family not in exclude_families
+            and c.name not in required
+        ]
+
+        def extend(prefix_names, prefix_bits, start, families, depth):
+            for i in range(start, len(candidates)):
+                cond = candidates[i]
+                if cond.family in families:
+                    continue
+                bits = prefix_bits & cond.bits
+                if popcount(bits) < min_support:
+                    continue  # Anti-monotone: no superset can recover support
+                names = prefix_names + (cond.name,)
+                # Required conditions read last, e.g. 'RSI<20 + Vol>2x + Bullish'
+                yield names + tuple(required), bits
+                if depth + 1 < max_depth:
+                    yield from extend(names, bits, i + 1, families | {cond.family}, depth + 1)
+
+        yield from extend((), base, 0, frozenset(), 0)
+
+
+# Worker-process state, set once per process by _init_worker
+_worker_grid: Optional[GridEvaluator] = None
+
+
+def _init_worker(highs, lows, closes, max_bars):
+    global _worker_grid
+    _worker_grid = GridEvaluator(highs, lows, closes, max_bars=max_bars)
+
+
+def _score_batch(batch, direction, stop_pcts, rr_ratios, min_gap, cooldown, timeout, min_trades):
+    frames = []
+    for names, signals in batch:
+        surface = _worker_grid.surface(
+            signals, direction, stop_pcts, rr_ratios=rr_ratios,
+            min_gap=min_gap, cooldown=cooldown, timeout=timeout, min_trades=min_trades
+        )
+        if not surface.empty:
+            surface.insert(0, 'pattern', ' + '.join(names))
+            surface.insert(1, 'depth', len(names))
+            surface.insert(2, 'signals', len(signals))
+            frames.append(surface)
+    return frames
+
+
+class PatternMiner:
+    """
+    Enumerate and score condition conjunctions for one direction.
+    """
+
+    def __init__(self, df: pd.DataFrame, conditions: ConditionSet, max_bars: int = 288,
+                 workers: Optional[int] = None, batch_size: int = 64):
+        self.highs = df['high'].to_numpy(dtype=np.float64)
+        self.lows = df['low'].to_numpy(dtype=np.float64)
+        self.closes = df['close'].to_numpy(dtype=np.float64)
+        self.conditions = conditions
+        self.max_bars = max_bars
+        self.workers = worker_count(workers)
+        self.batch_size = batch_size
+
+    def mine(self, direction: str, stop_pcts: Sequence[float], rr_ratios: Sequence[float],
+             max_depth: int = 3, min_support: int = 10, required: Sequence[str] = (),
+             exclude_families: Sequence[str] = (), min_gap: int = 0,
+             cooldown: str = 'entry', timeout: str = 'skip',
+             min_trades: int = 3) -> pd.DataFrame:
+        """
+        Mine patterns and return every scored (pattern, stop, rr) cell.
+
+        Args:
+            direction: 'LONG' or 'SHORT'
+            stop_pcts: Stop grid (fractions)
+            rr_ratios: R/R grid; target = stop * rr
+            max_depth: Optional conditions per pattern
+            min_support: Minimum signal count per pattern
+            required: Conditions in every pattern (e.g. 'Bullish')
+            exclude_families: Families to leave out of the search
+            min_gap / cooldown / timeout / min_trades: see GridEvaluator.surface
+
+        Returns:
+            DataFrame with pattern, depth, signals plus the surface columns
+        """
+        batches, batch = [], []
+        for names, bits in self.conditions.conjunctions(
+                max_depth, min_support, required=required, exclude_families=exclude_families):
+            batch.append((names, self.conditions.indices(bits)))
+            if len(batch) >= self.batch_size:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+
+        args = (direction, list(stop_pcts), list(rr_ratios), min_gap, cooldown, timeout, min_trades)
+        frames = []
+        context = pool_context()
+        if self.workers <= 1 or len(batches) <= 1 or context is None:
+            _init_worker(self.highs, self.lows, self.closes, self.max_bars)
+            for b in batches:
+                frames.extend(_score_batch(b, *args))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context, initializer=_init_worker,
+                initargs=(self.highs, self.lows, self.closes, self.max_bars)
+            ) as pool:
+                futures = [pool.submit(_score_batch, b, *args) for b in batches]
+                for future in futures:
+                    frames.extend(future.result())
+
+        if not frames:
+            return pd.DataFrame(columns=['pattern', 'depth', 'signals', 'stop', 'target', 'rr',
+                                         'wins', 'losses', 'total', 'win_rate', 'expectancy'])
+        result = pd.concat(frames, ignore_index=True)
+        result.insert(0, 'direction', direction)
+        return result
+
+
+def standard_conditions(df: pd.DataFrame) -> ConditionSet:
+    """
+    Atomic conditions covering the hand-built pattern lists.
+
+    Expects the indicator columns built by the pattern scripts: rsi,
+    vol_ratio, bullish, bearish, consec_red, consec_green, pct_1, pct_12,
+    pct_48, bb_lower, bb_upper, low_20, high_20, hour, body, upper_wick,
+    lower_wick.
+    """
+    conds = ConditionSet(len(df))
+
+    # Candle color
+    conds.add('Bullish', 'color', df['bullish'])
+    conds.add('Bearish', 'color', df['bearish'])
+
+    # RSI bands
+    for t in [10, 12, 15, 18, 20, 22, 25, 30]:
+        conds.add(f'RSI<{t}', 'rsi_low', df['rsi'] < t)
+    for t in [70, 75, 80, 82, 85, 88, 90]:
+        conds.add(f'RSI>{t}', 'rsi_high', df['rsi'] > t)
+
+    # Volume ratio bands
+    for v in [1.5, 2, 2.5, 3, 4]:
+        conds.add(f'Vol>{v}x', 'volume', df['vol_ratio'] > v)
+
+    # Consecutive candles before this one
+    for n in [3, 5, 6, 7, 8, 9, 10]:
+        conds.add(f'{n}+ Red', 'consec_red', df['consec_red'].shift(1) >= n)
+        conds.add(f'{n}+ Green', 'consec_green', df['consec_green'].shift(1) >= n)
+
+    # Previous-candle and multi-hour moves
+    for d in [0.5, 0.8, 1.0, 1.2, 1.5, 2.0]:
+        conds.add(f'Drop>{d}%', 'drop_1', df['pct_1'].shift(1) < -d)
+        conds.add(f'Pump>{d}%', 'pump_1', df['pct_1'].shift(1) > d)
+    for d in [1.5, 2, 2.5, 3, 4]:
+        conds.add(f'1H Drop>{d}%', 'drop_12', df['pct_12'] < -d)
+        conds.add(f'1H Pump>{d}%', 'pump_12', df['pct_12'] > d)
+        conds.add(f'4H Drop>{d}%', 'drop_48', df['pct_48'] < -d)
+        conds.add(f'4H Pump>{d}%', 'pump_48', df['pct_48'] > d)
+
+    # Bollinger Bands
+    conds.add('BB<Lower', 'bb_low', df['low'] < df['bb_lower'])
+    conds.add('BB Lower Touch', 'bb_low', (df['low'] < df['bb_lower']) & (df['close'] > df['bb_lower']))
+    conds.add('BB>Upper', 'bb_high', df['high'] > df['bb_upper'])
+    conds.add('BB Upper Touch', 'bb_high', (df['high'] > df['bb_upper']) & (df['close'] < df['bb_upper']))
+
+    # 20-bar sweeps
+    conds.add('20-Bar Low Sweep', 'sweep_low',
+              (df['low'] < df['low_20'].shift(1)) & (df['close'] > df['low_20'].shift(1)))
+    conds.add('20-Bar High Sweep', 'sweep_high',
+              (df['high'] > df['high_20'].shift(1)) & (df['close'] < df['high_20'].shift(1)))
+
+    # Wicks
+    conds.add('Hammer', 'wick_low', df['lower_wick'] > df['body'])
+    conds.add('Strong Hammer', 'wick_low',
+              (df['lower_wick'] > df['body'] * 2) & (df['upper_wick'] < df['body'] * 0.3))
+    conds.add('Shooting Star', 'wick_high', df['upper_wick'] > df['body'])
+    conds.add('Strong Shooting Star', 'wick_high',
+              (df['upper_wick'] > df['body'] * 2) & (df['lower_wick'] < df['body'] * 0.3))
+
+    # Sessions (UTC)
+    conds.add('Asian', 'session', (df['hour'] >= 0) & (df['hour'] < 8))
+    conds.add('London', 'session', (df['hour'] >= 8) & (df['hour'] < 13))
+    conds.add('NY', 'session', (df['hour'] >= 13) & (df['hour'] < 21))
+
+    return conds
+
+
+# Families that only make sense on the other side of the trade
+LONG_EXCLUDED_FAMILIES = ('rsi_high', 'consec_green', 'pump_1', 'pump_12', 'pump_48',
+                          'bb_high', 'sweep_high', 'wick_high')
+SHORT_EXCLUDED_FAMILIES = ('rsi_low', 'consec_red', 'drop_1', 'drop_12', 'drop_48',
+                           'bb_low', 'sweep_low', 'wick_low')
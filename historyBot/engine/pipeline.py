@@ -0,0 +1,175 @@
+"""
+Layered Stage Pipeline
+======================
+Chains strategy layers (4H bias -> 1H session -> 5M execution -> 1M entry)
+so each layer consumes the signal batch the layer above produced and its
+output is cached on disk.
+
+A stage's key is built from its own code version and params plus the keys
+of its inputs (upstream stages and data files), never from the upstream
+values themselves. Changing one layer's code or params therefore changes
+its key and every key below it, while the layers above still load from the
+cache. Data files are only read, and upstream values only loaded, when a
+stage below them actually has to recompute.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from engine.cache import ResultCache, _MISS, code_version, default_cache, fingerprint
+from engine.profiling import PROFILER
+
+
+@dataclass
+class Source:
+    """A data file read by loader(path, **params)."""
+    name: str
+    path: Path
+    loader: Callable
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Stage:
+    """fn(*input_values, **params) -> picklable batch (usually a DataFrame)."""
+    name: str
+    fn: Callable
+    inputs: Sequence[str] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    depends: Sequence[Any] = ()
+
+
+@dataclass
+class StageReport:
+    name: str
+    status: str  # 'cached', 'computed' or 'loaded' (sources)
+    seconds: float
+    rows: Optional[int]
+
+
+class Pipeline:
+    """
+    Named sources and stages, resolved lazily from the requested targets.
+
+    Usage:
+        pipe = Pipeline()
+        pipe.source('candles_4h', 'data/btc_usd_4h.csv', load_4h)
+        pipe.stage('bias_4h', detect_bias, inputs=['candles_4h'], params={...})
+        pipe.stage('session_1h', gate_sessions, inputs=['bias_4h'])
+        batches = pipe.run('session_1h')
+    """
+
+    def __init__(self, cache: Optional[ResultCache] = None):
+        self.cache = cache or default_cache()
+        self.nodes: Dict[str, Any] = {}
+        self.report: List[StageReport] = []
+        self._keys: Dict[str, str] = {}
+        self._values: Dict[str, Any] = {}
+
+    def source(self, name: str, path, loader: Callable, **params) -> 'Pipeline':
+        self._add(Source(name, Path(path), loader, params))
+        return self
+
+    def stage(self, name: str, fn: Callable, inputs: Sequence[str] = (),
+              params: Optional[Dict[str, Any]] = None, depends: Sequence[Any] = ()) -> 'Pipeline':
+        missing = [i for i in inputs if i not in self.nodes]
+        if missing:
+            raise KeyError(f"Stage {name!r} depends on undefined {missing}")
+        self._add(Stage(name, fn, tuple(inputs), dict(params or {}), tuple(depends)))
+        return self
+
+    def _add(self, node) -> None:
+        if node.name in self.nodes:
+            raise KeyError(f"Duplicate pipeline node {node.name!r}")
+        self.nodes[node.name] = node
+
+    # -------------------------------------------------------------------------
+    # KEYS
+    # -------------------------------------------------------------------------
+
+    def key(self, name: str) -> str:
+        """Chained key: node code + params + input keys (file bytes for sources)."""
+        if name in self._keys:
+            return self._keys[name]
+
+        node = self.nodes[name]
+        h = hashlib.sha256()
+        h.update(f"{type(node).__name__}:{name};".encode())
+        h.update(fingerprint(node.params).encode())
+        if isinstance(node, Source):
+            h.update(code_version(node.loader).encode())
+            h.update(_file_digest(node.path).encode())
+        else:
+            h.update(code_version(node.fn, node.depends).encode())
+            for upstream in node.inputs:
+                h.update(self.key(upstream).encode())
+
+        self._keys[name] = h.hexdigest()
+        return self._keys[name]
+
+    # -------------------------------------------------------------------------
+    # EXECUTION
+    # -------------------------------------------------------------------------
+
+    def run(self, *targets: str) -> Dict[str, Any]:
+        """
+        Resolve targets (default: every stage) and return their values.
+
+        Stages whose key is cached are loaded without touching their inputs;
+        the rest pull their inputs recursively and are stored after running.
+        """
+        if not targets:
+            targets = tuple(n for n, node in self.nodes.items() if isinstance(node, Stage))
+        return {name: self._value(name) for name in targets}
+
+    def _value(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+
+        node = self.nodes[name]
+        start = time.perf_counter()
+
+        if isinstance(node, Source):
+            with PROFILER.stage(f"pipeline.{name}"):
+                value = node.loader(node.path, **node.params)
+            status = 'loaded'
+        else:
+            key = self.key(name)
+            value = self.cache.get(key) if self.cache.enabled else _MISS
+            if value is not _MISS:
+                self.cache.hits += 1
+                status = 'cached'
+            else:
+                args = [self._value(upstream) for upstream in node.inputs]
+                # Time only this stage, not the upstream work it triggered
+                start = time.perf_counter()
+                with PROFILER.stage(f"pipeline.{name}"):
+                    value = node.fn(*args, **node.params)
+                self.cache.misses += 1
+                if self.cache.enabled:
+                    self.cache.put(key, value)
+                status = 'computed'
+
+        self.report.append(StageReport(name, status, time.perf_counter() - start,
+                                       len(value) if hasattr(value, '__len__') else None))
+        self._values[name] = value
+        return value
+
+    def describe(self) -> str:
+        """One line per node resolved by run(), in resolution order."""
+        lines = []
+        for r in self.report:
+            rows = f"{r.rows:>7} rows" if r.rows is not None else ''
+            lines.append(f"  {r.name:<16} {r.status:<9} {r.seconds:>7.2f}s {rows}")
+        return "\n".join(lines)
+
+
+def _file_digest(path: Path) -> str:
+    """Content hash of a data file; missing files hash to a fixed marker."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return 'missing'
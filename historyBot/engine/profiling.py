@@ -0,0 +1,166 @@
+"""
+Stage Profiler
+==============
+Wall time and call counts per named stage, so optimization work can target
+measured hot spots and regressions show up as changed stage timings.
+
+Off by default and near free when off. HISTORYBOT_PROFILE=1 turns it on
+(HISTORYBOT_PROFILE=cprofile also records a cProfile trace), the same kind
+of switch as HISTORYBOT_CACHE. Every @CACHE.stage function is a stage
+automatically; scripts mark other phases with PROFILER.stage('name') and
+their entry point with @profiled. Stages nest: total time includes nested
+stages, self time does not.
+
+Reports are JSON under data/profiles/<entry>_<UTC time>.json, with the
+trace next to it as .prof (open with pstats or snakeviz).
+"""
+
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Profiler:
+    """
+    Accumulates per-stage timings for one profiled entry point.
+    """
+
+    def __init__(self, mode: Optional[str] = None):
+        # mode: '' / '0' = off, 'cprofile' = timings + trace, anything else = timings
+        if mode is None:
+            mode = os.environ.get('HISTORYBOT_PROFILE', '')
+        self.enabled = mode not in ('', '0')
+        self.trace = mode == 'cprofile'
+        self.active = False
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._stack: List[List[float]] = []  # [start, nested time] per open stage
+
+    def reset(self) -> None:
+        self.stats = {}
+        self._stack = []
+
+    def stage(self, name: str):
+        """Context manager timing one call of a named stage."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed(name)
+
+    def timed(self, fn: Optional[Callable] = None, *, name: Optional[str] = None):
+        """Decorator form of stage() for hot helpers that are not cache stages."""
+        if fn is None:
+            return lambda f: self.timed(f, name=name)
+        stage_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.stage(stage_name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    @contextlib.contextmanager
+    def _timed(self, name: str):
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+            entry = self.stats.setdefault(name, {'calls': 0, 'total_s': 0.0, 'self_s': 0.0, 'max_s': 0.0})
+            entry['calls'] += 1
+            entry['total_s'] += elapsed
+            entry['self_s'] += elapsed - frame[1]
+            entry['max_s'] = max(entry['max_s'], elapsed)
+
+    def report(self, entry: str, wall: float, trace: Optional[Path] = None) -> Dict[str, Any]:
+        """Machine-readable report, stages sorted by self time."""
+        stages = [
+            {'stage': name, **{k: round(v, 6) if isinstance(v, float) else v for k, v in s.items()},
+             'share': round(s['self_s'] / wall, 4) if wall else 0.0}
+            for name, s in sorted(self.stats.items(), key=lambda item: -item[1]['self_s'])
+        ]
+        return {
+            'entry': entry,
+            'finished': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'wall_s': round(wall, 6),
+            'stages': stages,
+            'trace': str(trace) if trace else None,
+        }
+
+
+PROFILER = Profiler()
+
+
+def default_report_dir() -> Path:
+    """historyBot/data/profiles (HISTORYBOT_PROFILE_DIR overrides)."""
+    return Path(os.environ.get('HISTORYBOT_PROFILE_DIR',
+                               str(Path(__file__).resolve().parents[1] / 'data' / 'profiles')))
+
+
+def print_summary(report: Dict[str, Any], top: int = 12) -> None:
+    print(f"\nPROFILE ({report['entry']}, {report['wall_s']:.2f}s wall)")
+    print(f"  {'Stage':<48} {'Calls':>8} {'Self s':>9} {'Total s':>9} {'Share':>7}")
+    for s in report['stages'][:top]:
+        print(f"  {s['stage'][-48:]:<48} {s['calls']:>8} {s['self_s']:>9.3f} "
+              f"{s['total_s']:>9.3f} {s['share'] * 100:>6.1f}%")
+
+
+def profiled(fn: Optional[Callable] = None, *, name: Optional[str] = None):
+    """
+    Mark a script entry point. With profiling on, the call is timed, its
+    stages collected and a report written; entry points called from inside
+    another profiled run are recorded as a stage of that run instead.
+
+    Usage:
+        @profiled
+        def run_tests(filepath): ...
+    """
+    if fn is None:
+        return lambda f: profiled(f, name=name)
+
+    entry = name or f"{Path(fn.__code__.co_filename).stem}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.enabled or PROFILER.active:
+            with PROFILER.stage(entry):
+                return fn(*args, **kwargs)
+
+        PROFILER.reset()
+        PROFILER.active = True
+        tracer = cProfile.Profile() if PROFILER.trace else None
+        start = time.perf_counter()
+        try:
+            if tracer:
+                tracer.enable()
+            with PROFILER.stage(entry):
+                return fn(*args, **kwargs)
+        finally:
+            if tracer:
+                tracer.disable()
+            wall = time.perf_counter() - start
+            PROFILER.active = False
+
+            out_dir = default_report_dir()
+            out_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"{entry}_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}"
+            trace = None
+            if tracer:
+                trace = out_dir / f"{stem}.prof"
+                tracer.dump_stats(str(trace))
+            report = PROFILER.report(entry, wall, trace)
+            path = out_dir / f"{stem}.json"
+            path.write_text(json.dumps(report, indent=2))
+            print_summary(report)
+            print(f"  report: {path}" + (f"\n  trace:  {trace}" if trace else ''))
+
+    return wrapper
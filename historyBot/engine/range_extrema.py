@@ -0,0 +1,154 @@
+"""
+Range Extrema Index
+===================
+Sparse table over a candle column: O(n log n) build, O(1) max/min for any
+half-open window [start, end).
+
+Replaces per-row `window.iloc[a:b]['high'].max()` style scans. Build once per
+series, then answer every lookback / forward window with query_batch().
+"""
+
+import numpy as np
+from typing import Union
+
+ArrayLike = Union[np.ndarray, list]
+
+
+class SparseTable:
+    """
+    Idempotent range query table (max or min).
+
+    Level k holds the extremum of every window of length 2**k, so any
+    range is covered by two overlapping power-of-two windows.
+    """
+
+    def __init__(self, values: ArrayLike, op: str = 'max'):
+        if op not in ('max', 'min'):
+            raise ValueError(f"op must be 'max' or 'min', got {op!r}")
+
+        self.op = op
+        self._reduce = np.maximum if op == 'max' else np.minimum
+        self._empty = -np.inf if op == 'max' else np.inf
+
+        base = np.asarray(values, dtype=np.float64)
+        self.n = len(base)
+        self.levels = [base]
+
+        width = 1
+        while width * 2 <= self.n:
+            prev = self.levels[-1]
+            self.levels.append(self._reduce(prev[:-width], prev[width:]))
+            width *= 2
+
+        # floor(log2(length)) lookup for every possible window length
+        self._log2 = np.zeros(self.n + 1, dtype=np.int64)
+        if self.n > 1:
+            self._log2[2:] = np.floor(np.log2(np.arange(2, self.n + 1))).astype(np.int64)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def query(self, start: int, end: int) -> float:
+        """
+        Extremum of values[start:end].
+
+        Slice bounds are clipped like Python slicing; an empty range returns
+        -inf for max and +inf for min.
+        """
+        start = max(0, start)
+        end = min(self.n, end)
+        if end <= start:
+            return float(self._empty)
+
+        k = self._log2[end - start]
+        level = self.levels[k]
+        return float(self._reduce(level[start], level[end - (1 << k)]))
+
+    def query_batch(self, starts: ArrayLike, ends: ArrayLike) -> np.ndarray:
+        """
+        Vectorized query over many [start, end) windows.
+
+        Args:
+            starts: Window start indices (inclusive)
+            ends: Window end indices (exclusive)
+
+        Returns:
+            Array of extrema, -inf/+inf where the clipped window is empty
+        """
+        starts = np.clip(np.asarray(starts, dtype=np.int64), 0, self.n)
+        ends = np.clip(np.asarray(ends, dtype=np.int64), 0, self.n)
+        starts, ends = np.broadcast_arrays(starts, ends)
+
+        out = np.full(starts.shape, self._empty, dtype=np.float64)
+        valid = ends > starts
+        if not valid.any():
+            return out
+
+        s = starts[valid]
+        e = ends[valid]
+        k = self._log2[e - s]
+        left = np.empty(len(s), dtype=np.float64)
+        right = np.empty(len(s), dtype=np.float64)
+
+        # Gather per level so each lookup is a plain fancy index
+        for level_idx in np.unique(k):
+            sel = k == level_idx
+            level = self.levels[level_idx]
+            left[sel] = level[s[sel]]
+            right[sel] = level[e[sel] - (1 << int(level_idx))]
+
+        out[valid] = self._reduce(left, right)
+        return out
+
+    def lookback(self, window: int, include_current: bool = False) -> np.ndarray:
+        """
+        Extremum of the `window` values before each index.
+
+        Args:
+            window: Number of candles to look back
+            include_current: Include the candle at each index itself
+
+        Returns:
+            Array aligned with the input series
+        """
+        idx = np.arange(self.n)
+        end = idx + 1 if include_current else idx
+        return self.query_batch(end - window, end)
+
+    def lookahead(self, window: int, include_current: bool = False) -> np.ndarray:
+        """
+        Extremum of the `window` values after each index.
+
+        Args:
+            window: Number of candles to look ahead
+            include_current: Include the candle at each index itself
+
+        Returns:
+            Array aligned with the input series
+        """
+        idx = np.arange(self.n)
+        start = idx if include_current else idx + 1
+        return self.query_batch(start, start + window)
+
+
+class RangeExtrema:
+    """
+    Max over highs and min over lows for one candle series.
+    """
+
+    def __init__(self, highs: ArrayLike, lows: ArrayLike):
+        self.high = SparseTable(highs, 'max')
+        self.low = SparseTable(lows, 'min')
+
+    @classmethod
+    def from_frame(cls, df) -> 'RangeExtrema':
+        """Build from a DataFrame with 'high' and 'low' columns."""
+        return cls(df['high'].to_numpy(), df['low'].to_numpy())
+
+    def max_high(self, starts: ArrayLike, ends: ArrayLike) -> np.ndarray:
+        """Highest high in each [start, end) window."""
+        return self.high.query_batch(starts, ends)
+
+    def min_low(self, starts: ArrayLike, ends: ArrayLike) -> np.ndarray:
+        """Lowest low in each [start, end) window."""
+        return self.low.query_batch(starts, ends)
@@ -0,0 +1,493 @@
+"""
+Synthetic Candles
+=================
+Seeded, arbitrarily long BTC-like OHLCV series for load and scaling tests,
+with planted structures whose positions are known exactly:
+
+    market = SyntheticMarket(seed=1)
+    frames, truth = market.generate(5_000_000, ['1min', '5min', '1h', '4h'])
+
+The finest timeframe is a random walk in log price whose volatility and
+drift switch between regimes (calm / normal / volatile, Markov durations),
+with a weak pull back to the start price so very long series stay in a
+realistic range. Every coarser timeframe is aggregated from it, so all
+timeframes agree bar for bar (a 4H high is the max of its 1M highs).
+
+Planted on top of the walk, and reported in the truth table:
+
+    SWEEP  a swing low (high) on the sweep timeframe, then within 4-12 bars
+           a bar that wicks below (above) it and closes back above (below).
+           No bar in between touches the level, so it is the first sweep.
+    FVG    three bars on the FVG timeframe where bar k+1's low is above
+           bar k-1's high (bullish) by at least fvg_gap, or the reverse.
+
+Long series are produced chunk by chunk (iter_chunks) so memory stays flat;
+write_csv / write_columns / write_postgres stream chunks straight into the
+project's CSV layout, memory-mappable .npy columns, or psql COPY scripts.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine.timeframes import OHLCV, period_ns
+
+TRUTH_COLUMNS = ['kind', 'timeframe', 'timestamp', 'bias', 'level', 'top', 'bottom', 'swing_timestamp']
+
+# Tables in database/schema.sql, for write_postgres
+POSTGRES_TABLES = {'5min': 'candles_5m', '4h': 'candles_4h'}
+
+
+@dataclass(frozen=True)
+class Regime:
+    name: str
+    vol: float        # log-return standard deviation per base bar
+    drift: float      # mean log return per base bar
+    mean_bars: int    # mean duration in base bars
+
+
+# Per-minute volatility; scaled by sqrt(minutes) for coarser base timeframes
+DEFAULT_REGIMES = (
+    Regime('calm', 0.0004, 0.0, 3 * 1440),
+    Regime('normal', 0.0008, 0.000002, 5 * 1440),
+    Regime('volatile', 0.0018, -0.000004, 1440),
+)
+
+
+@dataclass
+class Chunk:
+    """One aligned slice of the series: every timeframe plus its planted truth."""
+    frames: Dict[str, pd.DataFrame]
+    truth: pd.DataFrame
+
+
+@dataclass
+class _State:
+    log_price: float
+    regime: int
+    remaining: int
+    start_ns: int
+
+
+@dataclass
+class SyntheticMarket:
+    """
+    Deterministic generator: the same seed, parameters and chunk size give
+    the same candles and truth.
+
+    Args:
+        seed: RNG seed
+        base: Finest timeframe, e.g. '1min' or '5min'
+        start: First candle time (floored to the coarsest generated timeframe)
+        start_price: Price the walk starts at and is pulled back towards
+        regimes: Volatility regimes (vol given per minute)
+        sweep_timeframe / sweep_every: one planted sweep per this many bars
+        fvg_timeframe / fvg_every: one planted FVG per this many bars
+        swing_width: Bars on each side a planted swing is the extreme of
+        fvg_gap: Minimum planted gap as a fraction of price
+    """
+    seed: int = 0
+    base: str = '1min'
+    start: str = '2020-01-01'
+    start_price: float = 30000.0
+    regimes: Sequence[Regime] = DEFAULT_REGIMES
+    sweep_timeframe: str = '4h'
+    sweep_every: int = 30
+    fvg_timeframe: str = '5min'
+    fvg_every: int = 400
+    swing_width: int = 3
+    fvg_gap: float = 0.002
+    mean_reversion: float = 0.05   # fraction of the log distance to start_price removed per day
+
+    def __post_init__(self):
+        base_ns = period_ns(self.base)
+        self._base_ns = base_ns
+        self._rows_per_day = int(period_ns('1D') // base_ns)
+        scale = np.sqrt(base_ns / period_ns('1min'))
+        minutes = base_ns / period_ns('1min')
+        self._vol = np.array([r.vol * scale for r in self.regimes])
+        self._drift = np.array([r.drift * minutes for r in self.regimes])
+        self._mean_bars = np.array([max(1, int(r.mean_bars / minutes)) for r in self.regimes])
+
+    # -------------------------------------------------------------------------
+    # PUBLIC
+    # -------------------------------------------------------------------------
+
+    def iter_chunks(self, n_rows: int, timeframes: Sequence[str],
+                    chunk_rows: int = 1_000_000) -> Iterator[Chunk]:
+        """
+        Yield the series in chunks of about chunk_rows base rows.
+
+        Chunks are whole days, so no bar of any timeframe (up to 1D) spans
+        two chunks. Structures are only planted inside a chunk, and a
+        trailing bar left incomplete by n_rows is dropped.
+        """
+        widths = self._widths(timeframes)
+        align = int(np.lcm.reduce([self._rows_per_day, *widths.values()]))
+        chunk_rows = max(align, chunk_rows // align * align)
+
+        coarsest = max(widths.values()) * self._base_ns
+        start_ns = pd.Timestamp(self.start, tz='UTC').value // coarsest * coarsest
+        state = _State(np.log(self.start_price), -1, 0, start_ns)
+        rng = np.random.default_rng(self.seed)
+
+        done = 0
+        while done < n_rows:
+            n = min(chunk_rows, n_rows - done)
+            yield self._chunk(n, timeframes, widths, state, rng)
+            done += n
+
+    def generate(self, n_rows: int, timeframes: Sequence[str],
+                 chunk_rows: int = 1_000_000) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+        """Whole series in memory: ({timeframe: candles}, truth)."""
+        chunks = list(self.iter_chunks(n_rows, timeframes, chunk_rows))
+        frames = {tf: pd.concat([c.frames[tf] for c in chunks], ignore_index=True) for tf in timeframes}
+        truth = pd.concat([c.truth for c in chunks], ignore_index=True)
+        return frames, truth
+
+    # -------------------------------------------------------------------------
+    # GENERATION
+    # -------------------------------------------------------------------------
+
+    def _widths(self, timeframes: Sequence[str]) -> Dict[str, int]:
+        widths = {}
+        for tf in set(timeframes) | {self.sweep_timeframe, self.fvg_timeframe}:
+            width, rest = divmod(period_ns(tf), self._base_ns)
+            if rest or width < 1:
+                raise ValueError(f"Timeframe {tf!r} is not a multiple of the base {self.base!r}")
+            widths[tf] = int(width)
+        return widths
+
+    def _regimes(self, n: int, state: _State, rng: np.random.Generator) -> np.ndarray:
+        """Regime index of every row, continuing the previous chunk's regime."""
+        out = np.empty(n, dtype=np.int64)
+        filled = 0
+        while filled < n:
+            if state.remaining == 0:
+                choices = [i for i in range(len(self.regimes)) if i != state.regime] or [state.regime]
+                state.regime = int(rng.choice(choices))
+                state.remaining = int(rng.geometric(1 / self._mean_bars[state.regime]))
+            take = min(state.remaining, n - filled)
+            out[filled:filled + take] = state.regime
+            filled += take
+            state.remaining -= take
+        return out
+
+    def _chunk(self, n: int, timeframes: Sequence[str], widths: Dict[str, int],
+               state: _State, rng: np.random.Generator) -> Chunk:
+        regime = self._regimes(n, state, rng)
+        vol = self._vol[regime]
+
+        # Student-t shocks (fat tails) scaled to unit variance
+        shocks = rng.standard_t(4, n) / np.sqrt(2)
+        ret = self._drift[regime] + vol * shocks
+        self._pull_back(ret, state.log_price)
+        up = np.abs(rng.standard_normal(n)) * vol * 0.6
+        down = np.abs(rng.standard_normal(n)) * vol * 0.6
+        volume = rng.lognormal(0.0, 0.8, n) * (vol / self._vol[0]) * np.sqrt(self._base_ns / period_ns('1min'))
+
+        truth: List[dict] = []
+        reserved = np.zeros(n, dtype=bool)
+        fvgs = self._plant_fvgs(ret, state.log_price, up, down, widths[self.fvg_timeframe], reserved, rng)
+
+        close = state.log_price + np.cumsum(ret)
+        open_ = np.r_[state.log_price, close[:-1]]
+        high = np.maximum(open_, close) + up
+        low = np.minimum(open_, close) - down
+        sweeps = self._plant_sweeps(high, low, open_, close, widths[self.sweep_timeframe], reserved, rng)
+
+        timestamps = state.start_ns + np.arange(n, dtype=np.int64) * self._base_ns
+        base = pd.DataFrame({
+            'timestamp': pd.DatetimeIndex(timestamps.view('datetime64[ns]')).tz_localize('UTC'),
+            'open': np.round(np.exp(open_), 2),
+            'high': np.round(np.exp(high), 2),
+            'low': np.round(np.exp(low), 2),
+            'close': np.round(np.exp(close), 2),
+            'volume': np.round(volume, 8),
+        })
+
+        frames = {tf: self._aggregate(base, widths[tf]) for tf in timeframes}
+        sweep_bars = frames.get(self.sweep_timeframe)
+        if sweep_bars is None:
+            sweep_bars = self._aggregate(base, widths[self.sweep_timeframe])
+        fvg_bars = frames.get(self.fvg_timeframe)
+        if fvg_bars is None:
+            fvg_bars = self._aggregate(base, widths[self.fvg_timeframe])
+
+        for j, k, bias in sweeps:
+            side = 'low' if bias == 'BULLISH' else 'high'
+            truth.append({
+                'kind': 'SWEEP', 'timeframe': self.sweep_timeframe,
+                'timestamp': sweep_bars['timestamp'].iloc[k], 'bias': bias,
+                'level': sweep_bars[side].iloc[j], 'swing_timestamp': sweep_bars['timestamp'].iloc[j],
+            })
+        for k, bias in fvgs:
+            before, after = fvg_bars.iloc[k - 1], fvg_bars.iloc[k + 1]
+            top, bottom = (after['low'], before['high']) if bias == 'BULLISH' else (before['low'], after['high'])
+            truth.append({
+                'kind': 'FVG', 'timeframe': self.fvg_timeframe,
+                'timestamp': fvg_bars['timestamp'].iloc[k], 'bias': bias, 'top': top, 'bottom': bottom,
+            })
+
+        state.log_price = float(close[-1])
+        state.start_ns = int(timestamps[-1] + self._base_ns)
+        truth = pd.DataFrame(truth, columns=TRUTH_COLUMNS).sort_values('timestamp', kind='stable')
+        return Chunk(frames, truth.reset_index(drop=True))
+
+    def _pull_back(self, ret: np.ndarray, log_price: float) -> None:
+        """Add the mean-reversion drift day by day, from each day's opening distance."""
+        anchor = np.log(self.start_price)
+        day = self._rows_per_day
+        for start in range(0, len(ret), day):
+            block = ret[start:start + day]
+            block -= self.mean_reversion * (log_price - anchor) / day
+            log_price += block.sum()
+
+    @staticmethod
+    def _aggregate(base: pd.DataFrame, width: int) -> pd.DataFrame:
+        """Bars of `width` consecutive base rows (chunks are bar aligned)."""
+        if width == 1:
+            return base.copy()
+        n = len(base) // width * width
+        shape = (-1, width)
+        return pd.DataFrame({
+            'timestamp': base['timestamp'].iloc[:n:width].reset_index(drop=True),
+            'open': base['open'].to_numpy()[:n].reshape(shape)[:, 0],
+            'high': base['high'].to_numpy()[:n].reshape(shape).max(axis=1),
+            'low': base['low'].to_numpy()[:n].reshape(shape).min(axis=1),
+            'close': base['close'].to_numpy()[:n].reshape(shape)[:, -1],
+            'volume': np.round(base['volume'].to_numpy()[:n].reshape(shape).sum(axis=1), 8),
+        })
+
+    # -------------------------------------------------------------------------
+    # PLANTING
+    # -------------------------------------------------------------------------
+
+    def _sites(self, n_bars: int, every: int, spacing: int, margin: int,
+               rng: np.random.Generator) -> np.ndarray:
+        """
+        One jittered bar position per `every` bars, at least `spacing` bars
+        apart and `margin` bars from the chunk edges.
+        """
+        every = max(every, spacing)
+        if n_bars <= 2 * margin + every:
+            return np.zeros(0, dtype=np.int64)
+        starts = np.arange(margin, n_bars - margin - every, every)
+        return starts + rng.integers(0, every - spacing + 1, len(starts))
+
+    def _plant_fvgs(self, ret: np.ndarray, log_price: float, up: np.ndarray, down: np.ndarray,
+                    width: int, reserved: np.ndarray, rng: np.random.Generator) -> List[Tuple[int, str]]:
+        """
+        Shift the walk inside bar k so bar k+1 clears bar k-1 by fvg_gap.
+
+        Sites are at least 3 bars apart and the shift moves every later bar
+        by the same amount, so each gap can be sized from the unshifted walk.
+        """
+        n_bars = len(ret) // width
+        sites = self._sites(n_bars, self.fvg_every, 4, 2, rng)
+        if not len(sites):
+            return []
+
+        close = log_price + np.cumsum(ret)
+        open_ = np.r_[log_price, close[:-1]]
+        m = n_bars * width
+        bar_high = (np.maximum(open_, close) + up)[:m].reshape(-1, width).max(axis=1)
+        bar_low = (np.minimum(open_, close) - down)[:m].reshape(-1, width).min(axis=1)
+
+        planted = []
+        bullish = rng.random(len(sites)) < 0.5
+        for k, bull in zip(sites, bullish):
+            if bull:
+                shift = max(0.0, bar_high[k - 1] + self.fvg_gap - bar_low[k + 1])
+            else:
+                shift = min(0.0, bar_low[k - 1] - self.fvg_gap - bar_high[k + 1])
+            ret[k * width:(k + 1) * width] += shift / width
+            reserved[(k - 1) * width:(k + 2) * width] = True
+            planted.append((int(k), 'BULLISH' if bull else 'BEARISH'))
+        return planted
+
+    def _plant_sweeps(self, high: np.ndarray, low: np.ndarray, open_: np.ndarray, close: np.ndarray,
+                      width: int, reserved: np.ndarray, rng: np.random.Generator
+                      ) -> List[Tuple[int, int, str]]:
+        """
+        Deepen one wick in bar j past the extreme of bars j-w .. k-1, then
+        wick bar k through that level while its close stays on the
+        other side. Wicks avoid rows reserved by FVGs.
+        """
+        n_bars = len(high) // width
+        w = self.swing_width
+        min_gap, max_gap = max(w + 1, 4), 12
+        sites = self._sites(n_bars, self.sweep_every, max_gap + w + 2, w, rng)
+        if not len(sites):
+            return []
+
+        m = n_bars * width
+        bar_high = high[:m].reshape(-1, width).max(axis=1)
+        bar_low = low[:m].reshape(-1, width).min(axis=1)
+        margin = 0.0005
+
+        planted = []
+        for j in sites:
+            k = j + int(rng.integers(min_gap, max_gap + 1))
+            if k >= n_bars:
+                continue
+            bull = rng.random() < 0.5
+            depth = rng.uniform(0.001, 0.004)
+            rows_j = self._free_rows(j, width, reserved)
+            rows_k = self._free_rows(k, width, reserved)
+            if not len(rows_j) or not len(rows_k):
+                continue
+            span = np.r_[j - w:k]
+
+            if bull:
+                level = bar_low[span].min() - depth
+                if bar_low[k] <= level + margin:
+                    continue
+                low[rng.choice(rows_j)] = level
+                low[rng.choice(rows_k)] = level - rng.uniform(0.001, 0.004)
+                bar_low[j], bar_low[k] = low[j * width:(j + 1) * width].min(), low[k * width:(k + 1) * width].min()
+            else:
+                level = bar_high[span].max() + depth
+                if bar_high[k] >= level - margin:
+                    continue
+                high[rng.choice(rows_j)] = level
+                high[rng.choice(rows_k)] = level + rng.uniform(0.001, 0.004)
+                bar_high[j], bar_high[k] = high[j * width:(j + 1) * width].max(), high[k * width:(k + 1) * width].max()
+
+            reserved[(j - w) * width:(k + 1) * width] = True
+            planted.append((int(j), int(k), 'BULLISH' if bull else 'BEARISH'))
+        return planted
+
+    @staticmethod
+    def _free_rows(bar: int, width: int, reserved: np.ndarray) -> np.ndarray:
+        rows = np.arange(bar * width, (bar + 1) * width)
+        return rows[~reserved[rows]]
+
+# =============================================================================
+# WRITERS
+# =============================================================================
+
+def _csv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Candles in the data/*.csv layout (ISO timestamps with milliseconds and Z)."""
+    out = df.copy()
+    out['timestamp'] = out['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    return out
+
+
+def _csv_truth(truth: pd.DataFrame) -> pd.DataFrame:
+    out = truth.copy()
+    for col in ('timestamp', 'swing_timestamp'):
+        out[col] = pd.to_datetime(out[col], utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    return out
+
+
+def write_csv(market: SyntheticMarket, n_rows: int, timeframes: Sequence[str], out_dir: Path,
+              prefix: str = 'btc_usd_synthetic', chunk_rows: int = 1_000_000) -> Dict[str, Path]:
+    """
+    Stream the series to <out_dir>/<prefix>_<timeframe>.csv plus <prefix>_truth.csv.
+
+    Returns:
+        {timeframe or 'truth': path}
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {tf: out_dir / f"{prefix}_{tf}.csv" for tf in timeframes}
+    paths['truth'] = out_dir / f"{prefix}_truth.csv"
+
+    first = True
+    for chunk in market.iter_chunks(n_rows, timeframes, chunk_rows):
+        mode = 'w' if first else 'a'
+        for tf in timeframes:
+            _csv_frame(chunk.frames[tf]).to_csv(paths[tf], mode=mode, header=first, index=False)
+        _csv_truth(chunk.truth).to_csv(paths['truth'], mode=mode, header=first, index=False)
+        first = False
+    return paths
+
+
+def write_columns(market: SyntheticMarket, n_rows: int, timeframes: Sequence[str], out_dir: Path,
+                  prefix: str = 'btc_usd_synthetic', chunk_rows: int = 1_000_000) -> Dict[str, Path]:
+    """
+    Stream the series to one directory of .npy columns per timeframe
+    (timestamp as int64 ns, OHLCV as float64), each openable with
+    np.load(path, mmap_mode='r'), plus the truth as CSV.
+    """
+    out_dir = Path(out_dir)
+    base_ns = period_ns(market.base)
+    dirs = {tf: out_dir / f"{prefix}_{tf}" for tf in timeframes}
+    columns = {}
+    for tf, d in dirs.items():
+        d.mkdir(parents=True, exist_ok=True)
+        rows = n_rows * base_ns // period_ns(tf)
+        columns[tf] = {
+            col: np.lib.format.open_memmap(d / f"{col}.npy", mode='w+',
+                                           dtype=np.int64 if col == 'timestamp' else np.float64,
+                                           shape=(rows,))
+            for col in ['timestamp'] + OHLCV
+        }
+
+    truths = []
+    offsets = dict.fromkeys(timeframes, 0)
+    for chunk in market.iter_chunks(n_rows, timeframes, chunk_rows):
+        for tf in timeframes:
+            frame, start = chunk.frames[tf], offsets[tf]
+            end = start + len(frame)
+            columns[tf]['timestamp'][start:end] = frame['timestamp'].dt.tz_convert(None).to_numpy().view(np.int64)
+            for col in OHLCV:
+                columns[tf][col][start:end] = frame[col].to_numpy()
+            offsets[tf] = end
+        truths.append(chunk.truth)
+
+    for tf, d in dirs.items():
+        for mapped in columns[tf].values():
+            mapped.flush()
+        (d / 'meta.json').write_text(json.dumps({
+            'timeframe': tf, 'rows': offsets[tf], 'seed': market.seed, 'base': market.base,
+        }))
+
+    truth_path = out_dir / f"{prefix}_truth.csv"
+    _csv_truth(pd.concat(truths, ignore_index=True)).to_csv(truth_path, index=False)
+    return {**dirs, 'truth': truth_path}
+
+
+def read_columns(directory: Path) -> pd.DataFrame:
+    """Candles from a write_columns directory (columns memory-mapped)."""
+    directory = Path(directory)
+    rows = json.loads((directory / 'meta.json').read_text())['rows']
+    data = {col: np.load(directory / f"{col}.npy", mmap_mode='r')[:rows] for col in ['timestamp'] + OHLCV}
+    data['timestamp'] = pd.DatetimeIndex(np.asarray(data['timestamp']).view('datetime64[ns]')).tz_localize('UTC')
+    return pd.DataFrame(data)
+
+
+def write_postgres(market: SyntheticMarket, n_rows: int, timeframes: Sequence[str], out_dir: Path,
+                   prefix: str = 'btc_usd_synthetic', chunk_rows: int = 1_000_000) -> Dict[str, Path]:
+    """
+    Stream psql scripts that COPY the series into the candle tables
+    (candles_5m, candles_4h; other timeframes have no table and are skipped).
+
+    Load into an empty database with: psql -d trading_bot -f <file>
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tables = {tf: POSTGRES_TABLES[tf] for tf in timeframes if tf in POSTGRES_TABLES}
+    if not tables:
+        raise ValueError(f"No candle table for {list(timeframes)}; tables exist for {list(POSTGRES_TABLES)}")
+
+    paths = {tf: out_dir / f"{prefix}_{table}.sql" for tf, table in tables.items()}
+    files = {tf: open(path, 'w') for tf, path in paths.items()}
+    try:
+        for tf, f in files.items():
+            f.write(f"COPY {tables[tf]} (timestamp, open, high, low, close, volume) "
+                    "FROM STDIN WITH (FORMAT csv);\n")
+        for chunk in market.iter_chunks(n_rows, list(timeframes), chunk_rows):
+            for tf, f in files.items():
+                _csv_frame(chunk.frames[tf]).to_csv(f, header=False, index=False)
+        for f in files.values():
+            f.write("\\.\n")
+    finally:
+        for f in files.values():
+            f.close()
+    return paths
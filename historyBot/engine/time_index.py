@@ -0,0 +1,109 @@
+"""
+Sorted Time Index
+=================
+Binary-search window lookup over a sorted timestamp column.
+
+Resolves [t0, t1] to integer positions in O(log n) instead of building a
+full boolean mask per signal. Use slice()/window() for one signal and
+slice_batch() to resolve every signal in a single searchsorted call.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Tuple, Union
+
+TimeLike = Union[pd.Timestamp, np.datetime64, str, int]
+
+# 'both' -> t0 <= ts <= t1, 'left' -> t0 <= ts < t1, etc.
+_SIDES = {
+    'both': ('left', 'right'),
+    'left': ('left', 'left'),
+    'right': ('right', 'right'),
+    'neither': ('right', 'left'),
+}
+
+
+def to_int64_ns(values) -> np.ndarray:
+    """Convert a timestamp column or list to int64 nanoseconds (UTC)."""
+    values = np.asarray(values) if isinstance(values, list) else values
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+        return values.astype(np.int64)
+    return pd.DatetimeIndex(values).as_unit('ns').asi8
+
+
+def scalar_to_int64_ns(value: TimeLike) -> int:
+    """Convert a single timestamp to int64 nanoseconds (UTC)."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return pd.Timestamp(value).value
+
+
+class TimeIndex:
+    """
+    Integer-position lookup over a sorted timestamp column.
+    """
+
+    def __init__(self, timestamps):
+        self.ns = to_int64_ns(timestamps)
+        if len(self.ns) > 1 and (np.diff(self.ns) < 0).any():
+            raise ValueError("TimeIndex requires timestamps sorted ascending")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = 'timestamp') -> 'TimeIndex':
+        """Build from a DataFrame column."""
+        return cls(df[column])
+
+    def __len__(self) -> int:
+        return len(self.ns)
+
+    def slice(self, t0: TimeLike, t1: TimeLike, closed: str = 'both') -> slice:
+        """
+        Positional slice covering timestamps between t0 and t1.
+
+        Args:
+            t0: Window start
+            t1: Window end
+            closed: Which bounds are inclusive: 'both', 'left', 'right', 'neither'
+
+        Returns:
+            slice usable with df.iloc / numpy arrays
+        """
+        left_side, right_side = _SIDES[closed]
+        start = int(np.searchsorted(self.ns, scalar_to_int64_ns(t0), side=left_side))
+        end = int(np.searchsorted(self.ns, scalar_to_int64_ns(t1), side=right_side))
+        return slice(start, max(start, end))
+
+    def window(self, df: pd.DataFrame, t0: TimeLike, t1: TimeLike,
+               closed: str = 'both') -> pd.DataFrame:
+        """Rows of df between t0 and t1 (same rows as the equivalent boolean mask)."""
+        return df.iloc[self.slice(t0, t1, closed)]
+
+    def slice_batch(self, t0s, t1s, closed: str = 'both') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Resolve many windows at once.
+
+        Args:
+            t0s: Window starts
+            t1s: Window ends
+            closed: Which bounds are inclusive
+
+        Returns:
+            (starts, ends) position arrays, ends >= starts
+        """
+        left_side, right_side = _SIDES[closed]
+        starts = np.searchsorted(self.ns, to_int64_ns(t0s), side=left_side)
+        ends = np.searchsorted(self.ns, to_int64_ns(t1s), side=right_side)
+        return starts, np.maximum(starts, ends)
+
+    def last_at_or_before(self, t: TimeLike) -> int:
+        """Position of the last timestamp <= t, or -1 if none."""
+        return int(np.searchsorted(self.ns, scalar_to_int64_ns(t), side='right')) - 1
+
+    def first_after(self, t: TimeLike) -> int:
+        """Position of the first timestamp > t (len(self) if none)."""
+        return int(np.searchsorted(self.ns, scalar_to_int64_ns(t), side='right'))
+
+    def count_before(self, t: TimeLike, inclusive: bool = False) -> int:
+        """Number of timestamps < t (or <= t when inclusive)."""
+        side = 'right' if inclusive else 'left'
+        return int(np.searchsorted(self.ns, scalar_to_int64_ns(t), side=side))
@@ -0,0 +1,258 @@
+"""
+Multi-Timeframe Candles
+=======================
+Builds every timeframe (5M, 1H, 4H, ...) from the finest candles once and
+keeps the base-row span of each bar, so cross-timeframe lookups are array
+indexing instead of timestamp scans:
+
+    frames = load_timeframes('data/btc_usd_1m.csv', ['5min', '4h'])
+    a, b = frames.children('4h', '5min')   # 4H bar k <-> 5M rows [a[k], b[k])
+    k = frames.parent_of('5min', '4h')     # 5M row j -> 4H bar k[j]
+
+Bars are fixed-width and aligned to the epoch, which for periods that
+divide a day gives the same bars as df.resample(rule).agg(OHLCV).dropna().
+
+load_timeframes persists the result next to the cache. An unchanged file
+loads the stored frames directly; a file that only gained rows at the end
+(a new fetch) is extended with append(), which re-aggregates from the last,
+possibly partial, bar of each timeframe instead of resampling everything.
+"""
+
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from engine.time_index import TimeIndex, to_int64_ns
+
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+
+# Bump when the stored layout changes so old stores are rebuilt
+_STORE_VERSION = 1
+
+# Aliases older pandas accepted ('5T', '4H') and newer versions reject
+_LEGACY_UNITS = {'T': 'min', 'H': 'h', 'S': 's', 'L': 'ms'}
+
+
+def period_ns(rule: str) -> int:
+    """Fixed bar width of a pandas rule ('5min', '5T', '4h', '4H') in ns."""
+    try:
+        return to_offset(rule).nanos
+    except ValueError:
+        unit = rule.lstrip('0123456789')
+        if unit not in _LEGACY_UNITS:
+            raise
+        return to_offset(rule[:len(rule) - len(unit)] + _LEGACY_UNITS[unit]).nanos
+
+
+def _spans(ns: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Base-row [start, end) of every non-empty bar of the given width."""
+    if len(ns) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    bars = ns // width
+    starts = np.flatnonzero(np.r_[True, bars[1:] != bars[:-1]])
+    ends = np.r_[starts[1:], len(ns)]
+    return starts, ends
+
+
+def _aggregate(base: pd.DataFrame, ns: np.ndarray, width: int,
+               starts: np.ndarray, ends: np.ndarray) -> pd.DataFrame:
+    """OHLCV bars for the given spans, timestamped at the bar open."""
+    bar_ns = ns[starts] // width * width
+    timestamps = pd.DatetimeIndex(bar_ns.view('datetime64[ns]'))
+    if isinstance(base['timestamp'].dtype, pd.DatetimeTZDtype):
+        timestamps = timestamps.tz_localize('UTC').tz_convert(base['timestamp'].dt.tz)
+    frame = {'timestamp': timestamps.as_unit(base['timestamp'].dt.unit)}
+
+    if len(starts):
+        frame['open'] = base['open'].to_numpy()[starts]
+        frame['high'] = np.maximum.reduceat(base['high'].to_numpy(), starts)
+        frame['low'] = np.minimum.reduceat(base['low'].to_numpy(), starts)
+        frame['close'] = base['close'].to_numpy()[ends - 1]
+        # groupby sum (compensated) so volumes match resample bit for bit
+        labels = np.repeat(np.arange(len(starts)), ends - starts)
+        frame['volume'] = base['volume'].iloc[starts[0]:ends[-1]].groupby(labels).sum().to_numpy()
+    else:
+        for col in OHLCV:
+            frame[col] = np.zeros(0, dtype=base[col].dtype)
+    return pd.DataFrame(frame)
+
+
+def aggregate(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """
+    Aggregate sorted candles to a coarser fixed-width timeframe.
+
+    Drop-in for df.set_index('timestamp').resample(rule).agg(OHLCV)
+    .dropna().reset_index() on gap-free OHLCV data.
+    """
+    df = df.sort_values('timestamp').reset_index(drop=True)
+    ns = to_int64_ns(df['timestamp'])
+    width = period_ns(rule)
+    starts, ends = _spans(ns, width)
+    return _aggregate(df, ns, width, starts, ends)
+
+
+class Timeframes:
+    """
+    Base candles, every aggregated timeframe, and the spans linking them.
+    """
+
+    def __init__(self, base: pd.DataFrame, rules: Sequence[str]):
+        self.base = base.sort_values('timestamp').reset_index(drop=True)
+        self.rules = list(rules)
+        self.ns = to_int64_ns(self.base['timestamp'])
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.spans: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._maps: Dict[Tuple[str, Optional[str]], Tuple[np.ndarray, np.ndarray]] = {}
+        for rule in self.rules:
+            width = period_ns(rule)
+            starts, ends = _spans(self.ns, width)
+            self.spans[rule] = (starts, ends)
+            self.frames[rule] = _aggregate(self.base, self.ns, width, starts, ends)
+
+    def __getitem__(self, rule: str) -> pd.DataFrame:
+        return self.frames[rule]
+
+    def time_index(self, rule: Optional[str] = None) -> TimeIndex:
+        """TimeIndex over a timeframe (None = base candles)."""
+        return TimeIndex.from_frame(self.base if rule is None else self.frames[rule])
+
+    def children(self, parent: str, child: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Child rows of every parent bar.
+
+        Args:
+            parent: Coarser rule, e.g. '4h'
+            child: Finer rule, or None for the base candles
+
+        Returns:
+            (a, b): parent bar k covers child rows [a[k], b[k])
+        """
+        key = (parent, child)
+        if key not in self._maps:
+            parent_starts, parent_ends = self.spans[parent]
+            if child is None:
+                self._maps[key] = (parent_starts, parent_ends)
+            else:
+                # Bars nest, so child bars inside a parent are those whose
+                # first base row falls in the parent's base span
+                child_starts = self.spans[child][0]
+                self._maps[key] = (np.searchsorted(child_starts, parent_starts),
+                                   np.searchsorted(child_starts, parent_ends))
+        return self._maps[key]
+
+    def parent_of(self, child: Optional[str], parent: str) -> np.ndarray:
+        """Parent bar index of every child row (child None = base candles)."""
+        first_rows = np.arange(len(self.ns)) if child is None else self.spans[child][0]
+        return np.searchsorted(self.spans[parent][0], first_rows, side='right') - 1
+
+    def append(self, rows: pd.DataFrame) -> int:
+        """
+        Add base candles newer than the last one and extend every timeframe.
+
+        Only the last bar of each timeframe (which may have been partial)
+        and the bars after it are recomputed.
+
+        Returns:
+            Number of base rows added
+        """
+        rows = rows.sort_values('timestamp')
+        new_ns = to_int64_ns(rows['timestamp'])
+        if len(self.ns):
+            keep = new_ns > self.ns[-1]
+            rows, new_ns = rows[keep], new_ns[keep]
+        if len(rows) == 0:
+            return 0
+
+        self.base = pd.concat([self.base, rows[self.base.columns]], ignore_index=True)
+        self.ns = np.concatenate([self.ns, new_ns])
+
+        for rule in self.rules:
+            width = period_ns(rule)
+            starts, ends = self.spans[rule]
+            first = int(starts[-1]) if len(starts) else 0
+            tail_starts, tail_ends = _spans(self.ns[first:], width)
+            tail_starts, tail_ends = tail_starts + first, tail_ends + first
+            kept = max(len(starts) - 1, 0)
+            self.spans[rule] = (np.concatenate([starts[:kept], tail_starts]),
+                                np.concatenate([ends[:kept], tail_ends]))
+            tail = _aggregate(self.base, self.ns, width, tail_starts, tail_ends)
+            self.frames[rule] = pd.concat([self.frames[rule].iloc[:kept], tail], ignore_index=True)
+
+        self._maps.clear()
+        return len(rows)
+
+    def matches_prefix(self, df: pd.DataFrame) -> bool:
+        """True if df starts with exactly the stored base candles."""
+        n = len(self.base)
+        if len(df) < n:
+            return False
+        head = df.iloc[:n]
+        return (np.array_equal(to_int64_ns(head['timestamp']), self.ns) and
+                all(np.array_equal(head[col].to_numpy(), self.base[col].to_numpy()) for col in OHLCV))
+
+
+def read_candles(path: Union[str, Path]) -> pd.DataFrame:
+    """OHLCV CSV with parsed timestamps, sorted ascending."""
+    df = pd.read_csv(path)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df.sort_values('timestamp').reset_index(drop=True)
+
+
+def default_store_dir() -> Path:
+    """historyBot/data/.cache/timeframes (HISTORYBOT_CACHE_DIR overrides the root)."""
+    root = os.environ.get('HISTORYBOT_CACHE_DIR',
+                          str(Path(__file__).resolve().parents[1] / 'data' / '.cache'))
+    return Path(root) / 'timeframes'
+
+
+def load_timeframes(path: Union[str, Path], rules: Sequence[str],
+                    store_dir: Optional[Path] = None) -> Timeframes:
+    """
+    Timeframes for a candle CSV, reusing the persisted build when possible.
+
+    Args:
+        path: Finest-resolution candle CSV (1M or 5M)
+        rules: Timeframes to build, e.g. ['5min', '4h']
+        store_dir: Where builds are persisted (default: default_store_dir())
+
+    Returns:
+        Timeframes with base = the CSV's candles
+    """
+    path = Path(path)
+    store_dir = Path(store_dir) if store_dir else default_store_dir()
+    store = store_dir / f"{path.stem}__{'_'.join(rules)}.pkl"
+    st = path.stat()
+    stamp = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+    stored = None
+    try:
+        with open(store, 'rb') as f:
+            version, stored_stamp, stored = pickle.load(f)
+        if version != _STORE_VERSION:
+            stored = None
+        elif stored_stamp == stamp:
+            return stored
+    except FileNotFoundError:
+        pass
+    except Exception:
+        stored = None  # Unreadable store: rebuild
+
+    df = read_candles(path)
+    if stored is not None and stored.matches_prefix(df):
+        stored.append(df.iloc[len(stored.base):])
+        frames = stored
+    else:
+        frames = Timeframes(df, rules)
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    tmp = store.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        pickle.dump((_STORE_VERSION, stamp, frames), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, store)
+    return frames
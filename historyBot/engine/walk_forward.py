@@ -0,0 +1,183 @@
+"""
+Walk-Forward Harness
+====================
+Roll train/test windows across a dataset, pick the best config on each
+train window and score it on the following test window.
+
+Features (RSI, swings, regimes, ...) are computed once by the caller and
+handed to every worker. Each config is run once over the full history in
+a process pool; folds then only slice that config's signal table by time,
+so adding folds costs almost nothing. Train windows drop signals inside
+the embargo before train_end, whose outcome windows would otherwise reach
+into the test period.
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from engine.parallel import pool_context, worker_count
+
+# run_config(features, config) -> one row per signal, with a time column
+RunConfig = Callable[[Any, dict], pd.DataFrame]
+# metrics(rows) -> dict, or None when there is nothing to score
+Metrics = Callable[[pd.DataFrame], Optional[dict]]
+# score(metrics) -> sortable value, higher is better
+Score = Callable[[dict], Any]
+
+
+@dataclass
+class Fold:
+    """One train/test split (half-open [start, end) windows)."""
+    index: int
+    train_start: pd.Timestamp
+    train_end: pd.Timestamp
+    test_start: pd.Timestamp
+    test_end: pd.Timestamp
+
+
+def rolling_folds(start, end, train: str, test: str, step: Optional[str] = None,
+                  anchored: bool = False) -> List[Fold]:
+    """
+    Build consecutive folds between start and end.
+
+    Args:
+        start: First timestamp of the dataset
+        end: Last timestamp of the dataset
+        train: Train window length, e.g. '180D'
+        test: Test window length, e.g. '60D'
+        step: Shift between folds (defaults to test, so test windows tile)
+        anchored: Keep every train window starting at `start` (expanding)
+
+    Returns:
+        List of Fold; the last test window may be shorter than `test`
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    train, test = pd.Timedelta(train), pd.Timedelta(test)
+    step = pd.Timedelta(step) if step is not None else test
+
+    folds = []
+    train_start = start
+    train_end = start + train
+    while train_end < end:
+        test_end = min(train_end + test, end + pd.Timedelta(1, 'ns'))
+        folds.append(Fold(len(folds), train_start, train_end, train_end, test_end))
+        train_end += step
+        if not anchored:
+            train_start += step
+    return folds
+
+
+@dataclass
+class WalkForwardResult:
+    """Per-fold choices plus the pooled out-of-sample rows and metrics."""
+    folds: pd.DataFrame
+    oos_rows: pd.DataFrame
+    oos_metrics: Optional[dict]
+    signals: Dict[str, pd.DataFrame] = field(repr=False)
+
+
+# Worker-process state, set once per process by _init_worker
+_worker_features = None
+_worker_run_config: Optional[RunConfig] = None
+
+
+def _init_worker(run_config, features):
+    global _worker_features, _worker_run_config
+    _worker_features = features
+    _worker_run_config = run_config
+
+
+def _run_one(name, config):
+    return name, _worker_run_config(_worker_features, config)
+
+
+class WalkForward:
+    """
+    Walk-forward optimization over a fixed set of named configs.
+    """
+
+    def __init__(self, run_config: RunConfig, metrics: Metrics, score: Score,
+                 time_column: str = 'timestamp', embargo: Optional[str] = None,
+                 workers: Optional[int] = None):
+        self.run_config = run_config
+        self.metrics = metrics
+        self.score = score
+        self.time_column = time_column
+        self.embargo = pd.Timedelta(embargo) if embargo is not None else pd.Timedelta(0)
+        self.workers = worker_count(workers)
+
+    def run_configs(self, features, configs: Dict[str, dict]) -> Dict[str, pd.DataFrame]:
+        """Run every config once over the full history (in parallel)."""
+        context = pool_context()
+        if self.workers <= 1 or len(configs) <= 1 or context is None:
+            _init_worker(self.run_config, features)
+            return dict(_run_one(name, config) for name, config in configs.items())
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(configs)), mp_context=context,
+            initializer=_init_worker, initargs=(self.run_config, features)
+        ) as pool:
+            futures = [pool.submit(_run_one, name, config) for name, config in configs.items()]
+            return dict(future.result() for future in futures)
+
+    def _window(self, rows: pd.DataFrame, start, end) -> pd.DataFrame:
+        if rows.empty:
+            return rows
+        ts = rows[self.time_column]
+        return rows[(ts >= start) & (ts < end)]
+
+    def run(self, features, configs: Dict[str, dict], folds: List[Fold]) -> WalkForwardResult:
+        """
+        Optimize on each train window, evaluate on its test window.
+
+        Args:
+            features: Precomputed inputs passed to run_config
+            configs: Name -> config dict
+            folds: Train/test splits (see rolling_folds)
+
+        Returns:
+            WalkForwardResult
+        """
+        signals = self.run_configs(features, configs)
+
+        fold_rows = []
+        oos_parts = []
+        for fold in folds:
+            best_name, best_score, best_train = None, None, None
+            for name, rows in signals.items():
+                train_rows = self._window(rows, fold.train_start, fold.train_end - self.embargo)
+                train_metrics = self.metrics(train_rows)
+                if train_metrics is None:
+                    continue
+                s = self.score(train_metrics)
+                if best_score is None or s > best_score:
+                    best_name, best_score, best_train = name, s, train_metrics
+
+            record = {
+                'fold': fold.index,
+                'train_start': fold.train_start,
+                'train_end': fold.train_end,
+                'test_start': fold.test_start,
+                'test_end': fold.test_end,
+                'config': best_name,
+            }
+            if best_name is None:
+                fold_rows.append(record)
+                continue
+
+            test_rows = self._window(signals[best_name], fold.test_start, fold.test_end)
+            test_metrics = self.metrics(test_rows)
+            record.update({f'train_{k}': v for k, v in best_train.items() if np.isscalar(v)})
+            if test_metrics is not None:
+                record.update({f'test_{k}': v for k, v in test_metrics.items() if np.isscalar(v)})
+            fold_rows.append(record)
+
+            if not test_rows.empty:
+                oos_parts.append(test_rows.assign(fold=fold.index, config=best_name))
+
+        oos_rows = pd.concat(oos_parts, ignore_index=True) if oos_parts else pd.DataFrame()
+        oos_metrics = self.metrics(oos_rows) if not oos_rows.empty else None
+        return WalkForwardResult(pd.DataFrame(fold_rows), oos_rows, oos_metrics, signals)
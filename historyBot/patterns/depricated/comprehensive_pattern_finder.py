@@ -4,9 +4,15 @@ Comprehensive Pattern Finder
 Goal: Find ANY patterns with high win rates, then assess what R/R is achievable
 """
 
+import sys
 import pandas as pd
 import numpy as np
-from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.pattern_miner import (
+    PatternMiner, standard_conditions, LONG_EXCLUDED_FAMILIES, SHORT_EXCLUDED_FAMILIES
+)
 
 # Load data
 df = pd.read_csv('data/btc_usdc_5m.csv')
@@ -37,64 +43,6 @@ def calculate_rsi(df, period=14):
 def calculate_ema(series, period):
     return series.ewm(span=period, adjust=False).mean()
 
-def simulate_trade(df, entry_idx, direction, stop_pct, target_pct, max_candles=288):
-    if entry_idx >= len(df) - 1:
-        return None
-
-    entry_price = df['close'].iloc[entry_idx]
-
-    if direction == 'LONG':
-        stop_price = entry_price * (1 - stop_pct)
-        target_price = entry_price * (1 + target_pct)
-    else:
-        stop_price = entry_price * (1 + stop_pct)
-        target_price = entry_price * (1 - target_pct)
-
-    for i in range(entry_idx + 1, min(entry_idx + max_candles + 1, len(df))):
-        high = df['high'].iloc[i]
-        low = df['low'].iloc[i]
-
-        if direction == 'LONG':
-            if low <= stop_price:
-                return 'LOSS'
-            if high >= target_price:
-                return 'WIN'
-        else:
-            if high >= stop_price:
-                return 'LOSS'
-            if low <= target_price:
-                return 'WIN'
-
-    return None
-
-def test_pattern(df, signals, direction, stop_pct, target_pct, min_trades=3):
-    wins = 0
-    losses = 0
-    last_exit = 0
-
-    for idx in signals:
-        if idx <= last_exit + 5:  # Minimum gap between trades
-            continue
-        result = simulate_trade(df, idx, direction, stop_pct, target_pct)
-        if result == 'WIN':
-            wins += 1
-            last_exit = idx
-        elif result == 'LOSS':
-            losses += 1
-            last_exit = idx
-
-    total = wins + losses
-    if total < min_trades:
-        return None
-
-    return {
-        'wins': wins,
-        'losses': losses,
-        'total': total,
-        'win_rate': (wins / total) * 100,
-        'rr': target_pct / stop_pct
-    }
-
 # ============================================================
 # CALCULATE ALL INDICATORS
 # ============================================================
@@ -154,85 +102,17 @@ df['hour'] = df['timestamp'].dt.hour
 print("Done.\n")
 
 # ============================================================
-# PATTERN DEFINITIONS - Many combinations
+# PATTERN DEFINITIONS - Mined from atomic conditions
 # ============================================================
 
-patterns = []
-
-# RSI extremes
-for rsi_thresh in [10, 12, 15, 18, 20, 22, 25]:
-    patterns.append((f'RSI < {rsi_thresh} + Bullish',
-                     df[(df['rsi'] < rsi_thresh) & (df['bullish'])].index.tolist(), 'LONG'))
-
-for rsi_thresh in [80, 82, 85, 88, 90]:
-    patterns.append((f'RSI > {rsi_thresh} + Bearish',
-                     df[(df['rsi'] > rsi_thresh) & (df['bearish'])].index.tolist(), 'SHORT'))
-
-# RSI + Volume
-for rsi in [15, 20, 25, 30]:
-    for vol in [2, 2.5, 3, 4]:
-        patterns.append((f'RSI<{rsi} + Vol>{vol}x + Bullish',
-                        df[(df['rsi'] < rsi) & (df['vol_ratio'] > vol) & (df['bullish'])].index.tolist(), 'LONG'))
-
-for rsi in [70, 75, 80, 85]:
-    for vol in [2, 2.5, 3, 4]:
-        patterns.append((f'RSI>{rsi} + Vol>{vol}x + Bearish',
-                        df[(df['rsi'] > rsi) & (df['vol_ratio'] > vol) & (df['bearish'])].index.tolist(), 'SHORT'))
+# Every conjunction of up to MAX_DEPTH conditions (plus candle color) with
+# at least MIN_SUPPORT signals, instead of a hand-built threshold list
+MAX_DEPTH = 3
+MIN_SUPPORT = 10
 
-# BB extremes
-patterns.append(('BB Lower Touch + Bullish',
-                 df[(df['low'] < df['bb_lower']) & (df['close'] > df['bb_lower']) & (df['bullish'])].index.tolist(), 'LONG'))
-patterns.append(('BB Upper Touch + Bearish',
-                 df[(df['high'] > df['bb_upper']) & (df['close'] < df['bb_upper']) & (df['bearish'])].index.tolist(), 'SHORT'))
-
-# Consecutive candles
-for n in [5, 6, 7, 8, 9, 10]:
-    patterns.append((f'{n}+ Red Then Green',
-                    df[(df['consec_red'].shift(1) >= n) & (df['bullish'])].index.tolist(), 'LONG'))
-    patterns.append((f'{n}+ Green Then Red',
-                    df[(df['consec_green'].shift(1) >= n) & (df['bearish'])].index.tolist(), 'SHORT'))
-
-# Price drops
-for drop in [0.5, 0.8, 1.0, 1.2, 1.5, 2.0]:
-    patterns.append((f'1-Candle Drop >{drop}% Then Bullish',
-                    df[(df['pct_1'].shift(1) < -drop) & (df['bullish'])].index.tolist(), 'LONG'))
-    patterns.append((f'1-Candle Pump >{drop}% Then Bearish',
-                    df[(df['pct_1'].shift(1) > drop) & (df['bearish'])].index.tolist(), 'SHORT'))
-
-# Multi-hour drops
-for drop in [1.5, 2, 2.5, 3, 4]:
-    patterns.append((f'1H Drop >{drop}% Then Bullish',
-                    df[(df['pct_12'] < -drop) & (df['bullish'])].index.tolist(), 'LONG'))
-    patterns.append((f'4H Drop >{drop}% Then Bullish',
-                    df[(df['pct_48'] < -drop) & (df['bullish'])].index.tolist(), 'LONG'))
-
-# Hammer patterns
-patterns.append(('Strong Hammer (wick > 2x body)',
-                df[(df['lower_wick'] > df['body'] * 2) & (df['upper_wick'] < df['body'] * 0.3) & (df['bullish'])].index.tolist(), 'LONG'))
-patterns.append(('Shooting Star (wick > 2x body)',
-                df[(df['upper_wick'] > df['body'] * 2) & (df['lower_wick'] < df['body'] * 0.3) & (df['bearish'])].index.tolist(), 'SHORT'))
-
-# Low sweep + recovery
-patterns.append(('20-Bar Low Sweep + Bullish',
-                df[(df['low'] < df['low_20'].shift(1)) & (df['close'] > df['low_20'].shift(1)) & (df['bullish'])].index.tolist(), 'LONG'))
-patterns.append(('20-Bar High Sweep + Bearish',
-                df[(df['high'] > df['high_20'].shift(1)) & (df['close'] < df['high_20'].shift(1)) & (df['bearish'])].index.tolist(), 'SHORT'))
-
-# Extreme multi-confluence
-patterns.append(('RSI<20 + BB<Lower + Vol>2x + Bullish',
-                df[(df['rsi'] < 20) & (df['low'] < df['bb_lower']) & (df['vol_ratio'] > 2) & (df['bullish'])].index.tolist(), 'LONG'))
-patterns.append(('RSI<15 + BB<Lower + Vol>3x + Hammer',
-                df[(df['rsi'] < 15) & (df['low'] < df['bb_lower']) & (df['vol_ratio'] > 3) & (df['lower_wick'] > df['body'])].index.tolist(), 'LONG'))
-patterns.append(('RSI<25 + 5+Red + Bullish',
-                df[(df['rsi'] < 25) & (df['consec_red'].shift(1) >= 5) & (df['bullish'])].index.tolist(), 'LONG'))
-patterns.append(('RSI<20 + Drop>1% + Bullish',
-                df[(df['rsi'] < 20) & (df['pct_1'].shift(1) < -1) & (df['bullish'])].index.tolist(), 'LONG'))
-
-# Session-based
-patterns.append(('Asian (00-08 UTC) RSI<25 Bullish',
-                df[(df['hour'] >= 0) & (df['hour'] < 8) & (df['rsi'] < 25) & (df['bullish'])].index.tolist(), 'LONG'))
-patterns.append(('NY (13-21 UTC) RSI<25 + Vol>2x Bullish',
-                df[(df['hour'] >= 13) & (df['hour'] < 21) & (df['rsi'] < 25) & (df['vol_ratio'] > 2) & (df['bullish'])].index.tolist(), 'LONG'))
+conditions = standard_conditions(df)
+print(f"Atomic conditions: {len(conditions.conditions)}")
+print()
 
 print("=" * 90)
 print("COMPREHENSIVE PATTERN ANALYSIS")
@@ -247,26 +127,33 @@ all_results = []
 stop_losses = [0.002, 0.003, 0.004, 0.005, 0.006, 0.008, 0.01]
 rr_ratios = [1.5, 2, 2.5, 3, 4, 5, 6, 7, 8, 10]
 
-print("Testing all pattern/stop/RR combinations...")
+print("Mining pattern/stop/RR combinations...")
 print()
 
-for name, signals, direction in patterns:
-    if len(signals) < 3:
-        continue
-
-    for stop in stop_losses:
-        for rr in rr_ratios:
-            target = stop * rr
-            result = test_pattern(df, signals, direction, stop, target)
-            if result and result['total'] >= 3:
-                all_results.append({
-                    'name': name,
-                    'direction': direction,
-                    'stop': stop,
-                    'target': target,
-                    'rr': rr,
-                    **result
-                })
+# 24h max hold, min 5 candles between trades
+miner = PatternMiner(df, conditions, max_bars=288)
+
+for direction, color, excluded in [('LONG', 'Bullish', LONG_EXCLUDED_FAMILIES),
+                                   ('SHORT', 'Bearish', SHORT_EXCLUDED_FAMILIES)]:
+    mined = miner.mine(direction, stop_losses, rr_ratios, max_depth=MAX_DEPTH,
+                       min_support=MIN_SUPPORT, required=[color],
+                       exclude_families=excluded, min_gap=5, min_trades=3)
+    print(f"{direction}: {mined['pattern'].nunique()} patterns scored")
+
+    for cell in mined.itertuples(index=False):
+        all_results.append({
+            'name': cell.pattern,
+            'direction': direction,
+            'stop': cell.stop,
+            'target': cell.target,
+            'wins': int(cell.wins),
+            'losses': int(cell.losses),
+            'total': int(cell.total),
+            'win_rate': cell.win_rate,
+            'rr': cell.rr
+        })
+
+print()
 
 # Sort by win rate
 all_results.sort(key=lambda x: (x['win_rate'], x['rr']), reverse=True)
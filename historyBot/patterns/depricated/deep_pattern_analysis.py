@@ -4,8 +4,13 @@ Deep Pattern Analysis
 Focus on the most promising patterns with ultra-strict criteria
 """
 
+import sys
 import pandas as pd
 import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.grid_eval import GridEvaluator
 
 # Load data
 df = pd.read_csv('data/btc_usdc_5m.csv')
@@ -325,34 +330,54 @@ print("=" * 90)
 print()
 
 best_patterns_per_rr = {}
+rr_grid = [1.2, 1.5, 2, 2.5, 3, 4, 5]
+stop_grid = [0.002, 0.003, 0.004, 0.005, 0.006, 0.008, 0.01]
+
+# Test the most promising patterns
+test_patterns = [
+    ('1-Candle Drop >1% + Bullish',
+     df[(df['pct_1'].shift(1) < -1) & (df['bullish'])].index.tolist(), 'LONG'),
+    ('1-Candle Drop >0.8% + Bullish',
+     df[(df['pct_1'].shift(1) < -0.8) & (df['bullish'])].index.tolist(), 'LONG'),
+    ('RSI<20 + Bullish',
+     df[(df['rsi'] < 20) & (df['bullish'])].index.tolist(), 'LONG'),
+    ('RSI<25 + Vol>2x + Bullish',
+     df[(df['rsi'] < 25) & (df['vol_ratio'] > 2) & (df['bullish'])].index.tolist(), 'LONG'),
+    ('NY Session RSI<25 + Vol>2x',
+     df[(df['hour'] >= 13) & (df['hour'] < 21) & (df['rsi'] < 25) & (df['vol_ratio'] > 2) & (df['bullish'])].index.tolist(), 'LONG'),
+    ('BB Lower + RSI<30 + Bullish',
+     df[(df['low'] < df['bb_lower']) & (df['rsi'] < 30) & (df['bullish'])].index.tolist(), 'LONG'),
+    ('5+ Red Then Green',
+     df[(df['consec_red'].shift(1) >= 5) & (df['bullish'])].index.tolist(), 'LONG'),
+]
+
+# Whole stop x R/R grid per pattern in one call
+grid = GridEvaluator.from_frame(df, max_bars=288)
+surfaces = {
+    name: grid.surface(signals, direction, stop_grid, rr_ratios=rr_grid,
+                       min_gap=3, min_trades=5)
+    for name, signals, direction in test_patterns
+}
+
+def grid_result(name, stop, rr):
+    """Look up one stop/RR cell of a pattern's surface (None if too few trades)"""
+    surface = surfaces[name]
+    cell = surface[(surface['stop'] == stop) & (surface['target'] == stop * rr)]
+    if cell.empty:
+        return None
+    cell = cell.iloc[0]
+    return {'wins': int(cell['wins']), 'losses': int(cell['losses']),
+            'total': int(cell['total']), 'wr': cell['win_rate']}
 
-for rr in [1.2, 1.5, 2, 2.5, 3, 4, 5]:
+for rr in rr_grid:
     best_wr = 0
     best_pattern = None
 
-    for stop in [0.002, 0.003, 0.004, 0.005, 0.006, 0.008, 0.01]:
+    for stop in stop_grid:
         target = stop * rr
 
-        # Test the most promising patterns
-        test_patterns = [
-            ('1-Candle Drop >1% + Bullish',
-             df[(df['pct_1'].shift(1) < -1) & (df['bullish'])].index.tolist(), 'LONG'),
-            ('1-Candle Drop >0.8% + Bullish',
-             df[(df['pct_1'].shift(1) < -0.8) & (df['bullish'])].index.tolist(), 'LONG'),
-            ('RSI<20 + Bullish',
-             df[(df['rsi'] < 20) & (df['bullish'])].index.tolist(), 'LONG'),
-            ('RSI<25 + Vol>2x + Bullish',
-             df[(df['rsi'] < 25) & (df['vol_ratio'] > 2) & (df['bullish'])].index.tolist(), 'LONG'),
-            ('NY Session RSI<25 + Vol>2x',
-             df[(df['hour'] >= 13) & (df['hour'] < 21) & (df['rsi'] < 25) & (df['vol_ratio'] > 2) & (df['bullish'])].index.tolist(), 'LONG'),
-            ('BB Lower + RSI<30 + Bullish',
-             df[(df['low'] < df['bb_lower']) & (df['rsi'] < 30) & (df['bullish'])].index.tolist(), 'LONG'),
-            ('5+ Red Then Green',
-             df[(df['consec_red'].shift(1) >= 5) & (df['bullish'])].index.tolist(), 'LONG'),
-        ]
-
         for name, signals, direction in test_patterns:
-            res = test_pattern(df, signals, direction, stop, target, min_trades=5)
+            res = grid_result(name, stop, rr)
             if res and res['wr'] > best_wr:
                 best_wr = res['wr']
                 best_pattern = (name, res, stop, target)
@@ -426,10 +451,14 @@ print()
 print(f"{'R/R':<8} {'Stop':<8} {'Target':<10} {'WR%':<8} {'Trades':<8} {'EV/Trade':<10}")
 print("-" * 60)
 
+best_surface = grid.surface(signals, 'LONG', [0.002, 0.003, 0.004, 0.005],
+                            rr_ratios=[1.5, 2, 3, 4, 5, 6, 8, 10], min_gap=3, min_trades=3)
+
 for rr in [1.5, 2, 3, 4, 5, 6, 8, 10]:
     for stop in [0.002, 0.003, 0.004, 0.005]:
         target = stop * rr
-        res = test_pattern(df, signals, 'LONG', stop, target, min_trades=3)
+        cell = best_surface[(best_surface['stop'] == stop) & (best_surface['target'] == target)]
+        res = {'wr': cell['win_rate'].iloc[0], 'total': int(cell['total'].iloc[0])} if len(cell) else None
         if res:
             ev = (res['wr']/100 * rr) - ((100-res['wr'])/100)
             print(f"1:{rr:<5} {stop*100:.1f}%     {target*100:.1f}%       {res['wr']:.0f}%      {res['total']:<8} {ev:.2f}R")
@@ -9,9 +9,14 @@ Risk: 3.5% stop loss, 3.5% take profit (1:1 R:R)
 Max Hold: 72 hours (18 x 4H candles)
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from engine.grid_eval import GridEvaluator, WIN, LOSS
 
 
 def calc_rsi(series: pd.Series, period: int = 14) -> pd.Series:
@@ -82,20 +87,21 @@ def backtest(df: pd.DataFrame, risk_pct: float = 3.5,
     # Prepare data
     df = prepare_data(df)
 
-    # Add future prices for backtesting
-    for i in range(1, max_candles + 1):
-        df[f'future{i}_high'] = df['high'].shift(-i)
-        df[f'future{i}_low'] = df['low'].shift(-i)
-
     # Detect signals
     signals = detect_signal(df, rsi_threshold, cum_drop_threshold)
+    positions = np.flatnonzero(signals.to_numpy())
+    positions = positions[positions < len(df) - max_candles]
 
-    trades = []
+    # First stop/target touch for every signal at once (stop checked first)
+    grid = GridEvaluator.from_frame(df, max_bars=max_candles)
+    outcomes, exit_positions = grid.outcomes(
+        positions, 'LONG', [risk_pct / 100], [risk_pct / 100]
+    )
 
-    for idx in df[signals].index:
-        if idx >= len(df) - max_candles:
-            continue
+    trades = []
 
+    for pos, outcome, exit_pos in zip(positions, outcomes[:, 0, 0], exit_positions[:, 0, 0]):
+        idx = df.index[pos]
         entry = df.loc[idx, 'close']
         ts = df.loc[idx, 'timestamp'] if 'timestamp' in df.columns else idx
         rsi = df.loc[idx, 'rsi_14']
@@ -108,26 +114,14 @@ def backtest(df: pd.DataFrame, risk_pct: float = 3.5,
         exit_candle = None
         exit_price = None
 
-        for i in range(1, max_candles + 1):
-            future_high = df.loc[idx, f'future{i}_high']
-            future_low = df.loc[idx, f'future{i}_low']
-
-            if pd.isna(future_high) or pd.isna(future_low):
-                break
-
-            # Check stop loss first (conservative)
-            if future_low <= stop:
-                result = 'LOSS'
-                exit_candle = i
-                exit_price = stop
-                break
-
-            # Check take profit
-            if future_high >= target:
-                result = 'WIN'
-                exit_candle = i
-                exit_price = target
-                break
+        if outcome == LOSS:
+            result = 'LOSS'
+            exit_candle = int(exit_pos - pos)
+            exit_price = stop
+        elif outcome == WIN:
+            result = 'WIN'
+            exit_candle = int(exit_pos - pos)
+            exit_price = target
 
         if result:
             trades.append({
@@ -0,0 +1,196 @@
+"""
+Contract Pipeline
+=================
+The four locked contracts as one cached pipeline:
+
+    4H bias      RSI_ASYM_CONFIRM sweeps            (4H_BIAS_CONTRACT)
+    1H session   NY_OPEN blocked, NY_MID preferred  (1H_SESSION_CONTRACT)
+    5M execution RECLAIM_LEVEL within 4h            (5M_EXECUTION_CONTRACT)
+    1M entry     limit at the 1M extreme, 30 min    (1M_ENTRY_CONTRACT)
+
+Each layer takes the previous layer's signal batch (a DataFrame) and its
+output is cached by engine.pipeline. Editing one layer, or one of the
+constants below, recomputes that layer and the ones after it; the layers
+above load from data/.cache. Without a 1M file every entry stays a market
+entry and the stop is never touched (1M stops are banned by contract).
+
+Run from historyBot/: python scripts/contract_pipeline.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from strategy_adapters import (
+    ROOT, bias_v3, execution_5m, load_script, run_4h_config, run_5m_config, metrics_5m
+)
+from engine.excursions import ExcursionEngine
+from engine.pipeline import Pipeline
+from engine.profiling import profiled
+from engine.time_index import TimeIndex
+
+structure_1h = load_script('candleBias/1H/backtest_1h_structure.py', 'backtest_1h_structure')
+
+# =============================================================================
+# CONTRACTS
+# =============================================================================
+
+DATASET_4H = 'data/btc_usd_4h.csv'
+DATASET_5M = 'data/btc_usd_5m.csv'
+DATASET_1M = 'data/btc_usd_1m.csv'
+
+CONTRACT_4H = {
+    'rsi_filter': True,
+    'rsi_bull_threshold': 40,
+    'rsi_bear_threshold': 80,
+    'confirmation': True,
+}
+BLOCKED_SESSIONS = ('NY_OPEN',)
+PREFERRED_SESSIONS = ('NY_MID',)
+CONTRACT_5M = {'confirmation': 'RECLAIM_LEVEL', 'max_wait_hours': 4}
+ENTRY_WINDOW_MINUTES = 30
+
+# =============================================================================
+# SOURCES
+# =============================================================================
+
+def load_candles(path: Path) -> pd.DataFrame:
+    """OHLCV candles sorted by time; empty if the file is not there (1M)."""
+    if not path.exists():
+        return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df = pd.read_csv(path)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df.sort_values('timestamp').reset_index(drop=True)
+
+# =============================================================================
+# LAYERS
+# =============================================================================
+
+def bias_4h(df_4h: pd.DataFrame, **config) -> pd.DataFrame:
+    """Evaluated sweeps, same rows as 4h_bias_v3_best_results.csv."""
+    df = bias_v3.detect_swings(df_4h)
+    df = bias_v3.detect_regimes(df)
+    return run_4h_config(df, config)
+
+
+def session_1h(signals: pd.DataFrame, blocked=(), preferred=()) -> pd.DataFrame:
+    """Tag each bias signal with its session and drop blocked sessions."""
+    signals = signals.copy()
+    signals['session'] = signals['timestamp'].map(structure_1h.get_session)
+    signals['preferred'] = signals['session'].isin(preferred)
+    return signals[~signals['session'].isin(blocked)].reset_index(drop=True)
+
+
+def execution_5m_entries(signals: pd.DataFrame, df_5m: pd.DataFrame, **config) -> pd.DataFrame:
+    """5M entries for the gated signals, with MFE/MAE over the 5M hold."""
+    features = {
+        'df_5m': df_5m,
+        'time_index': TimeIndex.from_frame(df_5m),
+        'engine': ExcursionEngine.from_frame(df_5m),
+    }
+    bias_signals = [
+        execution_5m.BiasSignal(
+            timestamp=row.timestamp,
+            bias=execution_5m.Bias[row.bias],
+            sweep_price=row.close_price,
+            rsi_at_sweep=row.rsi,
+            swing_level=row.swing_price,
+        )
+        for row in signals.itertuples()
+    ]
+    entries = run_5m_config(features, config, bias_signals=bias_signals)
+    sessions = signals.set_index('timestamp')[['session', 'preferred']]
+    return entries.join(sessions, on='signal_time')
+
+
+def entry_1m(entries: pd.DataFrame, df_1m: pd.DataFrame, window_minutes: int = 30) -> pd.DataFrame:
+    """
+    Limit entry at the 1M extreme inside the window after each 5M entry,
+    otherwise market at the 5M price. Stops are left on the 5M swing.
+    """
+    entries = entries.copy()
+    prices = entries['entry_price'].to_numpy(dtype=float)
+    bullish = (entries['bias'] == 'BULLISH').to_numpy()
+    limit = np.full(len(entries), np.nan)
+
+    if len(entries) and not df_1m.empty:
+        times = pd.DatetimeIndex(df_1m['timestamp'])
+        lows = df_1m['low'].to_numpy(dtype=float)
+        highs = df_1m['high'].to_numpy(dtype=float)
+        starts = pd.DatetimeIndex(entries['timestamp'])
+        lo = times.searchsorted(starts, side='left')
+        hi = times.searchsorted(starts + pd.Timedelta(minutes=window_minutes), side='right')
+        for i in range(len(entries)):
+            if hi[i] > lo[i]:
+                limit[i] = lows[lo[i]:hi[i]].min() if bullish[i] else highs[lo[i]:hi[i]].max()
+
+    improvement = np.where(bullish, prices - limit, limit - prices) / prices * 100
+    filled = improvement > 0
+    entries['entry_type'] = np.where(filled, 'LIMIT', 'MARKET')
+    entries['entry_1m_price'] = np.where(filled, limit, prices)
+    entries['improvement_pct'] = np.where(filled, improvement, 0.0)
+    return entries
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def build_pipeline(cache=None) -> Pipeline:
+    """Sources and contract layers; run() resolves only what is not cached."""
+    pipe = Pipeline(cache)
+    pipe.source('candles_4h', ROOT / DATASET_4H, bias_v3.load_data)
+    pipe.source('candles_5m', ROOT / DATASET_5M, load_candles)
+    pipe.source('candles_1m', ROOT / DATASET_1M, load_candles)
+
+    pipe.stage('bias_4h', bias_4h, inputs=['candles_4h'], params=CONTRACT_4H,
+               depends=[bias_v3, run_4h_config])
+    pipe.stage('session_1h', session_1h, inputs=['bias_4h'],
+               params={'blocked': BLOCKED_SESSIONS, 'preferred': PREFERRED_SESSIONS},
+               depends=[structure_1h.get_session])
+    pipe.stage('execution_5m', execution_5m_entries, inputs=['session_1h', 'candles_5m'],
+               params=CONTRACT_5M, depends=[execution_5m, run_5m_config])
+    pipe.stage('entry_1m', entry_1m, inputs=['execution_5m', 'candles_1m'],
+               params={'window_minutes': ENTRY_WINDOW_MINUTES})
+    return pipe
+
+
+@profiled
+def main():
+    print("=" * 90)
+    print("CONTRACT PIPELINE: 4H BIAS -> 1H SESSION -> 5M EXECUTION -> 1M ENTRY")
+    print("=" * 90)
+
+    pipe = build_pipeline()
+    batches = pipe.run()
+    print("\nStages:")
+    print(pipe.describe())
+
+    signals = batches['bias_4h']
+    gated = batches['session_1h']
+    entries = batches['entry_1m']
+
+    print(f"\n4H bias signals:        {len(signals)}")
+    print(f"After session gate:     {len(gated)} ({gated['preferred'].sum()} in preferred sessions)")
+    print(f"5M {CONTRACT_5M['confirmation']} entries: {len(entries)}")
+
+    metrics = metrics_5m(entries)
+    if metrics is None:
+        print("\nNo 5M entries in the 5M data range")
+        return
+    print(f"  Win rate:       {metrics['win_rate']:.1f}%")
+    print(f"  Avg MFE / MAE:  {metrics['avg_mfe']:.2f}% / {metrics['avg_mae']:.2f}%")
+    print(f"  MFE/MAE ratio:  {metrics['mfe_mae_ratio']:.2f}")
+
+    limits = entries[entries['entry_type'] == 'LIMIT']
+    if limits.empty:
+        print(f"\n1M entry: no 1M fills ({DATASET_1M} missing or no retracement), all market entries")
+    else:
+        print(f"\n1M entry: {len(limits)}/{len(entries)} limit fills, "
+              f"avg improvement {limits['improvement_pct'].mean():.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,13 +16,28 @@ Trade Management Rules:
 - Protection: +0.8R → move stop to breakeven
 - Weekend: Close losers Friday, hold winners with BE stop
 - Typical hold: 8-48 hours (swing with intraday entry)
+
+With --trades, skips the parametric model and block-bootstraps the
+R-multiples of a real trade log instead (engine/bootstrap.py):
+
+Run from historyBot/:
+    python scripts/equity_curve_simulation.py
+    python scripts/equity_curve_simulation.py --trades "../44%bot/logs/backtest_trades.csv"
+    python scripts/equity_curve_simulation.py --trades candleBias/4H/4h_bias_v3_best_results.csv --stop-pct 1.5
 """
 
+import argparse
+import sys
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import random
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from engine.bootstrap import METHODS, STATIONARY, block_bootstrap, default_block, r_multiples
+
 # Set seed for reproducibility
 np.random.seed(42)
 
@@ -280,6 +295,83 @@ def run_monte_carlo(n_simulations, starting_balance, n_months, params,
     return pd.DataFrame(results)
 
 
+# =============================================================================
+# BLOCK BOOTSTRAP OVER REAL TRADES
+# =============================================================================
+
+def run_bootstrap(r, starting_balance, n_simulations=10000, n_trades=None, risk=0.01,
+                  block=None, method=STATIONARY, ruin_level=0.5, workers=None, seed=42):
+    """
+    Monte Carlo from real R-multiples instead of SYSTEM_PARAMS.
+
+    Resamples blocks of consecutive trades, so loss clustering in the log
+    carries into the simulated curves.
+
+    Returns:
+        DataFrame with one row per simulation (run_monte_carlo columns that
+        apply, plus max losing streak and death spirals)
+    """
+    result = block_bootstrap(
+        r, paths=n_simulations, length=n_trades, block=block, method=method,
+        risk=risk, ruin_level=ruin_level, seed=seed, workers=workers
+    )
+    final_equity = result.final_equity * starting_balance
+    return pd.DataFrame({
+        'simulation': np.arange(1, len(result) + 1),
+        'final_equity': final_equity,
+        'total_return_pct': (result.final_equity - 1) * 100,
+        'max_drawdown_pct': result.max_drawdown * 100,
+        'min_equity': result.min_equity * starting_balance,
+        'ruined': result.min_equity <= ruin_level,
+        'max_losing_streak': result.max_losing_streak,
+        'death_spirals': result.spirals,
+    })
+
+
+def bootstrap_report(trades_path, stop_pct=None, starting_balance=10000, n_simulations=10000,
+                     n_trades=None, risk=0.01, block=None, method=STATIONARY,
+                     ruin_level=0.5, workers=None):
+    """Print drawdown, ruin and streak distributions for a trade log."""
+    trades = pd.read_csv(trades_path)
+    r = r_multiples(trades, stop_pct=stop_pct)
+    block = block or default_block(len(r))
+    n_trades = n_trades or len(r)
+
+    print("=" * 70)
+    print("BLOCK BOOTSTRAP - REAL TRADE SEQUENCE")
+    print("=" * 70)
+    print(f"\nTrade log: {trades_path} ({len(r)} trades)")
+    print(f"  Win rate: {np.mean(r > 0) * 100:.1f}% | Avg R: {r.mean():+.3f}R | "
+          f"Avg win: {r[r > 0].mean() if (r > 0).any() else 0:.2f}R | "
+          f"Avg loss: {r[r < 0].mean() if (r < 0).any() else 0:.2f}R")
+    print(f"  {method} bootstrap, block {block}, {n_simulations:,} paths of {n_trades} trades, "
+          f"{risk * 100:.1f}% risk")
+
+    mc = run_bootstrap(r, starting_balance, n_simulations, n_trades, risk, block, method,
+                       ruin_level, workers)
+
+    print(f"\nEquity Distribution After {n_trades} Trades:")
+    for p in [5, 10, 25, 50, 75, 90, 95]:
+        val = np.percentile(mc['final_equity'], p)
+        print(f"  {p}th percentile: ${val:,.0f} ({(val / starting_balance - 1) * 100:+.0f}%)")
+
+    print(f"\nDrawdown Distribution:")
+    print(f"  Median Max DD: {mc['max_drawdown_pct'].median():.1f}%")
+    print(f"  95th percentile Max DD: {np.percentile(mc['max_drawdown_pct'], 95):.1f}%")
+    print(f"  99th percentile Max DD: {np.percentile(mc['max_drawdown_pct'], 99):.1f}%")
+    print(f"  Worst Max DD: {mc['max_drawdown_pct'].max():.1f}%")
+
+    print(f"\nRuin (equity down to {ruin_level * 100:.0f}% of start): "
+          f"{mc['ruined'].mean() * 100:.2f}% of paths")
+
+    print(f"\nLosing Streaks:")
+    print(f"  Median max streak: {mc['max_losing_streak'].median():.0f}")
+    print(f"  95th percentile max streak: {np.percentile(mc['max_losing_streak'], 95):.0f}")
+    print(f"  Paths with a death spiral (5+ losses): {(mc['death_spirals'] > 0).mean() * 100:.1f}%")
+
+    return mc
+
+
 # =============================================================================
 # OVERNIGHT HOLD ANALYSIS
 # =============================================================================
@@ -625,4 +717,21 @@ KEY INSIGHT:
 
 
 if __name__ == "__main__":
-    mc_results, single_curve = main()
+    parser = argparse.ArgumentParser(description='Equity curve Monte Carlo (parametric, or bootstrapped from real trades)')
+    parser.add_argument('--trades', type=Path, help='Trade log CSV to bootstrap (backtest.py --export-trades, or 4h_bias_v3_best_results.csv)')
+    parser.add_argument('--stop-pct', type=float, help='Stop distance in %% of entry, for logs without a stop_loss column')
+    parser.add_argument('--paths', type=int, default=10000, help='Bootstrap paths (default: 10,000)')
+    parser.add_argument('--length', type=int, help='Trades per path (default: trades in the log)')
+    parser.add_argument('--block', type=int, help='Mean block length (default: trades ** 1/3)')
+    parser.add_argument('--method', choices=METHODS, default=STATIONARY, help='Block scheme (default: stationary)')
+    parser.add_argument('--risk', type=float, default=0.01, help='Fraction of equity risked per trade (default: 0.01)')
+    parser.add_argument('--ruin', type=float, default=0.5, help='Equity multiple counted as ruin (default: 0.5)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: every core)')
+    args = parser.parse_args()
+
+    if args.trades:
+        bootstrap_report(args.trades, stop_pct=args.stop_pct, n_simulations=args.paths,
+                         n_trades=args.length, risk=args.risk, block=args.block,
+                         method=args.method, ruin_level=args.ruin, workers=args.workers)
+    else:
+        mc_results, single_curve = main()
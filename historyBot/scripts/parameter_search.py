@@ -0,0 +1,114 @@
+"""
+Successive-Halving Parameter Search
+===================================
+Searches a much wider detect_sweeps_filtered grid than FILTER_CONFIGS / V3
+CONFIGS, plus the 5M confirmation layer, without running every config over
+the full history.
+
+Configs are scored on 1/9 of the history, the best third move to 1/3, and
+the best third of those see all of it. Results persist to data/ after
+every evaluation; re-running resumes an interrupted search.
+
+The 2021-2023 4H dataset is kept out of the search and used to check the
+finalists, the same role backtest_4h_stress_test plays for the frozen logic.
+
+Run from historyBot/: python scripts/parameter_search.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from strategy_adapters import (
+    ROOT, build_4h_configs, build_5m_configs,
+    load_4h_features, run_4h_config, metrics_4h, score_4h, evaluate_4h_prefix,
+    load_5m_features, score_5m, evaluate_5m_prefix
+)
+from engine.halving import SuccessiveHalving
+from engine.profiling import profiled
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SEARCH_4H = 'data/btc_usd_4h.csv'
+HOLDOUT_4H = 'data/btc_usd_4h_2021_2023.csv'
+DATASET_5M = 'data/btc_usd_5m.csv'
+
+STATE_4H = 'data/search_state_4h.json'
+STATE_5M = 'data/search_state_5m.json'
+
+WORKERS = None  # None = all cores
+FINALISTS = 10
+
+# 4H search space
+RSI_BULL_THRESHOLDS = [25, 30, 35, 40, 45, 50]
+RSI_BEAR_THRESHOLDS = [55, 60, 65, 70, 75, 80, 85, 90, 95, 100]
+CONFIRMATION = [True, False]
+SWING_LOOKBACKS = [5, 10, 15, 20, 30, 40]
+
+# 5M search space (few bias signals, so a gentler eta)
+MAX_WAIT_HOURS = [3, 6, 9, 12, 18, 24]
+
+
+@profiled
+def main():
+    print("=" * 100)
+    print("SUCCESSIVE-HALVING PARAMETER SEARCH")
+    print("=" * 100)
+
+    # -------------------------------------------------------------------------
+    # 4H sweep filters
+    # -------------------------------------------------------------------------
+    configs_4h = build_4h_configs(RSI_BULL_THRESHOLDS, RSI_BEAR_THRESHOLDS,
+                                  CONFIRMATION, SWING_LOOKBACKS)
+    print(f"\n4H: {len(configs_4h)} configs on {SEARCH_4H}")
+    df = load_4h_features(SEARCH_4H)
+
+    search_4h = SuccessiveHalving(evaluate_4h_prefix, score_4h, eta=3, n_rungs=3,
+                                  state_path=ROOT / STATE_4H, workers=WORKERS)
+    board_4h = search_4h.run(df, configs_4h)
+    finalists = board_4h[board_4h['rung'] == board_4h['rung'].max()].head(FINALISTS)
+
+    print(f"\n  Holdout check on {HOLDOUT_4H}\n")
+    holdout = load_4h_features(HOLDOUT_4H)
+
+    print(f"  {'Config':<26} {'Signals':<9} {'Acc%':<8} {'MFE/MAE':<9} {'Pass':<6} "
+          f"| {'Holdout':<9} {'Acc%':<8} {'MFE/MAE':<9} {'Pass':<6}")
+    print("  " + "-" * 96)
+    for row in finalists.itertuples(index=False):
+        h = metrics_4h(run_4h_config(holdout, configs_4h[row.name]))
+        holdout_cols = (f"{h['signals']:<9} {h['accuracy']:<8.1f} {h['mfe_mae']:<9.2f} "
+                        f"{'yes' if h['passed'] else 'no':<6}") if h else "no signals"
+        print(f"  {row.name:<26} {row.signals:<9} {row.accuracy:<8.1f} {row.mfe_mae:<9.2f} "
+              f"{'yes' if row.passed else 'no':<6} | {holdout_cols}")
+
+    # -------------------------------------------------------------------------
+    # 5M confirmation layer
+    # -------------------------------------------------------------------------
+    configs_5m = build_5m_configs(MAX_WAIT_HOURS)
+    print(f"\n5M: {len(configs_5m)} configs on {DATASET_5M}")
+    features_5m = load_5m_features(DATASET_5M)
+
+    search_5m = SuccessiveHalving(evaluate_5m_prefix, score_5m, eta=2, n_rungs=3,
+                                  state_path=ROOT / STATE_5M, workers=WORKERS)
+    board_5m = search_5m.run(features_5m, configs_5m)
+    top_5m = board_5m[board_5m['rung'] == board_5m['rung'].max()]
+
+    print(f"\n  {'Config':<26} {'Entries':<9} {'Win%':<8} {'MFE/MAE':<9}")
+    print("  " + "-" * 52)
+    for row in top_5m.itertuples(index=False):
+        if np.isnan(getattr(row, 'entries', np.nan)):
+            print(f"  {row.name:<26} no entries")
+            continue
+        print(f"  {row.name:<26} {int(row.entries):<9} {row.win_rate:<8.1f} {row.mfe_mae_ratio:<9.2f}")
+
+    print("\n" + "=" * 100)
+    print(f"Search state: {STATE_4H}, {STATE_5M} (delete to start over)")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
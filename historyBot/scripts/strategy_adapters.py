@@ -0,0 +1,189 @@
+"""
+Strategy Adapters
+=================
+4H bias (backtest_4h_bias_v3) and 5M execution (5m_execution_backtest)
+wrapped as config -> signal table -> metrics functions, for the
+walk-forward and parameter-search scripts.
+
+Features are loaded once per dataset; every run_* function takes those
+features plus one config dict (JSON-friendly, so searches can persist it).
+"""
+
+import importlib.util
+import sys
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from engine.excursions import ExcursionEngine
+from engine.time_index import TimeIndex
+
+
+def load_script(relative_path: str, name: str):
+    """Import a strategy script whose file name is not a valid module name."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, ROOT / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+bias_v3 = load_script('candleBias/4H/backtest_4h_bias_v3.py', 'backtest_4h_bias_v3')
+execution_5m = load_script('candleBias/5M/5m_execution_backtest.py', 'execution_5m')
+
+HOLD_HOURS_5M = 24
+MIN_ENTRIES_5M = 5
+
+# =============================================================================
+# CONFIG GRIDS
+# =============================================================================
+
+def build_4h_configs(rsi_bull, rsi_bear, confirmation, lookbacks) -> dict:
+    """Named detect_sweeps_filtered configs for every combination, plus confirm_only."""
+    configs = {}
+    for bull, bear, confirm, lookback in product(rsi_bull, rsi_bear, confirmation, lookbacks):
+        name = f"rsi{bull}/{bear}{'_confirm' if confirm else ''}_lb{lookback}"
+        configs[name] = {
+            'rsi_filter': True,
+            'rsi_bull_threshold': bull,
+            'rsi_bear_threshold': bear,
+            'confirmation': confirm,
+            'lookback': lookback,
+        }
+    configs['confirm_only'] = {'rsi_filter': False, 'confirmation': True}
+    return configs
+
+
+def build_5m_configs(max_wait_hours, confirmation_types=None) -> dict:
+    """Named 5M confirmation configs (confirmation type x max wait)."""
+    types = confirmation_types or [ct.name for ct in execution_5m.ConfirmationType]
+    return {
+        f"{conf}_{wait}h": {'confirmation': conf, 'max_wait_hours': wait}
+        for conf, wait in product(types, max_wait_hours)
+    }
+
+# =============================================================================
+# 4H BIAS
+# =============================================================================
+
+def load_4h_features(filepath: str) -> pd.DataFrame:
+    """RSI, swings and regimes, computed once per dataset."""
+    df = bias_v3.load_data(str(ROOT / filepath))
+    df = bias_v3.detect_swings(df)
+    return bias_v3.detect_regimes(df)
+
+
+def run_4h_config(df: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """One row per evaluated sweep."""
+    sweeps = bias_v3.detect_sweeps_filtered(df, config)
+    return pd.DataFrame(bias_v3.evaluate_sweeps(df, sweeps))
+
+
+def metrics_4h(rows: pd.DataFrame):
+    """V3 metrics plus the V3 pass/fail flag."""
+    metrics = bias_v3.calculate_metrics(rows.to_dict('records'))
+    if metrics is not None:
+        metrics['passed'] = bias_v3.passes(metrics)
+    return metrics
+
+
+def score_4h(metrics: dict):
+    # Same ranking as V3: passing configs first, then by signal count
+    return (metrics['passed'], metrics['signals'])
+
+
+def evaluate_4h_prefix(df: pd.DataFrame, config: dict, fraction: float):
+    """4H metrics on the first `fraction` of the history."""
+    return metrics_4h(run_4h_config(df.iloc[:max(1, int(len(df) * fraction))], config))
+
+# =============================================================================
+# 5M EXECUTION
+# =============================================================================
+
+def load_5m_features(filepath: str) -> dict:
+    """5M candles, time index, excursion engine and 4H bias signals, computed once."""
+    df_5m = pd.read_csv(ROOT / filepath)
+    df_5m['timestamp'] = pd.to_datetime(df_5m['timestamp'])
+    df_4h = execution_5m.aggregate_to_4h(df_5m)
+    return {
+        'df_5m': df_5m,
+        'time_index': TimeIndex.from_frame(df_5m),
+        'engine': ExcursionEngine.from_frame(df_5m),
+        'bias_signals': execution_5m.detect_4h_bias_signals(df_4h),
+    }
+
+
+def run_5m_config(features: dict, config: dict, bias_signals=None) -> pd.DataFrame:
+    """One row per 5M entry of the configured confirmation type."""
+    df_5m = features['df_5m']
+    time_index = features['time_index']
+    wait = config['max_wait_hours']
+    if bias_signals is None:
+        bias_signals = features['bias_signals']
+
+    candidates = []
+    for signal in bias_signals:
+        confirmations = execution_5m.find_5m_confirmations(
+            df_5m, signal, max_wait_hours=wait, time_index=time_index
+        )
+        window = time_index.slice(signal.timestamp, signal.timestamp + pd.Timedelta(hours=wait))
+        for conf_type, candle_idx, entry_price in confirmations:
+            if conf_type.name != config['confirmation'] or candle_idx >= window.stop - window.start:
+                continue
+            entry_time = df_5m['timestamp'].iloc[window.start + candle_idx]
+            candidates.append((entry_time, entry_price, signal.bias, signal.timestamp, signal.swing_level))
+
+    if not candidates:
+        return pd.DataFrame(columns=['timestamp', 'bias', 'entry_price', 'mfe', 'mae', 'outcome',
+                                     'signal_time', 'swing_level'])
+
+    times, prices, biases, signal_times, swing_levels = zip(*candidates)
+    stats = execution_5m.calculate_mfe_mae(features['engine'], list(times), list(prices),
+                                           list(biases), hold_hours=HOLD_HOURS_5M)
+    rows = pd.DataFrame({
+        'timestamp': list(times),
+        'bias': [b.name for b in biases],
+        'entry_price': list(prices),
+        'mfe': stats['mfe'].to_numpy(),
+        'mae': stats['mae'].to_numpy(),
+        'outcome': stats['outcome'].to_numpy(),
+        'signal_time': list(signal_times),
+        'swing_level': list(swing_levels),
+    })
+    return rows[rows['outcome'] != 'INVALID'].reset_index(drop=True)
+
+
+def metrics_5m(rows: pd.DataFrame):
+    """Entry count, win rate and MFE/MAE ratio."""
+    if rows.empty:
+        return None
+    avg_mfe = rows['mfe'].mean()
+    avg_mae = rows['mae'].mean()
+    return {
+        'entries': len(rows),
+        'win_rate': (rows['outcome'] == 'WIN').mean() * 100,
+        'avg_mfe': avg_mfe,
+        'avg_mae': avg_mae,
+        'mfe_mae_ratio': avg_mfe / avg_mae if avg_mae > 0 else float('inf'),
+    }
+
+
+def score_5m(metrics: dict):
+    if metrics['entries'] < MIN_ENTRIES_5M:
+        return -np.inf
+    return metrics['mfe_mae_ratio']
+
+
+def evaluate_5m_prefix(features: dict, config: dict, fraction: float):
+    """5M metrics using the bias signals in the first `fraction` of the history."""
+    df_5m = features['df_5m']
+    start = df_5m['timestamp'].iloc[0]
+    cutoff = start + (df_5m['timestamp'].iloc[-1] - start) * fraction
+    signals = [s for s in features['bias_signals'] if s.timestamp <= cutoff]
+    return metrics_5m(run_5m_config(features, config, bias_signals=signals))
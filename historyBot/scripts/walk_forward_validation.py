@@ -0,0 +1,163 @@
+"""
+Walk-Forward Validation for the 4H Bias + 5M Execution Strategy
+===============================================================
+Replaces the manual loop of tuning in backtest_4h_bias_v3 and validating
+with backtest_4h_stress_test with one reproducible job.
+
+4H: sweep configs (RSI thresholds, confirmation, swing lookback) are
+    re-optimized on each train window of both 4H datasets and scored on
+    the next test window, using the V3 pass criteria.
+5M: confirmation type and max wait are re-optimized per fold on the 5M
+    dataset, scored by MFE/MAE ratio.
+
+Configs run in a process pool (one config per task) on every core.
+Out-of-sample rows from every fold are pooled and scored as one series.
+
+Run from historyBot/: python scripts/walk_forward_validation.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from strategy_adapters import (
+    ROOT, bias_v3, build_4h_configs, build_5m_configs,
+    load_4h_features, run_4h_config, metrics_4h, score_4h,
+    load_5m_features, run_5m_config, metrics_5m, score_5m, HOLD_HOURS_5M
+)
+from engine.walk_forward import WalkForward, rolling_folds
+from engine.profiling import profiled
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DATASETS_4H = ['data/btc_usd_4h_2021_2023.csv', 'data/btc_usd_4h.csv']
+DATASET_5M = 'data/btc_usd_5m.csv'
+
+# 4H folds: ~6 months train, 2 months test
+TRAIN_4H = '180D'
+TEST_4H = '60D'
+EMBARGO_4H = f'{bias_v3.EVALUATION_WINDOW * 4}h'  # Evaluation window in hours
+
+# 5M folds: dataset covers ~6 months
+TRAIN_5M = '60D'
+TEST_5M = '30D'
+EMBARGO_5M = f'{HOLD_HOURS_5M}h'
+
+WORKERS = None  # None = all cores
+
+# 4H search space
+RSI_BULL_THRESHOLDS = [30, 35, 40, 45]
+RSI_BEAR_THRESHOLDS = [60, 70, 80, 100]
+CONFIRMATION = [True, False]
+SWING_LOOKBACKS = [10, 20, 30]
+
+# 5M search space
+MAX_WAIT_HOURS = [6, 12, 24]
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def print_folds(folds: pd.DataFrame, columns: list):
+    print(f"{'Fold':<6} {'Test window':<25} {'Config':<28} " + " ".join(f"{c:<18}" for c in columns))
+    print("-" * 110)
+    for row in folds.itertuples(index=False):
+        window = f"{row.test_start:%Y-%m-%d} - {row.test_end:%Y-%m-%d}"
+        values = []
+        for c in columns:
+            v = getattr(row, c, None)
+            if v is None or (isinstance(v, float) and np.isnan(v)):
+                values.append(f"{'-':<18}")
+            elif isinstance(v, (bool, np.bool_)):
+                values.append(f"{str(v):<18}")
+            else:
+                values.append(f"{v:<18.2f}" if isinstance(v, float) else f"{v:<18}")
+        print(f"{row.fold:<6} {window:<25} {str(row.config):<28} " + " ".join(values))
+
+
+@profiled
+def main():
+    print("=" * 110)
+    print("WALK-FORWARD VALIDATION - 4H BIAS + 5M EXECUTION")
+    print("=" * 110)
+
+    # -------------------------------------------------------------------------
+    # 4H
+    # -------------------------------------------------------------------------
+    configs_4h = build_4h_configs(RSI_BULL_THRESHOLDS, RSI_BEAR_THRESHOLDS,
+                                  CONFIRMATION, SWING_LOOKBACKS)
+    harness_4h = WalkForward(run_4h_config, metrics_4h, score_4h,
+                             embargo=EMBARGO_4H, workers=WORKERS)
+    oos_4h = []
+
+    for path in DATASETS_4H:
+        print(f"\n4H dataset: {path}")
+        df = load_4h_features(path)
+        folds = rolling_folds(df['timestamp'].iloc[0], df['timestamp'].iloc[-1], TRAIN_4H, TEST_4H)
+        print(f"  {len(df)} candles, {len(folds)} folds, {len(configs_4h)} configs\n")
+
+        result = harness_4h.run(df, configs_4h, folds)
+        print_folds(result.folds, ['test_signals', 'test_accuracy', 'test_mfe_mae', 'test_passed'])
+
+        if result.oos_metrics:
+            m = result.oos_metrics
+            print(f"\n  Out-of-sample: {m['signals']} signals, {m['accuracy']:.1f}% accuracy, "
+                  f"MFE/MAE {m['mfe_mae']:.2f}x, {m['spirals']} death spirals, "
+                  f"{'PASS' if m['passed'] else 'FAIL'}")
+            oos_4h.append(result.oos_rows.assign(dataset=path))
+
+    # -------------------------------------------------------------------------
+    # 5M
+    # -------------------------------------------------------------------------
+    print(f"\n5M dataset: {DATASET_5M}")
+    features_5m = load_5m_features(DATASET_5M)
+    configs_5m = build_5m_configs(MAX_WAIT_HOURS)
+    df_5m = features_5m['df_5m']
+    folds_5m = rolling_folds(df_5m['timestamp'].iloc[0], df_5m['timestamp'].iloc[-1], TRAIN_5M, TEST_5M)
+    print(f"  {len(df_5m)} candles, {len(features_5m['bias_signals'])} 4H bias signals, "
+          f"{len(folds_5m)} folds, {len(configs_5m)} configs\n")
+
+    harness_5m = WalkForward(run_5m_config, metrics_5m, score_5m,
+                             embargo=EMBARGO_5M, workers=WORKERS)
+    result_5m = harness_5m.run(features_5m, configs_5m, folds_5m)
+    print_folds(result_5m.folds, ['test_entries', 'test_win_rate', 'test_mfe_mae_ratio'])
+
+    if result_5m.oos_metrics:
+        m = result_5m.oos_metrics
+        print(f"\n  Out-of-sample: {m['entries']} entries, {m['win_rate']:.1f}% win rate, "
+              f"MFE/MAE {m['mfe_mae_ratio']:.2f}x")
+
+    # -------------------------------------------------------------------------
+    # AGGREGATE
+    # -------------------------------------------------------------------------
+    print("\n" + "=" * 110)
+    print("POOLED OUT-OF-SAMPLE (4H, ALL DATASETS)")
+    print("=" * 110)
+
+    if oos_4h:
+        pooled = pd.concat(oos_4h, ignore_index=True)
+        m = metrics_4h(pooled)
+        print(f"\n  Signals: {m['signals']}")
+        print(f"  Accuracy: {m['accuracy']:.1f}%")
+        print(f"  MFE/MAE: {m['mfe_mae']:.2f}x")
+        print(f"  Min regime accuracy: {m['min_regime']:.1f}%")
+        print(f"  Death spirals: {m['spirals']}")
+        print(f"\n  VERDICT: {'PASS' if m['passed'] else 'FAIL'} (V3 criteria on out-of-sample data only)")
+
+        pooled.to_csv(ROOT / 'data/walk_forward_4h_oos.csv', index=False)
+        print("\n  Results exported to: data/walk_forward_4h_oos.csv")
+    else:
+        print("\n  No out-of-sample signals")
+
+    if not result_5m.oos_rows.empty:
+        result_5m.oos_rows.to_csv(ROOT / 'data/walk_forward_5m_oos.csv', index=False)
+        print("  Results exported to: data/walk_forward_5m_oos.csv")
+
+
+if __name__ == "__main__":
+    main()